@@ -1,13 +1,19 @@
 # app.py
 import os
+import secrets
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from telegram.ext import Application
 
 from src.bot.factory import create_main_bot
+from src.bot.lifecycle import BacklogCatchUp, drain
 from src.config.logger import setup_logger
+from src.platform.telegram.webhook import IngestionConfig, enqueue_update, start_ingestion
+from src.services.bulk_transfer import BulkFormat, BulkImportError, BulkTransferService, ConflictPolicy
+from src.utils.constants import TELEGRAM_WEBHOOK_PATH
 
 # --- Setup e Logs ---
 load_dotenv('./config/.env')
@@ -18,6 +24,10 @@ logger = setup_logger(__name__)
 async def lifespan(app: FastAPI):
     # === STARTUP ===
     logger.info("Serviço iniciado: Carregando dependências e configurando Bot...")
+    # Polling ou webhook (TELEGRAM_MODE); configuração inválida impede o startup
+    ingestion = IngestionConfig.from_env()
+    app.state.ingestion = ingestion
+    app.state.draining = False
 
     # 1. Cria a instância do Main e injeta dependências (ASSÍNCRONO)
     main_instance = await create_main_bot()
@@ -25,18 +35,20 @@ async def lifespan(app: FastAPI):
     # 2. Obtém a instância do Application configurada
     telegram_app: Application = main_instance.get_telegram_app()
     app.state.telegram_app = telegram_app
-    logger.info("Iniciando bot com polling async (FastAPI Lifespan)...")
+    logger.info(f"Iniciando bot em modo {ingestion.mode} (FastAPI Lifespan)...")
 
-    # 3. Inicializa e Inicia o Polling
+    # 3. Inicializa e inicia o recebimento de updates
     bot_app: Application = app.state.telegram_app
     await bot_app.initialize()
     await bot_app.start()
 
-    # IMPORTANTE: Usamos o método do updater para rodar o polling dentro do loop do FastAPI
-    # Isso é a forma estável de rodar o polling assíncrono (como você descobriu no teste).
-    await bot_app.updater.start_polling(
-        drop_pending_updates=True
-    )
+    # Polling: primeiro o backlog acumulado durante o deploy (filtrado), depois o updater
+    # roda dentro do loop do FastAPI (forma estável do polling assíncrono).
+    # Webhook: o Telegram reenvia o que ficou pendente; as updates chegam pela rota
+    # TELEGRAM_WEBHOOK_PATH e vão para o update_queue.
+    if not ingestion.is_webhook:
+        await BacklogCatchUp().run(bot_app)
+    await start_ingestion(bot_app, ingestion)
 
     logger.info("Bot e API FastAPI iniciados com sucesso!")
 
@@ -49,12 +61,23 @@ async def lifespan(app: FastAPI):
         bot_app_to_stop: Application | None = getattr(app.state, 'telegram_app', None)
 
         if bot_app_to_stop:
-            # O autocompletar funciona melhor com a variável local bot_app_to_stop
-            # Verifica e para o updater
-            if bot_app.updater and bot_app.updater.running:
-                await bot_app.updater.stop()
+            # Drenagem: para de receber updates (webhook responde 503 e o Telegram reenvia depois)
+            # e espera as que estão em andamento até DRAIN_TIMEOUT_SECONDS
+            app.state.draining = True
+            await drain(bot_app_to_stop, ingestion)
             await bot_app.stop()
             await bot_app.shutdown()
+
+            # Fecha a conexão LISTEN do catálogo de serviços
+            service_catalog = bot_app_to_stop.bot_data.get('service_catalog')
+            if service_catalog:
+                await service_catalog.stop()
+            business_calendar = bot_app_to_stop.bot_data.get('business_calendar')
+            if business_calendar:
+                await business_calendar.stop()
+            state_backend = bot_app_to_stop.bot_data.get('state_backend')
+            if state_backend:
+                await state_backend.close()
         logger.info("Shutdown completo.")
 
 # --- FastAPI com lifespan ---
@@ -76,5 +99,117 @@ async def root():
 
     return {"status": "OK", "service": "Telegram Bot + FastAPI", "health": status}
 
+# --- Webhook do Telegram (TELEGRAM_MODE=webhook) ---
+@app.post(TELEGRAM_WEBHOOK_PATH)
+async def telegram_webhook(request: Request
+                           , x_telegram_bot_api_secret_token: str | None = Header(default=None)):
+    ingestion: IngestionConfig | None = getattr(app.state, 'ingestion', None)
+    if ingestion is None or not ingestion.is_webhook:
+        raise HTTPException(status_code=404, detail="Webhook desabilitado.")
+    if not ingestion.verify_secret(x_telegram_bot_api_secret_token):
+        raise HTTPException(status_code=403, detail="Token inválido.")
+
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    if bot_app is None or not bot_app.running or getattr(app.state, 'draining', False):
+        # O Telegram reenvia a update depois de uma resposta de erro (outro worker ou após o deploy)
+        raise HTTPException(status_code=503, detail="Bot ainda não inicializado.")
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON inválido.")
+    if not isinstance(payload, dict) or 'update_id' not in payload:
+        raise HTTPException(status_code=400, detail="Update inválida.")
+
+    # Responde logo: o processamento segue no Application (mesmos handlers do polling)
+    await enqueue_update(bot_app, payload)
+    return {"ok": True}
+
+# --- Métricas de banco (instrumentação por update) ---
+@app.get("/metrics/db")
+async def db_metrics():
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    instrumentation = bot_app.bot_data.get('db_instrumentation') if bot_app else None
+
+    if instrumentation is None:
+        return {"enabled": False}
+    return {"enabled": True, **instrumentation.metrics.snapshot()}
+
+@app.get("/metrics/availability-cache")
+async def availability_cache_metrics():
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    cache = bot_app.bot_data.get('availability_cache') if bot_app else None
+
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.snapshot()}
+
+@app.get("/metrics/outbound")
+async def outbound_metrics():
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    limiter = bot_app.bot_data.get('outbound_limiter') if bot_app else None
+
+    if limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **limiter.snapshot()}
+
+@app.get("/metrics/update-dedup")
+async def update_dedup_metrics():
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    dedup = bot_app.bot_data.get('update_dedup') if bot_app else None
+
+    if dedup is None:
+        return {"enabled": False}
+    return {"enabled": True, **dedup.snapshot()}
+
+# --- Importação/exportação em lote (COPY) ---
+# Desligadas sem BULK_API_TOKEN; com ele, exigem o cabeçalho X-Admin-Token.
+def _bulk_service(token: str | None) -> BulkTransferService:
+    esperado = os.getenv('BULK_API_TOKEN')
+    if not esperado:
+        raise HTTPException(status_code=404, detail="Importação/exportação em lote desabilitada.")
+    if not token or not secrets.compare_digest(token, esperado):
+        raise HTTPException(status_code=401, detail="Token inválido.")
+
+    bot_app: Application | None = getattr(app.state, 'telegram_app', None)
+    service = bot_app.bot_data.get('bulk_transfer') if bot_app else None
+    if service is None:
+        raise HTTPException(status_code=503, detail="Serviço ainda não inicializado.")
+    return service
+
+@app.get("/bulk/{tabela}/export")
+async def bulk_export(tabela: str
+                      , formato: BulkFormat = 'csv'
+                      , x_admin_token: str | None = Header(default=None)):
+    service = _bulk_service(x_admin_token)
+    try:
+        service.spec(tabela)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type = 'application/x-ndjson' if formato == 'jsonl' else 'text/csv'
+    return StreamingResponse(
+        service.export_rows(tabela, formato)
+        , media_type=media_type
+        , headers={"Content-Disposition": f'attachment; filename="{tabela}.{formato}"'}
+    )
+
+@app.post("/bulk/{tabela}/import")
+async def bulk_import(tabela: str
+                      , request: Request
+                      , formato: BulkFormat = 'csv'
+                      , conflitos: ConflictPolicy = 'abort'
+                      , x_admin_token: str | None = Header(default=None)):
+    service = _bulk_service(x_admin_token)
+    try:
+        # O corpo é consumido em streaming: o arquivo nunca fica inteiro em memória
+        report = await service.import_rows(tabela, formato, request.stream(), on_conflict=conflitos)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BulkImportError as e:
+        detail = {"erro": str(e), **(e.report.to_dict() if e.report else {})}
+        raise HTTPException(status_code=409 if e.report and e.report.conflitos else 422, detail=detail)
+    return report.to_dict()
+
 # O bot agora está totalmente isolado no Lifespan.
 # Você pode adicionar rotas da API aqui (ex: para dashboard) sem interromper o bot.
\ No newline at end of file
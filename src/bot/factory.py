@@ -1,13 +1,17 @@
 # # src/bot/factory.py
 import os
 
+from datetime import timedelta
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
-from telegram.ext import Application, ApplicationBuilder, JobQueue
+from telegram.ext import Application, ApplicationBuilder, BaseRateLimiter, BaseUpdateProcessor, JobQueue
 
 from src.database.base import init_db
 from src.database.session import engine, AsyncSessionLocal
+from src.database.instrumentation import DbInstrumentation
+from src.bot.update_processor import InstrumentedUpdateProcessor
+from src.bot.update_dedup import UpdateDeduplicator
 from src.bot.main import Main
 from src.utils.system_message import MESSAGES
 
@@ -23,22 +27,44 @@ from src.bot.slot_filling_manager import SlotFillingManager
 from src.bot.telegram_handlers import TelegramHandlers
 from src.services.slot_processor_service import SlotProcessorService
 from src.services.dialog_flow_service import DialogFlowService
+from src.services.message_retention_service import MessageRetentionService
+from src.services.service_catalog import ServiceCatalog
+from src.services.availability_cache import AvailabilityCache, SharedOccupancyBackend
+from src.services.state_backend import create_state_backend
+from src.services.staff_roster import StaffRoster
+from src.services.slot_holds import SlotHoldService
+from src.services.business_calendar import BusinessCalendar
+from src.services.bulk_transfer import BulkTransferService
+from src.services.reminder_dispatcher import ReminderDispatcher
+from src.services.session_expiry_service import SessionExpiryService
+from src.platform.telegram.rate_limited_sender import RateLimitedSender
+from src.platform.telegram.outbound_limiter import OutboundPriority, OutboundRateLimiter
+from src.platform.telegram.webhook import IngestionConfig
+from src.utils.constants import (SESSION_SWEEP_INTERVAL_SECONDS, TELEGRAM_MAX_CONCURRENT_UPDATES
+    , TELEGRAM_MAX_ADMITTED_UPDATES, TELEGRAM_USER_LOCK_STRIPES)
+from src.utils.striped_lock import StripedLock
 
 from src.config.logger import setup_logger
 logger = setup_logger(__name__)
 
 # --- Função para criar a aplicação do Telegram com JobQueue ---
-def create_telegram_application(token: str) -> Application:
-    """Cria a instância do telegram.ext.Application com JobQueue configurado."""
+def create_telegram_application(token: str
+                                , update_processor: Optional[BaseUpdateProcessor] = None
+                                , rate_limiter: Optional[BaseRateLimiter] = None) -> Application:
+    """Cria a instância do telegram.ext.Application com JobQueue (e, opcionalmente, processador de updates e rate limiter)."""
     # Cria o JobQueue
     job_queue = JobQueue()
 
     # Constrói o Application, anexando o JobQueue
-    application = (ApplicationBuilder().token(token)
-                   .job_queue(job_queue) # <-- CONFIGURAÇÃO ESSENCIAL
-                   .build())
+    builder = (ApplicationBuilder().token(token)
+               .job_queue(job_queue)) # <-- CONFIGURAÇÃO ESSENCIAL
 
-    return application
+    if update_processor is not None:
+        builder = builder.concurrent_updates(update_processor)
+    if rate_limiter is not None:
+        builder = builder.rate_limiter(rate_limiter)
+
+    return builder.build()
 
 async def create_main_bot() -> Main:
     """Função Factory Assíncrona para inicializar todas as dependências e criar a instância da classe Main."""
@@ -49,6 +75,14 @@ async def create_main_bot() -> Main:
     await init_db(engine)
     logger.info("Sincronização de tabelas concluída.")
 
+    # Contagem/tempo de queries por update (resumo no log + /metrics/db)
+    db_instrumentation = DbInstrumentation(engine)
+    db_instrumentation.install()
+
+    # A tabela `mensagem` é particionada por mês: as partições precisam existir antes do 1º INSERT
+    retention_service = MessageRetentionService(session_maker=AsyncSessionLocal)
+    await retention_service.ensure_partitions()
+
     # --- 2. Preparação das Dependências de API ---
     telegram_api_key = os.getenv('TELEGRAM_API_KEY')
     openai_api_key = os.getenv('OPENAI_API_KEY')
@@ -59,13 +93,44 @@ async def create_main_bot() -> Main:
     # --- 3. Inicialização de Serviços e Componentes Assíncronos ---
 
     # 3.1. Serviços Base (resolver Ciclo de Dependência)
-    persistence_service = PersistenceService(session_maker=AsyncSessionLocal)
+    # Catálogo de serviços em memória (recarregado via LISTEN/NOTIFY ou polling)
+    service_catalog = ServiceCatalog(session_maker=AsyncSessionLocal, engine=engine)
+    await service_catalog.start()
+
+    # Calendário de funcionamento compilado (grade semanal + feriados/exceções do banco)
+    business_calendar = BusinessCalendar(session_maker=AsyncSessionLocal, engine=engine)
+    await business_calendar.start()
+
+    # Estado compartilhado entre workers (histórico do LLM e cache de ocupação): STATE_BACKEND_URL
+    state_backend_url = os.getenv('STATE_BACKEND_URL')
+    state_backend = create_state_backend(state_backend_url)
+
+    # Ocupação por data em cache (no processo, ou no servidor de estado com vários workers)
+    availability_cache = AvailabilityCache(
+        backend=SharedOccupancyBackend(state_backend) if state_backend_url else None
+    )
+
+    # Profissionais (recursos da agenda): sem cadastro, a agenda segue com um único recurso
+    staff_roster = StaffRoster(session_maker=AsyncSessionLocal)
+    await staff_roster.refresh()
+
+    # Reserva temporária do horário escolhido até a confirmação
+    slot_holds = SlotHoldService()
+
+    persistence_service = PersistenceService(
+        session_maker=AsyncSessionLocal
+        , service_catalog=service_catalog
+        , availability_cache=availability_cache
+        , staff_roster=staff_roster
+        , slot_holds=slot_holds
+    )
 
     services_list = await persistence_service.get_available_services_names()
 
     # 3.2 Componentes LLM e Histórico
     history_manager = HistoryManager(
         system_message_content=MESSAGES['RESPOSTA_SUCINTA']
+        , backend=state_backend
     )
     llm_config = LLMConfig(
         openai_api_key=openai_api_key,
@@ -78,6 +143,9 @@ async def create_main_bot() -> Main:
         persistence_service=persistence_service
     )
 
+    # Mudanças no catálogo chegam ao services_context dos prompts sem reiniciar o bot
+    service_catalog.subscribe(lambda snapshot: llm_config.update_services(snapshot.names()))
+
     persistence_service._llm_service = llm_service
     logger.info("Ciclo de dependência resolvido: LLMService injetado tardiamente no DataService.")
 
@@ -116,9 +184,92 @@ async def create_main_bot() -> Main:
     )
 
     # Criação da Aplicação do Telegram com JobQueue ---
-    telegram_app = create_telegram_application(telegram_api_key)
+    outbound_limiter = OutboundRateLimiter()
+    # Reentregas do mesmo update_id: memória sempre; tabela só com webhook (vários workers dividem a ingestão)
+    update_dedup = UpdateDeduplicator(
+        persistence_service=persistence_service if IngestionConfig.from_env().is_webhook else None
+    )
+    telegram_app = create_telegram_application(
+        telegram_api_key
+        , update_processor=InstrumentedUpdateProcessor(
+            db_instrumentation
+            , max_concurrent_updates=TELEGRAM_MAX_CONCURRENT_UPDATES
+            , user_locks=StripedLock(TELEGRAM_USER_LOCK_STRIPES)
+            , max_admitted_updates=TELEGRAM_MAX_ADMITTED_UPDATES
+            , deduplicator=update_dedup
+        )
+        # Toda saída para chats passa pela fila (respostas interativas antes das notificações em lote)
+        , rate_limiter=outbound_limiter
+    )
     logger.info("Instância Application do Telegram criada com JobQueue")
 
+    # Manutenção diária das partições de mensagem (novas partições + arquivamento das antigas)
+    telegram_app.job_queue.run_repeating(
+        retention_service.maintenance_job
+        , interval=timedelta(days=1)
+        , first=timedelta(minutes=1)
+        , name='mensagem_retention'
+    )
+    telegram_app.job_queue.run_repeating(
+        update_dedup.cleanup_job
+        , interval=timedelta(days=1)
+        , first=timedelta(minutes=2)
+        , name='update_dedup_cleanup'
+    )
+    # Fallback do catálogo: reabre o LISTEN se caiu e confere o fingerprint
+    telegram_app.job_queue.run_repeating(
+        service_catalog.poll_job
+        , interval=service_catalog.poll_interval
+        , first=service_catalog.poll_interval
+        , name='service_catalog_poll'
+    )
+    telegram_app.job_queue.run_repeating(
+        staff_roster.poll_job
+        , interval=staff_roster.poll_interval
+        , first=staff_roster.poll_interval
+        , name='staff_roster_poll'
+    )
+    # Fallback do calendário + avanço diário do horizonte pré-calculado
+    telegram_app.job_queue.run_repeating(
+        business_calendar.poll_job
+        , interval=business_calendar.poll_interval
+        , first=business_calendar.poll_interval
+        , name='business_calendar_poll'
+    )
+
+    # Expiração de sessões inativas: uma varredura em lote no lugar de um job por usuário
+    # O OutboundRateLimiter já repete RetryAfter: o sender não soma uma segunda camada de tentativas
+    notification_sender = RateLimitedSender(max_retries=0, rate_limit_args={'priority': OutboundPriority.BULK})
+    session_expiry_service = SessionExpiryService(
+        persistence_service=persistence_service
+        , history_manager=history_manager
+        , sender=notification_sender
+    )
+    telegram_app.job_queue.run_repeating(
+        session_expiry_service.sweep_job
+        , interval=SESSION_SWEEP_INTERVAL_SECONDS
+        , first=SESSION_SWEEP_INTERVAL_SECONDS
+        , name='session_expiry_sweep'
+    )
+
+    # Lembretes: uma leitura da janela por minuto + um tick que dispara os vencidos (sem job por agendamento)
+    reminder_dispatcher = ReminderDispatcher(
+        persistence_service=persistence_service
+        , sender=notification_sender
+    )
+    telegram_app.job_queue.run_repeating(
+        reminder_dispatcher.poll_job
+        , interval=reminder_dispatcher.poll_seconds
+        , first=5
+        , name='reminder_window'
+    )
+    telegram_app.job_queue.run_repeating(
+        reminder_dispatcher.tick_job
+        , interval=reminder_dispatcher.tick_seconds
+        , first=reminder_dispatcher.tick_seconds
+        , name='reminder_tick'
+    )
+
     # --- 4. Criação e Retorno da Instância Main ---
 
     # A Main agora recebe apenas as dependências já construídas
@@ -137,6 +288,16 @@ async def create_main_bot() -> Main:
     # Injeta DataService e LLMService, que são usados no start_command
     telegram_app.bot_data['data_service'] = persistence_service
     telegram_app.bot_data['llm_service'] = llm_service
+    telegram_app.bot_data['service_catalog'] = service_catalog
+    telegram_app.bot_data['notification_sender'] = notification_sender
+    telegram_app.bot_data['db_instrumentation'] = db_instrumentation
+    telegram_app.bot_data['availability_cache'] = availability_cache
+    telegram_app.bot_data['state_backend'] = state_backend
+    telegram_app.bot_data['outbound_limiter'] = outbound_limiter
+    telegram_app.bot_data['update_dedup'] = update_dedup
+    telegram_app.bot_data['business_calendar'] = business_calendar
+    # Importação/exportação em lote pela API (invalida o cache das datas importadas)
+    telegram_app.bot_data['bulk_transfer'] = BulkTransferService(engine, availability_cache=availability_cache)
 
     # O contact_handler (receive_contact_info) também precisa de data_service
     logger.info("Dependências injetadas no Application.bot_data.")
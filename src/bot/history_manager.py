@@ -1,47 +1,76 @@
 # # src/bot/history_manager.py
+import json
 import logging
-from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.messages import SystemMessage, AIMessage, HumanMessage, BaseMessage
 from datetime import datetime
+from typing import Optional
+
+from src.services.state_backend import MemoryStateBackend, StateBackend, StateBackendError
+from src.utils.constants import HISTORY_STATE_TTL_SECONDS
 
 logger = logging.getLogger(__name__)
 
-# Adicione o DataService (ou o repo de mensagens) ao construtor:
+# Serialização compacta de cada mensagem: [tipo, conteúdo, timestamp]
+_HUMANO, _IA = 'h', 'a'
+
 class HistoryManager:
-    """Gerencia o histórico de conversas em memória, aplicando janela deslizante."""
-    def __init__(self, system_message_content: str, max_length: int = 5):
-        # Dicionário para armazenar o histórico em memória: {user_id: ChatMessageHistory}
-        self.historico_por_usuario = {}
+    """
+    Gerencia o histórico de conversas com janela deslizante.
+    As mensagens ficam num StateBackend (memória do processo ou servidor compartilhado): com vários
+    workers, qualquer um que receba a update enxerga o mesmo histórico. A SystemMessage é fixa e
+    não é armazenada; a lista guarda só as últimas `max_length - 1` mensagens.
+    """
+    def __init__(self
+                 , system_message_content: str
+                 , max_length: int = 5
+                 , backend: Optional[StateBackend] = None
+                 , ttl_seconds: Optional[float] = HISTORY_STATE_TTL_SECONDS):
+        self.backend = backend or MemoryStateBackend()
         self.system_message = SystemMessage(content=system_message_content)
         self.max_historico_length = max_length
+        self.ttl_seconds = ttl_seconds
 
-    def _get_or_create_history(self, user_id: int) -> ChatMessageHistory:
-        """Recupera ou inicializa o histórico de mensagens para o usuário."""
-        if user_id not in self.historico_por_usuario:
-            self.historico_por_usuario[user_id] = ChatMessageHistory()
-            self.historico_por_usuario[user_id].add_message(self.system_message)
-        return self.historico_por_usuario[user_id]
-    
-    def reset_history(self, user_id: int):
-        """Reinicia o histórico de conversação do usuário."""
-        self.historico_por_usuario[user_id] = ChatMessageHistory()
-        self.historico_por_usuario[user_id].add_message(self.system_message)
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"hist:{user_id}"
 
-    def add_message(self, user_id: int, message: str, is_user: bool = True):
-        """Adiciona uma mensagem (usuário ou IA) ao histórico e aplica a janela deslizante."""
-        historico = self._get_or_create_history(user_id)
+    @staticmethod
+    def _encode(message: str, is_user: bool) -> bytes:
+        return json.dumps([_HUMANO if is_user else _IA, message, datetime.now().isoformat(timespec='seconds')]
+                          , ensure_ascii=False, separators=(',', ':')).encode()
 
-        metadata = {"timestamp": datetime.now().isoformat()}
+    @staticmethod
+    def _decode(raw: bytes) -> BaseMessage:
+        tipo, content, timestamp = json.loads(raw)
+        cls = HumanMessage if tipo == _HUMANO else AIMessage
+        return cls(content=content, metadata={"timestamp": timestamp})
 
-        if is_user:
-            historico.add_message(HumanMessage(content=message, metadata=metadata))
-        else:
-            historico.add_message(AIMessage(content=message, metadata=metadata))
+    async def reset_history(self, user_id: int):
+        """Reinicia o histórico de conversação do usuário."""
+        await self.discard_history(user_id)
+
+    async def discard_history(self, user_id: int):
+        """Libera o histórico do usuário (sessão expirada). Recriado sob demanda."""
+        try:
+            await self.backend.delete(self._key(user_id))
+        except StateBackendError as e:
+            logger.warning(f"Não foi possível descartar o histórico do usuário {user_id}: {e}")
 
-        # Limita o histórico com janela deslizante (mantendo a SystemMessage na 1ª posição)
-        if len(historico.messages) > self.max_historico_length:
-            historico.messages = [historico.messages[0]] + historico.messages[- (self.max_historico_length -1):]
+    async def add_message(self, user_id: int, message: str, is_user: bool = True):
+        """Adiciona uma mensagem (usuário ou IA) ao histórico e aplica a janela deslizante."""
+        try:
+            await self.backend.list_push_capped(self._key(user_id), self._encode(message, is_user)
+                                                , max_len=max(self.max_historico_length - 1, 1)
+                                                , ttl=self.ttl_seconds)
+        except StateBackendError as e:
+            # Sem o armazenamento o atendimento segue, só sem memória da conversa
+            logger.warning(f"Histórico do usuário {user_id} não foi gravado: {e}")
 
-    def get_prompt(self, user_id: int):
-        """Retorna o prompt completo (incluindo histórico) para a LLM."""
-        return self._get_or_create_history(user_id).messages
\ No newline at end of file
+    async def get_prompt(self, user_id: int) -> list[BaseMessage]:
+        """Retorna o prompt completo (SystemMessage + histórico) para a LLM."""
+        try:
+            mensagens = await self.backend.list_range(self._key(user_id))
+        except StateBackendError as e:
+            logger.warning(f"Histórico do usuário {user_id} indisponível: {e}")
+            mensagens = []
+        return [self.system_message, *map(self._decode, mensagens)]
@@ -0,0 +1,136 @@
+# src/bot/lifecycle.py
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from telegram import Bot, Update
+from telegram.ext import Application
+
+from src.platform.telegram.webhook import IngestionConfig, stop_ingestion
+from src.utils.constants import CATCHUP_MAX_AGE_SECONDS, CATCHUP_MAX_UPDATES, DRAIN_TIMEOUT_SECONDS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# -----------------------------
+# Startup: backlog acumulado durante o deploy
+# -----------------------------
+@dataclass
+class CatchUpReport:
+    fetched: int = 0
+    processed: int = 0
+    skipped_old: int = 0
+    collapsed: int = 0      # Mensagens absorvidas numa rajada do mesmo usuário
+    updates: list[Update] = field(default_factory=list, repr=False)
+
+
+def _mergeable(update: Update) -> bool:
+    """Texto simples de usuário (sem comando): pode ser juntado com as mensagens vizinhas dele."""
+    msg = update.message
+    return bool(msg and msg.text and update.effective_user and not msg.text.startswith('/'))
+
+def _merge(burst: list[Update], bot: Optional[Bot]) -> Update:
+    """Uma update com o texto de toda a rajada (na ordem), no lugar da última mensagem."""
+    if len(burst) == 1:
+        return burst[0]
+    payload = burst[-1].to_dict()
+    payload['message']['text'] = "\n".join(u.message.text for u in burst)
+    payload['message'].pop('entities', None)     # Offsets das entidades não valem mais
+    return Update.de_json(payload, bot)
+
+
+class BacklogCatchUp:
+    """
+    Processa as updates pendentes no Telegram ao subir (em vez de descartá-las com drop_pending_updates):
+    mensagens mais velhas que `max_age_seconds` são ignoradas e rajadas de texto do mesmo usuário
+    viram uma só mensagem (um único turno do LLM, sem avalanche de respostas atrasadas).
+    As updates entram no update_queue do Application: concorrência limitada e ordem por usuário
+    ficam com o processador de updates, como no fluxo normal.
+    """
+
+    def __init__(self
+                 , max_age_seconds: int = CATCHUP_MAX_AGE_SECONDS
+                 , max_updates: int = CATCHUP_MAX_UPDATES):
+        self.max_age = timedelta(seconds=max_age_seconds)
+        self.max_updates = max_updates
+
+    async def fetch(self, bot: Bot) -> list[Update]:
+        """Lê o backlog (até `max_updates`), confirmando-o no Telegram; o restante fica para o polling."""
+        # getUpdates não funciona com webhook ativo (ex.: deploy anterior em modo webhook)
+        await bot.delete_webhook(drop_pending_updates=False)
+        pendentes: list[Update] = []
+        offset = None
+        while True:
+            lote = await bot.get_updates(offset=offset, timeout=0, allowed_updates=Update.ALL_TYPES
+                                         , limit=min(100, self.max_updates - len(pendentes)))
+            # Cada chamada com offset confirma o lote anterior (o Telegram descarta o que veio antes dele)
+            if not lote:
+                return pendentes
+            pendentes.extend(lote)
+            offset = lote[-1].update_id + 1
+            if len(pendentes) >= self.max_updates:
+                # Confirma o último lote sem consumir o próximo: o polling segue daqui
+                await bot.get_updates(offset=offset, timeout=0, limit=1)
+                return pendentes
+
+    def plan(self, updates: list[Update], now: Optional[datetime] = None, bot: Optional[Bot] = None) -> CatchUpReport:
+        """Filtra e junta as updates pendentes, preservando a ordem de cada usuário."""
+        now = now or datetime.now(timezone.utc)
+        report = CatchUpReport(fetched=len(updates))
+        rajadas: dict[int, list[Update]] = {}
+
+        def fechar(user_id: int):
+            rajada = rajadas.pop(user_id, None)
+            if rajada:
+                report.collapsed += len(rajada) - 1
+                report.updates.append(_merge(rajada, bot))
+
+        for update in sorted(updates, key=lambda u: u.update_id):
+            msg = update.message
+            if msg is not None and now - msg.date > self.max_age:
+                report.skipped_old += 1
+                continue
+            user = update.effective_user
+            if _mergeable(update):
+                rajadas.setdefault(user.id, []).append(update)
+                continue
+            if user is not None:
+                fechar(user.id)     # Comando, botão, contato...: a rajada anterior vai antes
+            report.updates.append(update)
+
+        for user_id in list(rajadas):
+            fechar(user_id)
+        report.processed = len(report.updates)
+        return report
+
+    async def run(self, telegram_app: Application) -> CatchUpReport:
+        report = self.plan(await self.fetch(telegram_app.bot), bot=telegram_app.bot)
+        for update in report.updates:
+            await telegram_app.update_queue.put(update)
+        if report.fetched:
+            logger.info(f"Backlog do deploy: {report.fetched} updates, {report.processed} enfileiradas, "
+                        f"{report.skipped_old} antigas ignoradas, {report.collapsed} juntadas em rajadas.")
+        return report
+
+# -----------------------------
+# Shutdown: drenagem
+# -----------------------------
+async def drain(telegram_app: Application
+                , ingestion: IngestionConfig
+                , timeout: float = DRAIN_TIMEOUT_SECONDS) -> bool:
+    """
+    Para de receber updates e espera as que já entraram (handlers, chamadas ao LLM e ao banco)
+    até `timeout`. Estouro do prazo cancela as que restam. Depois disso o Application.stop()
+    ainda aguarda os jobs e as tarefas de fundo (avisos, lembretes) antes de desligar.
+    True se tudo terminou dentro do prazo.
+    """
+    await stop_ingestion(telegram_app, ingestion)
+    try:
+        await asyncio.wait_for(telegram_app.update_queue.join(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        cancel = getattr(telegram_app.update_processor, 'cancel_in_flight', None)
+        canceladas = cancel() if cancel else 0
+        logger.warning(f"Drenagem excedeu {timeout:.0f}s: {canceladas} updates em andamento canceladas.")
+        return False
@@ -34,13 +34,17 @@ class LLMConfig:
             max_completion_tokens=300,
         )
         self.persistence_service = persistence_service
-        self.services_list = services_list
-        self.services_context = ", ".join(services_list) if services_list else "Nenhum"
+        self.update_services(services_list)
         
         # 2. INSTANCIA O NOVO ROTEADOR DINÂMICO, isso permite que o LLM decida qual função chamar
         self.router = ClassificationRouter(llm=self.llm)
         self.llm_with_tools = self.llm.bind_tools(ALL_TOOLS) if ALL_TOOLS else self.llm
 
+    def update_services(self, services_list: list[str]):
+        """Atualiza a lista de serviços usada nos prompts (chamado a cada nova versão do catálogo)."""
+        self.services_list = services_list
+        self.services_context = ", ".join(services_list) if services_list else "Nenhum"
+
     def _get_extraction_chain(self) -> Runnable:
         """Configura a chain de extração de slots (Pydantic)."""
         output_parser = PydanticOutputParser(pydantic_object=SlotExtraction)
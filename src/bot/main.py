@@ -1,11 +1,12 @@
 # # src/bot/main.py
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 
 # Importações dos Módulos de Fluxo e Roteamento
 from src.bot.telegram_handlers import TelegramHandlers
 
 from src.platform.telegram.handlers.start_handlers import start_command
 from src.platform.telegram.handlers.contact_handler import receive_contact_info
+from src.utils.constants import BOOKING_CALLBACK_PREFIX
 
 import logging
 logger = logging.getLogger(__name__)
@@ -43,6 +44,9 @@ class Main:
         self.app.add_handler(CommandHandler('servicos', self.bot_handlers.servicos))
         self.app.add_handler(CommandHandler('agenda', self.bot_handlers.agenda))
 
+        # Botões inline do agendamento (serviço, data, turno, horário): resolvidos sem LLM
+        self.app.add_handler(CallbackQueryHandler(self.bot_handlers.booking_choice, pattern=f"^{BOOKING_CALLBACK_PREFIX}:"))
+
         # Handler de Mensagem Principal (Roteamento)
         self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.bot_handlers.answer))
 
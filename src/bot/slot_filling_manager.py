@@ -1,17 +1,26 @@
 # src/bot/slot_filling_manager.py
+from datetime import date, datetime
+from typing import Optional
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from src.services.appointment_service import AppointmentService
 from src.services.persistence_service import PersistenceService
+from src.platform.telegram.ui.keyboards import (get_services_keyboard, get_dates_keyboard, get_shifts_keyboard
+    , get_times_keyboard, get_confirm_keyboard)
 
 from src.utils.helpers import SafeDict
 from src.utils.system_message import MESSAGES
-from src.utils.constants import REQUIRED_SLOTS
+from src.utils.constants import (REQUIRED_SLOTS, SHIFT_TIMES, BOOKING_DATE_OPTIONS, BOOKING_TIME_OPTIONS
+    , BOOKING_CONFIRM_WORDS)
 
 from src.config.logger import setup_logger
 logger = setup_logger(__name__)
 
+# Flag no slot_data: todos os slots preenchidos, horário reservado, esperando o "Confirmar"
+AWAITING_CONFIRMATION = 'aguardando_confirmacao'
+
 class SlotFillingManager:
     """[ASYNC] Gerencia o diálogo multi-turno para preencher os slots de agendamento (AGENDAR)"""
 
@@ -27,6 +36,7 @@ class SlotFillingManager:
         
         next_slot = missing_slots[0]
         response = None
+        keyboard = None     # Botões inline: a escolha volta pelo CallbackQueryHandler, sem LLM
 
         # PREPARAÇÃO DO CONTEXTO SEGURO 
         ctx = SafeDict(nome=nome) # Criamos o SafeDict injetando o nome e os slots já preenchidos
@@ -34,22 +44,27 @@ class SlotFillingManager:
 
         # Se falta servico_id, perguntamos pelo 'servico' (nome)
         if next_slot == 'servico_id':
-            servicos = await self.persistence_service.get_available_services_names()
+            servicos = await self.persistence_service.buscar_servicos('')
 
             if not servicos:
-                await update.message.reply_text("Ops, Não encontrei serviços disponíveis no momento. Tente novamente mais tarde.")
+                await update.effective_message.reply_text("Ops, Não encontrei serviços disponíveis no momento. Tente novamente mais tarde.")
                 return
             
-            lista_servicos = "\n".join([f"  - {s}" for s in servicos])
-            # Use uma mensagem mais descritiva com a lista
+            # A lista de serviços vai nos botões
             response = MESSAGES['SLOT_FILLING_ASK_SERVICE'].format_map(ctx)
-            response += f"\n\n**Serviços Disponíveis:**\n{lista_servicos}"
-            
-            # if lista_servicos: Poderei remover essa verificação depois
-            #     response += f"\n\n**Opções:**\n{lista_servicos}"
+            keyboard = get_services_keyboard([(s['servico_id'], s['nome']) for s in servicos])
             
         elif next_slot == 'data':
             response = MESSAGES['SLOT_FILLING_ASK_DATE'].format_map(ctx)
+            if updated_slots.get('servico_id'):
+                # Próximas datas com horário livre (a data digitada continua valendo)
+                opcoes = await self.persistence_service.find_next_available(
+                    servico_id=updated_slots['servico_id']
+                    , from_date=date.today()
+                    , limit=BOOKING_DATE_OPTIONS
+                )
+                if opcoes:
+                    keyboard = get_dates_keyboard([op.data for op in opcoes])
 
         elif next_slot == 'turno':
             # Proteção: Se por algum motivo o servico_id sumiu, volta um passo
@@ -61,11 +76,23 @@ class SlotFillingManager:
             # Usa servico_id e data para validar turnos reais
             servico_info = await self.persistence_service.get_service_details_by_id(updated_slots['servico_id'])
             duracao = servico_info['duracao_minutos']
-            turnos = await self.appointment_service.get_available_shifts(data=updated_slots['data'], duracao_minutos=duracao)
+            turnos = await self.appointment_service.get_available_shifts(
+                data=updated_slots['data'], duracao_minutos=duracao, servico_id=sid, user_id=update.effective_user.id)
 
             if not turnos:
-                # Se não houver turnos livres, informar e pedir uma nova data
-                response = MESSAGES['SLOT_FILLING_NO_AVAILABILITY'].format_map(ctx)
+                # Se não houver turnos livres, sugerir as próximas datas e pedir uma nova
+                sugestoes = await self.appointment_service.suggest_next_dates(
+                    servico_id=sid
+                    , after_date=updated_slots['data']
+                    , preferred_shift=updated_slots.get('turno')
+                )
+                if sugestoes:
+                    ctx['sugestoes'] = "\n".join(
+                        f"  - {op.data.strftime('%d/%m')}, {op.turno}: {', '.join(op.horarios)}" for op in sugestoes)
+                    response = MESSAGES['SLOT_FILLING_NO_AVAILABILITY_SUGGESTIONS'].format_map(ctx)
+                    keyboard = get_dates_keyboard([op.data for op in sugestoes])
+                else:
+                    response = MESSAGES['SLOT_FILLING_NO_AVAILABILITY'].format_map(ctx)
                 updated_slots.pop('data', None) # Limpa data para o bot pedir outra
                 await self.persistence_service.update_session_state(
                     update.effective_user.id
@@ -74,6 +101,7 @@ class SlotFillingManager:
             else:
                 ctx['lista_turnos'] = ", ".join([f"**{t}**" for t in turnos])
                 response = MESSAGES['SLOT_FILLING_ASK_SHIFT'].format_map(ctx)
+                keyboard = get_shifts_keyboard(turnos)
 
         elif next_slot == 'hora_inicio':
             servico_info = await self.persistence_service.get_service_details_by_id(updated_slots['servico_id'])
@@ -83,7 +111,9 @@ class SlotFillingManager:
             horarios_livres = await self.appointment_service.get_available_times_by_shift(
                 data=updated_slots['data'],
                 turno=updated_slots['turno'],
-                duracao_minutos=duracao
+                duracao_minutos=duracao,
+                servico_id=updated_slots['servico_id'],
+                user_id=update.effective_user.id
             )
 
             if not horarios_livres:
@@ -92,15 +122,24 @@ class SlotFillingManager:
                 updated_slots.pop('turno', None)
                 await self.persistence_service.update_session_state(update.effective_user.id, slot_data=updated_slots)
             else:
-                    # 3. Montar a lista (apresentar apenas os 8 primeiros para não poluir)
-                ctx['horarios'] = ", ".join(horarios_livres[:8])
+                # 3. Montar a lista (os primeiros, para não poluir): o texto e os botões mostram os mesmos
+                opcoes = horarios_livres[:BOOKING_TIME_OPTIONS]
+                ctx['horarios'] = ", ".join(opcoes)
                 response = MESSAGES['SLOT_FILLING_ASK_SPECIFIC_TIME'].format_map(ctx)
+                keyboard = get_times_keyboard(opcoes)
         
         if response:
-            await update.message.reply_text(response, parse_mode='Markdown')
+            # effective_message: a pergunta pode vir de uma mensagem de texto ou do toque num botão
+            await update.effective_message.reply_text(response, parse_mode='Markdown', reply_markup=keyboard)
         else:
             logger.warning(f"Nenhuma resposta gerada para o slot: {next_slot}")
 
+    async def _drop_slots(self, user_id: int, updated_slots: dict, *keys: str):
+        """Apaga os slots na memória e no banco (update_session_state só mescla o dict)."""
+        for key in keys:
+            updated_slots.pop(key, None)
+        await self.persistence_service.update_session_state(user_id, slot_data=updated_slots, remove_keys=keys)
+
     async def handle_slot_filling(self, update: Update, context: ContextTypes.DEFAULT_TYPE, slots_from_db: dict = None):
         user_id = update.effective_user.id
         nome = await self.persistence_service.get_nome_usuario(user_id) or update.effective_user.first_name
@@ -115,19 +154,105 @@ class SlotFillingManager:
         # Validação: REQUIRED_SLOTS = ["servico_id", "data", "turno", "hora_inicio"]
         missing_slots = [s for s in REQUIRED_SLOTS if not updated_slots.get(s)]
 
+        # Horário escolhido: segura o horário até a confirmação (ninguém mais o vê como livre)
+        if all(updated_slots.get(s) for s in ('servico_id', 'data', 'hora_inicio')):
+            held, hold_msg = await self.appointment_service.hold_slot(user_id, updated_slots)
+            if not held:
+                await update.effective_message.reply_text(hold_msg)
+                await self._drop_slots(user_id, updated_slots, 'hora_inicio', AWAITING_CONFIRMATION)
+                missing_slots = [s for s in REQUIRED_SLOTS if not updated_slots.get(s)]
+
         if not missing_slots:
-            # 4. Todos os slots preenchidos: Finalizar Agendamento
-            sucess, msg = await self.appointment_service.process_appointment(user_id=user_id,slot_data=updated_slots)
-            await update.message.reply_text(msg)
+            # 4. Todos os slots preenchidos: o agendamento só é gravado depois do "Confirmar"
+            updated_slots[AWAITING_CONFIRMATION] = True
+            await self.persistence_service.update_session_state(user_id, slot_data=updated_slots)
 
-            if sucess:
-                await self.persistence_service.clear_session_state(user_id)
+            ctx = SafeDict(nome=nome)
+            ctx.update(updated_slots)
+            ctx['data'] = date.fromisoformat(updated_slots['data']).strftime('%d/%m')
+            await update.effective_message.reply_text(MESSAGES['SLOT_FILLING_CONFIRM'].format_map(ctx)
+                                                      , reply_markup=get_confirm_keyboard())
             return True
 
         # Slots Faltando: Solicitar o Próximo
         await self._ask_for_next_slot(update, nome, updated_slots, missing_slots)
         return True
     
+    @staticmethod
+    def is_confirmation_text(text: str) -> bool:
+        """'sim', 'ok', 'confirmo'... digitados no lugar do botão de confirmação."""
+        return (text or '').strip().strip('!.').lower() in BOOKING_CONFIRM_WORDS
+
+    async def resolve_confirmation(self, update: Update, context: ContextTypes.DEFAULT_TYPE, confirmed: bool) -> bool:
+        """
+        Resposta à confirmação final. Confirmado: grava o agendamento (a reserva vira o agendamento);
+        recusado ou recusado pelo banco: libera o horário e pergunta outro. False se não há
+        confirmação pendente (teclado antigo, sessão expirada ou slots alterados).
+        """
+        user_id = update.effective_user.id
+        session_state = await self.persistence_service.get_session_state(user_id)
+        if not session_state or session_state.get('current_intent') != 'AGENDAR':
+            return False
+
+        updated_slots = dict(session_state.get('slot_data') or {})
+        if not updated_slots.get(AWAITING_CONFIRMATION) or any(not updated_slots.get(s) for s in REQUIRED_SLOTS):
+            return False
+
+        if confirmed:
+            sucess, msg = await self.appointment_service.process_appointment(user_id=user_id, slot_data=updated_slots)
+            await update.effective_message.reply_text(msg)
+            if sucess:
+                await self.persistence_service.clear_session_state(user_id)
+                return True
+        else:
+            await self.persistence_service.release_slot_hold(user_id)
+
+        # Outro horário: o turno continua; a pergunta volta com os horários livres atualizados
+        await self._drop_slots(user_id, updated_slots, 'hora_inicio', AWAITING_CONFIRMATION)
+        await self.handle_slot_filling(update, context, slots_from_db=updated_slots)
+        return True
+
+    async def apply_choice(self, user_id: int, slot: str, value: str) -> Optional[dict]:
+        """
+        Grava a escolha de um botão direto no slot_data (sem LLM). Trocar um passo anterior
+        (teclado antigo) limpa os seguintes. None se a escolha não vale mais: fora do agendamento,
+        valor inválido ou já aplicado (toque repetido).
+        """
+        session_state = await self.persistence_service.get_session_state(user_id)
+        if not session_state or session_state.get('current_intent') != 'AGENDAR':
+            return None
+
+        novos = await self._resolve_choice(slot, value)
+        updated_slots = dict(session_state.get('slot_data') or {})
+        if novos is None or updated_slots.get(slot) == novos[slot]:
+            return None
+
+        # Slot trocado: os passos seguintes e a confirmação pendente são pedidos de novo
+        updated_slots.update(novos)
+        await self._drop_slots(user_id, updated_slots
+                               , *REQUIRED_SLOTS[REQUIRED_SLOTS.index(slot) + 1:], AWAITING_CONFIRMATION)
+        return updated_slots
+
+    async def _resolve_choice(self, slot: str, value: str) -> Optional[dict]:
+        """Valida o valor do botão e devolve os slots que ele preenche."""
+        try:
+            if slot == 'servico_id':
+                servico = await self.persistence_service.get_service_details_by_id(int(value))
+                if not servico:
+                    return None
+                return {'servico_id': servico['servico_id'], 'servico': servico['nome']
+                        , 'duracao_minutos': servico['duracao_minutos']}
+            if slot == 'data':
+                return {'data': value} if date.fromisoformat(value) >= date.today() else None
+            if slot == 'turno':
+                return {'turno': value} if value in SHIFT_TIMES else None
+            if slot == 'hora_inicio':
+                datetime.strptime(value, '%H:%M')
+                return {'hora_inicio': value}
+        except ValueError:
+            return None
+        return None
+
     async def get_next_missing_slot(self, user_id: int) -> str:
         """Analisa o estado e pergunta pelo próximo slot na fila de prioridade."""
         session_state = await self.persistence_service.get_session_state(user_id)
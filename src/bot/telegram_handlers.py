@@ -1,6 +1,7 @@
 # # src/bot/telegram_handlers.py
-from telegram import Update
-from telegram.ext import ContextTypes, JobQueue
+from telegram import CallbackQuery, Update
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes
 
 from src.services.persistence_service import PersistenceService
 from src.services.dialog_flow_service import DialogFlowService
@@ -8,13 +9,15 @@ from src.bot.llm_service import LLMService
 from src.services.service_finder import ServiceFinder
 from src.bot.slot_filling_manager import SlotFillingManager
 from src.schemas.slot_extraction_schema import SlotExtraction
+from src.platform.telegram.ui.keyboards import get_services_keyboard, parse_booking_callback
 
 from src.utils.system_message import MESSAGES
+from src.utils.constants import SESSION_TIMEOUT_MINUTES, BOOKING_CONFIRM_SLOT
 from src.config.logger import setup_logger
 logger = setup_logger(__name__)
 
 # Constante de Timeout
-TIMEOUT_MINUTES = 10
+TIMEOUT_MINUTES = SESSION_TIMEOUT_MINUTES
 TIMEOUT_SECONDS = TIMEOUT_MINUTES * 60 # 600 segundos (10 minutes)
 
 class TelegramHandlers:
@@ -57,84 +60,30 @@ class TelegramHandlers:
         return update.effective_user.first_name
     
     # ======================================================================================================
-    #                                       Timer / Job Manager
+    #                                       Inatividade
     # ======================================================================================================
-    def _remove_inactivity_timer(self, user_id: int, job_queue: JobQueue) -> bool:
-        """Remove o job de timeout existente para o usuário, se houver."""
-        job_name = f'timeout_{user_id}'
-        current_jobs = job_queue.get_jobs_by_name(job_name)
-
-        if current_jobs:
-            current_jobs[0].schedule_removal()
-            logger.debug(f"Job de timeout antigo ({job_name}) removido.")
-            return True
-        return False
-
-    def _set_inactivity_timer(self, user_id: int, context: ContextTypes.DEFAULT_TYPE):
+    async def _mark_activity(self, user_id: int):
         """
-        Agenda o job de limpeza da sessão, substituindo um job anterior.
-        Deve ser chamado no final de cada handler de interação.
+        Registra a atividade do usuário (user_sessions.last_updated).
+        A expiração é feita em lote pelo SessionExpiryService; deve ser chamado no final de cada handler de interação.
         """
-        job_name = f'timeout_{user_id}'
-
-        # 1. Remove o job antigo (se existir)
-        self._remove_inactivity_timer(user_id, context.application.job_queue)
-
-        # 2. Agenda o novo Job
-        context.application.job_queue.run_once(
-            self.session_timeout_job
-            , self.TIMEOUT_SECONDS
-            , chat_id=user_id
-            , name=job_name
-        )
-        logger.debug(f"Novo job de timeout ({job_name}) agendado para {self.TIMEOUT_MINUTES} minutos.")
-        # A função do Job não precisa ser um método da instância (pode ser static ou externa), 
-        # mas mantê-la aqui como um método da classe facilita o acesso às dependências.
-
-    async def session_timeout_job(self, context: ContextTypes.DEFAULT_TYPE):
-        """Função chamada pelo Job para limpar o contexto da sessão após o timeout."""
-
-        user_id = context.job.chat_id
-
-        # 1. Limpa o histórico da LLM (em memória)
-        self.llm_service.history_manager.reset_history(user_id)
-
-        # 2. Limpa o estado da sessão (DB)
-        await self.persistence_service.clear_session_state(user_id)
-
-        # 3. Limpa o histórico persistente (mensagens salvas no DB)
-        await self.persistence_service.clear_historico(user_id)
-
-        # 4. Limpa o user_data (se você usa para armazenar estado temporário)
-        if user_id in context.application.user_data:
-            context.application.user_data[user_id].clear()
-
-        # 5. Notificar o usuário que a sessão expirou
-        await context.bot.send_message(
-            user_id
-            , f"⚠️ Sua sessão expirou por inatividade ({self.TIMEOUT_MINUTES} minutos). Por favor, comece uma nova conversa."
-        )
-
-        logger.info(f"Sessão do usuário {user_id} limpa devido a timeout de inatividade.")
+        await self.persistence_service.touch_session(user_id)
 
     # ======================================================================================================
     #                                       Handlers Default
     # ======================================================================================================
-    # Note: O /start e /reset já fazem uma limpeza completa e podem remover o timer
+    # Note: O /start e /reset já fazem uma limpeza completa (sem sessão, não há o que expirar)
     async def reset(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Reinicia a conversação e o estado de agendamento."""
         user_id = update.effective_user.id
 
-        self.llm_service.history_manager.reset_history(user_id)
+        await self.llm_service.history_manager.reset_history(user_id)
         # Limpa o estado da sessão também
         await self.persistence_service.clear_session_state(user_id)
         await self.persistence_service.clear_historico(user_id)
 
-        # Remove o timer existente ao resetar
-        self._remove_inactivity_timer(user_id, context.application.job_queue)
-
         await update.message.reply_text('Conversação e estado de agendamento reiniciados. Pode perguntar algo novo!')
-        # Não agenda novo timer aqui, pois a interação acabou.
+        # Não marca atividade aqui, pois a interação acabou.
 
     # ======================================================================================================
     #                                       Handlers Custom
@@ -168,10 +117,58 @@ class TelegramHandlers:
         # 2. Define a intenção AGENDAR
         await self.persistence_service.update_session_state(user_id, current_intent='AGENDAR', slot_data={})
 
-        await update.message.reply_text(MESSAGES['SLOT_FILLING_WELCOME'].format(nome=nome))
+        # O serviço já pode ser escolhido por botão
+        servicos = await self.persistence_service.buscar_servicos('')
+        keyboard = get_services_keyboard([(s['servico_id'], s['nome']) for s in servicos]) if servicos else None
+        await update.message.reply_text(MESSAGES['SLOT_FILLING_WELCOME'].format(nome=nome), reply_markup=keyboard)
 
-        # Reagenda o timer para o usuário ter 10 minutos para iniciar o agendamento
-        self._set_inactivity_timer(user_id, context)
+        # O usuário tem TIMEOUT_MINUTES para iniciar o agendamento
+        await self._mark_activity(user_id)
+
+    # ======================================================================================================
+    #                                       Botões do Agendamento
+    # ======================================================================================================
+    async def booking_choice(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Toque num botão de agendamento: grava o slot na sessão e segue o fluxo sem passar pelo LLM."""
+        query = update.callback_query
+        user_id = update.effective_user.id
+        escolha = parse_booking_callback(query.data)
+
+        if escolha and escolha[0] == BOOKING_CONFIRM_SLOT:
+            await self._booking_confirmation(update, context, query, escolha[1] == 'sim')
+            return
+
+        updated_slots = await self.slot_filling_manager.apply_choice(user_id, *escolha) if escolha else None
+        if updated_slots is None:
+            # Teclado antigo, agendamento encerrado/expirado ou toque repetido
+            await query.answer(MESSAGES['SLOT_FILLING_CHOICE_EXPIRED'])
+            await self._close_keyboard(query)
+            return
+
+        await query.answer()
+        await self._close_keyboard(query)   # A pergunta respondida não aceita um segundo toque
+        await self.slot_filling_manager.handle_slot_filling(update, context, slots_from_db=updated_slots)
+        await self._mark_activity(user_id)
+
+    async def _booking_confirmation(self
+                                    , update: Update
+                                    , context: ContextTypes.DEFAULT_TYPE
+                                    , query: CallbackQuery
+                                    , confirmed: bool):
+        """Botões 'Confirmar' / 'Outro horário' da etapa final."""
+        await self._close_keyboard(query)   # Um segundo toque não agenda duas vezes
+        if not await self.slot_filling_manager.resolve_confirmation(update, context, confirmed):
+            await query.answer(MESSAGES['SLOT_FILLING_CHOICE_EXPIRED'])
+            return
+        await query.answer()
+        await self._mark_activity(update.effective_user.id)
+
+    @staticmethod
+    async def _close_keyboard(query: CallbackQuery):
+        try:
+            await query.edit_message_reply_markup(reply_markup=None)
+        except TelegramError as e:
+            logger.debug(f"Teclado do agendamento não removido: {e}")  # Ex.: mensagem já sem botões
 
     # ======================================================================================================
     #                                       ANSWER
@@ -188,6 +185,12 @@ class TelegramHandlers:
         # 1. Garante registro do usuário
         await self._ensure_user_registered(user_id, nome)
 
+        # "sim"/"ok" digitado na etapa de confirmação vale como o botão (sem passar pelo LLM)
+        if (self.slot_filling_manager.is_confirmation_text(original_question)
+                and await self.slot_filling_manager.resolve_confirmation(update, context, True)):
+            await self._mark_activity(user_id)
+            return
+
         # 2. INVOCA O ORQUESTRADOR (DialogFlowService)
         # O DialogFlow agora cuida de salvar a mensagem, processar com a IA, enriquecer slots e fazer o MERGE
         result = await self.dialog_flow_service.process_llm_response(user_id=user_id, user_message=original_question)
@@ -202,7 +205,7 @@ class TelegramHandlers:
                 logger.info(f"Usuário {user_id} mudou de assunto durante agendamento → estado limpo")
 
             await update.message.reply_text(result)
-            self._set_inactivity_timer(user_id, context)
+            await self._mark_activity(user_id)
             return
         
         # CASO B: AGENDAMENTO (RESULT É UM DICIONÁRIO DE SLOTS). É agendamento (result é dict com slots)
@@ -214,10 +217,10 @@ class TelegramHandlers:
             if current_intent == 'AGENDAR':
                 # Chama Slot Filling
                 await self.slot_filling_manager.handle_slot_filling(update, context, slots_from_db=result)
-                self._set_inactivity_timer(user_id, context)
+                await self._mark_activity(user_id)
                 return
             
         # CASO C: FALLBACK (Se nada acima for atendido)
         await update.message.reply_text("Desculpe, não entendi. Como posso ajudar?")
-        self._set_inactivity_timer(user_id, context)
+        await self._mark_activity(user_id)
             
\ No newline at end of file
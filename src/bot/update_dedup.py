@@ -0,0 +1,125 @@
+# src/bot/update_dedup.py
+import time as _time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, Optional, TYPE_CHECKING
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.utils.constants import UPDATE_DEDUP_TTL_SECONDS, UPDATE_DEDUP_MAX_IDS, UPDATE_DEDUP_RETENTION_HOURS
+from src.config.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.services.persistence_service import PersistenceService
+
+logger = setup_logger(__name__)
+
+class RecentIds:
+    """
+    Conjunto limitado de ids vistos recentemente, em ordem de chegada.
+    Consulta/inserção O(1); expirados (ttl) e excedentes (max_size) saem pela frente.
+    """
+    __slots__ = ('ttl', 'max_size', '_clock', '_seen')
+
+    def __init__(self
+                 , ttl_seconds: float = UPDATE_DEDUP_TTL_SECONDS
+                 , max_size: int = UPDATE_DEDUP_MAX_IDS
+                 , clock: Callable[[], float] = _time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._seen: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _evict(self, now: float):
+        while self._seen:
+            key, visto = next(iter(self._seen.items()))
+            if now - visto < self.ttl:
+                break
+            del self._seen[key]
+
+    def add(self, key: Hashable) -> bool:
+        """Registra o id. False se ele já estava no conjunto (duplicata)."""
+        now = self._clock()
+        self._evict(now)
+        if key in self._seen:
+            return False
+        self._seen[key] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+
+class UpdateDeduplicator:
+    """
+    Descarta updates repetidas (mesmo update_id) antes de qualquer trabalho caro.
+    1ª camada: RecentIds em memória (síncrona, antes do lock do usuário).
+    2ª camada opcional: tabela updates_processadas (INSERT ... ON CONFLICT), que vale entre
+    workers e reinícios. Falha do banco não bloqueia o atendimento: a update é processada.
+    """
+
+    def __init__(self
+                 , persistence_service: Optional['PersistenceService'] = None
+                 , recent: Optional[RecentIds] = None
+                 , retention_hours: int = UPDATE_DEDUP_RETENTION_HOURS):
+        self.persistence_service = persistence_service
+        self.recent = recent or RecentIds()
+        self.retention = timedelta(hours=retention_hours)
+        self.checked = 0
+        self.dropped_memory = 0
+        self.dropped_persistent = 0
+        self.persistent_errors = 0
+
+    @staticmethod
+    def _update_id(update: object) -> Optional[int]:
+        return update.update_id if isinstance(update, Update) else None
+
+    def seen_recently(self, update: object) -> bool:
+        """Checagem em memória (O(1)). Também registra o id para as próximas entregas."""
+        update_id = self._update_id(update)
+        if update_id is None:
+            return False
+        self.checked += 1
+        if self.recent.add(update_id):
+            return False
+        self.dropped_memory += 1
+        return True
+
+    async def claimed_elsewhere(self, update: object) -> bool:
+        """Registro persistente: True se outro worker (ou uma entrega anterior) já ficou com a update."""
+        update_id = self._update_id(update)
+        if update_id is None or self.persistence_service is None:
+            return False
+        try:
+            if await self.persistence_service.registrar_update(update_id):
+                return False
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Deduplicação persistente indisponível (update {update_id} será processada): {e}")
+            return False
+        self.dropped_persistent += 1
+        return True
+
+    async def cleanup_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: remove registros fora da janela de reentrega."""
+        if self.persistence_service is None:
+            return
+        try:
+            removidos = await self.persistence_service.limpar_updates_processadas(datetime.now() - self.retention)
+            if removidos:
+                logger.info(f"{removidos} registros antigos de updates_processadas removidos.")
+        except Exception as e:
+            logger.error(f"Erro na limpeza de updates_processadas: {e}", exc_info=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "checked": self.checked,
+            "dropped_memory": self.dropped_memory,
+            "dropped_persistent": self.dropped_persistent,
+            "persistent": self.persistence_service is not None,
+            "persistent_errors": self.persistent_errors,
+            "tracked_ids": len(self.recent),
+        }
@@ -0,0 +1,99 @@
+# src/bot/update_processor.py
+import asyncio
+from typing import Any, Awaitable, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.bot.update_dedup import UpdateDeduplicator
+from src.database.instrumentation import DbInstrumentation
+from src.utils.striped_lock import StripedLock
+
+class InstrumentedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processa cada update dentro de um escopo de instrumentação: todas as queries disparadas
+    pelos handlers dessa update são contabilizadas juntas (resumo + alerta de N+1).
+    Com max_concurrent_updates=1 o comportamento é o mesmo do processador padrão (sequencial).
+
+    Com concorrência, updates do mesmo usuário passam por um StripedLock e rodam uma de cada vez,
+    na ordem de chegada (o merge de slot_data em user_data não corre em paralelo); usuários
+    diferentes rodam em paralelo. O semáforo da base limita as updates admitidas (executando ou
+    esperando a vez do usuário); um segundo semáforo, tomado só depois do lock do usuário, limita
+    as que executam. Assim mensagens enfileiradas de um usuário não ocupam vagas de execução.
+
+    Com um UpdateDeduplicator, reentregas do mesmo update_id (webhook reenviado, backlog
+    relido) são descartadas antes do lock do usuário (memória) e antes de executar (tabela).
+    """
+
+    def __init__(self
+                 , instrumentation: DbInstrumentation
+                 , max_concurrent_updates: int = 1
+                 , user_locks: Optional[StripedLock] = None
+                 , max_admitted_updates: Optional[int] = None
+                 , deduplicator: Optional[UpdateDeduplicator] = None):
+        super().__init__(max(max_admitted_updates or 0, max_concurrent_updates))
+        self.instrumentation = instrumentation
+        self.user_locks = user_locks
+        self.deduplicator = deduplicator
+        self._running = asyncio.Semaphore(max_concurrent_updates)
+        self._in_flight: set[asyncio.Task] = set()
+        self._aborted = False
+
+    @staticmethod
+    def _label(update: object) -> str:
+        if isinstance(update, Update):
+            user = update.effective_user
+            return f"update {update.update_id} (user {user.id if user else '-'})"
+        return type(update).__name__
+
+    @staticmethod
+    def ordering_key(update: object) -> Optional[Hashable]:
+        """Usuário (ou chat, sem usuário) cuja ordem deve ser preservada; None processa sem lock."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user:
+            return update.effective_user.id
+        return update.effective_chat.id if update.effective_chat else None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        if self._aborted or (self.deduplicator and self.deduplicator.seen_recently(update)):
+            coroutine.close()   # Drenagem encerrada ou reentrega da mesma update: não começa
+            return
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        try:
+            key = self.ordering_key(update) if self.user_locks is not None else None
+            if key is None:
+                await self._run(update, coroutine)
+                return
+            # Nenhum await entre a admissão e o pedido do lock: a fila FIFO do lock guarda a ordem de chegada
+            async with self.user_locks.lock_for(key):
+                await self._run(update, coroutine)
+        finally:
+            self._in_flight.discard(task)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def cancel_in_flight(self) -> int:
+        """Cancela as updates admitidas (drenagem que estourou o prazo). Retorna quantas foram canceladas."""
+        self._aborted = True
+        tasks = [t for t in self._in_flight if not t.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    async def _run(self, update: object, coroutine: Awaitable[Any]) -> None:
+        if self.deduplicator and await self.deduplicator.claimed_elsewhere(update):
+            coroutine.close()   # Já processada por outro worker (ou antes de um restart)
+            return
+        async with self._running:
+            with self.instrumentation.track(self._label(update)):
+                await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -93,8 +93,8 @@ def configure_root_and_external_loggers():
                 'CRITICAL': 'bold_red,bg_white'
             }
         )
-    root_handler.setFormatter(root_formatter)
-    root_logger.addHandler(root_handler)
+        root_handler.setFormatter(root_formatter)
+        root_logger.addHandler(root_handler)
 
     root_logger.setLevel(logging.DEBUG)
     
@@ -1,7 +1,7 @@
 # src/database/base.py
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy import BigInteger, Integer, DateTime
+from sqlalchemy import BigInteger, Integer, DateTime, DDL
 from datetime import datetime
 
 # ----------------------------------------------------------------------
@@ -25,6 +25,17 @@ class Base(DeclarativeBase):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+# ----------------------------------------------------------------------
+# DDL idempotente aplicada em todo startup
+# O create_all só cria tabelas que não existem: colunas, índices, funções e triggers novos de uma
+# tabela já implantada ficam aqui (IF NOT EXISTS / CREATE OR REPLACE), na ordem de registro.
+
+_SCHEMA_UPGRADES: list[DDL] = []
+
+def schema_upgrade(*statements: str) -> None:
+    """Registra comandos DDL idempotentes executados pelo init_db depois do create_all."""
+    _SCHEMA_UPGRADES.extend(DDL(s) for s in statements)
+
 # ----------------------------------------------------------------------
 # Função de Inicialização Assíncrona do Banco de Dados
 
@@ -42,4 +53,7 @@ async def init_db(engine: AsyncEngine):
     async with engine.begin() as conn:
         # Usa run_sync para executar DDL (criação de tabelas) de forma síncrona dentro do contexto assíncrono
         await conn.run_sync(Base.metadata.create_all)
+        # Bancos já implantados recebem aqui o que o create_all não altera
+        for ddl in _SCHEMA_UPGRADES:
+            await conn.execute(ddl)
         print("Tabelas do banco de dados sincronizadas com sucesso.")
\ No newline at end of file
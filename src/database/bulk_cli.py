@@ -0,0 +1,89 @@
+# src/database/bulk_cli.py
+"""
+Importação/exportação em lote pela linha de comando (COPY via asyncpg).
+
+    python -m src.database.bulk_cli export agenda -o agenda.csv
+    python -m src.database.bulk_cli export servicos --formato jsonl > servicos.jsonl
+    python -m src.database.bulk_cli import usuarios usuarios.csv
+    python -m src.database.bulk_cli import agenda historico.jsonl --conflitos skip
+
+Ordem de importação num banco novo: servicos e usuarios antes de agenda (chaves estrangeiras).
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterator
+
+from src.database.session import engine
+from src.services.bulk_transfer import BULK_TABLES, BulkImportError, BulkTransferService
+
+_BLOCO = 1 << 16
+
+def _formato(args) -> str:
+    if args.formato:
+        return args.formato
+    caminho = getattr(args, 'arquivo', None) or getattr(args, 'saida', None) or ''
+    return 'jsonl' if caminho.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+async def _ler(caminho: str) -> AsyncIterator[bytes]:
+    arquivo = sys.stdin.buffer if caminho == '-' else open(caminho, 'rb')
+    try:
+        while bloco := arquivo.read(_BLOCO):
+            yield bloco
+    finally:
+        if arquivo is not sys.stdin.buffer:
+            arquivo.close()
+
+async def _export(service: BulkTransferService, args) -> int:
+    destino = sys.stdout.buffer if args.saida in (None, '-') else open(args.saida, 'wb')
+    try:
+        async for bloco in service.export_rows(args.tabela, _formato(args)):
+            destino.write(bloco)
+    finally:
+        if destino is not sys.stdout.buffer:
+            destino.close()
+    return 0
+
+async def _import(service: BulkTransferService, args) -> int:
+    def progresso(linhas: int):
+        print(f"\r{linhas} linhas carregadas...", end='', file=sys.stderr, flush=True)
+
+    try:
+        report = await service.import_rows(args.tabela, _formato(args), _ler(args.arquivo)
+                                           , on_conflict=args.conflitos, on_progress=progresso)
+    except BulkImportError as e:
+        print(f"\nErro: {e}", file=sys.stderr)
+        if e.report is not None:
+            print(json.dumps(e.report.to_dict(), ensure_ascii=False), file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(json.dumps(report.to_dict(), ensure_ascii=False))
+    return 0
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importação/exportação em lote (CSV ou JSONL).")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    exportar = sub.add_parser('export', help="Exporta uma tabela")
+    exportar.add_argument('tabela', choices=list(BULK_TABLES))
+    exportar.add_argument('-o', '--saida', help="Arquivo de saída (padrão: stdout)")
+    exportar.add_argument('--formato', choices=['csv', 'jsonl'])
+
+    importar = sub.add_parser('import', help="Importa um arquivo ('-' para stdin)")
+    importar.add_argument('tabela', choices=list(BULK_TABLES))
+    importar.add_argument('arquivo')
+    importar.add_argument('--formato', choices=['csv', 'jsonl'])
+    importar.add_argument('--conflitos', choices=['abort', 'skip'], default='abort'
+                          , help="Agendamentos sobrepostos: abortar tudo ou descartar só os conflitantes")
+
+    args = parser.parse_args(argv)
+    service = BulkTransferService(engine)
+    try:
+        return await (_export(service, args) if args.comando == 'export' else _import(service, args))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,200 @@
+# src/database/instrumentation.py
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.constants import DB_REPEATED_STATEMENT_THRESHOLD, DB_SLOW_UPDATE_MS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Estatísticas da update em processamento. O ContextVar atravessa o greenlet do SQLAlchemy
+# assíncrono, então os eventos síncronos do engine enxergam a update certa mesmo com concorrência.
+_current_stats: ContextVar[Optional["UpdateQueryStats"]] = ContextVar('db_update_stats', default=None)
+
+_START_KEY = 'instrumentation_query_start'
+
+def _short(statement: str, limit: int = 160) -> str:
+    flat = " ".join(statement.split())
+    return flat if len(flat) <= limit else flat[:limit] + "..."
+
+
+class UpdateQueryStats:
+    """Queries executadas durante o processamento de uma única update."""
+    __slots__ = ('label', 'queries', 'total_ms', 'rows', 'statements')
+
+    def __init__(self, label: str):
+        self.label = label
+        self.queries = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        # statement -> [execuções, parâmetros distintos, ms]
+        self.statements: dict[str, list] = {}
+
+    def record(self, statement: str, parameters, elapsed_ms: float, rowcount: int):
+        self.queries += 1
+        self.total_ms += elapsed_ms
+        if rowcount > 0:
+            self.rows += rowcount
+
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, set(), 0.0]
+        entry[0] += 1
+        entry[1].add(repr(parameters))
+        entry[2] += elapsed_ms
+
+    def repeated(self, threshold: int = DB_REPEATED_STATEMENT_THRESHOLD) -> list[tuple[str, int, int]]:
+        """Statements executados `threshold`+ vezes: (statement, execuções, parâmetros distintos)."""
+        return sorted(
+            ((stmt, n, len(params)) for stmt, (n, params, _) in self.statements.items() if n >= threshold),
+            key=lambda r: r[1], reverse=True,
+        )
+
+    def summary(self) -> str:
+        return (f"[DB] {self.label}: {self.queries} queries, {self.total_ms:.1f} ms, "
+                f"{self.rows} linhas, {len(self.statements)} statements distintos")
+
+
+class QueryMetrics:
+    """Agregados globais desde o início do processo (expostos em /metrics/db)."""
+
+    def __init__(self, window: int = 1000):
+        self.updates = 0
+        self.queries = 0
+        self.untracked_queries = 0      # Fora de uma update (jobs, startup)
+        self.total_ms = 0.0
+        self.max_queries_per_update = 0
+        self.updates_with_repeats = 0
+        self._recent_counts: deque[int] = deque(maxlen=window)
+        self._statements: dict[str, list] = {}  # statement -> [execuções, ms]
+
+    def record_untracked(self, statement: str, elapsed_ms: float):
+        self.untracked_queries += 1
+        self._add_statement(statement, 1, elapsed_ms)
+
+    def _add_statement(self, statement: str, count: int, elapsed_ms: float):
+        entry = self._statements.setdefault(statement, [0, 0.0])
+        entry[0] += count
+        entry[1] += elapsed_ms
+
+    def merge(self, stats: UpdateQueryStats, had_repeats: bool):
+        self.updates += 1
+        self.queries += stats.queries
+        self.total_ms += stats.total_ms
+        self.max_queries_per_update = max(self.max_queries_per_update, stats.queries)
+        self.updates_with_repeats += had_repeats
+        self._recent_counts.append(stats.queries)
+        for statement, (n, _, ms) in stats.statements.items():
+            self._add_statement(statement, n, ms)
+
+    def snapshot(self, top: int = 10) -> dict:
+        recentes = sorted(self._recent_counts)
+
+        def percentil(p: float) -> int:
+            return recentes[min(len(recentes) - 1, int(p * len(recentes)))] if recentes else 0
+
+        top_statements = sorted(self._statements.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return {
+            "updates": self.updates,
+            "queries": self.queries,
+            "untracked_queries": self.untracked_queries,
+            "total_db_ms": round(self.total_ms, 1),
+            "avg_queries_per_update": round(self.queries / self.updates, 2) if self.updates else 0,
+            "p50_queries_per_update": percentil(0.50),
+            "p95_queries_per_update": percentil(0.95),
+            "max_queries_per_update": self.max_queries_per_update,
+            "updates_with_repeated_statements": self.updates_with_repeats,
+            "top_statements": [
+                {"statement": _short(stmt), "count": n, "total_ms": round(ms, 1)}
+                for stmt, (n, ms) in top_statements
+            ],
+        }
+
+
+class DbInstrumentation:
+    """
+    Conta, cronometra e atribui cada statement à update atual (eventos before/after_cursor_execute).
+    Ao final de cada update registra um resumo e avisa sobre statements repetidos (suspeita de N+1).
+    """
+
+    def __init__(self
+                 , engine: AsyncEngine
+                 , repeat_threshold: int = DB_REPEATED_STATEMENT_THRESHOLD
+                 , slow_update_ms: float = DB_SLOW_UPDATE_MS):
+        self._sync_engine = engine.sync_engine
+        self.repeat_threshold = repeat_threshold
+        self.slow_update_ms = slow_update_ms
+        self.metrics = QueryMetrics()
+        self._installed = False
+
+    def install(self):
+        if self._installed:
+            return
+        event.listen(self._sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(self._sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(self._sync_engine, 'handle_error', self._handle_error)
+        self._installed = True
+        logger.info("Instrumentação de queries por update ativada.")
+
+    def uninstall(self):
+        if not self._installed:
+            return
+        event.remove(self._sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(self._sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(self._sync_engine, 'handle_error', self._handle_error)
+        self._installed = False
+
+    # --- Eventos do engine (síncronos, rodam dentro do greenlet) ---
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info[_START_KEY].pop()
+        elapsed_ms = (time.perf_counter() - inicio) * 1000
+
+        stats = _current_stats.get()
+        if stats is None:
+            self.metrics.record_untracked(statement, elapsed_ms)
+            return
+
+        stats.record(statement, parameters, elapsed_ms, getattr(cursor, 'rowcount', -1))
+
+    def _handle_error(self, exception_context):
+        # Statement com erro não dispara after_cursor_execute: descarta o início pendente
+        conn = exception_context.connection
+        pendentes = conn.info.get(_START_KEY) if conn is not None else None
+        if pendentes:
+            pendentes.pop()
+
+    # --- Escopo de uma update ---
+    @contextmanager
+    def track(self, label: str) -> Iterator[UpdateQueryStats]:
+        """Atribui todas as queries executadas dentro do bloco (no mesmo contexto) a `label`."""
+        stats = UpdateQueryStats(label)
+        token = _current_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_stats.reset(token)
+            self._report(stats)
+
+    def _report(self, stats: UpdateQueryStats):
+        repetidos = stats.repeated(self.repeat_threshold)
+        self.metrics.merge(stats, bool(repetidos))
+
+        if not stats.queries:
+            return
+        if stats.total_ms >= self.slow_update_ms:
+            logger.warning(stats.summary())
+        else:
+            logger.info(stats.summary())
+
+        for statement, n, distintos in repetidos:
+            logger.warning(f"[DB] {stats.label}: statement executado {n}x ({distintos} conjunto(s) de "
+                           f"parâmetros) - possível N+1: {_short(statement)}")
@@ -3,7 +3,11 @@ from .user_model import Usuario
 from .mensagem_model import Mensagem
 from .session_model import UserSession
 from .servico_model import Servico
+from .profissional_model import Profissional, ProfissionalServico, ProfissionalHorario
 from .agenda_model import Agenda
+from .calendario_model import HorarioFuncionamento, CalendarioExcecao
+from .disponibilidade_model import DisponibilidadeResumo
+from .update_model import UpdateProcessada
 
 # 'from src.database.models import *', 
 # garante que todas as classes de modelo estarão disponíveis.
@@ -12,6 +16,13 @@ __all__ = [
     , "Mensagem"
     , "UserSession"
     , "Servico"
+    , "Profissional"
+    , "ProfissionalServico"
+    , "ProfissionalHorario"
     , "Agenda"
+    , "HorarioFuncionamento"
+    , "CalendarioExcecao"
+    , "DisponibilidadeResumo"
+    , "UpdateProcessada"
     ,
 ]
\ No newline at end of file
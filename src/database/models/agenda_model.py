@@ -1,16 +1,40 @@
 # src/database/models/agenda_model.py
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import (BigInteger, Time, Date, DateTime, ForeignKey, 
-    CheckConstraint, UniqueConstraint, String)
+    CheckConstraint, Index, SmallInteger, String, DDL, column, event, text)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime, time, date
 from ...database.session import Base
+from ...database.base import schema_upgrade
 
 if TYPE_CHECKING:
     from .user_model import Usuario
     from .servico_model import Servico
+    from .profissional_model import Profissional
+
+# Agendamentos que ocupam a agenda e o intervalo [início, fim) de cada um
+AGENDA_ACTIVE_PREDICATE = "status IN ('agendado', 'concluido')"
+AGENDA_RESOURCE_KEY = "coalesce(profissional_id, 0)"
+AGENDA_TIME_RANGE = "tsrange(data + hora_inicio, data + hora_fim, '[)')"
+AGENDA_OVERLAP_CONSTRAINT = 'ex_agenda_sem_sobreposicao'
+AGENDA_USER_DAY_CONSTRAINT = 'uq_agenda_usuario_dia'
+
+def agenda_resource_conflict(novo: str, existente: str = 'agenda.profissional_id') -> str:
+    """
+    SQL: os dois agendamentos disputam o mesmo recurso. Mesmo profissional, ou um deles sem
+    profissional (legado: ocupa o estabelecimento inteiro). Predicado único da inserção do bot,
+    da importação em lote e do trigger que completa a exclusion constraint.
+    """
+    return f"({novo} IS NULL OR {existente} IS NULL OR {novo} = {existente})"
+
+# Estado do lembrete: NULL (pendente), 'enviando' (reservado por um dispatcher), 'enviado', 'falhou'
+# ou 'bloqueado' ('falhou' volta a ser tentado depois do lease, até REMINDER_MAX_ATTEMPTS reservas;
+# 'bloqueado' é definitivo: o usuário bloqueou o bot e repetir não adianta)
+REMINDER_SENDING, REMINDER_SENT, REMINDER_FAILED = 'enviando', 'enviado', 'falhou'
+REMINDER_BLOCKED = 'bloqueado'
 
 class Agenda(Base):
     __tablename__ = 'agenda'
@@ -19,33 +43,115 @@ class Agenda(Base):
 
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('usuarios.user_id', ondelete='CASCADE'))
     servico_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('servicos.servico_id', ondelete='RESTRICT'))
+    # Recurso que atende (NULL: agendamento anterior aos profissionais, ocupa o estabelecimento inteiro)
+    profissional_id: Mapped[Optional[int]] = mapped_column(BigInteger
+        , ForeignKey('profissionais.profissional_id', ondelete='RESTRICT'), nullable=True)
 
     hora_inicio: Mapped[time] = mapped_column(Time, nullable=False)
     hora_fim: Mapped[time] = mapped_column(Time, nullable=False)
-    data: Mapped[date] = mapped_column(Date, nullable=False)
+    data: Mapped[date] = mapped_column(Date, nullable=False, index=True)  # Consultas por dia e por período
     status: Mapped[str] = mapped_column(String(20), default='agendado')
+    lembrete_status: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    lembrete_em: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # Reserva/entrega do lembrete
+    lembrete_tentativas: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0, server_default=text('0'))
         
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     # Campo para rastrear a última modificação
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
 
-    __tableargs__ = (
+    __table_args__ = (
         CheckConstraint(
             "status IN ('agendado', 'cancelado', 'concluido')"
             , name='check_agenda_status'),
 
         CheckConstraint('hora_inicio < hora_fim', name='chk_horas_validas'),
 
-        # Garante que um slot de serviço (ex: médico) só tenha um agendamento
-        UniqueConstraint('servico_id', 'data', 'hora_inicio', name='uc_servico_slot'),
-        # Garante que um usuário só tenha um agendamento por slot
-        UniqueConstraint('user_id', 'data', name='uc_usuario_slot_per_day'),
+        # Nenhum par de agendamentos ativos do mesmo profissional pode se sobrepor no mesmo dia.
+        # Cancelados não contam. Requer btree_gist para as igualdades. Sem profissional x com
+        # profissional fica com o trigger trg_agenda_sem_profissional (a constraint só compara chaves iguais).
+        ExcludeConstraint(
+            (text(AGENDA_RESOURCE_KEY), '=')
+            , (column('data'), '=')
+            , (text(AGENDA_TIME_RANGE), '&&')
+            , name=AGENDA_OVERLAP_CONSTRAINT
+            , using='gist'
+            , where=text(AGENDA_ACTIVE_PREDICATE)),
+
+        # Um usuário só tem um agendamento ativo por dia
+        Index(AGENDA_USER_DAY_CONSTRAINT, 'user_id', 'data', unique=True
+              , postgresql_where=text("status = 'agendado'")),
+
+        # Janela de lembretes: varredura por (data, hora_inicio) só entre os agendamentos ativos
+        Index('ix_agenda_lembretes', 'data', 'hora_inicio', postgresql_where=text("status = 'agendado'")),
     )
 
     # Relacionamentos
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="agendamentos")
     servico: Mapped["Servico"] = relationship("Servico", back_populates="agendamentos")
+    profissional: Mapped[Optional["Profissional"]] = relationship("Profissional", back_populates="agendamentos")
 
     def __repr__(self):
         return f"<Agenda(id={self.agenda_id}, user={self.user_id}, data={self.data} {self.hora_inicio})>"
-    
\ No newline at end of file
+    
+
+event.listen(Agenda.__table__, 'before_create', DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+# -----------------------------
+# Bancos anteriores aos profissionais (DDL idempotente, a cada startup)
+# -----------------------------
+_OVERLAP_DEFINITION = (f"EXCLUDE USING gist ({AGENDA_RESOURCE_KEY} WITH =, data WITH =, {AGENDA_TIME_RANGE} WITH &&) "
+                       f"WHERE ({AGENDA_ACTIVE_PREDICATE})")
+
+schema_upgrade(
+    "CREATE EXTENSION IF NOT EXISTS btree_gist"
+    , "ALTER TABLE agenda ADD COLUMN IF NOT EXISTS profissional_id BIGINT "
+      "REFERENCES profissionais (profissional_id) ON DELETE RESTRICT"
+    # A constraint antiga (só por data) impediria profissionais diferentes no mesmo horário
+    , f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                        WHERE conname = '{AGENDA_OVERLAP_CONSTRAINT}' AND conrelid = 'agenda'::regclass
+                          AND position('profissional_id' IN pg_get_constraintdef(oid)) > 0) THEN
+            ALTER TABLE agenda DROP CONSTRAINT IF EXISTS {AGENDA_OVERLAP_CONSTRAINT};
+            ALTER TABLE agenda ADD CONSTRAINT {AGENDA_OVERLAP_CONSTRAINT} {_OVERLAP_DEFINITION};
+        END IF;
+    END $$
+"""
+    # Agendamento sem profissional conflita com todos: a exclusion constraint não expressa isso
+    # (NULL vira a chave 0). O advisory lock por data serializa as checagens concorrentes do dia
+    # (READ COMMITTED: a checagem vê o que a anterior confirmou), e o erro usa o SQLSTATE e o nome
+    # da constraint (conflict_message trata igual).
+    , f"""
+    CREATE OR REPLACE FUNCTION agenda_checa_sem_profissional() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.status NOT IN ('agendado', 'concluido') THEN
+            RETURN NEW;
+        END IF;
+        PERFORM pg_advisory_xact_lock(hashtextextended('agenda:' || NEW.data, 0));
+        IF EXISTS (SELECT 1 FROM agenda
+                    WHERE agenda_id <> NEW.agenda_id AND data = NEW.data AND {AGENDA_ACTIVE_PREDICATE}
+                      AND {agenda_resource_conflict('NEW.profissional_id')}
+                      AND {AGENDA_TIME_RANGE} && tsrange(NEW.data + NEW.hora_inicio, NEW.data + NEW.hora_fim, '[)')) THEN
+            RAISE EXCEPTION 'Horário sobreposto a outro agendamento'
+                USING ERRCODE = 'exclusion_violation', CONSTRAINT = '{AGENDA_OVERLAP_CONSTRAINT}';
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+    , "CREATE OR REPLACE TRIGGER trg_agenda_sem_profissional "
+      "BEFORE INSERT OR UPDATE OF data, hora_inicio, hora_fim, status, profissional_id ON agenda "
+      "FOR EACH ROW EXECUTE FUNCTION agenda_checa_sem_profissional()"
+)
+
+# Lembretes em bancos anteriores ao ReminderDispatcher
+schema_upgrade(
+    "ALTER TABLE agenda ADD COLUMN IF NOT EXISTS lembrete_status VARCHAR(10)"
+    , "ALTER TABLE agenda ADD COLUMN IF NOT EXISTS lembrete_em TIMESTAMP WITHOUT TIME ZONE"
+    , "ALTER TABLE agenda ADD COLUMN IF NOT EXISTS lembrete_tentativas SMALLINT NOT NULL DEFAULT 0"
+    , "CREATE INDEX IF NOT EXISTS ix_agenda_lembretes ON agenda (data, hora_inicio) WHERE status = 'agendado'"
+)
+
+# Consulta de próximas datas livres (faixa de datas): create_all não cria o índice em tabela existente
+schema_upgrade("CREATE INDEX IF NOT EXISTS ix_agenda_data ON agenda (data)")
@@ -0,0 +1,74 @@
+# src/database/models/calendario_model.py
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, Date, DateTime, DDL, SmallInteger, String, Time, event, func, false
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime, time
+from typing import Optional
+from ...database.session import Base  # Importa Base do diretório pai (database)
+
+# Canal LISTEN/NOTIFY usado pelo BusinessCalendar para recompilar o calendário em memória
+CALENDARIO_CHANNEL = 'calendario_changed'
+
+class HorarioFuncionamento(Base):
+    """
+    Grade semanal de funcionamento. Vários intervalos no mesmo dia representam pausas
+    (ex.: 09-12 e 13-18). Tabela vazia: vale BUSINESS_HOURS de constants.py.
+    """
+    __tablename__ = 'horario_funcionamento'
+
+    horario_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    dia_semana: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # 0 = segunda (date.weekday())
+    hora_inicio: Mapped[time] = mapped_column(Time, nullable=False)
+    hora_fim: Mapped[time] = mapped_column(Time, nullable=False)
+
+    # Editada direto no banco pelos donos: as colunas de auditoria precisam de default no servidor
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now()
+                                                 , onupdate=datetime.now)
+
+    __table_args__ = (
+        CheckConstraint('dia_semana BETWEEN 0 AND 6', name='chk_funcionamento_dia_semana'),
+        CheckConstraint('hora_inicio < hora_fim', name='chk_funcionamento_horas_validas'),
+    )
+
+class CalendarioExcecao(Base):
+    """
+    Exceções de uma data: feriado/fechamento (`fechado`) ou abertura especial/horário diferente
+    (um ou mais intervalos que substituem a grade semanal naquela data).
+    """
+    __tablename__ = 'calendario_excecoes'
+
+    excecao_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    data: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    fechado: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
+    hora_inicio: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
+    hora_fim: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
+    descricao: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now()
+                                                 , onupdate=datetime.now)
+
+    __table_args__ = (
+        CheckConstraint('fechado OR (hora_inicio IS NOT NULL AND hora_fim IS NOT NULL AND hora_inicio < hora_fim)'
+                        , name='chk_excecao_intervalo'),
+    )
+
+# Qualquer escrita nas duas tabelas avisa os bots conectados. A função é (re)criada antes
+# de cada tabela: a ordem de criação entre as duas não importa.
+_NOTIFY_FUNCTION = DDL(f"""
+    CREATE OR REPLACE FUNCTION notify_calendario_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CALENDARIO_CHANNEL}', TG_TABLE_NAME);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+""")
+for _table in (HorarioFuncionamento.__table__, CalendarioExcecao.__table__):
+    event.listen(_table, 'before_create', _NOTIFY_FUNCTION)
+    event.listen(_table, 'after_create', DDL(
+        f"CREATE TRIGGER trg_{_table.name}_changed "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_table.name} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_calendario_changed()"
+    ))
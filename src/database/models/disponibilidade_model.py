@@ -0,0 +1,102 @@
+# src/database/models/disponibilidade_model.py
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Date, DateTime, Integer, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime
+from ...database.session import Base
+from ...database.base import schema_upgrade
+from .agenda_model import Agenda, AGENDA_ACTIVE_PREDICATE
+
+# Com esta configuração ligada (SET LOCAL) o trigger não recalcula linha a linha:
+# a importação em lote recalcula cada (data, recurso) uma única vez no fim
+AGENDA_BULK_SETTING = 'agenda.importacao_em_lote'
+
+class DisponibilidadeResumo(Base):
+    """
+    Resumo materializado da ocupação: uma linha por (data, recurso) com os blocos ocupados já
+    fundidos, em minutos do dia ([início, fim, início, fim, ...]). Mantido pelo trigger da agenda;
+    a leitura de um dia é um lookup pela chave primária, com custo proporcional aos blocos
+    (não ao número de agendamentos). recurso_id = 0: agendamentos sem profissional.
+    """
+    __tablename__ = 'disponibilidade_resumo'
+
+    data: Mapped[date] = mapped_column(Date, primary_key=True)
+    recurso_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    intervalos_ocupados: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    minutos_ocupados: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Gravado só pelo trigger (SQL puro): as colunas de auditoria precisam de default no banco
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now()
+                                                 , onupdate=datetime.now)
+
+# O resumo é criado depois da agenda; as funções, o trigger e a carga rodam a cada inicialização
+# (schema_upgrade), então bancos criados antes do resumo também passam a mantê-lo
+DisponibilidadeResumo.__table__.add_is_dependent_on(Agenda.__table__)
+
+# Recalcula uma chave (data, recurso) a partir da agenda. O advisory lock serializa transações
+# que mexem na mesma chave: cada uma recalcula depois que a anterior confirmou (READ COMMITTED),
+# então o resumo nunca perde um agendamento concorrente. range_agg requer PostgreSQL 14+.
+schema_upgrade(f"""
+    CREATE OR REPLACE FUNCTION disponibilidade_resumo_recalcular(p_data date, p_recurso bigint) RETURNS void AS $$
+    DECLARE
+        v_intervalos integer[];
+        v_minutos integer;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtextextended('disponibilidade_resumo:' || p_data || ':' || p_recurso, 0));
+
+        SELECT coalesce(array_agg(l.limite ORDER BY lower(b.r), l.ordem), '{{}}')
+             , coalesce(sum(CASE l.ordem WHEN 2 THEN l.limite ELSE -l.limite END), 0)
+          INTO v_intervalos, v_minutos
+          FROM (SELECT unnest(range_agg(int4range((extract(epoch FROM hora_inicio) / 60)::int
+                                                 , (extract(epoch FROM hora_fim) / 60)::int))) AS r
+                  FROM agenda
+                 WHERE data = p_data AND coalesce(profissional_id, 0) = p_recurso
+                   AND {AGENDA_ACTIVE_PREDICATE}) b
+          CROSS JOIN LATERAL (VALUES (1, lower(b.r)), (2, upper(b.r))) AS l(ordem, limite);
+
+        IF v_minutos = 0 THEN
+            DELETE FROM disponibilidade_resumo WHERE data = p_data AND recurso_id = p_recurso;
+        ELSE
+            INSERT INTO disponibilidade_resumo (data, recurso_id, intervalos_ocupados, minutos_ocupados)
+            VALUES (p_data, p_recurso, v_intervalos, v_minutos)
+            ON CONFLICT (data, recurso_id) DO UPDATE
+               SET intervalos_ocupados = EXCLUDED.intervalos_ocupados
+                 , minutos_ocupados = EXCLUDED.minutos_ocupados
+                 , updated_at = now();
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+    , f"""
+    CREATE OR REPLACE FUNCTION agenda_atualiza_resumo() RETURNS trigger AS $$
+    BEGIN
+        IF current_setting('{AGENDA_BULK_SETTING}', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM disponibilidade_resumo_recalcular(OLD.data, coalesce(OLD.profissional_id, 0));
+        END IF;
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND (NEW.data, coalesce(NEW.profissional_id, 0))
+                                IS DISTINCT FROM (OLD.data, coalesce(OLD.profissional_id, 0))) THEN
+            PERFORM disponibilidade_resumo_recalcular(NEW.data, coalesce(NEW.profissional_id, 0));
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+    , "CREATE OR REPLACE TRIGGER trg_agenda_resumo "
+      "AFTER INSERT OR DELETE OR UPDATE OF data, hora_inicio, hora_fim, status, profissional_id ON agenda "
+      "FOR EACH ROW EXECUTE FUNCTION agenda_atualiza_resumo()"
+    # Carga/ressincronização das datas de hoje em diante (as que o bot consulta): cobre o banco que
+    # ainda não tinha o trigger e linhas de resumo que ficaram sem agendamento ativo. Recalcular
+    # uma chave é idempotente (upsert ou delete)
+    , f"""
+    SELECT disponibilidade_resumo_recalcular(data, recurso)
+      FROM (SELECT data, coalesce(profissional_id, 0) AS recurso
+              FROM agenda WHERE data >= current_date AND {AGENDA_ACTIVE_PREDICATE}
+            UNION
+            SELECT data, recurso_id FROM disponibilidade_resumo WHERE data >= current_date) chaves
+""")
@@ -1,7 +1,7 @@
 # src/database/models/mensagem_model.py
 from __future__ import annotations # 1. Para avaliação futura dos type hints
 
-from sqlalchemy import BigInteger, Text, DateTime, ForeignKey, String, Integer
+from sqlalchemy import BigInteger, Text, DateTime, ForeignKey, String, Integer, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from ..session import Base
@@ -15,21 +15,30 @@ if TYPE_CHECKING:
 class Mensagem(Base):
     """
     Representa uma única mensagem na conversa, seja ela do usuário ou do bot.
+
+    A tabela é particionada por mês (RANGE em created_at). As partições são criadas,
+    arquivadas e descartadas pelo MessageRetentionService; por isso created_at faz parte da PK.
     """
     __tablename__ = 'mensagem'
 
+    __table_args__ = (
+        # Cobre o get_historico_llm (últimas N mensagens do usuário) em cada partição
+        Index('ix_mensagem_usuario_created', 'usuario_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
     usuario_id: Mapped[int] = mapped_column(
         Integer
         , ForeignKey('usuarios.id')
-        , index=True
         , nullable=True
     )
     
     conteudo: Mapped[str] = mapped_column(Text, nullable=False)
     origem: Mapped[str] = mapped_column(String(10), nullable=False) # bot or user
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    # Chave de particionamento: precisa compor a PK em tabelas particionadas
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.now)
 
     # Relacionamento
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="mensagens")
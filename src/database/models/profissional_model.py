@@ -0,0 +1,59 @@
+# src/database/models/profissional_model.py
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (BigInteger, Boolean, CheckConstraint, ForeignKey, SmallInteger, String, Time,
+    UniqueConstraint)
+from sqlalchemy.orm import relationship, Mapped, mapped_column
+from datetime import time
+from ...database.session import Base  # Importa Base do diretório pai (database)
+
+if TYPE_CHECKING:
+    from .agenda_model import Agenda
+
+class Profissional(Base):
+    """Quem executa o serviço (profissional/cadeira). Cada um é um recurso independente na agenda."""
+    __tablename__ = 'profissionais'
+
+    profissional_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    nome: Mapped[str] = mapped_column(String(100), nullable=False)
+    ativo: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    # Sem linhas em `profissional_servicos`: atende todos os serviços.
+    # Sem linhas em `profissional_horarios`: segue o horário do estabelecimento.
+    servicos: Mapped[list["ProfissionalServico"]] = relationship(back_populates="profissional", cascade="all, delete-orphan")
+    horarios: Mapped[list["ProfissionalHorario"]] = relationship(back_populates="profissional", cascade="all, delete-orphan")
+    agendamentos: Mapped[list["Agenda"]] = relationship("Agenda", back_populates="profissional")
+
+    def __repr__(self):
+        return f"<Profissional(id={self.profissional_id}, nome='{self.nome}', ativo={self.ativo})>"
+
+class ProfissionalServico(Base):
+    """Serviços que o profissional sabe executar."""
+    __tablename__ = 'profissional_servicos'
+
+    profissional_id: Mapped[int] = mapped_column(BigInteger,
+        ForeignKey('profissionais.profissional_id', ondelete='CASCADE'), primary_key=True)
+    servico_id: Mapped[int] = mapped_column(BigInteger,
+        ForeignKey('servicos.servico_id', ondelete='CASCADE'), primary_key=True)
+
+    profissional: Mapped["Profissional"] = relationship(back_populates="servicos")
+
+class ProfissionalHorario(Base):
+    """Expediente do profissional em um dia da semana (0 = segunda, como date.weekday())."""
+    __tablename__ = 'profissional_horarios'
+
+    horario_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    profissional_id: Mapped[int] = mapped_column(BigInteger,
+        ForeignKey('profissionais.profissional_id', ondelete='CASCADE'))
+    dia_semana: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    hora_inicio: Mapped[time] = mapped_column(Time, nullable=False)
+    hora_fim: Mapped[time] = mapped_column(Time, nullable=False)
+
+    profissional: Mapped["Profissional"] = relationship(back_populates="horarios")
+
+    __table_args__ = (
+        CheckConstraint('dia_semana BETWEEN 0 AND 6', name='chk_profissional_dia_semana'),
+        CheckConstraint('hora_inicio < hora_fim', name='chk_profissional_horas_validas'),
+        UniqueConstraint('profissional_id', 'dia_semana', name='uc_profissional_dia'),
+    )
@@ -5,10 +5,14 @@ from typing import TYPE_CHECKING
 from sqlalchemy import BigInteger, String, Boolean, Text, Integer, DECIMAL
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from ...database.session import Base  # Importa Base do diretório pai (database)
+from ...database.base import schema_upgrade
 
 if TYPE_CHECKING:
     from .agenda_model import Agenda
 
+# Canal LISTEN/NOTIFY usado pelo ServiceCatalog para recarregar o catálogo em memória
+SERVICOS_CHANNEL = 'servicos_changed'
+
 class Servico(Base):
     __tablename__ = 'servicos'
 
@@ -24,4 +28,36 @@ class Servico(Base):
     agendamentos: Mapped[list["Agenda"]] = relationship("Agenda", back_populates="servico")
 
     def __repr__(self):
-        return f"<Servico(id={self.servico_id}, nome='{self.nome}', preco={self.preco} duração={self.duracao_minutos})>"
\ No newline at end of file
+        return f"<Servico(id={self.servico_id}, nome='{self.nome}', preco={self.preco} duração={self.duracao_minutos})>"
+
+# Trigger de notificação: qualquer escrita em `servicos` avisa os bots conectados.
+# Instalado a cada startup (idempotente): bancos anteriores ao catálogo em memória também recebem.
+schema_upgrade(f"""
+    CREATE OR REPLACE FUNCTION notify_servicos_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{SERVICOS_CHANNEL}', TG_OP);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+""", (
+    "CREATE OR REPLACE TRIGGER trg_servicos_changed "
+    "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON servicos "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_servicos_changed()"
+))
+
+# Busca aproximada e sem acentos (pg_trgm + unaccent). O wrapper IMMUTABLE é necessário
+# porque unaccent() é STABLE e não pode ser usado em índices de expressão.
+# Tudo idempotente e aplicado a cada startup: bancos anteriores à busca também recebem os índices.
+schema_upgrade(
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+    , "CREATE EXTENSION IF NOT EXISTS unaccent"
+    , """
+    CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS $$
+        SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+"""
+    , "CREATE INDEX IF NOT EXISTS ix_servicos_nome_trgm "
+      "ON servicos USING gin (f_unaccent(lower(nome)) gin_trgm_ops)"
+    , "CREATE INDEX IF NOT EXISTS ix_servicos_descricao_trgm "
+      "ON servicos USING gin (f_unaccent(lower(coalesce(descricao, ''))) gin_trgm_ops)"
+)
@@ -7,6 +7,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from ...database.session import Base  # Importa Base do diretório pai (database)
+from ...database.base import schema_upgrade
 
 if TYPE_CHECKING:
     from .user_model import Usuario
@@ -19,10 +20,14 @@ class UserSession(Base):
     current_intent: Mapped[str] = mapped_column(String(50), nullable=True)
     slot_data: Mapped[dict] = mapped_column(JSONB, default={})
     session_start: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    last_updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Indexado: a varredura de expiração busca por last_updated < limite
+    last_updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
 
     # Relacionamento
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="session")
 
     def __repr__(self):
-        return f"<UserSession(user_id={self.user_id}, intent='{self.current_intent}')>"
\ No newline at end of file
+        return f"<UserSession(user_id={self.user_id}, intent='{self.current_intent}')>"
+
+# create_all não cria índices em tabela já existente
+schema_upgrade("CREATE INDEX IF NOT EXISTS ix_user_sessions_last_updated ON user_sessions (last_updated)")
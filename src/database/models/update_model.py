@@ -0,0 +1,23 @@
+# src/database/models/update_model.py
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from ...database.session import Base  # Importa Base do diretório pai (database)
+
+class UpdateProcessada(Base):
+    """
+    update_id já recebidos do Telegram (deduplicação entre workers/reentregas do webhook).
+    Gravada por INSERT ... ON CONFLICT direto: as colunas de auditoria têm default no servidor.
+    Linhas antigas são removidas pelo job de limpeza (UPDATE_DEDUP_RETENTION_HOURS).
+    """
+    __tablename__ = 'updates_processadas'
+
+    update_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now(), index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now()
+                                                 , onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<UpdateProcessada(update_id={self.update_id})>"
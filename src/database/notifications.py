@@ -0,0 +1,60 @@
+# src/database/notifications.py
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PgNotificationListener:
+    """
+    Mantém uma conexão asyncpg dedicada (fora do pool do SQLAlchemy) escutando um canal
+    LISTEN/NOTIFY do PostgreSQL e repassa cada notificação para um callback assíncrono.
+    Se a conexão cair, `ensure_started` reconecta; quem usa deve manter um polling de fallback.
+    """
+
+    def __init__(self, engine: AsyncEngine, channel: str, callback: Callable[[str], Awaitable[None]]):
+        self.channel = channel
+        self._callback = callback
+        # asyncpg não entende o prefixo "postgresql+asyncpg"
+        self._dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        self._conn: Optional[asyncpg.Connection] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def is_listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def ensure_started(self) -> bool:
+        """Conecta e registra o LISTEN se ainda não estiver ativo. Retorna se está escutando."""
+        if self.is_listening:
+            return True
+        try:
+            self._conn = await asyncpg.connect(self._dsn)
+            self._conn.add_termination_listener(self._on_termination)
+            await self._conn.add_listener(self.channel, self._on_notify)
+            logger.info(f"LISTEN ativo no canal '{self.channel}'.")
+            return True
+        except Exception as e:
+            logger.warning(f"Não foi possível escutar o canal '{self.channel}' (usando polling): {e}")
+            self._conn = None
+            return False
+
+    async def stop(self):
+        """Encerra a conexão dedicada."""
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    def _on_termination(self, connection: asyncpg.Connection):
+        logger.warning(f"Conexão LISTEN do canal '{self.channel}' encerrada.")
+        self._conn = None
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str):
+        # O asyncpg chama este callback de forma síncrona: o trabalho real vai para uma task
+        task = asyncio.get_running_loop().create_task(self._callback(payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
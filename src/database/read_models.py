@@ -0,0 +1,77 @@
+# src/database/read_models.py
+"""
+Modelos de leitura (DTOs) dos caminhos quentes.
+
+São objetos pequenos com __slots__, montados a partir de SELECTs só de colunas:
+não passam pelo identity map da sessão e custam bem menos que entidades ORM ou dicts.
+Aceitam leitura no estilo dict (`dto['nome']`, `dto.get('nome')`) para manter
+compatíveis os chamadores que tratavam esses retornos como dicionários.
+"""
+from dataclasses import dataclass, field, fields
+from datetime import date, time
+from typing import Any, Iterator, Optional
+
+class ReadModel:
+    """Acesso somente-leitura no estilo Mapping sobre os campos do DTO."""
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and hasattr(self, key)
+
+    def keys(self) -> Iterator[str]:
+        return (f.name for f in fields(self))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.keys()}
+
+
+@dataclass(frozen=True, slots=True)
+class ServicoDTO(ReadModel):
+    servico_id: int
+    nome: str
+    descricao: Optional[str]
+    preco: float
+    duracao_minutos: int
+
+    @classmethod
+    def from_row(cls, row) -> "ServicoDTO":
+        return cls(
+            servico_id=row.servico_id
+            , nome=row.nome
+            , descricao=row.descricao
+            , preco=float(row.preco)
+            , duracao_minutos=row.duracao_minutos
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SessionStateDTO(ReadModel):
+    user_id: int
+    current_intent: Optional[str] = None
+    slot_data: dict = field(default_factory=dict)  # JSONB: dict próprio de cada leitura
+
+
+@dataclass(frozen=True, slots=True)
+class ProfissionalDTO(ReadModel):
+    profissional_id: int
+    nome: str
+    servicos: frozenset = frozenset()   # Vazio: atende todos os serviços
+    horarios: dict = field(default_factory=dict)  # dia_semana -> (início, fim) em minutos; vazio: horário da casa
+
+
+@dataclass(frozen=True, slots=True)
+class LembreteDTO(ReadModel):
+    agenda_id: int
+    user_id: int
+    servico: str
+    data: date
+    hora_inicio: time
@@ -3,6 +3,10 @@ from .agenda_repo import AgendaRepository
 from .session_repo import SessionRepository
 from .mensagem_repo import MensagemRepository
 from .servico_repo import ServicoRepository
+from .mensagem_partition_repo import MensagemPartitionRepository
+from .profissional_repo import ProfissionalRepository
+from .calendario_repo import CalendarioRepository
+from .update_repo import UpdateRepository
 
 __all__ = [
     "UserRepository"
@@ -10,5 +14,9 @@ __all__ = [
     , "SessionRepository"
     , "MensagemRepository"
     , "ServicoRepository"
+    , "MensagemPartitionRepository"
+    , "ProfissionalRepository"
+    , "CalendarioRepository"
+    , "UpdateRepository"
     , 
 ]
\ No newline at end of file
@@ -5,60 +5,175 @@ from datetime import datetime, time, date
 from typing import Optional
 
 # Importações Assíncronas
-from sqlalchemy import select, func, text, and_
+from sqlalchemy import (select, insert, update, exists, literal, func, text, and_, or_, tuple_, bindparam,
+    BigInteger, Date, DateTime, String, Time)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession 
 
 # Importações da Base e dos Modelos (Ajuste conforme a sua estrutura)
 from src.database.repositories.base_repo import BaseRepository
-from src.database.models.agenda_model import Agenda
+from src.database.models.agenda_model import (Agenda, AGENDA_OVERLAP_CONSTRAINT, AGENDA_USER_DAY_CONSTRAINT
+    , REMINDER_SENDING, REMINDER_FAILED, agenda_resource_conflict)
+from src.database.models.servico_model import Servico
+from src.database.read_models import LembreteDTO
+from src.database.models.disponibilidade_model import DisponibilidadeResumo
+from src.utils.constants import REMINDER_MAX_ATTEMPTS
 
 logger = setup_logger(__name__)
 
+SLOT_TAKEN_MESSAGE = "Este horário acabou de ser ocupado. Por favor, escolha outro."
+
+def conflict_message(error: IntegrityError) -> Optional[str]:
+    """Mensagem para o usuário quando o INSERT viola uma das regras de agenda; None para outros erros."""
+    causa = error.orig.__cause__ if error.orig is not None else None
+    constraint = getattr(causa, 'constraint_name', None) or str(error.orig)
+
+    if AGENDA_OVERLAP_CONSTRAINT in constraint:
+        return SLOT_TAKEN_MESSAGE
+    if AGENDA_USER_DAY_CONSTRAINT in constraint:
+        return "Você já tem um agendamento para este dia. Cancele-o ou escolha outra data."
+    return None
+
+def expand_summary(recurso_id: int, intervalos: list[int]) -> list[tuple[time, time, Optional[int]]]:
+    """Converte uma linha do resumo ([início, fim, ...] em minutos) em agendamentos (início, fim, profissional)."""
+    profissional_id = recurso_id or None   # 0: sem profissional (ocupa o estabelecimento inteiro)
+    return [(time(inicio // 60, inicio % 60), time(fim // 60, fim % 60), profissional_id)
+            for inicio, fim in zip(intervalos[::2], intervalos[1::2])]
+
 class AgendaRepository(BaseRepository[Agenda]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Agenda)
         # O self.session agora é a AsyncSession ativa
 
-    async def verificar_disponibilidade(self, data: str) -> list[tuple[time, time]]:
-        """Busca no DB todos os horários agendados e concluídos para uma data específica."""
+    async def verificar_disponibilidade(self, data: str) -> list[tuple[time, time, Optional[int]]]:
+        """
+        Blocos ocupados (agendados e concluídos) de uma data, por profissional, lidos do resumo
+        materializado (disponibilidade_resumo): um lookup pela chave, independente do volume de agendamentos.
+        """
         try:
             data_obj = datetime.strptime(data, '%Y-%m-%d').date()
         except ValueError as e:
             logger.info(f"Data inválida em verificar_disponibilidade: {data}. Erro: {e}.")
             return []
 
-        stmt = select(Agenda.hora_inicio, Agenda.hora_fim).where(
-                Agenda.data == data_obj,
-                Agenda.status.in_(['agendado', 'concluido'])
-            ).order_by(Agenda.hora_inicio)
-
-        # Assume-se que a verificação é para qualquer profissional, já que não temos o campo
-        return (await self.session.execute(stmt)).all()
-
-    async def inserir_agendamento(self,
-                                  user_id: int,
-                                  servico_id: int,
-                                  servico_nome: str,
-                                  data_dt: date,
-                                  hora_inicio_time: time, 
-                                  hora_fim_time: time) -> tuple[Optional[Agenda], Optional[str], str]:
-        """Insere novo agendamento"""
-        novo_agendamento = Agenda(
-            user_id=user_id
-            , servico_id=servico_id
-            , data=data_dt
-            , hora_inicio=hora_inicio_time
-            , hora_fim=hora_fim_time
-            , status='agendado'
-            , created_at=datetime.now()
-        )
+        stmt = select(DisponibilidadeResumo.recurso_id, DisponibilidadeResumo.intervalos_ocupados).where(
+                DisponibilidadeResumo.data == data_obj
+            )
+        return sorted(
+            (bloco for recurso_id, intervalos in await self.session.execute(stmt)
+             for bloco in expand_summary(recurso_id, intervalos)),
+            key=lambda b: (b[0], b[1]))
 
-        try:
-            self.session.add(novo_agendamento)
-            await self.session.flush()
-            await self.session.refresh(novo_agendamento)
-            return novo_agendamento, servico_nome, "Agendamento realizado!" 
-        except Exception as e:
-            # Se houver conflito de horário (UniqueConstraint), o DB barra aqui
-            logger.error(f"Conflito de integridade no banco: {e}")
-            return None, None, "Este horário acabou de ser ocupado. Por favor, escolha outro."
+    async def listar_ocupacao_periodo(self, data_inicio: date, data_fim: date) -> list[tuple[date, time, time, Optional[int]]]:
+        """Blocos ocupados de todas as datas do intervalo, numa única leitura do resumo materializado."""
+        stmt = select(DisponibilidadeResumo.data, DisponibilidadeResumo.recurso_id, DisponibilidadeResumo.intervalos_ocupados).where(
+                DisponibilidadeResumo.data.between(data_inicio, data_fim)
+            ).order_by(DisponibilidadeResumo.data)
+
+        return [(data, *bloco) for data, recurso_id, intervalos in await self.session.execute(stmt)
+                for bloco in expand_summary(recurso_id, intervalos)]
+
+    async def inserir_agendamento(self
+                                  , user_id: int
+                                  , servico_id: int
+                                  , data_dt: date
+                                  , hora_inicio_time: time
+                                  , hora_fim_time: time
+                                  , profissional_id: Optional[int] = None) -> Optional[int]:
+        """
+        Insere o agendamento em um único statement (INSERT ... SELECT ... WHERE NOT EXISTS ... RETURNING).
+        Retorna o agenda_id, ou None se o intervalo já estiver ocupado. Entre transações concorrentes
+        quem decide é a exclusion constraint: o perdedor recebe IntegrityError (ver conflict_message).
+        """
+        agora = datetime.now()
+        # Mesmo predicado de recurso do trigger e da importação: sem profissional conflita com todos
+        sobreposicao = select(Agenda.agenda_id).where(
+                Agenda.data == data_dt,
+                Agenda.status.in_(['agendado', 'concluido']),
+                Agenda.hora_inicio < hora_fim_time,
+                Agenda.hora_fim > hora_inicio_time,
+                text(agenda_resource_conflict(':novo_profissional')).bindparams(
+                    bindparam('novo_profissional', profissional_id, type_=BigInteger))
+            )
+
+        valores = select(
+                literal(user_id, BigInteger)
+                , literal(servico_id, BigInteger)
+                , literal(profissional_id, BigInteger)
+                , literal(data_dt, Date)
+                , literal(hora_inicio_time, Time)
+                , literal(hora_fim_time, Time)
+                , literal('agendado', String)
+                , literal(agora, DateTime)
+                , literal(agora, DateTime)
+            ).where(~exists(sobreposicao))
+
+        stmt = insert(Agenda).from_select(
+                ['user_id', 'servico_id', 'profissional_id', 'data', 'hora_inicio', 'hora_fim', 'status', 'created_at', 'updated_at']
+                , valores
+            ).returning(Agenda.agenda_id)
+
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def atualizar_status(self, agenda_id: int, status: str) -> Optional[date]:
+        """Altera o status de um agendamento. Retorna a data afetada (None se não existir)."""
+        stmt = (update(Agenda)
+                .where(Agenda.agenda_id == agenda_id)
+                .values(status=status, updated_at=datetime.now())
+                .returning(Agenda.data))
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    # =========================================================
+    # LEMBRETES
+    # =========================================================
+    @staticmethod
+    def _lembrete_pendente(lease_cutoff: datetime):
+        """
+        Sem lembrete ainda, ou nova tentativa: reservado por um dispatcher que não concluiu dentro do
+        prazo, ou envio que falhou. Cada reserva conta uma tentativa; esgotadas, o lembrete é descartado.
+        """
+        return or_(Agenda.lembrete_status.is_(None)
+                   , and_(Agenda.lembrete_status.in_((REMINDER_SENDING, REMINDER_FAILED))
+                          , Agenda.lembrete_em < lease_cutoff
+                          , Agenda.lembrete_tentativas < REMINDER_MAX_ATTEMPTS))
+
+    async def listar_lembretes_pendentes(self
+                                         , inicio: datetime
+                                         , fim: datetime
+                                         , lease_cutoff: datetime
+                                         , limite: int) -> list[LembreteDTO]:
+        """Agendamentos ativos que começam em [inicio, fim) e ainda precisam de lembrete (índice por data e hora)."""
+        stmt = (select(Agenda.agenda_id, Agenda.user_id, Servico.nome, Agenda.data, Agenda.hora_inicio)
+                .join(Servico, Servico.servico_id == Agenda.servico_id)
+                .where(Agenda.status == 'agendado'
+                       , tuple_(Agenda.data, Agenda.hora_inicio) >= tuple_(literal(inicio.date()), literal(inicio.time()))
+                       , tuple_(Agenda.data, Agenda.hora_inicio) < tuple_(literal(fim.date()), literal(fim.time()))
+                       , self._lembrete_pendente(lease_cutoff))
+                .order_by(Agenda.data, Agenda.hora_inicio)
+                .limit(limite))
+        return [LembreteDTO(*row) for row in await self.session.execute(stmt)]
+
+    async def reservar_lembretes(self, agenda_ids: list[int], agora: datetime, lease_cutoff: datetime) -> list[int]:
+        """
+        Marca os lembretes como 'enviando' num único UPDATE e devolve só os que este dispatcher reservou:
+        outro processo (ou um reinício) não envia o mesmo lembrete duas vezes.
+        """
+        if not agenda_ids:
+            return []
+        stmt = (update(Agenda)
+                .where(Agenda.agenda_id.in_(agenda_ids)
+                       , Agenda.status == 'agendado'
+                       , self._lembrete_pendente(lease_cutoff))
+                .values(lembrete_status=REMINDER_SENDING, lembrete_em=agora
+                        , lembrete_tentativas=Agenda.lembrete_tentativas + 1)
+                .returning(Agenda.agenda_id))
+        return list((await self.session.execute(stmt)).scalars())
+
+    async def registrar_lembretes(self, agenda_ids: list[int], status: str, agora: datetime) -> int:
+        """Grava o resultado da entrega ('enviado', 'falhou' ou 'bloqueado') de um lote de lembretes reservados."""
+        if not agenda_ids:
+            return 0
+        stmt = (update(Agenda)
+                .where(Agenda.agenda_id.in_(agenda_ids), Agenda.lembrete_status == REMINDER_SENDING)
+                .values(lembrete_status=status, lembrete_em=agora))
+        return (await self.session.execute(stmt)).rowcount
@@ -0,0 +1,49 @@
+# src/database/repositories/calendario_repo.py
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.repositories.base_repo import BaseRepository
+from src.database.models.calendario_model import HorarioFuncionamento, CalendarioExcecao
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _minuto(t) -> int:
+    return t.hour * 60 + t.minute
+
+class CalendarioRepository(BaseRepository[HorarioFuncionamento]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, HorarioFuncionamento)
+
+    async def listar_grade_semanal(self) -> dict[int, list[tuple[int, int]]]:
+        """Intervalos de funcionamento (em minutos) por dia da semana (0 = segunda)."""
+        grade: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for dia, inicio, fim in await self.session.execute(
+                select(HorarioFuncionamento.dia_semana, HorarioFuncionamento.hora_inicio, HorarioFuncionamento.hora_fim)
+                .order_by(HorarioFuncionamento.dia_semana, HorarioFuncionamento.hora_inicio)):
+            grade[dia].append((_minuto(inicio), _minuto(fim)))
+        return dict(grade)
+
+    async def listar_excecoes(self, desde: date) -> dict[date, tuple[list[tuple[int, int]], Optional[str]]]:
+        """
+        Exceções a partir de `desde`: data -> (intervalos de abertura, descrição).
+        Uma linha `fechado` na data fecha o dia inteiro (lista de intervalos vazia).
+        """
+        excecoes: dict[date, tuple[list[tuple[int, int]], Optional[str]]] = {}
+        fechadas: set[date] = set()
+        for data, fechado, inicio, fim, descricao in await self.session.execute(
+                select(CalendarioExcecao.data, CalendarioExcecao.fechado, CalendarioExcecao.hora_inicio
+                       , CalendarioExcecao.hora_fim, CalendarioExcecao.descricao)
+                .where(CalendarioExcecao.data >= desde)
+                .order_by(CalendarioExcecao.data, CalendarioExcecao.hora_inicio)):
+            intervalos, desc_atual = excecoes.get(data, ([], None))
+            if fechado:
+                fechadas.add(data)
+            elif data not in fechadas:
+                intervalos.append((_minuto(inicio), _minuto(fim)))
+            excecoes[data] = ([] if data in fechadas else intervalos, desc_atual or descricao)
+        return excecoes
@@ -0,0 +1,115 @@
+# src/database/repositories/mensagem_partition_repo.py
+import re
+from datetime import date
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PARENT_TABLE = 'mensagem'
+# Nome das partições mensais: mensagem_pAAAA_MM (ex: mensagem_p2025_10)
+_PARTITION_NAME_RE = re.compile(r'^mensagem_p(\d{4})_(\d{2})$')
+
+
+# ----------------------------------------------------------------------
+# Helpers de calendário (puros, sem I/O)
+
+def month_start(day: date) -> date:
+    """Retorna o primeiro dia do mês de `day`."""
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    """Soma (ou subtrai) meses a partir do primeiro dia do mês de `day`."""
+    total = day.year * 12 + (day.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    """Nome da partição que guarda as mensagens do mês de `month`."""
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+def parse_partition_month(name: str) -> Optional[date]:
+    """Inverso de partition_name. Retorna None para nomes fora do padrão."""
+    match = _PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class MensagemPartitionRepository:
+    """
+    Operações de DDL e leitura em massa sobre as partições mensais da tabela `mensagem`.
+    Os nomes de tabela são sempre gerados por partition_name (nunca vêm do usuário).
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _validated(name: str) -> str:
+        if parse_partition_month(name) is None:
+            raise ValueError(f"Nome de partição inválido: {name}")
+        return name
+
+    async def is_partitioned(self) -> bool:
+        """True se `mensagem` é uma tabela particionada (bancos antigos podem ter a tabela comum)."""
+        stmt = text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            f"WHERE partrelid = to_regclass('{PARENT_TABLE}'))"
+        )
+        return bool(await self.session.scalar(stmt))
+
+    async def ensure_partition(self, month: date) -> str:
+        """Cria (se não existir) a partição do mês informado."""
+        inicio = month_start(month)
+        fim = add_months(inicio, 1)
+        name = partition_name(inicio)
+
+        await self.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+        ))
+        return name
+
+    async def list_attached_partitions(self) -> list[str]:
+        """Partições atualmente anexadas à tabela pai."""
+        stmt = text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            f"WHERE i.inhparent = '{PARENT_TABLE}'::regclass "
+            "ORDER BY c.relname"
+        )
+        return list((await self.session.scalars(stmt)).all())
+
+    async def list_detached_partitions(self) -> list[str]:
+        """Tabelas mensais já desanexadas (ex: arquivamento interrompido) que ainda existem."""
+        stmt = text(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :pattern "
+            "ORDER BY relname"
+        )
+        names = (await self.session.scalars(stmt, {"pattern": f"{PARENT_TABLE}_p%"})).all()
+        return [n for n in names if parse_partition_month(n) is not None]
+
+    async def detach_partition(self, name: str) -> None:
+        """Desanexa a partição: ela deixa de ser visível nas consultas de `mensagem`."""
+        await self.session.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {self._validated(name)}"
+        ))
+
+    async def stream_rows(self, name: str, chunk_size: int = 5000) -> AsyncIterator[list]:
+        """Lê a partição (anexada ou não) em blocos, sem carregar tudo em memória."""
+        stmt = text(
+            f"SELECT id, usuario_id, conteudo, origem, created_at "
+            f"FROM {self._validated(name)} ORDER BY created_at, id"
+        )
+        result = await self.session.stream(stmt.execution_options(yield_per=chunk_size))
+        async for chunk in result.partitions(chunk_size):
+            yield chunk
+
+    async def drop_partition(self, name: str) -> None:
+        """Descarta a tabela inteira de uma vez (substitui DELETEs linha a linha)."""
+        await self.session.execute(text(f"DROP TABLE IF EXISTS {self._validated(name)}"))
+        logger.info(f"Partição {name} descartada.")
@@ -0,0 +1,47 @@
+# src/database/repositories/profissional_repo.py
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.repositories.base_repo import BaseRepository
+from src.database.models.profissional_model import Profissional, ProfissionalServico, ProfissionalHorario
+from src.database.read_models import ProfissionalDTO
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class ProfissionalRepository(BaseRepository[Profissional]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, Profissional)
+
+    async def listar_escala(self) -> list[ProfissionalDTO]:
+        """Profissionais ativos com os serviços que executam e o expediente de cada dia da semana."""
+        profissionais = (await self.session.execute(
+            select(Profissional.profissional_id, Profissional.nome)
+            .where(Profissional.ativo.is_(True))
+            .order_by(Profissional.profissional_id)
+        )).all()
+        if not profissionais:
+            return []
+
+        servicos: dict[int, set[int]] = defaultdict(set)
+        for profissional_id, servico_id in await self.session.execute(
+                select(ProfissionalServico.profissional_id, ProfissionalServico.servico_id)):
+            servicos[profissional_id].add(servico_id)
+
+        horarios: dict[int, dict[int, tuple[int, int]]] = defaultdict(dict)
+        for profissional_id, dia, inicio, fim in await self.session.execute(
+                select(ProfissionalHorario.profissional_id, ProfissionalHorario.dia_semana
+                       , ProfissionalHorario.hora_inicio, ProfissionalHorario.hora_fim)):
+            horarios[profissional_id][dia] = (inicio.hour * 60 + inicio.minute, fim.hour * 60 + fim.minute)
+
+        return [
+            ProfissionalDTO(
+                profissional_id=p.profissional_id
+                , nome=p.nome
+                , servicos=frozenset(servicos.get(p.profissional_id, ()))
+                , horarios=horarios.get(p.profissional_id, {})
+            )
+            for p in profissionais
+        ]
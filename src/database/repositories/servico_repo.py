@@ -1,11 +1,18 @@
 # src/database/repositories/servico_repo.py
 from typing import Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text, literal, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.repositories.base_repo import BaseRepository
 from src.database.models.servico_model import Servico
+from src.database.read_models import ServicoDTO
+from src.utils.constants import SERVICE_MATCH_MIN_SCORE, SERVICE_DESCRIPTION_WEIGHT
+from src.utils.text_search import ScoredMatch, normalize_text
+
+def _normalized(expr):
+    """Mesma expressão dos índices de trigramas: f_unaccent(lower(...))."""
+    return func.f_unaccent(func.lower(expr))
 
 class ServicoRepository(BaseRepository[Servico]):
     def __init__(self, session: AsyncSession):
@@ -17,9 +24,9 @@ class ServicoRepository(BaseRepository[Servico]):
     async def get_by_name(self, nome: str) -> Optional[Servico]:
         stmt = select(Servico).where(
             Servico.ativo.is_(True), 
-            func.lower(Servico.nome) == func.lower(nome)
+            _normalized(Servico.nome) == _normalized(literal(nome))
         )
-        return (await self.session.scalars(stmt)).one_or_none()
+        return (await self.session.scalars(stmt)).first()
     
     async def get_available_services_names(self) -> list[str]:
         """Lista serviços disponíveis."""
@@ -28,24 +35,77 @@ class ServicoRepository(BaseRepository[Servico]):
         
         return (await self.session.scalars(stmt)).all()
     
-    async def buscar_servicos(self, termo: str) -> list[dict]:
-        search_term = f'%{termo}%'
+    def _dto_select(self, *extra):
+        """SELECT só das colunas do ServicoDTO (sem entidades ORM no identity map)."""
+        return select(
+            Servico.servico_id, Servico.nome, Servico.descricao, Servico.preco, Servico.duracao_minutos, *extra)
 
-        # Otimização: Selecionar apenas colunas necessárias
-        stmt = select(Servico).where(
+    async def get_details_by_id(self, servico_id: int) -> Optional[ServicoDTO]:
+        """Versão de leitura do get_by_id: serviço ativo como DTO."""
+        stmt = self._dto_select().where(Servico.servico_id == servico_id, Servico.ativo.is_(True))
+        row = (await self.session.execute(stmt)).first()
+        return ServicoDTO.from_row(row) if row else None
+
+    async def get_details_by_name(self, nome: str) -> Optional[ServicoDTO]:
+        """Versão de leitura do get_by_name: serviço ativo como DTO."""
+        stmt = self._dto_select().where(
             Servico.ativo.is_(True),
-            (func.lower(Servico.nome).like(func.lower(search_term))) 
-            | (func.lower(Servico.descricao).like(func.lower(search_term))) 
+            _normalized(Servico.nome) == _normalized(literal(nome))
         )
-        resultados = (await self.session.scalars(stmt)).all()
+        row = (await self.session.execute(stmt)).first()
+        return ServicoDTO.from_row(row) if row else None
+
+    async def match_servicos(self
+                             , termo: str
+                             , min_score: float = SERVICE_MATCH_MIN_SCORE
+                             , limit: Optional[int] = None) -> list[ScoredMatch]:
+        """
+        Busca aproximada e sem acentos (pg_trgm + unaccent), ranqueada por similaridade.
+        Os operadores %> usam os índices GIN ix_servicos_nome_trgm / ix_servicos_descricao_trgm.
+        """
+        termo_norm = _normalized(literal(termo))
+        nome_expr = _normalized(Servico.nome)
+        descricao_expr = _normalized(func.coalesce(Servico.descricao, literal_column("''")))  # idêntica ao índice
+
+        score = func.greatest(
+            func.word_similarity(termo_norm, nome_expr),
+            func.word_similarity(termo_norm, descricao_expr) * SERVICE_DESCRIPTION_WEIGHT,
+        ).label('score')
+        contem_no_nome = nome_expr.contains(termo_norm)
+
+        stmt = self._dto_select(score).where(
+            Servico.ativo.is_(True),
+            # %> filtra pelo índice; o score ponderado decide. Substrings literais do nome
+            # continuam entrando mesmo com score baixo (comportamento do antigo LIKE)
+            nome_expr.op('%>')(termo_norm) | descricao_expr.op('%>')(termo_norm) | contem_no_nome,
+            (score >= min_score) | contem_no_nome,
+        ).order_by(score.desc(), func.similarity(termo_norm, nome_expr).desc(), Servico.nome)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
 
         return [
-            {
-                "servico_id": servico.servico_id,
-                "nome": servico.nome,
-                "descricao": servico.descricao,
-                "preco": float(servico.preco),
-                "duracao_minutos": servico.duracao_minutos,
-            }
-            for servico in resultados
-        ]
\ No newline at end of file
+            ScoredMatch(ServicoDTO.from_row(row), round(float(row.score), 4))
+            for row in (await self.session.execute(stmt)).all()
+        ]
+
+    async def buscar_servicos(self, termo: str) -> list[ServicoDTO]:
+        """Serviços ativos que casam com o termo (com erros de digitação e sem acentos), do mais ao menos similar."""
+        if not normalize_text(termo):
+            return await self.get_active_services()
+        return [m.item for m in await self.match_servicos(termo)]
+
+    async def get_active_services(self) -> list[ServicoDTO]:
+        """Carrega o catálogo ativo completo (colunas necessárias apenas) para o ServiceCatalog."""
+        stmt = self._dto_select().where(Servico.ativo.is_(True)).order_by(Servico.nome)
+        return [ServicoDTO.from_row(row) for row in (await self.session.execute(stmt)).all()]
+
+    async def get_catalog_fingerprint(self) -> Optional[str]:
+        """Hash do conteúdo relevante do catálogo (polling barato para detectar mudanças)."""
+        stmt = text(
+            "SELECT md5(string_agg("
+            "servico_id || ':' || nome || ':' || coalesce(descricao, '') || ':' || preco "
+            "|| ':' || coalesce(duracao_minutos, 0) || ':' || ativo, ',' ORDER BY servico_id)) "
+            "FROM servicos"
+        )
+        return await self.session.scalar(stmt)
@@ -1,14 +1,17 @@
 # src/database/repositories/session_repo.py
 from src.config.logger import setup_logger
-from typing import Optional
+from typing import Iterable, Optional
 
 # Importações Assíncronas
-from sqlalchemy import select, update, func
+from datetime import datetime
+from sqlalchemy import select, update, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession # A chave para o modo assíncrono
 
 # Importações da Base e dos Modelos
 from src.database.repositories.base_repo import BaseRepository
 from src.database.models.session_model import UserSession
+from src.database.read_models import SessionStateDTO
 
 logger = setup_logger(__name__)
 
@@ -22,29 +25,30 @@ class SessionRepository(BaseRepository[UserSession]):
         super().__init__(session, UserSession)
         # O self.session agora é a AsyncSession ativa
 
-    async def get_session_state(self, user_id: int) -> dict[str, any]:
+    async def get_session_state(self, user_id: int) -> SessionStateDTO:
         """Recupera o estado atual da sessão (intenção e slots preenchidos) de forma assíncrona."""
 
-        # 1. Busca o objeto UserSession pela Chave Primária (user_id)
-        session_state_obj: Optional[UserSession] = await self.session.get(UserSession, user_id)
+        # SELECT só das colunas lidas: nenhum UserSession entra no identity map
+        stmt = select(UserSession.current_intent, UserSession.slot_data).where(UserSession.user_id == user_id)
+        row = (await self.session.execute(stmt)).first()
+
+        if row:
+            return SessionStateDTO(user_id=user_id, current_intent=row.current_intent, slot_data=row.slot_data or {})
 
-        if session_state_obj:
-            return {
-                "user_id": user_id,
-                "current_intent": session_state_obj.current_intent,
-                "slot_data": session_state_obj.slot_data  # JSONB retorna como dict
-            }
-        
         # Retorna o estado padrão se não houver sessão ativa
-        return {"user_id": user_id, "current_intent": None, "slot_data": {}}
+        return SessionStateDTO(user_id=user_id)
 
     async def update_session_state(self,
                              user_id: int,
                              current_intent: Optional[str] = None,
-                             slot_data: Optional[dict] = None):
-        """Atualiza o estado da sessão (INSERT/UPDATE) de forma assíncrona."""
-
-        if slot_data is None and current_intent is None:
+                             slot_data: Optional[dict] = None,
+                             remove_keys: Optional[Iterable[str]] = None):
+        """
+        Atualiza o estado da sessão (INSERT/UPDATE) de forma assíncrona.
+        slot_data é mesclado ao salvo (valores None são ignorados); as chaves em remove_keys são apagadas.
+        """
+        remove_keys = tuple(remove_keys or ())
+        if slot_data is None and current_intent is None and not remove_keys:
             return  
 
         # 1. Busca o objeto existente (Assíncrono)
@@ -60,6 +64,8 @@ class SessionRepository(BaseRepository[UserSession]):
                 for key, value in slot_data.items():
                     if value is not None:
                         new_slot_data[key] = value
+            for key in remove_keys:
+                new_slot_data.pop(key, None)
 
             if current_intent is not None:
                 session_obj.current_intent = current_intent
@@ -92,3 +98,40 @@ class SessionRepository(BaseRepository[UserSession]):
         if session_obj:
             await self.session.delete(session_obj)
             # O commit será feito pelo DataService
+
+    async def touch_session(self, user_id: int, now: Optional[datetime] = None):
+        """Registra atividade do usuário (UPSERT de last_updated) sem carregar o objeto."""
+        now = now or datetime.now()
+        stmt = pg_insert(UserSession).values(
+            user_id=user_id, slot_data={}, session_start=now, last_updated=now
+        ).on_conflict_do_update(
+            index_elements=[UserSession.user_id],
+            set_={"last_updated": now},
+        )
+        await self.session.execute(stmt)
+
+    async def delete_expired_sessions(self, cutoff: datetime, batch_size: int) -> list[tuple[int, datetime]]:
+        """
+        Remove, num único statement, até `batch_size` sessões inativas desde antes de `cutoff`
+        e o histórico persistente (mensagem) desses usuários. Retorna (user_id, last_updated) das expiradas.
+        SKIP LOCKED: sessões sendo atualizadas agora ficam para o próximo ciclo.
+        """
+        stmt = text("""
+            WITH expiradas AS (
+                SELECT user_id FROM user_sessions
+                WHERE last_updated < :cutoff
+                ORDER BY last_updated
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            ), mensagens AS (
+                DELETE FROM mensagem m
+                USING usuarios u, expiradas e
+                WHERE u.user_id = e.user_id AND m.usuario_id = u.id
+            )
+            DELETE FROM user_sessions s
+            USING expiradas e
+            WHERE s.user_id = e.user_id
+            RETURNING s.user_id, s.last_updated
+        """)
+        result = await self.session.execute(stmt, {"cutoff": cutoff, "batch_size": batch_size})
+        return [(row.user_id, row.last_updated) for row in result]
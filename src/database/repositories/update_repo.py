@@ -0,0 +1,27 @@
+# src/database/repositories/update_repo.py
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.repositories.base_repo import BaseRepository
+from src.database.models.update_model import UpdateProcessada
+
+class UpdateRepository(BaseRepository[UpdateProcessada]):
+    """Registro dos update_id recebidos (idempotência do processamento de updates)."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, UpdateProcessada)
+
+    async def registrar(self, update_id: int) -> bool:
+        """Grava o update_id numa única ida ao banco. False se ele já tinha sido registrado (duplicata)."""
+        stmt = pg_insert(UpdateProcessada).values(update_id=update_id).on_conflict_do_nothing(
+                index_elements=[UpdateProcessada.update_id]
+            ).returning(UpdateProcessada.update_id)
+        return (await self.session.execute(stmt)).scalar_one_or_none() is not None
+
+    async def limpar(self, antes: datetime) -> int:
+        """Remove os registros anteriores a `antes` (a janela de reentrega do Telegram já passou)."""
+        result = await self.session.execute(delete(UpdateProcessada).where(UpdateProcessada.created_at < antes))
+        return result.rowcount or 0
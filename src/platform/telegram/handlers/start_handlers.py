@@ -47,7 +47,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await data_service.salvar_usuario(user_id=user_id, nome=nome, telefone=None)
     
     # Limpa estados
-    llm_service.history_manager.reset_history(user_id)
+    await llm_service.history_manager.reset_history(user_id)
     await data_service.clear_session_state(user_id) # Sessão de agendamento (garantir que não há slots preenchidos)
     await data_service.clear_historico(user_id) # HISTÓRICO PERSISTENTE (mensagens salvas no DB)
     
@@ -0,0 +1,203 @@
+# src/platform/telegram/outbound_limiter.py
+import asyncio
+import heapq
+import itertools
+import time as _time
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Any, Callable, Coroutine, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from src.platform.telegram.rate_limited_sender import retry_after_seconds
+from src.utils.constants import (TELEGRAM_GLOBAL_RATE_PER_SECOND, TELEGRAM_GLOBAL_BURST, TELEGRAM_CHAT_RATE_PER_SECOND
+    , TELEGRAM_CHAT_BURST, TELEGRAM_GROUP_RATE_PER_MINUTE, TELEGRAM_MAX_TRACKED_CHATS, TELEGRAM_RETRY_AFTER_MAX_RETRIES)
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class OutboundPriority(IntEnum):
+    """Menor valor sai primeiro. Chamadas sem rate_limit_args são respostas interativas."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class TokenBucket:
+    """Balde de fichas: `rate` por segundo, acumulando até `capacity` (rajada)."""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Segundos até haver uma ficha (0 se já houver)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self, now: float) -> float:
+        """Consome uma ficha (podendo ficar negativo: fila FIFO) e devolve quanto esperar por ela."""
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _PriorityStats:
+    __slots__ = ('sent', 'waiting', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.sent = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "waiting": self.waiting,
+            "avg_wait_ms": round(self.total_wait / self.sent * 1000, 1) if self.sent else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class OutboundRateLimiter(BaseRateLimiter[dict]):
+    """
+    Ponto único de saída de todas as chamadas da Bot API (reply_text, send_message, edições...),
+    instalado no ApplicationBuilder: os handlers continuam chamando a API normalmente.
+
+    - Balde por chat (privado ~1 msg/s com pequena rajada; grupos 20/min), FIFO dentro do chat.
+    - Balde global (limite do bot) com fila de prioridade: respostas interativas passam à frente
+      de notificações em lote (rate_limit_args={'priority': OutboundPriority.BULK}).
+    - RetryAfter pausa todas as saídas pelo tempo pedido e a chamada é repetida.
+    Chamadas sem chat_id (getUpdates, setWebhook, answerCallbackQuery...) não são limitadas.
+    """
+
+    def __init__(self
+                 , global_rate: float = TELEGRAM_GLOBAL_RATE_PER_SECOND
+                 , global_burst: float = TELEGRAM_GLOBAL_BURST
+                 , chat_rate: float = TELEGRAM_CHAT_RATE_PER_SECOND
+                 , chat_burst: float = TELEGRAM_CHAT_BURST
+                 , group_rate_per_minute: float = TELEGRAM_GROUP_RATE_PER_MINUTE
+                 , max_retries: int = TELEGRAM_RETRY_AFTER_MAX_RETRIES
+                 , max_tracked_chats: int = TELEGRAM_MAX_TRACKED_CHATS
+                 , clock: Callable[[], float] = _time.monotonic):
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        self.chat_rate, self.chat_burst = chat_rate, chat_burst
+        self.group_rate = group_rate_per_minute / 60
+        self.max_retries = max_retries
+        self.max_tracked_chats = max_tracked_chats
+        self._chats: OrderedDict[Union[int, str], TokenBucket] = OrderedDict()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self.retry_after_count = 0
+        self._stats = {p: _PriorityStats() for p in OutboundPriority}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for _, _, fut in self._waiters:
+            fut.cancel()
+        self._waiters.clear()
+
+    # -----------------------------
+    # Baldes
+    # -----------------------------
+    def _chat_bucket(self, chat_id: Union[int, str], now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # chat_id negativo (ou @canal): grupo/canal, limite por minuto
+            grupo = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(self.group_rate if grupo else self.chat_rate
+                                 , 1 if grupo else self.chat_burst, now)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > self.max_tracked_chats:
+                self._chats.popitem(last=False)     # Chat ocioso há mais tempo: o balde estaria cheio de novo
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def _global_slot(self, priority: int):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch(), name='telegram_outbound_dispatcher')
+        await fut
+
+    async def _dispatch(self):
+        """Libera as fichas globais para quem tem maior prioridade (e chegou antes) na fila."""
+        while self._waiters:
+            now = self._clock()
+            espera = max(self._paused_until - now, self._global.wait_time(now))
+            if espera > 0:
+                await asyncio.sleep(espera)
+                continue
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue    # Chamada cancelada enquanto esperava
+            self._global.reserve(now)
+            fut.set_result(None)
+
+    # -----------------------------
+    # BaseRateLimiter
+    # -----------------------------
+    async def process_request(self
+                              , callback: Callable[..., Coroutine[Any, Any, Union[bool, dict, list]]]
+                              , args: Any
+                              , kwargs: dict[str, Any]
+                              , endpoint: str
+                              , data: dict[str, Any]
+                              , rate_limit_args: Optional[dict]) -> Union[bool, dict, list]:
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            return await callback(*args, **kwargs)
+
+        priority = OutboundPriority((rate_limit_args or {}).get('priority', OutboundPriority.INTERACTIVE))
+        stats = self._stats[priority]
+        inicio = self._clock()
+        stats.waiting += 1
+        try:
+            for tentativa in range(self.max_retries + 1):
+                espera_chat = self._chat_bucket(chat_id, self._clock()).reserve(self._clock())
+                if espera_chat > 0:
+                    await asyncio.sleep(espera_chat)
+                await self._global_slot(priority)
+
+                if tentativa == 0:
+                    espera = self._clock() - inicio
+                    stats.total_wait += espera
+                    stats.max_wait = max(stats.max_wait, espera)
+                try:
+                    resultado = await callback(*args, **kwargs)
+                    stats.sent += 1
+                    return resultado
+                except RetryAfter as e:
+                    self.retry_after_count += 1
+                    segundos = retry_after_seconds(e)
+                    self._paused_until = max(self._paused_until, self._clock() + segundos)
+                    if tentativa == self.max_retries:
+                        raise
+                    logger.warning(f"Flood control do Telegram em {endpoint}: saídas pausadas por {segundos:.1f}s.")
+        finally:
+            stats.waiting -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "retry_after": self.retry_after_count,
+            "paused_for_s": round(max(0.0, self._paused_until - self._clock()), 1),
+            "queued_global": len(self._waiters),
+            "tracked_chats": len(self._chats),
+            **{p.name.lower(): s.as_dict() for p, s in self._stats.items()},
+        }
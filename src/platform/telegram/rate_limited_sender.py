@@ -0,0 +1,87 @@
+# src/platform/telegram/rate_limited_sender.py
+import asyncio
+from datetime import timedelta
+from enum import Enum
+from typing import Iterable, Optional
+
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from src.utils.constants import TELEGRAM_NOTIFY_RATE_PER_SECOND
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """Segundos de espera pedidos pelo Telegram (int ou timedelta, conforme a versão do PTB)."""
+    delay = error.retry_after
+    return delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
+
+class SendOutcome(Enum):
+    """Resultado de um envio: BLOCKED (usuário bloqueou o bot) é definitivo, FAILED pode ser repetido."""
+    SENT = 'sent'
+    BLOCKED = 'blocked'
+    FAILED = 'failed'
+
+class RateLimitedSender:
+    """
+    Envia mensagens iniciadas pelo bot (avisos, notificações em lote) espaçando os envios
+    para não estourar o limite global do Telegram. Um RetryAfter pausa todos os envios.
+    Atrás do OutboundRateLimiter (rate_limit_args), use max_retries=0: o limiter já repete o RetryAfter.
+    """
+
+    def __init__(self
+                 , rate_per_second: float = TELEGRAM_NOTIFY_RATE_PER_SECOND
+                 , max_retries: int = 2
+                 , rate_limit_args: Optional[dict] = None):
+        self._interval = 1.0 / rate_per_second
+        self.max_retries = max_retries
+        # Repassado ao rate limiter do Application (ex.: prioridade de envio em lote)
+        self._send_kwargs = {'rate_limit_args': rate_limit_args} if rate_limit_args is not None else {}
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def _wait_turn(self):
+        """Reserva o próximo horário livre e dorme até ele (fora do lock)."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _pause(self, seconds: float):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            self._next_slot = max(self._next_slot, loop.time() + seconds)
+
+    async def send_outcome(self, bot: Bot, chat_id: int, text: str) -> SendOutcome:
+        """Envia uma mensagem e diz se ela foi entregue, se o usuário bloqueou o bot ou se falhou."""
+        for _ in range(self.max_retries + 1):
+            await self._wait_turn()
+            try:
+                await bot.send_message(chat_id, text, **self._send_kwargs)
+                return SendOutcome.SENT
+            except RetryAfter as e:
+                seconds = retry_after_seconds(e)
+                logger.warning(f"Flood control do Telegram: pausando envios por {seconds:.0f}s.")
+                await self._pause(seconds)
+            except Forbidden:
+                logger.info(f"Usuário {chat_id} bloqueou o bot; mensagem descartada.")
+                return SendOutcome.BLOCKED
+            except TelegramError as e:
+                logger.warning(f"Falha ao enviar mensagem para {chat_id}: {e}")
+                return SendOutcome.FAILED
+        return SendOutcome.FAILED
+
+    async def send(self, bot: Bot, chat_id: int, text: str) -> bool:
+        """Envia uma mensagem. Retorna False se o usuário bloqueou o bot ou se as tentativas acabaram."""
+        return await self.send_outcome(bot, chat_id, text) is SendOutcome.SENT
+
+    async def send_many(self, bot: Bot, messages: Iterable[tuple[int, str]]) -> int:
+        """Envia uma sequência de (chat_id, texto) respeitando o limite. Retorna quantas foram entregues."""
+        enviadas = 0
+        for chat_id, text in messages:
+            enviadas += await self.send(bot, chat_id, text)
+        return enviadas
@@ -1,6 +1,10 @@
 # src/platform/telegram/ui/keyboards.py
+from datetime import date
+from typing import Optional
 
-from telegram import KeyboardButton, ReplyKeyboardMarkup
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+
+from src.utils.constants import BOOKING_CALLBACK_PREFIX, BOOKING_CONFIRM_SLOT, WEEKDAY_MAP
 
 def get_contact_request_keyboard() -> ReplyKeyboardMarkup:
     """
@@ -26,4 +30,45 @@ def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
         ["Agendar Serviço", "Meus Agendamentos"],
         ["Resetar Diálogo"]
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
\ No newline at end of file
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+# -----------------------------
+# Agendamento: escolhas por botão (resolvidas pelo CallbackQueryHandler, sem LLM)
+# -----------------------------
+def booking_callback_data(slot: str, value) -> str:
+    """callback_data de um botão de agendamento (limite do Telegram: 64 bytes)."""
+    return f"{BOOKING_CALLBACK_PREFIX}:{slot}:{value}"
+
+def parse_booking_callback(data: Optional[str]) -> Optional[tuple[str, str]]:
+    """(slot, valor) de um callback_data de agendamento; None se não for um."""
+    partes = (data or "").split(":", 2)
+    if len(partes) != 3 or partes[0] != BOOKING_CALLBACK_PREFIX:
+        return None
+    return partes[1], partes[2]
+
+def _grid(buttons: list[InlineKeyboardButton], columns: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([buttons[i:i + columns] for i in range(0, len(buttons), columns)])
+
+def get_services_keyboard(servicos: list[tuple[int, str]]) -> InlineKeyboardMarkup:
+    """Um botão por serviço: (servico_id, nome)."""
+    return _grid([InlineKeyboardButton(nome, callback_data=booking_callback_data('servico_id', sid))
+                  for sid, nome in servicos], 2)
+
+def get_dates_keyboard(datas: list[date]) -> InlineKeyboardMarkup:
+    """Datas com horário livre (ex.: 'Qua 22/10'); o valor enviado é ISO."""
+    return _grid([InlineKeyboardButton(f"{WEEKDAY_MAP[d.weekday()][:3].title()} {d.strftime('%d/%m')}"
+                                       , callback_data=booking_callback_data('data', d.isoformat()))
+                  for d in datas], 3)
+
+def get_shifts_keyboard(turnos: list[str]) -> InlineKeyboardMarkup:
+    return _grid([InlineKeyboardButton(t, callback_data=booking_callback_data('turno', t)) for t in turnos], 3)
+
+def get_times_keyboard(horarios: list[str]) -> InlineKeyboardMarkup:
+    return _grid([InlineKeyboardButton(h, callback_data=booking_callback_data('hora_inicio', h))
+                  for h in horarios], 4)
+
+def get_confirm_keyboard() -> InlineKeyboardMarkup:
+    """Confirmação final do agendamento (o horário fica reservado enquanto o usuário decide)."""
+    return _grid([InlineKeyboardButton("✅ Confirmar", callback_data=booking_callback_data(BOOKING_CONFIRM_SLOT, 'sim'))
+                  , InlineKeyboardButton("🔄 Outro horário", callback_data=booking_callback_data(BOOKING_CONFIRM_SLOT, 'nao'))], 2)
@@ -0,0 +1,89 @@
+# src/platform/telegram/webhook.py
+import os
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from src.utils.constants import TELEGRAM_WEBHOOK_PATH, TELEGRAM_WEBHOOK_MAX_CONNECTIONS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IngestionMode = Literal['polling', 'webhook']
+
+# Restrição do Telegram para o secret_token do setWebhook
+_SECRET_RE = re.compile(r'^[A-Za-z0-9_-]{1,256}$')
+
+@dataclass(frozen=True, slots=True)
+class IngestionConfig:
+    """
+    Como o bot recebe updates.
+    polling: um único processo por token faz long-poll (getUpdates).
+    webhook: o Telegram faz POST no endpoint da API; vários workers/hosts atrás de um balanceador
+    dividem a ingestão. Só quem tem TELEGRAM_WEBHOOK_URL registra o webhook no startup.
+    """
+    mode: IngestionMode = 'polling'
+    webhook_url: Optional[str] = None
+    secret_token: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "IngestionConfig":
+        mode = (os.getenv('TELEGRAM_MODE') or 'polling').strip().lower()
+        if mode not in ('polling', 'webhook'):
+            raise ValueError(f"TELEGRAM_MODE inválido: {mode!r} (use 'polling' ou 'webhook').")
+        if mode == 'polling':
+            return cls()
+
+        secret = os.getenv('TELEGRAM_WEBHOOK_SECRET')
+        if not secret or not _SECRET_RE.match(secret):
+            raise ValueError("TELEGRAM_WEBHOOK_SECRET obrigatório no modo webhook (1-256 caracteres A-Z, a-z, 0-9, _ e -).")
+        return cls(mode='webhook', webhook_url=os.getenv('TELEGRAM_WEBHOOK_URL') or None, secret_token=secret)
+
+    @property
+    def is_webhook(self) -> bool:
+        return self.mode == 'webhook'
+
+    @property
+    def endpoint(self) -> Optional[str]:
+        """URL pública completa registrada no Telegram."""
+        return self.webhook_url.rstrip('/') + TELEGRAM_WEBHOOK_PATH if self.webhook_url else None
+
+    def verify_secret(self, header: Optional[str]) -> bool:
+        """Confere o cabeçalho X-Telegram-Bot-Api-Secret-Token (comparação em tempo constante)."""
+        return bool(self.secret_token and header and secrets.compare_digest(header, self.secret_token))
+
+
+async def start_ingestion(telegram_app: Application, config: IngestionConfig):
+    """Inicia o recebimento de updates (o Application já deve estar inicializado e iniciado)."""
+    if not config.is_webhook:
+        # O backlog do deploy já foi tratado pelo BacklogCatchUp: nada é descartado
+        await telegram_app.updater.start_polling(drop_pending_updates=False)
+        logger.info("Recebendo updates por polling.")
+        return
+
+    if config.endpoint:
+        # Sem drop_pending_updates: com vários workers, um restart não pode descartar a fila dos outros
+        await telegram_app.bot.set_webhook(
+            url=config.endpoint
+            , secret_token=config.secret_token
+            , allowed_updates=Update.ALL_TYPES
+            , max_connections=TELEGRAM_WEBHOOK_MAX_CONNECTIONS
+        )
+        logger.info(f"Webhook registrado em {config.endpoint}.")
+    else:
+        logger.info("Modo webhook sem TELEGRAM_WEBHOOK_URL: este worker só atende o endpoint (registro feito por outro).")
+
+async def stop_ingestion(telegram_app: Application, config: IngestionConfig):
+    """Para o polling. O webhook continua registrado: outros workers seguem recebendo."""
+    if telegram_app.updater and telegram_app.updater.running:
+        await telegram_app.updater.stop()
+
+async def enqueue_update(telegram_app: Application, payload: dict) -> Update:
+    """Converte o JSON recebido em Update e entrega ao Application (mesmo caminho do polling)."""
+    update = Update.de_json(payload, telegram_app.bot)
+    await telegram_app.update_queue.put(update)
+    return update
@@ -1,4 +1,5 @@
 # src/services/appointment_service.py
+from datetime import timedelta
 from typing import Optional, Tuple
 import logging
 
@@ -8,9 +9,9 @@ from telegram.ext import ContextTypes
 from src.services.persistence_service import PersistenceService
 from src.schemas.slot_extraction_schema import SlotExtraction
 from src.services.appointment_validator import AppointmentValidator
+from src.services.availability_engine import AvailableOption, parse_date
 
 from src.utils.system_message import MESSAGES
-from src.utils.constants import SHIFT_TIMES
 
 logger = logging.getLogger(__name__)
 
@@ -78,28 +79,51 @@ class AppointmentService:
         
         return False, "Dados de data ou hora incompletos.", None
         
-    async def get_available_shifts(self, data: str, duracao_minutos: int) -> list[str]:
-        """Consulta turnos disponíveis (Manhã, Tarde, Noite)."""
-        disponiveis = []
-
-        for shift_name in SHIFT_TIMES.keys():
-            # Chamada ao método de cálculo do repositório, filtrando pelo turno
-            horarios_livres = await self.persistence_service.get_available_blocks_for_shift(
-                data=data,
-                duracao_minutos=duracao_minutos,
-                shift_name=shift_name
-            )
+    async def get_available_shifts(self
+                                   , data: str
+                                   , duracao_minutos: int
+                                   , servico_id: Optional[int] = None
+                                   , user_id: Optional[int] = None) -> list[str]:
+        """Consulta turnos disponíveis (Manhã, Tarde, Noite) com uma única leitura do dia."""
+        day = await self.persistence_service.get_day_availability(data, servico_id, user_id)
+        return day.available_shifts(duracao_minutos)
+
+    async def get_available_times_by_shift(self
+                                           , data: str
+                                           , turno: str
+                                           , duracao_minutos: int
+                                           , servico_id: Optional[int] = None
+                                           , user_id: Optional[int] = None) -> list[str]:
+        """Retorna os horários HH:MM em que algum profissional que executa o serviço está livre no turno."""
+        day = await self.persistence_service.get_day_availability(data, servico_id, user_id)
+        return day.available_times(duracao_minutos, turno)
+
+    async def hold_slot(self, user_id: int, slot_data: dict) -> Tuple[bool, str]:
+        """Reserva o horário já escolhido enquanto o usuário informa o que falta."""
+        is_valid, validation_msg, normalized_slots = await self.validate_slots(slot_data)
+        if not is_valid:
+            return False, validation_msg
 
-            if horarios_livres:
-                disponiveis.append(shift_name)
+        servico = await self.persistence_service.get_service_details_by_id(normalized_slots['servico_id'])
+        if not servico:
+            return False, "O serviço selecionado não foi encontrado no catálogo."
 
-        return disponiveis
+        return await self.persistence_service.hold_slot(
+            user_id=user_id
+            , servico_id=servico.servico_id
+            , servico_minutos=servico.duracao_minutos
+            , data=normalized_slots['data']
+            , hora_inicio=normalized_slots['hora_inicio']
+        )
 
-    async def get_available_times_by_shift(self, data: str, turno: str, duracao_minutos: int) -> list[str]:
-        """Retorna todos os horários HH:MM livres dentro de um turno específico."""
-        horarios = await self.persistence_service.get_available_blocks_for_shift(
-            data=data,
-            duracao_minutos=duracao_minutos,
-            shift_name=turno
+    async def suggest_next_dates(self
+                                 , servico_id: int
+                                 , after_date: str
+                                 , preferred_shift: Optional[str] = None) -> list[AvailableOption]:
+        """Sugestões de datas seguintes a `after_date` com horário livre para o serviço."""
+        from_date = parse_date(after_date) + timedelta(days=1)
+        return await self.persistence_service.find_next_available(
+            servico_id=servico_id
+            , from_date=from_date
+            , preferred_shift=preferred_shift
         )
-        return horarios # O método já retorna a lista de strings 'HH:MM'
@@ -4,7 +4,9 @@ import logging
 
 from typing import Tuple, Optional
 
-from src.utils.constants import BUSINESS_HOURS, WEEKDAY_MAP
+from src.utils.constants import WEEKDAY_MAP
+from src.services.availability_engine import business_day, format_minute
+from src.services.booking_index import to_minute
 from src.utils.system_message import MESSAGES
 
 logger = logging.getLogger(__name__)
@@ -72,24 +74,22 @@ class AppointmentValidator:
         return ""
 
     def validate_business_hours(self, data_hora: datetime) -> str:
-        """Verifica se o agendamento está dentro do horário de funcionamento."""
-        dia_semana_num = data_hora.weekday()
-        dia_semana_chave = WEEKDAY_MAP.get(dia_semana_num)
-        horario_dia = BUSINESS_HOURS.get(dia_semana_chave)
-
-        if horario_dia is None:
+        """Verifica se o agendamento está dentro do horário de funcionamento (calendário compilado)."""
+        dia = business_day(data_hora.date())
+        dia_semana_chave = WEEKDAY_MAP.get(data_hora.weekday())
+
+        if not dia.is_open:
+            if dia.descricao:
+                return MESSAGES['VALIDATION_HOLIDAY'].format(
+                    nome="usuário", data=data_hora.strftime("%d/%m/%Y"), motivo=dia.descricao)
             return f'O salão está fechado na(o) {dia_semana_chave.capitalize()}. Por favor, escolha outro dia.'
 
-        hora_agendada = data_hora.time()
-        hora_inicio = horario_dia["start"]
-        hora_fim = horario_dia["end"]
-
-        if not (hora_inicio <= hora_agendada < hora_fim):
+        if not dia.opens_at(to_minute(data_hora.time())):
             return MESSAGES['VALIDATION_OUTSIDE_HOURS'].format(
                 nome="usuário",
                 dia=dia_semana_chave.capitalize(),
-                inicio=hora_inicio.strftime("%H:%M"),
-                fim=hora_fim.strftime("%H:%M")
+                inicio=format_minute(dia.window[0]),
+                fim=format_minute(dia.window[1])
             )
         return ""
 
@@ -0,0 +1,217 @@
+# src/services/availability_cache.py
+import json
+import time as _time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from src.services.state_backend import StateBackend
+from src.utils.constants import AVAILABILITY_CACHE_TTL_SECONDS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (hora_inicio, hora_fim, profissional_id)
+Booking = tuple
+
+
+@dataclass(frozen=True, slots=True)
+class CachedOccupancy:
+    """Ocupação de uma data como foi lida do banco, na versão em que foi gravada."""
+    version: int
+    bookings: tuple[Booking, ...]
+    stored_at: float
+
+
+class OccupancyCacheBackend(ABC):
+    """
+    Armazenamento das ocupações por data. Cada data tem um contador de versão que só cresce:
+    toda escrita confirmada no banco incrementa a versão, e uma leitura do banco só é gravada
+    se a versão ainda for a mesma de antes da query (compare-and-set). Um backend compartilhado
+    (ex.: Redis) permite que vários workers usem o mesmo cache.
+    """
+
+    @abstractmethod
+    async def get(self, data: date) -> tuple[int, Optional[CachedOccupancy]]:
+        """Versão atual da data e a entrada em cache (se houver)."""
+
+    @abstractmethod
+    async def put(self, data: date, bookings: tuple[Booking, ...], expected_version: int) -> bool:
+        """Grava a ocupação somente se a versão da data ainda for `expected_version`."""
+
+    @abstractmethod
+    async def add_booking(self, data: date, booking: Booking) -> int:
+        """Incrementa a versão e acrescenta o agendamento à entrada existente (atualização incremental)."""
+
+    @abstractmethod
+    async def invalidate(self, data: date) -> int:
+        """Incrementa a versão e descarta a entrada da data."""
+
+
+class InMemoryOccupancyBackend(OccupancyCacheBackend):
+    """Backend local do processo. As operações não cedem o event loop, então são atômicas."""
+
+    def __init__(self):
+        self._versions: dict[date, int] = {}
+        self._entries: dict[date, CachedOccupancy] = {}
+
+    async def get(self, data: date) -> tuple[int, Optional[CachedOccupancy]]:
+        return self._versions.get(data, 0), self._entries.get(data)
+
+    async def put(self, data: date, bookings: tuple[Booking, ...], expected_version: int) -> bool:
+        if self._versions.get(data, 0) != expected_version:
+            return False
+        self._entries[data] = CachedOccupancy(expected_version, bookings, _time.monotonic())
+        return True
+
+    async def add_booking(self, data: date, booking: Booking) -> int:
+        version = self._versions.get(data, 0) + 1
+        self._versions[data] = version
+
+        entry = self._entries.get(data)
+        if entry is not None:
+            # A leitura pode já ter visto o agendamento (commit antes da query, incremento depois)
+            bookings = (entry.bookings if booking in entry.bookings
+                        else tuple(sorted(entry.bookings + (booking,), key=lambda b: (b[0], b[1]))))
+            self._entries[data] = CachedOccupancy(version, bookings, entry.stored_at)
+        return version
+
+    async def invalidate(self, data: date) -> int:
+        version = self._versions.get(data, 0) + 1
+        self._versions[data] = version
+        self._entries.pop(data, None)
+        return version
+
+
+def _encode_occupancy(version: int, bookings: tuple[Booking, ...]) -> bytes:
+    """[versão, [[início, fim, profissional], ...]] com horários em segundos do dia (JSON compacto)."""
+    def seg(t: time) -> int:
+        return t.hour * 3600 + t.minute * 60 + t.second
+    return json.dumps([version, [[seg(b[0]), seg(b[1]), b[2] if len(b) > 2 else None] for b in bookings]]
+                      , separators=(',', ':')).encode()
+
+def _decode_occupancy(raw: bytes) -> tuple[int, tuple[Booking, ...]]:
+    def hora(s: int) -> time:
+        return time(s // 3600, s % 3600 // 60, s % 60)
+    version, bookings = json.loads(raw)
+    return version, tuple((hora(a), hora(b), pid) for a, b, pid in bookings)
+
+
+class SharedOccupancyBackend(OccupancyCacheBackend):
+    """
+    Ocupações num StateBackend compartilhado (vários workers/hosts veem as mesmas versões).
+    Sem transações no servidor: cada entrada carrega a versão com que foi gravada e só vale se for
+    igual ao contador atual da data. Uma gravação atrasada ou concorrente, no pior caso, deixa uma
+    entrada com versão velha, que é tratada como ausente (nunca serve ocupação desatualizada).
+    O TTL fica na própria chave (relógios de hosts diferentes não são comparáveis).
+    """
+
+    def __init__(self, state: StateBackend, ttl_seconds: float = AVAILABILITY_CACHE_TTL_SECONDS):
+        self.state = state
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _keys(data: date) -> tuple[str, str]:
+        return f"occ:v:{data.isoformat()}", f"occ:e:{data.isoformat()}"
+
+    async def get(self, data: date) -> tuple[int, Optional[CachedOccupancy]]:
+        raw_version, raw_entry = await self.state.get_many(*self._keys(data))
+        version = int(raw_version) if raw_version is not None else 0
+        if raw_entry is None:
+            return version, None
+        entry_version, bookings = _decode_occupancy(raw_entry)
+        if entry_version != version:
+            return version, None
+        # A chave expira no servidor: se ainda existe, está dentro do TTL
+        return version, CachedOccupancy(version, bookings, _time.monotonic())
+
+    async def put(self, data: date, bookings: tuple[Booking, ...], expected_version: int) -> bool:
+        chave_versao, chave_entrada = self._keys(data)
+        raw_version = await self.state.get(chave_versao)
+        if (int(raw_version) if raw_version is not None else 0) != expected_version:
+            return False
+        await self.state.set(chave_entrada, _encode_occupancy(expected_version, bookings), ttl=self.ttl_seconds)
+        return True
+
+    async def add_booking(self, data: date, booking: Booking) -> int:
+        chave_versao, chave_entrada = self._keys(data)
+        version = await self.state.incr(chave_versao)
+
+        raw_entry = await self.state.get(chave_entrada)
+        if raw_entry is not None:
+            entry_version, bookings = _decode_occupancy(raw_entry)
+            if entry_version == version - 1:
+                if booking not in bookings:
+                    bookings = tuple(sorted(bookings + (booking,), key=lambda b: (b[0], b[1])))
+                await self.state.set(chave_entrada, _encode_occupancy(version, bookings), ttl=self.ttl_seconds)
+            else:
+                await self.state.delete(chave_entrada)
+        return version
+
+    async def invalidate(self, data: date) -> int:
+        chave_versao, chave_entrada = self._keys(data)
+        version = await self.state.incr(chave_versao)
+        await self.state.delete(chave_entrada)
+        return version
+
+
+class AvailabilityCache:
+    """
+    Cache da ocupação por data usado pelo SchedulerService.
+    Leituras servem turnos, horários e a checagem final; gravações no banco atualizam a
+    entrada (novo agendamento) ou a invalidam (mudança de status) depois do commit.
+    """
+
+    def __init__(self
+                 , backend: Optional[OccupancyCacheBackend] = None
+                 , ttl_seconds: float = AVAILABILITY_CACHE_TTL_SECONDS):
+        self.backend = backend or InMemoryOccupancyBackend()
+        # O TTL é só uma rede de segurança para escritas feitas fora do bot (ex.: direto no banco)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stale_writes = 0       # Leituras descartadas porque uma escrita aconteceu durante a query
+        self.updates = 0
+        self.invalidations = 0
+
+    async def get_bookings(self
+                           , data: date
+                           , loader: Callable[[], Awaitable[Iterable[Booking]]]) -> tuple[Booking, ...]:
+        """Ocupação da data: do cache se válida, senão do `loader` (gravada apenas se nada mudou no meio)."""
+        version, entry = await self.backend.get(data)
+        if entry is not None and _time.monotonic() - entry.stored_at < self.ttl_seconds:
+            self.hits += 1
+            return entry.bookings
+
+        self.misses += 1
+        bookings = tuple(tuple(b) for b in await loader())
+        if not await self.backend.put(data, bookings, expected_version=version):
+            self.stale_writes += 1
+            logger.debug(f"Ocupação de {data} mudou durante a leitura: resultado não foi para o cache.")
+        return bookings
+
+    async def booking_committed(self
+                                , data: date
+                                , hora_inicio: time
+                                , hora_fim: time
+                                , profissional_id: Optional[int] = None):
+        """Chamado após o commit de um novo agendamento."""
+        self.updates += 1
+        await self.backend.add_booking(data, (hora_inicio, hora_fim, profissional_id))
+
+    async def invalidate(self, data: date):
+        """Chamado após o commit de uma mudança de status (cancelamento, conclusão...)."""
+        self.invalidations += 1
+        await self.backend.invalidate(data)
+
+    def snapshot(self) -> dict:
+        leituras = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / leituras, 3) if leituras else 0.0,
+            "stale_writes": self.stale_writes,
+            "incremental_updates": self.updates,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,218 @@
+# src/services/availability_engine.py
+from datetime import date, datetime, time
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from src.services.booking_index import MINUTES_PER_DAY, BookingIndex, to_minute
+from src.services.business_calendar import CalendarDay, active_calendar
+from src.utils.constants import AVAILABILITY_STEP_MINUTES, SHIFT_TIMES
+from src.utils.text_search import normalize_text
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+def _parse_hhmm(value: str) -> int:
+    hora, minuto = value.split(':')
+    return int(hora) * 60 + int(minuto)
+
+# SHIFT_TIMES pré-convertido uma única vez: nome oficial -> (início, fim) em minutos
+SHIFT_WINDOWS: dict[str, tuple[int, int]] = {
+    name: (_parse_hhmm(limites['inicio']), _parse_hhmm(limites['fim'])) for name, limites in SHIFT_TIMES.items()
+}
+# O LLM devolve o turno em minúsculas ("manhã"): a busca ignora caixa e acentos
+_SHIFT_BY_KEY = {normalize_text(name): name for name in SHIFT_WINDOWS}
+
+def resolve_shift(shift_name: Optional[str]) -> Optional[str]:
+    """Nome oficial do turno (chave de SHIFT_TIMES) ou None se não reconhecido."""
+    if not shift_name:
+        return None
+    return _SHIFT_BY_KEY.get(normalize_text(shift_name))
+
+def parse_date(data: Union[str, date]) -> date:
+    return datetime.strptime(data, '%Y-%m-%d').date() if isinstance(data, str) else data
+
+def business_day(data: date) -> CalendarDay:
+    """Dia compilado do calendário ativo (feriados, aberturas especiais e pausas já aplicados)."""
+    return active_calendar().day(data)
+
+def business_window(data: date) -> Optional[tuple[int, int]]:
+    """Horário de funcionamento do dia em minutos (primeira abertura, último fechamento), ou None se fechado."""
+    return business_day(data).window
+
+
+class AvailableOption(NamedTuple):
+    """Sugestão de agendamento: o dia, o turno e os primeiros horários livres."""
+    data: date
+    turno: str
+    horarios: list[str]
+
+
+class DayAvailability:
+    """
+    Disponibilidade de um dia inteiro a partir de uma única leitura dos agendamentos.
+    Os agendamentos ficam num BookingIndex (ordenado + máximo acumulado dos fins): cada
+    verificação de conflito é uma busca binária, feita de uma vez para todos os inícios candidatos.
+    """
+    __slots__ = ('data', 'window', 'index')
+
+    def __init__(self
+                 , data: date
+                 , bookings: Union[BookingIndex, Iterable[tuple[time, time]]]
+                 , window: Optional[tuple[int, int]] = None):
+        self.data = data
+        self.window = window
+        self.index = bookings if isinstance(bookings, BookingIndex) else BookingIndex.from_bookings(bookings)
+
+    @classmethod
+    def for_date(cls, data: Union[str, date], bookings: Iterable[tuple[time, time]]) -> "DayAvailability":
+        """Constrói o dia aplicando o calendário ativo; pausas entre intervalos contam como ocupadas."""
+        dia = business_day(parse_date(data))
+        return cls(dia.data, [*bookings, *dia.breaks], dia.window)
+
+    @property
+    def is_open(self) -> bool:
+        return self.window is not None
+
+    def _bounds(self, shift_name: Optional[str]) -> Optional[tuple[int, int]]:
+        """Janela efetiva: funcionamento do dia intersectado com o turno (se informado)."""
+        if self.window is None:
+            return None
+        inicio, fim = self.window
+        turno = resolve_shift(shift_name)
+        if turno:
+            shift_inicio, shift_fim = SHIFT_WINDOWS[turno]
+            inicio, fim = max(inicio, shift_inicio), min(fim, shift_fim)
+        return (inicio, fim) if inicio < fim else None
+
+    def free_starts(self
+                    , duracao_minutos: int
+                    , shift_name: Optional[str] = None
+                    , step: int = AVAILABILITY_STEP_MINUTES
+                    , not_before: Optional[int] = None) -> np.ndarray:
+        """Minutos de início (a cada `step`) em que a duração inteira cabe sem conflito."""
+        bounds = self._bounds(shift_name)
+        if bounds is None or duracao_minutos <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        inicio, fim = bounds
+        starts = np.arange(inicio, fim - duracao_minutos + 1, step)
+        if not_before is not None:
+            starts = starts[starts >= not_before]
+        return starts[self.index.free_mask(starts, duracao_minutos)]
+
+    def available_times(self
+                        , duracao_minutos: int
+                        , shift_name: Optional[str] = None
+                        , step: int = AVAILABILITY_STEP_MINUTES) -> list[str]:
+        """Horários HH:MM livres (no turno, se informado)."""
+        return [format_minute(int(m)) for m in self.free_starts(duracao_minutos, shift_name, step)]
+
+    def earliest_option(self
+                        , duracao_minutos: int
+                        , preferred_shift: Optional[str] = None
+                        , not_before: Optional[int] = None
+                        , max_times: int = 3) -> Optional[AvailableOption]:
+        """Primeiro turno com horário livre no dia, tentando antes o turno preferido."""
+        preferido = resolve_shift(preferred_shift)
+        turnos = ([preferido] if preferido else []) + [t for t in SHIFT_WINDOWS if t != preferido]
+
+        for turno in turnos:
+            starts = self.free_starts(duracao_minutos, turno, not_before=not_before)
+            if starts.size:
+                return AvailableOption(self.data, turno, [format_minute(int(m)) for m in starts[:max_times]])
+        return None
+
+    def candidates(self, inicio_minuto: int, duracao_minutos: int) -> list[Optional[int]]:
+        """Recursos livres no intervalo. Com um único recurso (o estabelecimento): [None] ou []."""
+        return [None] if self.is_free(inicio_minuto, duracao_minutos) else []
+
+    def available_shifts(self, duracao_minutos: int) -> list[str]:
+        """Turnos (na ordem de SHIFT_TIMES) com pelo menos um horário livre."""
+        return [turno for turno in SHIFT_WINDOWS if self.free_starts(duracao_minutos, turno).size]
+
+    def is_free(self, inicio_minuto: int, duracao_minutos: int) -> bool:
+        """O intervalo [início, início + duração) não colide com nenhum agendamento."""
+        fim = inicio_minuto + duracao_minutos
+        if inicio_minuto < 0 or fim > MINUTES_PER_DAY:
+            return False
+        return not self.index.overlaps(inicio_minuto, fim)
+
+
+class ResourceDayAvailability(DayAvailability):
+    """
+    Disponibilidade de um dia com vários recursos (profissionais) avaliados de uma vez.
+    Monta uma matriz recurso x minuto de ocupação (fora do expediente conta como ocupado)
+    e sua soma acumulada por linha: um início está livre se algum recurso estiver livre.
+    """
+    __slots__ = ('resource_ids', '_busy_prefix', '_load')
+
+    def __init__(self
+                 , data: date
+                 , bookings: Iterable[tuple]
+                 , window: Optional[tuple[int, int]]
+                 , recursos: Sequence[tuple[int, tuple[int, int]]]):
+        self.data = data
+        self.window = window
+        self.resource_ids: tuple[int, ...] = tuple(rid for rid, _ in recursos)
+        linha = {rid: i for i, rid in enumerate(self.resource_ids)}
+        n = len(self.resource_ids)
+
+        # Fora do expediente de cada recurso: ocupado
+        minutos = np.arange(MINUTES_PER_DAY)
+        expediente = np.array([janela for _, janela in recursos], dtype=np.int32).reshape(n, 2)
+        fora = (minutos < expediente[:, :1]) | (minutos >= expediente[:, 1:])
+
+        # Agendamentos por array de diferenças 2D; sem recurso (legado) ocupa todas as linhas
+        diff = np.zeros((n, MINUTES_PER_DAY + 1), dtype=np.int32)
+        geral = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int32)
+        linhas, inicios, fins = [], [], []
+        for b in bookings:
+            rid = b[2] if len(b) > 2 else None
+            if rid is None:
+                geral[to_minute(b[0])] += 1
+                geral[to_minute(b[1])] -= 1
+            elif rid in linha:
+                linhas.append(linha[rid])
+                inicios.append(to_minute(b[0]))
+                fins.append(to_minute(b[1]))
+        np.add.at(diff, (linhas, inicios), 1)
+        np.add.at(diff, (linhas, fins), -1)
+        diff += geral
+
+        ocupado = (np.cumsum(diff[:, :-1], axis=1) > 0) | fora
+        prefix = np.zeros((n, MINUTES_PER_DAY + 1), dtype=np.int32)
+        np.cumsum(ocupado, axis=1, out=prefix[:, 1:])
+        self._busy_prefix = prefix
+        self._load = prefix[:, -1] - fora.sum(axis=1)     # Minutos já agendados de cada recurso
+
+    def _free_matrix(self, inicios: np.ndarray, duracao_minutos: int) -> np.ndarray:
+        """Matriz recurso x início: True se o recurso está livre em [início, início + duração)."""
+        return (self._busy_prefix[:, inicios + duracao_minutos] - self._busy_prefix[:, inicios]) == 0
+
+    def free_starts(self
+                    , duracao_minutos: int
+                    , shift_name: Optional[str] = None
+                    , step: int = AVAILABILITY_STEP_MINUTES
+                    , not_before: Optional[int] = None) -> np.ndarray:
+        bounds = self._bounds(shift_name)
+        if bounds is None or duracao_minutos <= 0 or not self.resource_ids:
+            return np.empty(0, dtype=np.int64)
+
+        inicio, fim = bounds
+        starts = np.arange(inicio, fim - duracao_minutos + 1, step)
+        if not_before is not None:
+            starts = starts[starts >= not_before]
+        return starts[self._free_matrix(starts, duracao_minutos).any(axis=0)]
+
+    def is_free(self, inicio_minuto: int, duracao_minutos: int) -> bool:
+        return bool(self.candidates(inicio_minuto, duracao_minutos))
+
+    def candidates(self, inicio_minuto: int, duracao_minutos: int) -> list[int]:
+        """Recursos livres no intervalo, do menos ao mais ocupado no dia (distribui a carga)."""
+        fim = inicio_minuto + duracao_minutos
+        if inicio_minuto < 0 or fim > MINUTES_PER_DAY or not self.resource_ids:
+            return []
+        livres = np.flatnonzero(self._free_matrix(np.array([inicio_minuto]), duracao_minutos)[:, 0])
+        ordem = livres[np.argsort(self._load[livres], kind='stable')]
+        return [self.resource_ids[i] for i in ordem]
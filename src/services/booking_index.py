@@ -0,0 +1,62 @@
+# src/services/booking_index.py
+from bisect import bisect_left
+from datetime import time
+from typing import Iterable
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+def to_minute(value: time) -> int:
+    """Minuto do dia (0..1439) de um objeto time."""
+    return value.hour * 60 + value.minute
+
+
+class BookingIndex:
+    """
+    Índice de conflitos dos agendamentos de um dia (ou de um recurso em um dia).
+    Guarda os intervalos [início, fim) ordenados pelo início e o máximo acumulado dos fins:
+    existe sobreposição com [a, b) se, entre os agendamentos que começam antes de b,
+    o maior fim passa de a. Cada consulta é uma busca binária, O(log n).
+    """
+    __slots__ = ('starts', 'ends', '_max_end', '_starts_list')
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        ordem = np.argsort(starts, kind='stable')
+        self.starts = np.ascontiguousarray(starts[ordem], dtype=np.int32)
+        self.ends = np.ascontiguousarray(ends[ordem], dtype=np.int32)
+        self._max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        self._starts_list = self.starts.tolist()    # bisect em lista é mais rápido que em ndarray
+
+    @classmethod
+    def from_bookings(cls, bookings: Iterable[tuple[time, time]]) -> "BookingIndex":
+        """Constrói a partir de (hora_inicio, hora_fim[, ...]) como vêm do banco."""
+        pares = [(to_minute(b[0]), to_minute(b[1])) for b in bookings]
+        if not pares:
+            vazio = np.empty(0, dtype=np.int32)
+            return cls(vazio, vazio)
+        arr = np.array(pares, dtype=np.int32)
+        return cls(arr[:, 0], arr[:, 1])
+
+    def __len__(self) -> int:
+        return len(self._starts_list)
+
+    def overlaps(self, inicio: int, fim: int) -> bool:
+        """[início, fim) colide com algum agendamento? (O(log n))"""
+        idx = bisect_left(self._starts_list, fim)
+        return idx > 0 and int(self._max_end[idx - 1]) > inicio
+
+    def free_mask(self, inicios: np.ndarray, duracao: int) -> np.ndarray:
+        """Para cada início, True se [início, início + duração) está livre (O(k log n), vetorizado)."""
+        if not len(self):
+            return np.ones(len(inicios), dtype=bool)
+        idx = np.searchsorted(self.starts, inicios + duracao, side='left')
+        max_end = np.where(idx > 0, self._max_end[np.maximum(idx - 1, 0)], -1)
+        return max_end <= inicios
+
+    def busy_minutes(self) -> np.ndarray:
+        """Máscara minuto a minuto (int8) montada por array de diferenças, sem laço em Python."""
+        diff = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int32)
+        np.add.at(diff, self.starts, 1)
+        np.add.at(diff, self.ends, -1)
+        return (np.cumsum(diff[:-1]) > 0).astype(np.int8)
@@ -0,0 +1,385 @@
+# src/services/bulk_transfer.py
+import asyncio
+import csv
+import json
+import time as _time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Callable, Literal, Optional
+
+import asyncpg
+from sqlalchemy import Column, Table
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.database.models import Agenda, Servico, Usuario
+from src.database.models.agenda_model import (AGENDA_ACTIVE_PREDICATE, AGENDA_RESOURCE_KEY, AGENDA_TIME_RANGE
+    , agenda_resource_conflict)
+from src.database.models.disponibilidade_model import AGENDA_BULK_SETTING
+from src.services.availability_cache import AvailabilityCache
+from src.utils.constants import BULK_CHUNK_ROWS, BULK_MAX_REPORTED_CONFLICTS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BulkFormat = Literal['csv', 'jsonl']
+ConflictPolicy = Literal['abort', 'skip']
+
+class BulkImportError(Exception):
+    """Arquivo inválido ou conflitos com on_conflict='abort'. Nada foi gravado (rollback)."""
+
+    def __init__(self, message: str, report: Optional["ImportReport"] = None):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass(frozen=True)
+class BulkTable:
+    """Como cada tabela entra e sai em lote."""
+    table: Table
+    exclude: frozenset[str] = frozenset()       # Chaves substitutas geradas pelo banco: ignoradas na importação
+    upsert_key: Optional[str] = None            # Linhas existentes são atualizadas (última ocorrência no arquivo vence)
+    sequence_column: Optional[str] = None       # Sequência reposicionada após importar ids explícitos
+    validate_overlaps: bool = False
+
+    @property
+    def import_columns(self) -> list[Column]:
+        return [c for c in self.table.columns if c.name not in self.exclude]
+
+
+BULK_TABLES: dict[str, BulkTable] = {
+    'usuarios': BulkTable(Usuario.__table__, exclude=frozenset({'id'}), upsert_key='user_id'),
+    'servicos': BulkTable(Servico.__table__, upsert_key='servico_id', sequence_column='servico_id'),
+    'agenda': BulkTable(Agenda.__table__, exclude=frozenset({'agenda_id'}), validate_overlaps=True),
+}
+
+
+@dataclass
+class ImportReport:
+    tabela: str
+    linhas_lidas: int = 0
+    linhas_importadas: int = 0
+    conflitos: int = 0
+    linhas_em_conflito: list[int] = field(default_factory=list)   # Primeiras BULK_MAX_REPORTED_CONFLICTS
+    segundos: float = 0.0
+    datas: list[date] = field(default_factory=list, repr=False)    # Datas de agenda afetadas (cache)
+
+    def to_dict(self) -> dict:
+        return {
+            "tabela": self.tabela
+            , "linhas_lidas": self.linhas_lidas
+            , "linhas_importadas": self.linhas_importadas
+            , "conflitos": self.conflitos
+            , "linhas_em_conflito": self.linhas_em_conflito
+            , "segundos": round(self.segundos, 3)
+        }
+
+
+# =========================================================
+# LEITURA EM STREAMING (CSV / JSONL)
+# =========================================================
+_TRUE = {'true', 't', '1', 'sim', 's', 'yes', 'y'}
+
+def _converter(column: Column) -> Callable[[object], object]:
+    """Texto do arquivo -> valor Python do tipo da coluna (o COPY binário exige o tipo exato)."""
+    tipo = column.type.python_type
+    if tipo is bool:
+        return lambda v: v if isinstance(v, bool) else str(v).strip().lower() in _TRUE
+    if tipo is int:
+        return int
+    if tipo in (float, Decimal):
+        return lambda v: Decimal(str(v))
+    if tipo is date:
+        return date.fromisoformat
+    if tipo is time:
+        return time.fromisoformat
+    if tipo is datetime:
+        return lambda v: datetime.fromisoformat(v.replace(' ', 'T'))
+    return str
+
+def _default(column: Column) -> Callable[[], object]:
+    """Default do modelo (ex.: status='agendado', created_at=now) para colunas ausentes no arquivo."""
+    default = column.default
+    if default is not None and default.is_scalar:
+        return lambda: default.arg
+    if default is not None and default.is_callable:
+        return lambda: default.arg(None)
+    return lambda: None
+
+def _decode(linha: bytes, numero: int) -> str:
+    try:
+        return linha.decode('utf-8').rstrip('\r')
+    except UnicodeDecodeError as e:
+        raise BulkImportError(f"Linha {numero}: o arquivo deve estar em UTF-8 ({e.reason}).") from e
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Blocos de bytes -> linhas de texto, guardando em memória só a linha incompleta."""
+    pendente = b''
+    bom = True
+    numero = 0
+    async for chunk in chunks:
+        pendente += chunk
+        if bom and len(pendente) >= 3:
+            pendente, bom = pendente.removeprefix(b'\xef\xbb\xbf'), False   # BOM de planilhas exportadas
+        *linhas, pendente = pendente.split(b'\n')
+        for linha in linhas:
+            numero += 1
+            yield _decode(linha, numero)
+    if pendente:
+        yield _decode(pendente.removeprefix(b'\xef\xbb\xbf'), numero + 1)
+
+async def iter_csv(lines: AsyncIterable[str]) -> AsyncIterator[tuple[int, dict]]:
+    """(número da linha, registro) de um CSV com cabeçalho; campos entre aspas podem ter quebras de linha."""
+    header: Optional[list[str]] = None
+    pendente = ''
+    numero = 0
+    async for linha in lines:
+        numero += 1
+        pendente = f"{pendente}\n{linha}" if pendente else linha
+        if pendente.count('"') % 2:
+            continue    # Aspas abertas: o registro continua na próxima linha
+        try:
+            row = next(csv.reader([pendente], strict=True), [])
+        except csv.Error as e:
+            raise BulkImportError(f"Linha {numero}: CSV inválido ({e}).") from e
+        pendente = ''
+        if header is None:
+            header = [h.strip() for h in row]
+        elif any(row):
+            yield numero, dict(zip(header, row))
+    if pendente:
+        raise BulkImportError(f"Linha {numero}: aspas abertas até o fim do arquivo.")
+
+async def iter_jsonl(lines: AsyncIterable[str]) -> AsyncIterator[tuple[int, dict]]:
+    numero = 0
+    async for linha in lines:
+        numero += 1
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError as e:
+            raise BulkImportError(f"Linha {numero}: JSON inválido ({e.msg}).") from e
+        if not isinstance(registro, dict):
+            raise BulkImportError(f"Linha {numero}: cada linha deve ser um objeto JSON.")
+        yield numero, registro
+
+async def iter_batches(records: AsyncIterable, size: int) -> AsyncIterator[list]:
+    lote = []
+    async for record in records:
+        lote.append(record)
+        if len(lote) >= size:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class BulkTransferService:
+    """
+    Importação e exportação em lote de usuarios, servicos e agenda com COPY (asyncpg).
+    Tudo é streaming: a importação lê o arquivo em blocos e envia lotes de BULK_CHUNK_ROWS
+    registros para uma tabela temporária, valida conflitos de agenda com uma única query
+    e grava com um único INSERT ... SELECT; a exportação repassa os blocos do COPY TO STDOUT.
+    A memória fica constante (um lote) independente do tamanho do arquivo.
+    """
+
+    def __init__(self
+                 , engine: AsyncEngine
+                 , availability_cache: Optional[AvailabilityCache] = None
+                 , chunk_rows: int = BULK_CHUNK_ROWS):
+        # asyncpg não entende o prefixo "postgresql+asyncpg"
+        self._dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        self.availability_cache = availability_cache
+        self.chunk_rows = chunk_rows
+
+    @staticmethod
+    def spec(tabela: str) -> BulkTable:
+        try:
+            return BULK_TABLES[tabela]
+        except KeyError:
+            raise LookupError(f"Tabela '{tabela}' não suportada. Use: {', '.join(BULK_TABLES)}.") from None
+
+    # =========================================================
+    # EXPORTAÇÃO
+    # =========================================================
+    async def export_rows(self, tabela: str, formato: BulkFormat = 'csv') -> AsyncIterator[bytes]:
+        """Blocos do COPY TO STDOUT (CSV com cabeçalho ou uma linha JSON por registro)."""
+        spec = self.spec(tabela)
+        nome = spec.table.name
+        colunas = ", ".join(c.name for c in spec.table.columns)
+        ordem = ", ".join(c.name for c in spec.table.primary_key.columns)
+        query = f"SELECT {colunas} FROM {nome} ORDER BY {ordem}"
+
+        if formato == 'jsonl':
+            # Um único campo por linha com aspas/delimitador que o JSON nunca contém cru
+            # (row_to_json escapa caracteres de controle): o CSV sai como JSON puro
+            query = f"SELECT row_to_json(t) FROM ({query}) t"
+            options = dict(format='csv', delimiter='\x02', quote='\x01')
+        else:
+            options = dict(format='csv', header=True)
+
+        fila: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=8)   # Backpressure: o COPY espera o leitor
+        conn = await asyncpg.connect(self._dsn)
+
+        async def _copy():
+            try:
+                await conn.copy_from_query(query, output=fila.put, **options)
+            finally:
+                await fila.put(None)
+
+        task = asyncio.create_task(_copy())
+        total = 0
+        try:
+            while (bloco := await fila.get()) is not None:
+                total += len(bloco)
+                yield bloco
+            await task      # Propaga erro do COPY
+        finally:
+            if not task.done():
+                task.cancel()   # Leitor desistiu (ex.: cliente HTTP desconectou)
+            await conn.close()
+        logger.info(f"Exportação de '{nome}' ({formato}) concluída: {total} bytes.")
+
+    # =========================================================
+    # IMPORTAÇÃO
+    # =========================================================
+    async def _records(self
+                       , spec: BulkTable
+                       , formato: BulkFormat
+                       , source: AsyncIterable[bytes]) -> AsyncIterator[tuple]:
+        """Registros já convertidos para os tipos das colunas, mais o número da linha no final."""
+        colunas = [(c.name, _converter(c), _default(c)) for c in spec.import_columns]
+        lines = iter_lines(source)
+        registros = iter_jsonl(lines) if formato == 'jsonl' else iter_csv(lines)
+
+        async for numero, registro in registros:
+            valores = []
+            for nome, converter, default in colunas:
+                valor = registro.get(nome)
+                if valor is None or valor == '':
+                    valores.append(default())
+                    continue
+                try:
+                    valores.append(converter(valor))
+                except (ArithmeticError, AttributeError, TypeError, ValueError) as e:   # Decimal: InvalidOperation
+                    raise BulkImportError(f"Linha {numero}: valor inválido para '{nome}': {valor!r}.") from e
+            valores.append(numero)
+            yield tuple(valores)
+
+    async def import_rows(self
+                          , tabela: str
+                          , formato: BulkFormat
+                          , source: AsyncIterable[bytes]
+                          , on_conflict: ConflictPolicy = 'abort'
+                          , on_progress: Optional[Callable[[int], None]] = None) -> ImportReport:
+        """
+        Importa o arquivo numa única transação. Agendamentos que se sobrepõem (entre si ou com a
+        agenda atual, mesmo profissional e data) abortam tudo (`abort`) ou são descartados (`skip`).
+        """
+        spec = self.spec(tabela)
+        nome = spec.table.name
+        staging = f"_importacao_{nome}"
+        colunas = [c.name for c in spec.import_columns]
+        lista = ", ".join(colunas)
+        report = ImportReport(tabela=nome)
+        inicio = _time.perf_counter()
+
+        conn = await asyncpg.connect(self._dsn)
+        try:
+            async with conn.transaction():
+                # Só os tipos das colunas, sem constraints: as regras valem no INSERT final
+                await conn.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                                   f"SELECT {lista}, 0::bigint AS linha FROM {nome} WITH NO DATA")
+
+                async for lote in iter_batches(self._records(spec, formato, source), self.chunk_rows):
+                    await conn.copy_records_to_table(staging, records=lote, columns=[*colunas, 'linha'])
+                    report.linhas_lidas += len(lote)
+                    logger.info(f"Importação de '{nome}': {report.linhas_lidas} linhas carregadas.")
+                    if on_progress:
+                        on_progress(report.linhas_lidas)
+
+                if spec.validate_overlaps:
+                    await self._validate_overlaps(conn, staging, report, on_conflict)
+                    report.datas = [r['data'] for r in await conn.fetch(f"SELECT DISTINCT data FROM {staging}")]
+                    # O resumo de disponibilidade é recalculado uma vez por (data, recurso), não por linha
+                    await conn.execute(f"SET LOCAL {AGENDA_BULK_SETTING} = 'on'")
+
+                status = await conn.execute(self._insert_sql(spec, staging, lista))
+                report.linhas_importadas = int(status.split()[-1])
+
+                if spec.validate_overlaps:
+                    await conn.execute(f"""
+                        SELECT disponibilidade_resumo_recalcular(data, recurso)
+                          FROM (SELECT DISTINCT data, {AGENDA_RESOURCE_KEY} AS recurso FROM {staging}) chaves
+                    """)
+                if spec.sequence_column:
+                    await conn.execute(f"SELECT setval(pg_get_serial_sequence('{nome}', '{spec.sequence_column}')"
+                                       f", (SELECT max({spec.sequence_column}) FROM {nome}))")
+        except asyncpg.PostgresError as e:
+            raise BulkImportError(f"Importação de '{nome}' recusada pelo banco: {e}", report) from e
+        finally:
+            await conn.close()
+
+        report.segundos = _time.perf_counter() - inicio
+        if self.availability_cache is not None:
+            for data in report.datas:
+                await self.availability_cache.invalidate(data)
+        logger.info(f"Importação de '{nome}' concluída: {report.to_dict()}")
+        return report
+
+    async def _validate_overlaps(self
+                                 , conn: asyncpg.Connection
+                                 , staging: str
+                                 , report: ImportReport
+                                 , on_conflict: ConflictPolicy):
+        """
+        Conflitos numa passada, com a mesma regra de recurso da inserção do bot
+        (agenda_resource_conflict: mesmo profissional, ou um dos dois sem profissional).
+        Dentro do arquivo, um agendamento conflita se começa antes do maior fim dos anteriores da
+        data que disputam o recurso (máximos acumulados por janela): sem profissional, qualquer
+        anterior; com profissional, os do mesmo profissional e os sem profissional. Contra a agenda
+        atual, a busca usa o mesmo índice GiST da exclusion constraint.
+        """
+        anteriores = "ORDER BY hora_inicio, linha ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING"
+        rows = await conn.fetch(f"""
+            WITH novos AS (
+                SELECT linha, data, hora_inicio, hora_fim, profissional_id
+                     , max(hora_fim) OVER (PARTITION BY data, {AGENDA_RESOURCE_KEY} {anteriores}) AS fim_recurso
+                     , max(hora_fim) FILTER (WHERE profissional_id IS NULL)
+                                     OVER (PARTITION BY data {anteriores}) AS fim_sem_profissional
+                     , max(hora_fim) OVER (PARTITION BY data {anteriores}) AS fim_dia
+                  FROM {staging}
+                 WHERE {AGENDA_ACTIVE_PREDICATE}
+            )
+            SELECT n.linha
+              FROM novos n
+             WHERE n.hora_inicio < CASE WHEN n.profissional_id IS NULL THEN n.fim_dia
+                                        ELSE greatest(n.fim_recurso, n.fim_sem_profissional) END
+                OR EXISTS (SELECT 1 FROM agenda
+                            WHERE {agenda_resource_conflict('n.profissional_id')}
+                              AND data = n.data AND {AGENDA_ACTIVE_PREDICATE}
+                              AND {AGENDA_TIME_RANGE} && tsrange(n.data + n.hora_inicio, n.data + n.hora_fim, '[)'))
+             ORDER BY n.linha
+        """)
+        conflitos = [r['linha'] for r in rows]
+        report.conflitos = len(conflitos)
+        report.linhas_em_conflito = conflitos[:BULK_MAX_REPORTED_CONFLICTS]
+        if not conflitos:
+            return
+        if on_conflict == 'abort':
+            raise BulkImportError(f"{len(conflitos)} agendamentos em conflito; nada foi importado.", report)
+        await conn.execute(f"DELETE FROM {staging} WHERE linha = ANY($1::bigint[])", conflitos)
+
+    @staticmethod
+    def _insert_sql(spec: BulkTable, staging: str, lista: str) -> str:
+        nome = spec.table.name
+        if spec.upsert_key is None:
+            return f"INSERT INTO {nome} ({lista}) SELECT {lista} FROM {staging} ORDER BY linha"
+
+        atualizadas = ", ".join(f"{c.name} = EXCLUDED.{c.name}" for c in spec.import_columns
+                                if c.name not in (spec.upsert_key, 'created_at'))
+        # DISTINCT ON: a mesma chave repetida no arquivo não pode atualizar a linha duas vezes
+        return (f"INSERT INTO {nome} ({lista}) "
+                f"SELECT DISTINCT ON ({spec.upsert_key}) {lista} FROM {staging} ORDER BY {spec.upsert_key}, linha DESC "
+                f"ON CONFLICT ({spec.upsert_key}) DO UPDATE SET {atualizadas}")
@@ -0,0 +1,194 @@
+# src/services/business_calendar.py
+import asyncio
+from datetime import date, time, timedelta
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, AsyncEngine
+from telegram.ext import ContextTypes
+
+from src.database.notifications import PgNotificationListener
+from src.database.models.calendario_model import CALENDARIO_CHANNEL
+from src.database.repositories.calendario_repo import CalendarioRepository
+from src.services.booking_index import to_minute
+from src.utils.constants import BUSINESS_HOURS, WEEKDAY_MAP, CALENDAR_HORIZON_DAYS, CALENDAR_POLL_SECONDS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Intervals = tuple[tuple[int, int], ...]
+
+def _to_time(minuto: int) -> time:
+    return time(minuto // 60, minuto % 60)
+
+def _normalize(intervalos: Iterable[tuple[int, int]]) -> Intervals:
+    """Ordena e funde intervalos sobrepostos ou encostados."""
+    fundidos: list[list[int]] = []
+    for inicio, fim in sorted(intervalos):
+        if inicio >= fim:
+            continue
+        if fundidos and inicio <= fundidos[-1][1]:
+            fundidos[-1][1] = max(fundidos[-1][1], fim)
+        else:
+            fundidos.append([inicio, fim])
+    return tuple((inicio, fim) for inicio, fim in fundidos)
+
+
+class CalendarDay:
+    """
+    Um dia compilado: intervalos de abertura, a janela (primeira abertura, último fechamento)
+    e as pausas entre intervalos no formato de agendamento (início, fim, None), que bloqueiam
+    todos os recursos na disponibilidade.
+    """
+    __slots__ = ('data', 'intervals', 'window', 'breaks', 'descricao')
+
+    def __init__(self, data: date, intervals: Intervals, descricao: Optional[str] = None):
+        self.data = data
+        self.intervals = intervals
+        self.descricao = descricao
+        self.window: Optional[tuple[int, int]] = (intervals[0][0], intervals[-1][1]) if intervals else None
+        self.breaks: tuple[tuple[time, time, None], ...] = tuple(
+            (_to_time(fim), _to_time(inicio), None) for (_, fim), (inicio, _) in zip(intervals, intervals[1:]))
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self.intervals)
+
+    def opens_at(self, minuto: int) -> bool:
+        """O minuto está dentro de algum intervalo de abertura?"""
+        return any(inicio <= minuto < fim for inicio, fim in self.intervals)
+
+    def fits(self, inicio_minuto: int, duracao_minutos: int) -> bool:
+        """[início, início + duração) cabe inteiro em um único intervalo de abertura?"""
+        fim = inicio_minuto + duracao_minutos
+        return any(inicio <= inicio_minuto and fim <= fim_i for inicio, fim_i in self.intervals)
+
+
+class CalendarSnapshot:
+    """
+    Calendário compilado e imutável: grade semanal + exceções por data.
+    Os dias do horizonte (a partir de `start`) ficam pré-calculados num dict: a consulta é O(1).
+    Datas fora do horizonte são compiladas na hora com as mesmas regras.
+    """
+    __slots__ = ('version', 'weekly', 'exceptions', 'start', 'horizon_days', '_days')
+
+    def __init__(self
+                 , weekly: Mapping[int, Iterable[tuple[int, int]]]
+                 , exceptions: Optional[Mapping[date, tuple[Iterable[tuple[int, int]], Optional[str]]]] = None
+                 , start: Optional[date] = None
+                 , horizon_days: int = CALENDAR_HORIZON_DAYS
+                 , version: int = 0):
+        self.version = version
+        self.weekly: dict[int, Intervals] = {dia: _normalize(v) for dia, v in weekly.items()}
+        self.exceptions: dict[date, tuple[Intervals, Optional[str]]] = {
+            data: (_normalize(intervalos), descricao) for data, (intervalos, descricao) in (exceptions or {}).items()}
+        self.start = start or date.today()
+        self.horizon_days = horizon_days
+        self._days: dict[date, CalendarDay] = {}
+        for offset in range(horizon_days):
+            data = self.start + timedelta(days=offset)
+            self._days[data] = self._compile(data)
+
+    @classmethod
+    def from_business_hours(cls, **kwargs) -> "CalendarSnapshot":
+        """Grade padrão de constants.BUSINESS_HOURS (usada enquanto o banco não tem grade cadastrada)."""
+        weekly = {}
+        for dia, chave in WEEKDAY_MAP.items():
+            regra = BUSINESS_HOURS.get(chave)
+            if regra:
+                weekly[dia] = [(to_minute(regra['start']), to_minute(regra['end']))]
+        return cls(weekly, **kwargs)
+
+    def _compile(self, data: date) -> CalendarDay:
+        excecao = self.exceptions.get(data)
+        if excecao is not None:
+            return CalendarDay(data, *excecao)
+        return CalendarDay(data, self.weekly.get(data.weekday(), ()))
+
+    def day(self, data: date) -> CalendarDay:
+        dia = self._days.get(data)
+        return dia if dia is not None else self._compile(data)
+
+    def same_rules(self, other: "CalendarSnapshot") -> bool:
+        return self.weekly == other.weekly and self.exceptions == other.exceptions
+
+
+# Calendário em vigor no processo. Trocado atomicamente a cada recarga; leitores pegam a
+# referência uma vez por consulta e nunca veem um estado parcial.
+_active = CalendarSnapshot.from_business_hours()
+
+def active_calendar() -> CalendarSnapshot:
+    return _active
+
+def set_active_calendar(snapshot: CalendarSnapshot):
+    global _active
+    _active = snapshot
+
+
+class BusinessCalendar:
+    """
+    Carrega o calendário do banco, compila e publica como calendário ativo.
+    Recarrega quando o PostgreSQL notifica mudanças (LISTEN/NOTIFY) e no polling de fallback,
+    que também avança o horizonte pré-calculado a cada dia.
+    """
+
+    def __init__(self
+                 , session_maker: async_sessionmaker[AsyncSession]
+                 , engine: Optional[AsyncEngine] = None
+                 , poll_interval: int = CALENDAR_POLL_SECONDS
+                 , horizon_days: int = CALENDAR_HORIZON_DAYS):
+        self._session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.horizon_days = horizon_days
+        self._refresh_lock = asyncio.Lock()
+        self._listener = (PgNotificationListener(engine, CALENDARIO_CHANNEL, self._on_notification)
+                          if engine is not None else None)
+
+    @property
+    def snapshot(self) -> CalendarSnapshot:
+        return active_calendar()
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Recompila o calendário. Retorna True se uma nova versão foi publicada."""
+        async with self._refresh_lock:
+            hoje = date.today()
+            async with self._session_maker() as session:
+                repo = CalendarioRepository(session)
+                weekly = await repo.listar_grade_semanal()
+                exceptions = await repo.listar_excecoes(hoje)
+
+            atual = active_calendar()
+            kwargs = dict(exceptions=exceptions, start=hoje, horizon_days=self.horizon_days, version=atual.version + 1)
+            # Grade semanal vazia no banco: mantém BUSINESS_HOURS (exceções continuam valendo)
+            snapshot = (CalendarSnapshot(weekly, **kwargs) if weekly
+                        else CalendarSnapshot.from_business_hours(**kwargs))
+
+            if not force and atual.version and atual.start == hoje and snapshot.same_rules(atual):
+                return False
+            set_active_calendar(snapshot)
+
+        logger.info(f"Calendário compilado (versão {snapshot.version}, {len(snapshot.exceptions)} exceções, "
+                    f"{snapshot.horizon_days} dias a partir de {snapshot.start}).")
+        return True
+
+    async def start(self):
+        """Carga inicial + LISTEN no canal de mudanças (se houver engine)."""
+        await self.refresh(force=True)
+        if self._listener:
+            await self._listener.ensure_started()
+
+    async def stop(self):
+        if self._listener:
+            await self._listener.stop()
+
+    async def _on_notification(self, payload: str):
+        logger.debug(f"Notificação de mudança no calendário recebida ({payload}).")
+        await self.refresh()
+
+    async def poll_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: reabre o LISTEN se caiu, recarrega e avança o horizonte."""
+        try:
+            if self._listener:
+                await self._listener.ensure_started()
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Erro ao recarregar o calendário: {e}", exc_info=True)
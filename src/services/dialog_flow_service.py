@@ -43,9 +43,9 @@ class DialogFlowService:
         """
 
         # 1. PERSISTÊNCIA DA ENTRADA ---
-        # Salvamos no BD e no HistoryManager (Memória RAM do LLM)
+        # Salvamos no BD e no HistoryManager (memória da conversa do LLM, compartilhada entre workers)
         await self._persistence_service.salvar_mensagem(user_id, user_message, origem='user')
-        self._llm_service.history_manager.add_message(user_id, user_message, is_user=True)
+        await self._llm_service.history_manager.add_message(user_id, user_message, is_user=True)
 
         # Recupera o estado atual da sessão para MERGE
         session_state = await self._persistence_service.get_session_state(user_id)
@@ -81,7 +81,7 @@ class DialogFlowService:
         elif isinstance(llm_result, str):
             # Salva a resposta do bot no BD e no HistoryManager
             await self._persistence_service.salvar_mensagem(user_id, llm_result, origem='bot')
-            self._llm_service.history_manager.add_message(user_id, llm_result, is_user=False)
+            await self._llm_service.history_manager.add_message(user_id, llm_result, is_user=False)
 
             # Se não for agendamento, podemos manter a intenção anterior ou resetar
             # optamos por manter para não quebrar fluxos em andamento
@@ -0,0 +1,148 @@
+# src/services/message_retention_service.py
+import asyncio
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import zstandard
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from telegram.ext import ContextTypes
+
+from src.database.repositories.mensagem_partition_repo import (
+    MensagemPartitionRepository, add_months, month_start, parse_partition_month)
+from src.utils.constants import MENSAGEM_RETENTION_MONTHS, MENSAGEM_PARTITIONS_AHEAD, MENSAGEM_ARCHIVE_DIR
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class MessageRetentionService:
+    """
+    Mantém as partições mensais da tabela `mensagem`:
+    - pré-cria as partições do mês corrente e dos próximos meses;
+    - desanexa as partições fora da janela de retenção, arquiva em JSONL comprimido (zstd) e as descarta.
+    Em bancos criados antes do particionamento (`mensagem` comum) a manutenção é desligada com um
+    aviso: o create_all não converte a tabela existente e o bot sobe normalmente.
+    """
+
+    def __init__(self
+                 , session_maker: async_sessionmaker[AsyncSession]
+                 , retention_months: int = MENSAGEM_RETENTION_MONTHS
+                 , months_ahead: int = MENSAGEM_PARTITIONS_AHEAD
+                 , archive_dir: str = MENSAGEM_ARCHIVE_DIR):
+        self._session_maker = session_maker
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+        self.archive_dir = Path(archive_dir)
+
+    # =========================================================
+    # CRIAÇÃO DAS PARTIÇÕES
+    # =========================================================
+    async def _partitioned(self, repo: MensagemPartitionRepository) -> bool:
+        if await repo.is_partitioned():
+            return True
+        logger.warning("Tabela `mensagem` não é particionada (criada antes do particionamento): manutenção de "
+                       "partições desligada. Converta a tabela para habilitar a retenção por partição.")
+        return False
+
+    async def ensure_partitions(self, today: Optional[date] = None) -> list[str]:
+        """Garante a existência das partições do mês corrente até `months_ahead` meses à frente."""
+        today = today or date.today()
+        atual = month_start(today)
+
+        async with self._session_maker() as session:
+            async with session.begin():
+                repo = MensagemPartitionRepository(session)
+                if not await self._partitioned(repo):
+                    return []
+                names = [await repo.ensure_partition(add_months(atual, i)) for i in range(self.months_ahead + 1)]
+
+        logger.info(f"Partições de mensagem garantidas: {', '.join(names)}")
+        return names
+
+    # =========================================================
+    # RETENÇÃO (ARQUIVAMENTO + DROP)
+    # =========================================================
+    def _is_expired(self, name: str, today: date) -> bool:
+        month = parse_partition_month(name)
+        limite = add_months(month_start(today), -self.retention_months)
+        return month is not None and month < limite
+
+    def _archive_path(self, name: str) -> Path:
+        return self.archive_dir / f"{name}.jsonl.zst"
+
+    async def _archive_partition(self, name: str) -> Path:
+        """Exporta a partição (já desanexada) para JSONL comprimido, em streaming."""
+        final_path = self._archive_path(name)
+        if final_path.exists():
+            # Arquivamento concluído numa execução anterior (falhou apenas o DROP)
+            return final_path
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        partial_path = final_path.with_suffix(final_path.suffix + '.partial')
+        total = 0
+
+        with open(partial_path, 'wb') as fh:
+            writer = zstandard.ZstdCompressor(level=10).stream_writer(fh)
+            async with self._session_maker() as session:
+                repo = MensagemPartitionRepository(session)
+                async for chunk in repo.stream_rows(name):
+                    payload = "".join(
+                        json.dumps({
+                            "id": row.id,
+                            "usuario_id": row.usuario_id,
+                            "conteudo": row.conteudo,
+                            "origem": row.origem,
+                            "created_at": row.created_at.isoformat(),
+                        }, ensure_ascii=False) + "\n"
+                        for row in chunk
+                    ).encode('utf-8')
+                    # Compressão fora do event loop para não travar o bot
+                    await asyncio.to_thread(writer.write, payload)
+                    total += len(chunk)
+            await asyncio.to_thread(writer.close)
+
+        os.replace(partial_path, final_path)
+        logger.info(f"Partição {name} arquivada em {final_path} ({total} mensagens).")
+        return final_path
+
+    async def archive_expired_partitions(self, today: Optional[date] = None) -> list[Path]:
+        """Desanexa, arquiva e descarta as partições mais antigas que a janela de retenção."""
+        today = today or date.today()
+
+        # 1. Desanexa as expiradas numa única transação (deixam de ser lidas pelo bot)
+        async with self._session_maker() as session:
+            async with session.begin():
+                repo = MensagemPartitionRepository(session)
+                if not await self._partitioned(repo):
+                    return []
+                for name in await repo.list_attached_partitions():
+                    if self._is_expired(name, today):
+                        await repo.detach_partition(name)
+                        logger.info(f"Partição {name} desanexada para arquivamento.")
+
+            # Inclui tabelas desanexadas de execuções anteriores que não chegaram ao DROP
+            pendentes = [n for n in await repo.list_detached_partitions() if self._is_expired(n, today)]
+
+        arquivos = []
+        for name in pendentes:
+            # 2. Arquiva e 3. descarta a tabela inteira (sem DELETE linha a linha)
+            arquivos.append(await self._archive_partition(name))
+            async with self._session_maker() as session:
+                async with session.begin():
+                    await MensagemPartitionRepository(session).drop_partition(name)
+
+        return arquivos
+
+    async def run_maintenance(self, today: Optional[date] = None) -> None:
+        """Ciclo completo: cria partições futuras e aplica a retenção."""
+        await self.ensure_partitions(today)
+        await self.archive_expired_partitions(today)
+
+    async def maintenance_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue (execução periódica)."""
+        try:
+            await self.run_maintenance()
+        except Exception as e:
+            logger.error(f"Erro na manutenção das partições de mensagem: {e}", exc_info=True)
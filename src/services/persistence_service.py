@@ -1,14 +1,25 @@
 # src/services/persistence_service.py
 import logging
 from src.config.logger import setup_logger
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Iterable, Optional, Union
+from datetime import date, datetime, timedelta
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
-from src.database.repositories import UserRepository, AgendaRepository, SessionRepository, MensagemRepository, ServicoRepository
+from src.database.repositories import (UserRepository, AgendaRepository, SessionRepository, MensagemRepository
+    , ServicoRepository, UpdateRepository)
+from src.database.read_models import LembreteDTO, ServicoDTO, SessionStateDTO
+from src.database.repositories.agenda_repo import SLOT_TAKEN_MESSAGE, conflict_message
 from src.services.scheduler_service import SchedulerService
+from src.services.availability_engine import AvailableOption, DayAvailability
+from src.services.availability_cache import AvailabilityCache
+from src.services.staff_roster import StaffRoster
+from src.services.slot_holds import SlotHoldService
+from src.services.service_catalog import ServiceCatalog
+from src.utils.text_search import ScoredMatch
 from src.utils import MESSAGES
+from src.utils.constants import NEXT_AVAILABLE_HORIZON_DAYS, NEXT_AVAILABLE_SUGGESTIONS
 
 # Configuração do logging
 logging.basicConfig(level=logging.INFO,
@@ -18,9 +29,18 @@ logger = setup_logger(__name__)
 class PersistenceService:
     """Coordenador de Repositórios de Dados e Orquestrador do Processamento LLM/Slots."""
 
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
-        """Recebe o criador de sessões assíncronas."""
+    def __init__(self
+                 , session_maker: async_sessionmaker[AsyncSession]
+                 , service_catalog: Optional[ServiceCatalog] = None
+                 , availability_cache: Optional[AvailabilityCache] = None
+                 , staff_roster: Optional[StaffRoster] = None
+                 , slot_holds: Optional[SlotHoldService] = None):
+        """Recebe o criador de sessões e, opcionalmente, o catálogo, o cache de ocupação, a escala e as reservas."""
         self._session_maker = session_maker
+        self.service_catalog = service_catalog
+        self.availability_cache = availability_cache
+        self.staff_roster = staff_roster
+        self.slot_holds = slot_holds
         logger.info("Database (Coordenador Assíncrono) inicializado com sucesso.")
         self.resposta_sucinta = MESSAGES.get('RESPOSTA_SUCINTA' + MESSAGES['WELCOME_MESSAGE'])
 
@@ -36,12 +56,18 @@ class PersistenceService:
             , "session_repo": SessionRepository(session)
             , "mensagem_repo": MensagemRepository(session, self.resposta_sucinta)
             , "servico_repo": ServicoRepository(session)
+            , "update_repo": UpdateRepository(session)
         }
     
     def _get_scheduler_service(self, session: AsyncSession):
         """Retorna o SchedulerService para a sessão atual (Leitura de Agendamentos/Disponibilidade)."""
         agenda_repo = self._get_repos(session)['agenda_repo']
-        return SchedulerService(agenda_repo=agenda_repo)
+        return SchedulerService(
+            agenda_repo=agenda_repo
+            , cache=self.availability_cache
+            , staff=self.staff_roster.snapshot if self.staff_roster else None
+            , holds=self.slot_holds
+        )
     
     # =========================================================
     # FUNÇÕES DE USUÁRIO (PROXY para UserRepository)
@@ -103,19 +129,27 @@ class PersistenceService:
     # =========================================================
     # FUNÇÕES DE SESSÃO (PROXY para SessionRepository)
     # =========================================================
-    async def get_session_state(self, user_id: int) -> dict:
+    async def get_session_state(self, user_id: int) -> SessionStateDTO:
         async with self._get_session() as session:
             return await self._get_repos(session)["session_repo"].get_session_state(user_id)
 
-    async def update_session_state(self, user_id: int, current_intent: Optional[str] = None, slot_data: Optional[dict] = None):
-        """Atualiza o estado da sessão e comita em uma transação."""
-        if slot_data is None and current_intent is None:
+    async def update_session_state(self
+                                   , user_id: int
+                                   , current_intent: Optional[str] = None
+                                   , slot_data: Optional[dict] = None
+                                   , remove_keys: Optional[Iterable[str]] = None):
+        """
+        Atualiza o estado da sessão e comita em uma transação. slot_data é mesclado ao estado salvo:
+        para apagar um slot, passe a chave em remove_keys (remover do dict não apaga no banco).
+        """
+        if slot_data is None and current_intent is None and not remove_keys:
             return
 
         async with self._get_session() as session:
             async with session.begin():
                 try:
-                    await self._get_repos(session)["session_repo"].update_session_state(user_id, current_intent, slot_data)
+                    await self._get_repos(session)["session_repo"].update_session_state(
+                        user_id, current_intent, slot_data, remove_keys)
                     logger.info(f"Estado da sessão do usuário {user_id} atualizado com sucesso.")
                 except Exception as e:
                     logger.error(f"Erro transacional ao atualizar sessão: {e}")
@@ -133,6 +167,32 @@ class PersistenceService:
                     logger.error(f"Erro transacional ao limpar sessão: {e}")
                     raise
 
+    async def touch_session(self, user_id: int):
+        """Marca atividade do usuário (base da expiração por inatividade)."""
+        async with self._get_session() as session:
+            async with session.begin():
+                await self._get_repos(session)["session_repo"].touch_session(user_id)
+
+    async def delete_expired_sessions(self, cutoff: datetime, batch_size: int) -> list[tuple[int, datetime]]:
+        """Remove um lote de sessões expiradas (e suas mensagens) numa única transação."""
+        async with self._get_session() as session:
+            async with session.begin():
+                return await self._get_repos(session)["session_repo"].delete_expired_sessions(cutoff, batch_size)
+
+    # =========================================================
+    # IDEMPOTÊNCIA DE UPDATES (PROXY para UpdateRepository)
+    # =========================================================
+    async def registrar_update(self, update_id: int) -> bool:
+        """Registra o update_id; False se outro worker (ou uma reentrega) já o registrou."""
+        async with self._get_session() as session:
+            async with session.begin():
+                return await self._get_repos(session)["update_repo"].registrar(update_id)
+
+    async def limpar_updates_processadas(self, antes: datetime) -> int:
+        async with self._get_session() as session:
+            async with session.begin():
+                return await self._get_repos(session)["update_repo"].limpar(antes)
+
     async def get_current_slots(self, user_id: int) -> dict:
         """Apenas retorna o dicionário de slots atual do banco."""
         state = await self.get_session_state(user_id)
@@ -141,40 +201,54 @@ class PersistenceService:
     # =========================================================
     # FUNÇÕES DE SERVIÇOS (PROXY para ServicoRepository)
     # =========================================================
-    async def buscar_servicos(self, termo: str) -> list:
+    def _catalog_snapshot(self):
+        """Foto do catálogo em memória, se carregada (consultas sem I/O). None -> consulta o DB."""
+        if self.service_catalog and self.service_catalog.is_loaded:
+            return self.service_catalog.snapshot
+        return None
+
+    async def buscar_servicos(self, termo: str) -> list[ServicoDTO]:
+        snapshot = self._catalog_snapshot()
+        if snapshot:
+            return snapshot.search(termo)
+
         async with self._get_session() as session:
             return await self._get_repos(session)["servico_repo"].buscar_servicos(termo)
 
     async def get_available_services_names(self) -> list[str]:
+        snapshot = self._catalog_snapshot()
+        if snapshot:
+            return snapshot.names()
+
         async with self._get_session() as session:
             return await self._get_repos(session)["servico_repo"].get_available_services_names()
         
-    async def get_service_details_by_id(self, servico_id: int) -> Optional[dict]:
-        """Busca ID, nome e duração de um serviço ativo pelo seu ID."""
+    async def get_service_details_by_id(self, servico_id: int) -> Optional[ServicoDTO]:
+        """Busca um serviço ativo pelo seu ID (ID, nome, descrição, preço e duração)."""
+        snapshot = self._catalog_snapshot()
+        if snapshot:
+            return snapshot.get_by_id(servico_id)
+
         async with self._get_session() as session:
-            servico_repo = self._get_repos(session)["servico_repo"]
-            servico = await servico_repo.get_by_id(servico_id)
-
-            if servico:
-                return {
-                    "servico_id": servico.servico_id,
-                    "nome": servico.nome,
-                    "duracao_minutos": servico.duracao_minutos,
-                }
-            return None
+            return await self._get_repos(session)["servico_repo"].get_details_by_id(servico_id)
         
-    async def get_service_details_by_name(self, servico_nome: str) -> Optional[dict]:
-        """[ASYNC] Busca o ID, nome e duração de um serviço ativo pelo nome."""
+    async def get_service_details_by_name(self, servico_nome: str) -> Optional[ServicoDTO]:
+        """[ASYNC] Busca um serviço ativo pelo nome (sem diferenciar maiúsculas e acentos)."""
+        snapshot = self._catalog_snapshot()
+        if snapshot:
+            return snapshot.get_by_name(servico_nome)
+
         async with self._get_session() as session:
-            servico = await self._get_repos(session)["servico_repo"].get_by_name(servico_nome)
-
-            if servico:
-                return {
-                    "servico_id": servico.servico_id,
-                    "nome": servico.nome,
-                    "duracao_minutos": servico.duracao_minutos,
-                }
-            return None
+            return await self._get_repos(session)["servico_repo"].get_details_by_name(servico_nome)
+
+    async def match_services(self, termo: str, limit: int = 3) -> list[ScoredMatch]:
+        """Busca aproximada (erros de digitação, sem acentos) ranqueada por similaridade."""
+        snapshot = self._catalog_snapshot()
+        if snapshot:
+            return snapshot.match(termo, limit=limit)
+
+        async with self._get_session() as session:
+            return await self._get_repos(session)["servico_repo"].match_servicos(termo, limit=limit)
         
     # =========================================================
     # FUNÇÕES DE AGENDAMENTO (PROXY para AgendaRepository)
@@ -183,7 +257,7 @@ class PersistenceService:
         async with self._get_session() as session:
             return await self._get_repos(session)["agenda_repo"].verificar_disponibilidade(data)
         
-    """Validação de disponibilidade (SchedulerService) e Persistência transacional"""
+    """Validação de regras (SchedulerService) e Persistência transacional"""
     async def inserir_agendamento(self
                                   , user_id: int
                                   , servico_id: int
@@ -191,55 +265,189 @@ class PersistenceService:
                                   , servico_minutos: int
                                   , data: str
                                   , hora_inicio: str) -> tuple[bool, str]:
-        """Orquestra a validação final e a inserção física no banco."""
-        
+        """
+        Valida as regras de negócio e insere em um único statement.
+        O conflito de horário é decidido pelo banco (exclusion constraint), não por uma leitura prévia.
+        Com profissionais cadastrados, atribui o menos ocupado entre os livres (e tenta o próximo se perder a corrida).
+        """
         async with self._get_session() as session:
-            # 1. Validação de Disponibilidade via Scheduler
             scheduler = self._get_scheduler_service(session)
 
-            # VALIDAÇÃO DE DISPONIBILIDADE (Regra de Negócio)
-            is_available, validation_msg = await scheduler.is_slot_available(
+            # 1. Regras que não dependem do banco (passado, horário comercial)
+            is_valid, validation_msg = scheduler.check_booking_rules(
                 data=data
                 , hora_inicio=hora_inicio
                 , servico_minutos=servico_minutos
             )
-
-            if not is_available:
-                # Retorna a mensagem de erro (ex: horário passado, conflito, fora do horário comercial)
+            if not is_valid:
                 return False, validation_msg
-            
-        # 2. Preparação dos dados para o AgendaRepository
-        try:
-            # Converte os strings para objetos date/time que o AgendaRepository espera
+
+            # 2. Conversão para os tipos que o AgendaRepository espera
             data_dt = datetime.strptime(data, '%Y-%m-%d').date()
             hora_inicio_dt = datetime.strptime(hora_inicio, '%H:%M')
-            hora_fim_time = (hora_inicio_dt + timedelta(minutes=servico_minutos)).time()
             hora_inicio_time = hora_inicio_dt.time()
-            # O SchedulerService já fez este cálculo, mas repetimos para persistência
-        except ValueError:
-            return False, "Erro no formato de data/hora enviado ao banco."
-        
-        # 3. Transação de Escrita
-        async with session.begin():
-            try:
-                agenda_repo = self._get_repos(session)['agenda_repo']
-                # 1. Executa a lógica que manipula a sessão (INSERT/UPDATE)
-                agenda_obj, final_servico_nome, msg = await agenda_repo.inserir_agendamento(
-                    user_id=user_id 
-                    , servico_id=servico_id 
-                    , servico_nome=servico_nome 
-                    , data_dt=data_dt
-                    , hora_inicio_time=hora_inicio_time
-                    , hora_fim_time=hora_fim_time)
-
-                if agenda_obj:
-                    return True, (f"Agendamento confirmado! {final_servico_nome} no dia "
-                                     f"{data_dt.strftime('%d/%m')} às {hora_inicio_time.strftime('%H:%M')}.")
-
-                return False, msg  # Erro de validação/conflito
-            except Exception as e:
-                logger.error(f"Falha ao comitar agendamento: {e}")
-                raise
+            hora_fim_time = (hora_inicio_dt + timedelta(minutes=servico_minutos)).time()
+
+            # 3. Recurso: sem profissionais, o estabelecimento inteiro (None) sem leitura prévia
+            candidatos: list[Optional[int]] = [None]
+            if scheduler.staff:
+                day = await scheduler.get_day_availability(data_dt, servico_id, user_id)
+                candidatos = day.candidates(hora_inicio_dt.hour * 60 + hora_inicio_dt.minute, servico_minutos)
+            elif self.slot_holds and await self.slot_holds.conflicts(data_dt, hora_inicio_time, hora_fim_time, user_id):
+                return False, MESSAGES['SLOT_HELD_BY_OTHER']
+
+            # A reserva do próprio usuário vira o agendamento: o profissional reservado vai primeiro.
+            # Ela só é liberada depois do commit (ou de uma recusa definitiva); se o INSERT falhar
+            # por erro inesperado, o horário continua segurado para a nova tentativa.
+            reserva = await self.slot_holds.get(user_id) if self.slot_holds else None
+            if reserva and reserva.profissional_id in candidatos and reserva.as_booking()[:2] == (hora_inicio_time, hora_fim_time):
+                candidatos.remove(reserva.profissional_id)
+                candidatos.insert(0, reserva.profissional_id)
+
+            # 4. INSERT ... WHERE NOT EXISTS ... RETURNING (uma ida ao banco + commit por tentativa)
+            agenda_id, conflito, profissional_id = None, SLOT_TAKEN_MESSAGE, None
+            for profissional_id in candidatos:
+                try:
+                    async with session.begin():
+                        agenda_id = await self._get_repos(session)['agenda_repo'].inserir_agendamento(
+                            user_id=user_id
+                            , servico_id=servico_id
+                            , data_dt=data_dt
+                            , hora_inicio_time=hora_inicio_time
+                            , hora_fim_time=hora_fim_time
+                            , profissional_id=profissional_id)
+                except IntegrityError as e:
+                    conflito = conflict_message(e)
+                    if conflito is None:
+                        logger.error(f"Falha ao comitar agendamento: {e}")
+                        raise
+                    logger.info(f"Agendamento recusado pelo banco para {user_id} em {data} {hora_inicio}: {conflito}")
+                    if conflito != SLOT_TAKEN_MESSAGE:
+                        break   # Regra do usuário (um por dia): outro profissional não resolve
+                    continue
+                if agenda_id is not None:
+                    break
+
+        if self.slot_holds:
+            await self.slot_holds.release(user_id)
+        if agenda_id is None:
+            return False, await self._booking_conflict(data_dt, conflito)
+
+        # Só depois do commit: o cache da data passa a incluir o novo horário
+        if self.availability_cache:
+            await self.availability_cache.booking_committed(data_dt, hora_inicio_time, hora_fim_time, profissional_id)
+
+        com_quem = f" com {scheduler.staff.nome(profissional_id)}" if profissional_id is not None else ""
+        return True, (f"Agendamento confirmado! {servico_nome}{com_quem} no dia "
+                      f"{data_dt.strftime('%d/%m')} às {hora_inicio_time.strftime('%H:%M')}.")
+
+    async def _booking_conflict(self, data_dt: date, mensagem: str) -> str:
+        """O usuário viu a data como livre: a ocupação em cache estava desatualizada."""
+        if self.availability_cache:
+            await self.availability_cache.invalidate(data_dt)
+        return mensagem
+
+    async def atualizar_status_agendamento(self, agenda_id: int, status: str) -> bool:
+        """Altera o status (ex.: cancelado) e invalida o cache de ocupação da data após o commit."""
+        async with self._get_session() as session:
+            async with session.begin():
+                data_afetada = await self._get_repos(session)['agenda_repo'].atualizar_status(agenda_id, status)
+
+        if data_afetada is None:
+            return False
+        if self.availability_cache:
+            await self.availability_cache.invalidate(data_afetada)
+        return True
+
+    async def listar_lembretes_pendentes(self
+                                         , inicio: datetime
+                                         , fim: datetime
+                                         , lease_cutoff: datetime
+                                         , limite: int) -> list[LembreteDTO]:
+        async with self._get_session() as session:
+            return await self._get_repos(session)['agenda_repo'].listar_lembretes_pendentes(
+                inicio, fim, lease_cutoff, limite)
+
+    async def reservar_lembretes(self, agenda_ids: list[int], agora: datetime, lease_cutoff: datetime) -> list[int]:
+        async with self._get_session() as session:
+            async with session.begin():
+                return await self._get_repos(session)['agenda_repo'].reservar_lembretes(agenda_ids, agora, lease_cutoff)
+
+    async def registrar_lembretes(self, agenda_ids: list[int], status: str, agora: datetime) -> int:
+        async with self._get_session() as session:
+            async with session.begin():
+                return await self._get_repos(session)['agenda_repo'].registrar_lembretes(agenda_ids, status, agora)
+
+    async def get_day_availability(self
+                                   , data: str
+                                   , servico_id: Optional[int] = None
+                                   , user_id: Optional[int] = None) -> DayAvailability:
+        """Disponibilidade do dia inteiro com uma única query (serve turnos, horários e durações)."""
+        async with self._get_session() as session:
+            return await self._get_scheduler_service(session).get_day_availability(data, servico_id, user_id)
+
+    async def hold_slot(self
+                        , user_id: int
+                        , servico_id: int
+                        , servico_minutos: int
+                        , data: str
+                        , hora_inicio: str) -> tuple[bool, str]:
+        """Reserva temporariamente o horário escolhido até a confirmação (TTL em SLOT_HOLD_TTL_SECONDS)."""
+        if not self.slot_holds:
+            return True, ""
+
+        async with self._get_session() as session:
+            scheduler = self._get_scheduler_service(session)
+            is_valid, msg = scheduler.check_booking_rules(data, hora_inicio, servico_minutos)
+            if not is_valid:
+                return False, msg
+
+            hora_inicio_dt = datetime.strptime(hora_inicio, '%H:%M')
+            inicio_min = hora_inicio_dt.hour * 60 + hora_inicio_dt.minute
+            day = await scheduler.get_day_availability(data, servico_id, user_id)
+            candidatos = day.candidates(inicio_min, servico_minutos)
+
+            if not candidatos:
+                # Só reservas de outros bloqueiam: o horário pode voltar a ficar livre. Senão, já foi agendado
+                sem_reservas = await scheduler.get_day_availability(data, servico_id, user_id, include_holds=False)
+                if sem_reservas.candidates(inicio_min, servico_minutos):
+                    return False, MESSAGES['SLOT_HELD_BY_OTHER']
+                return False, SLOT_TAKEN_MESSAGE
+
+        acquired = await self.slot_holds.hold(
+            user_id
+            , day.data
+            , hora_inicio_dt.time()
+            , (hora_inicio_dt + timedelta(minutes=servico_minutos)).time()
+            , candidatos[0]
+        )
+        return (True, "") if acquired else (False, MESSAGES['SLOT_HELD_BY_OTHER'])
+
+    async def release_slot_hold(self, user_id: int):
+        """Desiste do horário reservado (ex.: o usuário pediu outro horário na confirmação)."""
+        if self.slot_holds:
+            await self.slot_holds.release(user_id)
+
+    async def find_next_available(self
+                                  , servico_id: int
+                                  , from_date: Union[str, date]
+                                  , horizon_days: int = NEXT_AVAILABLE_HORIZON_DAYS
+                                  , preferred_shift: Optional[str] = None
+                                  , limit: int = NEXT_AVAILABLE_SUGGESTIONS) -> list[AvailableOption]:
+        """Próximas datas com horário livre para o serviço (uma query para todo o horizonte)."""
+        servico = await self.get_service_details_by_id(servico_id)
+        if not servico:
+            return []
+
+        async with self._get_session() as session:
+            return await self._get_scheduler_service(session).find_next_available(
+                duracao_minutos=servico.duracao_minutos
+                , from_date=from_date
+                , horizon_days=horizon_days
+                , preferred_shift=preferred_shift
+                , limit=limit
+                , servico_id=servico_id
+            )
 
     async def get_available_blocks_for_shift(self, data: str, duracao_minutos: int, shift_name: Optional[str] = None) -> list[str]:
         """Retorna os horários HH:MM livres."""
@@ -262,4 +470,6 @@ class PersistenceService:
                 await self._get_repos(session)["mensagem_repo"].clear_historico(user_id)
                 await self._get_repos(session)["session_repo"].delete_session_by_id(user_id)
                 logger.info(f"Dados totais do usuário {user_id} resetados.")
+        if self.slot_holds:
+            await self.slot_holds.release(user_id)
         
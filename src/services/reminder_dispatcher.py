@@ -0,0 +1,144 @@
+# src/services/reminder_dispatcher.py
+import time as _time
+from datetime import date, datetime, timedelta
+from typing import Optional, TYPE_CHECKING
+
+from telegram import Bot
+from telegram.ext import ContextTypes
+
+from src.database.models.agenda_model import REMINDER_SENT, REMINDER_FAILED, REMINDER_BLOCKED
+from src.database.read_models import LembreteDTO
+from src.platform.telegram.rate_limited_sender import RateLimitedSender, SendOutcome
+from src.utils.timer_wheel import TimerWheel
+from src.utils.constants import (REMINDER_LEAD_MINUTES, REMINDER_POLL_SECONDS, REMINDER_TICK_SECONDS
+    , REMINDER_BATCH_SIZE, REMINDER_CLAIM_LEASE_SECONDS)
+from src.utils.system_message import MESSAGES
+from src.config.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.services.persistence_service import PersistenceService
+
+logger = setup_logger(__name__)
+
+class ReminderDispatcher:
+    """
+    Lembretes antes de cada agendamento sem um job por item.
+    A cada REMINDER_POLL_SECONDS uma única query (índice em agenda(data, hora_inicio)) traz os
+    agendamentos da próxima janela para uma roda de temporização em memória; um job de tick
+    retira os vencidos e os envia pelo RateLimitedSender. O estado de entrega fica no banco
+    (reserva 'enviando' atômica, depois 'enviado'/'falhou'): reinícios e vários processos não
+    duplicam lembretes, e a próxima leitura recupera os que estavam só em memória. Um envio que
+    falhou (ou reserva abandonada) volta na leitura seguinte ao lease, até REMINDER_MAX_ATTEMPTS
+    reservas; depois disso o lembrete é descartado. Usuário que bloqueou o bot fica 'bloqueado'
+    já na primeira tentativa.
+    """
+
+    def __init__(self
+                 , persistence_service: 'PersistenceService'
+                 , sender: RateLimitedSender
+                 , lead_minutes: int = REMINDER_LEAD_MINUTES
+                 , poll_seconds: int = REMINDER_POLL_SECONDS
+                 , tick_seconds: float = REMINDER_TICK_SECONDS
+                 , batch_size: int = REMINDER_BATCH_SIZE
+                 , lease_seconds: int = REMINDER_CLAIM_LEASE_SECONDS
+                 , record_every: int = 50
+                 , clock=_time.time):
+        self.persistence_service = persistence_service
+        self.sender = sender
+        self.lead = timedelta(minutes=lead_minutes)
+        self.poll_seconds = poll_seconds
+        self.tick_seconds = tick_seconds
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.record_every = record_every
+        self._clock = clock
+        # Uma volta da roda cobre a janela inteira (duas leituras)
+        self.wheel: TimerWheel[LembreteDTO] = TimerWheel(tick_seconds, slots=int(2 * poll_seconds / tick_seconds) + 1)
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock())
+
+    def _due(self, lembrete: LembreteDTO) -> float:
+        return (datetime.combine(lembrete.data, lembrete.hora_inicio) - self.lead).timestamp()
+
+    @staticmethod
+    def _text(lembrete: LembreteDTO, hoje: date) -> str:
+        if lembrete.data == hoje:
+            quando = "hoje"
+        elif lembrete.data == hoje + timedelta(days=1):
+            quando = "amanhã"
+        else:
+            quando = f"em {lembrete.data:%d/%m/%Y}"
+        return MESSAGES['APPOINTMENT_REMINDER'].format(
+            servico=lembrete.servico, quando=quando, hora=lembrete.hora_inicio.strftime('%H:%M'))
+
+    async def load_window(self, now: Optional[datetime] = None) -> int:
+        """
+        Lê os agendamentos que começam de agora até o fim da próxima janela e os põe na roda.
+        Lembretes atrasados (ex.: bot fora do ar) saem no próximo tick, se o horário ainda não passou.
+        """
+        now = now or self._now()
+        fim = now + self.lead + timedelta(seconds=2 * self.poll_seconds)
+        pendentes = await self.persistence_service.listar_lembretes_pendentes(
+            now, fim, now - self.lease, self.batch_size)
+
+        novos = sum(self.wheel.schedule(l.agenda_id, self._due(l), l) for l in pendentes)
+        if novos:
+            logger.info(f"{novos} lembretes agendados na roda ({len(self.wheel)} pendentes em memória).")
+        return novos
+
+    def pop_due(self, now_ts: Optional[float] = None) -> list[LembreteDTO]:
+        return self.wheel.advance(self._clock() if now_ts is None else now_ts)
+
+    async def deliver(self, bot: Bot, vencidos: list[LembreteDTO]) -> int:
+        """Reserva o lote num único UPDATE, envia no ritmo do sender e grava o resultado em grupos."""
+        agora = self._now()
+        reservados = set(await self.persistence_service.reservar_lembretes(
+            [l.agenda_id for l in vencidos], agora, agora - self.lease))
+
+        entregues = 0
+        resultados: dict[SendOutcome, list[int]] = {outcome: [] for outcome in SendOutcome}
+        pendentes = 0
+        for lembrete in vencidos:
+            if lembrete.agenda_id not in reservados:
+                continue    # Cancelado, já enviado ou reservado por outro processo
+            outcome = await self.sender.send_outcome(bot, lembrete.user_id, self._text(lembrete, agora.date()))
+            resultados[outcome].append(lembrete.agenda_id)
+            pendentes += 1
+
+            if pendentes >= self.record_every:
+                entregues += await self._record(resultados)
+                resultados, pendentes = {outcome: [] for outcome in SendOutcome}, 0
+        entregues += await self._record(resultados)
+        return entregues
+
+    async def _record(self, resultados: dict[SendOutcome, list[int]]) -> int:
+        agora = self._now()
+        for outcome, status in ((SendOutcome.FAILED, REMINDER_FAILED)
+                                , (SendOutcome.BLOCKED, REMINDER_BLOCKED)
+                                , (SendOutcome.SENT, REMINDER_SENT)):
+            if resultados[outcome]:
+                await self.persistence_service.registrar_lembretes(resultados[outcome], status, agora)
+        return len(resultados[SendOutcome.SENT])
+
+    async def poll_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: recarrega a janela de lembretes."""
+        try:
+            await self.load_window()
+        except Exception as e:
+            logger.error(f"Erro ao carregar a janela de lembretes: {e}", exc_info=True)
+
+    async def tick_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: dispara os vencidos em background, sem segurar o próximo tick."""
+        vencidos = self.pop_due()
+        if not vencidos:
+            return
+        context.application.create_task(self._deliver_logged(context.bot, vencidos), name='appointment_reminders')
+
+    async def _deliver_logged(self, bot: Bot, vencidos: list[LembreteDTO]):
+        try:
+            entregues = await self.deliver(bot, vencidos)
+            logger.info(f"Lembretes: {entregues}/{len(vencidos)} entregues.")
+        except Exception as e:
+            # Reservados e não registrados voltam a valer depois do lease
+            logger.error(f"Erro ao enviar lembretes: {e}", exc_info=True)
@@ -1,125 +1,153 @@
 # src/services/scheduler_service.py
 
-from datetime import datetime, timedelta, time, date
+from collections import defaultdict
+from datetime import datetime, date, timedelta
 from typing import Optional, Union
 import logging
-from src.utils.constants import SHIFT_TIMES, BUSINESS_HOURS, WEEKDAY_MAP
+from src.utils.constants import (
+    AVAILABILITY_STEP_MINUTES, WEEKDAY_MAP, NEXT_AVAILABLE_HORIZON_DAYS, NEXT_AVAILABLE_SUGGESTIONS)
+from src.services.availability_engine import (
+    AvailableOption, DayAvailability, ResourceDayAvailability, business_day, parse_date, to_minute)
+from src.services.business_calendar import CalendarDay
+from src.services.availability_cache import AvailabilityCache
+from src.services.staff_roster import StaffSnapshot
+from src.services.slot_holds import SlotHoldService
 
 logger = logging.getLogger(__name__)
 
 class SchedulerService:
-    def __init__(self, agenda_repo):
+    def __init__(self
+                 , agenda_repo
+                 , cache: Optional[AvailabilityCache] = None
+                 , staff: Optional[StaffSnapshot] = None
+                 , holds: Optional[SlotHoldService] = None):
         self.agenda_repo = agenda_repo
+        self.cache = cache
+        self.staff = staff
+        self.holds = holds
+
+    def _build_day(self
+                   , dia: CalendarDay
+                   , bookings
+                   , servico_id: Optional[int]) -> DayAvailability:
+        """
+        Um recurso (o estabelecimento) ou, com profissionais cadastrados, os que atendem o serviço.
+        As pausas do calendário entram como agendamentos sem profissional (bloqueiam todos).
+        """
+        bookings = [*bookings, *dia.breaks] if dia.breaks else bookings
+        if not self.staff:
+            return DayAvailability(dia.data, bookings, dia.window)
+        return ResourceDayAvailability(
+            dia.data, bookings, dia.window, self.staff.eligible(dia.data, dia.window, servico_id))
+
+    async def get_day_availability(self
+                                   , data: Union[str, date]
+                                   , servico_id: Optional[int] = None
+                                   , user_id: Optional[int] = None
+                                   , include_holds: bool = True) -> DayAvailability:
+        """
+        Lê os agendamentos do dia uma única vez (nenhuma query se o estabelecimento estiver fechado).
+        Reservas temporárias de outros usuários (que não `user_id`) contam como ocupadas,
+        a não ser com include_holds=False (só agendamentos e pausas).
+        """
+        data_obj = parse_date(data)
+        dia = business_day(data_obj)
+        if not dia.is_open:
+            logger.info(f"Estabelecimento fechado em: {dia.descricao or WEEKDAY_MAP[data_obj.weekday()]}")
+            return DayAvailability(data_obj, (), None)
+
+        if self.cache is None:
+            agendamentos_ocupados = await self.agenda_repo.verificar_disponibilidade(data_obj.isoformat())
+        else:
+            agendamentos_ocupados = await self.cache.get_bookings(
+                data_obj, lambda: self.agenda_repo.verificar_disponibilidade(data_obj.isoformat()))
 
-    def _get_operation_limits(self, data: date, shift_name: Optional[str]) -> Optional[dict]:
-        """Lógica de regra de negócio: Define os limites de operação (horário de abertura/fechamento)."""
-
-        weekday_idx = data.weekday() # 0 = Segunda, 6 = Domingo
-        day_name = WEEKDAY_MAP[weekday_idx]
-        business_rule = BUSINESS_HOURS.get(day_name)
-
-        if not business_rule:
-            logger.info(f"Estabelecimento fechado em: {day_name}")
-            return None
-        
-        inicio_operacao = business_rule['start']
-        fim_operacao = business_rule['end']
+        if self.holds is not None and include_holds:
+            agendamentos_ocupados = [*agendamentos_ocupados, *await self.holds.blocking(data_obj, user_id)]
+        return self._build_day(dia, agendamentos_ocupados, servico_id)
 
-        if shift_name and shift_name in SHIFT_TIMES:
-            shift = SHIFT_TIMES[shift_name]
-            inicio_operacao = datetime.strptime(shift['inicio'], '%H:%M').time()
-            fim_operacao = datetime.strptime(shift['fim'], '%H:%M').time()
-    
-        return {"start": inicio_operacao, "end": fim_operacao}
-    
     async def calculate_available_blocks(self
                                          , data: Union[str, date]
                                          , duracao_minutos: int
-                                         , shift_name: Optional[str] = None) -> list[str]:
-        """Calcula os blocos de tempo disponíveis para agendamento."""
-        # 1. Normalização da data e verificação de regras de negócio (BUSINESS_HOURS)
-
-        if isinstance(data, str):
-            data_obj = datetime.strptime(data, '%Y-%m-%d').date()
-            data_str = data
-        else:
-            data_obj = data
-            data_str = data.strftime('%Y-%m-%d')
-
-        limits = self._get_operation_limits(data_obj, shift_name)
-        if not limits:
-            return []
-        
-        inicio_operacao = limits['start']
-        fim_operacao = limits['end']
-
-        # 2. Obter agendamentos ocupados (CHAMA O REPOSITÓRIO)
-        agendamentos_ocupados = await self.agenda_repo.verificar_disponibilidade(data_str)
-        horarios_livres: list[str] = []
-
-        # Usar uma data dummy para facilitar calculo de tempo
-        dummy_date = datetime(2000, 1, 1).date()
-        current_dt = datetime.combine(dummy_date, inicio_operacao)
-        fim_operacao_dt = datetime.combine(dummy_date, fim_operacao)
-
-        # 3. Iterar de 30 em 30 minutos (ou a cada 15 minuto se quiser ser granular)
-        intervalo_step = timedelta(minutes=30)
-        duracao_delta = timedelta(minutes=duracao_minutos)
-
-        # Loop de verificação
-        while current_dt + duracao_delta <= fim_operacao_dt:
-            hora_inicio_bloco = current_dt.time()
-            hora_fim_bloco = (current_dt + duracao_delta).time()
-
-            is_available = True
-
-            # Checa se o bloco de tempo colide com algum agendamento ocupado
-            for inicio_agendado, fim_agendado in agendamentos_ocupados:
-                if (hora_inicio_bloco < fim_agendado and hora_fim_bloco > inicio_agendado):
-                    is_available = False
+                                         , shift_name: Optional[str] = None
+                                         , step: int = AVAILABILITY_STEP_MINUTES) -> list[str]:
+        """Calcula os blocos de tempo disponíveis para agendamento (no turno, se informado)."""
+        day = await self.get_day_availability(data)
+        return day.available_times(duracao_minutos, shift_name, step)
+    
+    async def find_next_available(self
+                                  , duracao_minutos: int
+                                  , from_date: Union[str, date]
+                                  , horizon_days: int = NEXT_AVAILABLE_HORIZON_DAYS
+                                  , preferred_shift: Optional[str] = None
+                                  , limit: int = NEXT_AVAILABLE_SUGGESTIONS
+                                  , now: Optional[datetime] = None
+                                  , servico_id: Optional[int] = None) -> list[AvailableOption]:
+        """
+        Próximos `limit` dias com horário livre a partir de `from_date`.
+        Lê a ocupação de todo o horizonte com uma única query e avalia os dias em uma só passada.
+        """
+        inicio = parse_date(from_date)
+        fim = inicio + timedelta(days=horizon_days - 1)
+        now = now or datetime.now()
+
+        por_dia: dict[date, list] = defaultdict(list)
+        for row in await self.agenda_repo.listar_ocupacao_periodo(inicio, fim):
+            por_dia[row[0]].append(tuple(row[1:]))
+
+        opcoes: list[AvailableOption] = []
+        for offset in range(horizon_days):
+            dia = inicio + timedelta(days=offset)
+            calendario = business_day(dia)
+            if dia < now.date() or not calendario.is_open:
+                continue
+
+            # Hoje: só horários que ainda não passaram
+            not_before = to_minute(now.time()) if dia == now.date() else None
+            opcao = self._build_day(calendario, por_dia.get(dia, ()), servico_id).earliest_option(
+                duracao_minutos, preferred_shift, not_before=not_before)
+
+            if opcao:
+                opcoes.append(opcao)
+                if len(opcoes) >= limit:
                     break
+        return opcoes
 
-            if is_available:
-                horarios_livres.append(hora_inicio_bloco.strftime('%H:%M'))
-
-            current_dt += intervalo_step
-        return horarios_livres
-    
-    async def is_slot_available(self, data: str, hora_inicio: str, servico_minutos: int) -> tuple[bool, str]:
-        # Verifica se um slot específico está disponível para agendamento.
+    def check_booking_rules(self, data: str, hora_inicio: str, servico_minutos: int) -> tuple[bool, str]:
+        """Regras que não dependem do banco: formato, horário passado e horário comercial."""
         # 1. Validação de Formato e Tempo Passado
         try:
             data_dt = datetime.strptime(data, '%Y-%m-%d').date()
-            hora_inicio_dt = datetime.strptime(hora_inicio, '%H:%M')
-            hora_inicio_time = hora_inicio_dt.time()
+            hora_inicio_time = datetime.strptime(hora_inicio, '%H:%M').time()
         except ValueError:
             return False, "Formato de data ou hora inválido."
         
-        agora = datetime.now()
-        data_hora_pedido = datetime.combine(data_dt, hora_inicio_time)
-
-        if data_hora_pedido < agora:
+        if datetime.combine(data_dt, hora_inicio_time) < datetime.now():
             return False, "Não é possível agendar para horários passados."
         
-        # 2. Validação de Horário Comercial (Business Hours)
-        limits = self._get_operation_limits(data_dt, None) # Checagem geral de horário comercial
-        if not limits:
+        # 2. Validação de Horário Comercial (calendário compilado: feriados, exceções e pausas)
+        dia = business_day(data_dt)
+        if not dia.is_open:
+            if dia.descricao:
+                return False, f"Estabelecimento fechado em {data_dt:%d/%m/%Y} ({dia.descricao})"
             return False, f"Estabelecimento fechado no dia {WEEKDAY_MAP.get(data_dt.weekday())}"
         
-        # Lógica de Horário de Início/Fim (Opcional, mas útil)
-        hora_fim_dt = hora_inicio_dt + timedelta(minutes=servico_minutos)
-        hora_fim_time = hora_fim_dt.time()
-
-        # O slot completo deve estar dentro dos limites de operação
-        if hora_inicio_time < limits['start'] or hora_fim_time > limits['end']:
+        # O slot completo deve caber num único intervalo de abertura (não atravessa pausas)
+        if not dia.fits(to_minute(hora_inicio_time), servico_minutos):
             return False, "O horário de agendamento está fora do horário comercial permitido."
+
+        return True, "Horário dentro das regras de agendamento."
+
+    async def is_slot_available(self, data: str, hora_inicio: str, servico_minutos: int) -> tuple[bool, str]:
+        # Verifica se um slot específico está disponível para agendamento.
+        is_valid, msg = self.check_booking_rules(data, hora_inicio, servico_minutos)
+        if not is_valid:
+            return False, msg
         
         # 3. Verificação de Conflitos no DB (CHAMA O REPOSITÓRIO)
-        agendamentos_ocupados = await self.agenda_repo.verificar_disponibilidade(data)
-
-        for inicio_agendado, fim_agendado in agendamentos_ocupados:
-            if (hora_inicio_time < fim_agendado and hora_fim_time > inicio_agendado):
-                return False, "Horário indisponível. Conflito com agendamento existente."
+        day = await self.get_day_availability(data)
+        inicio_minuto = to_minute(datetime.strptime(hora_inicio, '%H:%M').time())
+        if not day.is_free(inicio_minuto, servico_minutos):
+            return False, "Horário indisponível. Conflito com agendamento existente."
             
         return True, "Horário disponível para agendamento."
-    
\ No newline at end of file
@@ -0,0 +1,184 @@
+# src/services/service_catalog.py
+import asyncio
+from bisect import bisect_left
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, Optional, Union
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, AsyncEngine
+from telegram.ext import ContextTypes
+
+from src.database.notifications import PgNotificationListener
+from src.database.models.servico_model import SERVICOS_CHANNEL
+from src.database.read_models import ServicoDTO
+from src.database.repositories.servico_repo import ServicoRepository
+from src.utils.constants import CATALOG_POLL_SECONDS, SERVICE_MATCH_MIN_SCORE, SERVICE_DESCRIPTION_WEIGHT
+from src.utils.text_search import ScoredMatch, TrigramIndex, normalize_text, tokenize
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ServiceRecord = ServicoDTO
+
+class CatalogSnapshot:
+    """
+    Foto imutável e indexada do catálogo de serviços ativos.
+    Os registros são ServicoDTO imutáveis: podem ser devolvidos aos chamadores sem cópia.
+    """
+    __slots__ = ('version', 'fingerprint', 'services', 'by_id', 'by_name'
+                 , '_token_index', '_sorted_tokens', '_name_trigrams', '_description_trigrams')
+
+    def __init__(self, services: Iterable[Union[ServicoDTO, dict]], version: int = 0, fingerprint: Optional[str] = None):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.services: tuple[ServiceRecord, ...] = tuple(
+            s if isinstance(s, ServicoDTO) else ServicoDTO(**s) for s in services)
+
+        self.by_id: Mapping[int, ServiceRecord] = MappingProxyType({s.servico_id: s for s in self.services})
+        self.by_name: Mapping[str, ServiceRecord] = MappingProxyType(
+            {normalize_text(s.nome): s for s in self.services})
+
+        # Índice invertido token -> ids (nome + descrição, equivalente ao LIKE do buscar_servicos)
+        token_index: dict[str, set[int]] = {}
+        for s in self.services:
+            for token in tokenize(f"{s.nome} {s.descricao or ''}"):
+                token_index.setdefault(token, set()).add(s.servico_id)
+        self._token_index = {t: frozenset(ids) for t, ids in token_index.items()}
+        self._sorted_tokens = tuple(sorted(self._token_index))
+
+        # Índices de trigramas (mesma semântica dos índices GIN do banco: tolera erros de digitação)
+        self._name_trigrams = TrigramIndex((s.servico_id, s.nome) for s in self.services)
+        self._description_trigrams = TrigramIndex((s.servico_id, s.descricao or '') for s in self.services)
+
+    def names(self) -> list[str]:
+        return [s.nome for s in self.services]
+
+    def get_by_id(self, servico_id: int) -> Optional[ServiceRecord]:
+        return self.by_id.get(servico_id)
+
+    def get_by_name(self, nome: str) -> Optional[ServiceRecord]:
+        return self.by_name.get(normalize_text(nome))
+
+    def _ids_with_prefix(self, prefix: str) -> set[int]:
+        """Une os ids de todos os tokens que começam com `prefix` (busca binária no vocabulário)."""
+        ids: set[int] = set()
+        i = bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            ids |= self._token_index[self._sorted_tokens[i]]
+            i += 1
+        return ids
+
+    def match(self
+              , termo: str
+              , min_score: float = SERVICE_MATCH_MIN_SCORE
+              , limit: Optional[int] = None) -> list[ScoredMatch]:
+        """Busca aproximada ranqueada: o nome vale mais que a descrição (SERVICE_DESCRIPTION_WEIGHT)."""
+        scores: dict[int, float] = {}
+        for m in self._description_trigrams.query(termo):
+            scores[m.item] = m.score * SERVICE_DESCRIPTION_WEIGHT
+        for m in self._name_trigrams.query(termo):
+            scores[m.item] = max(m.score, scores.get(m.item, 0.0))
+
+        ranked = sorted(
+            ((score, sid) for sid, score in scores.items() if score >= min_score),
+            key=lambda r: (-r[0], self.by_id[r[1]].nome),
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [ScoredMatch(self.by_id[sid], round(score, 4)) for score, sid in ranked]
+
+    def search(self, termo: str) -> list[ServiceRecord]:
+        """
+        Serviços que casam com o termo, do mais ao menos similar: busca aproximada por trigramas
+        mais os que contêm todos os termos como prefixo de palavra (sem acentos).
+        """
+        tokens = tokenize(termo)
+        if not tokens:
+            return list(self.services)
+
+        ids: Optional[set[int]] = None
+        for token in tokens:
+            matches = self._ids_with_prefix(token)
+            ids = matches if ids is None else ids & matches
+            if not ids:
+                break
+
+        ranked = [m.item for m in self.match(termo)]
+        vistos = {s.servico_id for s in ranked}
+        return ranked + [s for s in self.services if s.servico_id in (ids or ()) and s.servico_id not in vistos]
+
+class ServiceCatalog:
+    """
+    Mantém o catálogo de serviços em memória (zero I/O por consulta).
+    A foto é trocada atomicamente quando o PostgreSQL notifica mudanças (LISTEN/NOTIFY)
+    ou quando o polling de fallback detecta um fingerprint diferente.
+    """
+
+    def __init__(self
+                 , session_maker: async_sessionmaker[AsyncSession]
+                 , engine: Optional[AsyncEngine] = None
+                 , poll_interval: int = CATALOG_POLL_SECONDS):
+        self._session_maker = session_maker
+        self.poll_interval = poll_interval
+        self._snapshot = CatalogSnapshot([])
+        self._subscribers: list[Callable[[CatalogSnapshot], None]] = []
+        self._refresh_lock = asyncio.Lock()
+        self._listener = (PgNotificationListener(engine, SERVICOS_CHANNEL, self._on_notification)
+                          if engine is not None else None)
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot.version > 0
+
+    def subscribe(self, callback: Callable[[CatalogSnapshot], None]):
+        """Registra um callback chamado a cada nova versão do catálogo."""
+        self._subscribers.append(callback)
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Recarrega o catálogo se o fingerprint mudou. Retorna True se uma nova versão foi publicada."""
+        async with self._refresh_lock:
+            async with self._session_maker() as session:
+                repo = ServicoRepository(session)
+                fingerprint = await repo.get_catalog_fingerprint()
+
+                if not force and self.is_loaded and fingerprint == self._snapshot.fingerprint:
+                    return False
+                services = await repo.get_active_services()
+
+            snapshot = CatalogSnapshot(services, version=self._snapshot.version + 1, fingerprint=fingerprint)
+            # Troca atômica: leitores concorrentes veem a foto antiga ou a nova, nunca um estado parcial
+            self._snapshot = snapshot
+
+        logger.info(f"Catálogo de serviços carregado (versão {snapshot.version}, {len(snapshot.services)} serviços).")
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Erro ao propagar nova versão do catálogo: {e}", exc_info=True)
+        return True
+
+    async def start(self):
+        """Carga inicial + LISTEN no canal de mudanças (se houver engine)."""
+        await self.refresh(force=True)
+        if self._listener:
+            await self._listener.ensure_started()
+
+    async def stop(self):
+        if self._listener:
+            await self._listener.stop()
+
+    async def _on_notification(self, payload: str):
+        logger.debug(f"Notificação de mudança no catálogo recebida ({payload}).")
+        await self.refresh()
+
+    async def poll_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: reabre o LISTEN se caiu e confere o fingerprint (fallback)."""
+        try:
+            if self._listener:
+                await self._listener.ensure_started()
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Erro no polling do catálogo de serviços: {e}", exc_info=True)
@@ -0,0 +1,80 @@
+# src/services/session_expiry_service.py
+from datetime import datetime, timedelta
+from typing import Optional, TYPE_CHECKING
+
+from telegram.ext import ContextTypes
+
+from src.platform.telegram.rate_limited_sender import RateLimitedSender
+from src.utils.constants import (SESSION_TIMEOUT_MINUTES, SESSION_SWEEP_BATCH_SIZE
+    , SESSION_EXPIRY_NOTICE_WINDOW_SECONDS)
+from src.utils.system_message import MESSAGES
+from src.config.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.services.persistence_service import PersistenceService
+    from src.bot.history_manager import HistoryManager
+
+logger = setup_logger(__name__)
+
+class SessionExpiryService:
+    """
+    Expira sessões inativas com uma única varredura periódica (substitui um job por usuário).
+    O prazo é calculado a partir de user_sessions.last_updated, então sobrevive a reinícios do bot.
+    Só recebe o aviso quem expirou há pouco (notice_window_seconds): sessões antigas (ex.: as que
+    ficaram de antes da varredura, ou de um período com o bot fora do ar) são removidas em silêncio.
+    """
+
+    def __init__(self
+                 , persistence_service: 'PersistenceService'
+                 , history_manager: 'HistoryManager'
+                 , sender: RateLimitedSender
+                 , timeout_minutes: int = SESSION_TIMEOUT_MINUTES
+                 , batch_size: int = SESSION_SWEEP_BATCH_SIZE
+                 , notice_window_seconds: int = SESSION_EXPIRY_NOTICE_WINDOW_SECONDS):
+        self.persistence_service = persistence_service
+        self.history_manager = history_manager
+        self.sender = sender
+        self.timeout_minutes = timeout_minutes
+        self.batch_size = batch_size
+        self.notice_window = timedelta(seconds=notice_window_seconds)
+
+    async def sweep(self, now: Optional[datetime] = None) -> tuple[list[int], list[int]]:
+        """
+        Remove um lote de sessões expiradas (sessão + histórico no DB e em memória).
+        Retorna (expirados, a avisar): só os que expiraram dentro da janela de aviso.
+        """
+        cutoff = (now or datetime.now()) - timedelta(minutes=self.timeout_minutes)
+
+        # Um único DELETE por ciclo; se sobrar backlog, o próximo ciclo continua de onde parou
+        removidas = await self.persistence_service.delete_expired_sessions(cutoff, self.batch_size)
+        expirados = [user_id for user_id, _ in removidas]
+        for user_id in expirados:
+            await self.history_manager.discard_history(user_id)
+        avisar = [user_id for user_id, last_updated in removidas if last_updated >= cutoff - self.notice_window]
+        return expirados, avisar
+
+    async def sweep_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue (execução periódica)."""
+        try:
+            expirados, avisar = await self.sweep()
+        except Exception as e:
+            logger.error(f"Erro na varredura de sessões expiradas: {e}", exc_info=True)
+            return
+
+        if not expirados:
+            return
+
+        application = context.application
+        for user_id in expirados:
+            if user_id in application.user_data:
+                application.user_data[user_id].clear()
+
+        # Os avisos saem em background, no ritmo do sender, sem segurar o próximo ciclo
+        if avisar:
+            texto = MESSAGES['SESSION_EXPIRED'].format(minutos=self.timeout_minutes)
+            application.create_task(
+                self.sender.send_many(context.bot, ((user_id, texto) for user_id in avisar))
+                , name='session_expiry_notices'
+            )
+        logger.info(f"{len(expirados)} sessões expiradas por inatividade ({self.timeout_minutes} minutos)"
+                    f", {len(avisar)} avisadas.")
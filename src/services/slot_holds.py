@@ -0,0 +1,148 @@
+# src/services/slot_holds.py
+import time as _time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Optional
+
+from src.utils.constants import SLOT_HOLD_TTL_SECONDS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SlotHold:
+    """Reserva temporária de um intervalo enquanto o usuário termina o agendamento."""
+    user_id: int
+    data: date
+    inicio: time
+    fim: time
+    profissional_id: Optional[int]
+    expires_at: float
+
+    def overlaps(self, data: date, inicio: time, fim: time, profissional_id: Optional[int]) -> bool:
+        # Sem profissional (estabelecimento inteiro) conflita com qualquer recurso
+        mesmo_recurso = (self.profissional_id is None or profissional_id is None
+                         or self.profissional_id == profissional_id)
+        return self.data == data and mesmo_recurso and inicio < self.fim and fim > self.inicio
+
+    def as_booking(self) -> tuple[time, time, Optional[int]]:
+        return self.inicio, self.fim, self.profissional_id
+
+
+class SlotHoldStore(ABC):
+    """Armazenamento das reservas. Uma reserva por usuário; `acquire` é atômico (verifica e grava)."""
+
+    @abstractmethod
+    async def acquire(self, hold: SlotHold) -> bool:
+        """Grava a reserva (substituindo a anterior do usuário) se não colidir com a de outro usuário."""
+
+    @abstractmethod
+    async def release(self, user_id: int) -> Optional[SlotHold]:
+        """Remove e retorna a reserva do usuário."""
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[SlotHold]:
+        """Reserva vigente do usuário."""
+
+    @abstractmethod
+    async def active_for_date(self, data: date) -> list[SlotHold]:
+        """Reservas vigentes da data."""
+
+
+class InMemorySlotHoldStore(SlotHoldStore):
+    """Reservas no processo, indexadas por usuário e por data. Sem awaits internos: operações atômicas."""
+
+    def __init__(self, clock=_time.monotonic):
+        self._clock = clock
+        self._by_user: dict[int, SlotHold] = {}
+        self._by_date: dict[date, dict[int, SlotHold]] = {}
+
+    def _live(self, data: date) -> dict[int, SlotHold]:
+        """Reservas da data, descartando as expiradas."""
+        holds = self._by_date.get(data, {})
+        agora = self._clock()
+        for user_id in [u for u, h in holds.items() if h.expires_at <= agora]:
+            self._drop(user_id)
+        return self._by_date.get(data, {})
+
+    def _drop(self, user_id: int) -> Optional[SlotHold]:
+        hold = self._by_user.pop(user_id, None)
+        if hold is not None:
+            do_dia = self._by_date.get(hold.data, {})
+            do_dia.pop(user_id, None)
+            if not do_dia:
+                self._by_date.pop(hold.data, None)
+        return hold
+
+    async def acquire(self, hold: SlotHold) -> bool:
+        for outro in self._live(hold.data).values():
+            if outro.user_id != hold.user_id and outro.overlaps(hold.data, hold.inicio, hold.fim, hold.profissional_id):
+                return False
+        self._drop(hold.user_id)
+        self._by_user[hold.user_id] = hold
+        self._by_date.setdefault(hold.data, {})[hold.user_id] = hold
+        return True
+
+    async def release(self, user_id: int) -> Optional[SlotHold]:
+        return self._drop(user_id)
+
+    async def get(self, user_id: int) -> Optional[SlotHold]:
+        hold = self._by_user.get(user_id)
+        if hold is not None and hold.expires_at <= self._clock():
+            self._drop(user_id)
+            return None
+        return hold
+
+    async def active_for_date(self, data: date) -> list[SlotHold]:
+        return list(self._live(data).values())
+
+
+class SlotHoldService:
+    """
+    Segura o horário escolhido enquanto faltam outros dados do agendamento.
+    Reservas de outros usuários contam como ocupadas na disponibilidade e na inserção;
+    a do próprio usuário é convertida em agendamento na confirmação.
+    """
+
+    def __init__(self
+                 , store: Optional[SlotHoldStore] = None
+                 , ttl_seconds: float = SLOT_HOLD_TTL_SECONDS
+                 , clock=_time.monotonic):
+        self.store = store or InMemorySlotHoldStore(clock)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    async def hold(self
+                   , user_id: int
+                   , data: date
+                   , inicio: time
+                   , fim: time
+                   , profissional_id: Optional[int] = None) -> bool:
+        """Reserva (ou renova) o intervalo para o usuário. False se outro usuário já o reservou."""
+        hold = SlotHold(user_id, data, inicio, fim, profissional_id, self._clock() + self.ttl_seconds)
+        acquired = await self.store.acquire(hold)
+        if acquired:
+            logger.info(f"Horário {data} {inicio:%H:%M} reservado para {user_id} por {self.ttl_seconds:.0f}s.")
+        return acquired
+
+    async def release(self, user_id: int) -> Optional[SlotHold]:
+        return await self.store.release(user_id)
+
+    async def get(self, user_id: int) -> Optional[SlotHold]:
+        return await self.store.get(user_id)
+
+    async def blocking(self, data: date, user_id: Optional[int] = None) -> list[tuple[time, time, Optional[int]]]:
+        """Reservas de outros usuários na data, no formato de agendamento (início, fim, profissional)."""
+        return [h.as_booking() for h in await self.store.active_for_date(data) if h.user_id != user_id]
+
+    async def conflicts(self
+                        , data: date
+                        , inicio: time
+                        , fim: time
+                        , user_id: int
+                        , profissional_id: Optional[int] = None) -> bool:
+        """O intervalo colide com a reserva vigente de outro usuário?"""
+        return any(h.user_id != user_id and h.overlaps(data, inicio, fim, profissional_id)
+                   for h in await self.store.active_for_date(data))
@@ -5,10 +5,13 @@ from datetime import date, datetime
 
 from src.utils.date_parser import parse_relative_date
 from src.schemas.slot_extraction_schema import SlotExtraction
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+from src.utils.constants import SERVICE_MATCH_MIN_SCORE, SERVICE_MATCH_AMBIGUITY_MARGIN
 
 if TYPE_CHECKING:
     from src.services.persistence_service import PersistenceService
+    from src.database.read_models import ServicoDTO
     from src.utils.date_parser import parse_relative_date
 
 logger = logging.getLogger(__name__)
@@ -58,8 +61,11 @@ class SlotProcessorService:
         service_name = slot_data.get('servico')
 
         if service_name and isinstance(service_name, str):
-            # Chama o método do repositório para buscar os detalhes
+            # Chama o método do repositório para buscar os detalhes (nome exato, sem acentos)
             service_details = await self.persistence_service.get_service_details_by_name(service_name)
+            if not service_details:
+                # Fallback: busca aproximada ("corte masculno", "coloracao")
+                service_details = await self._best_fuzzy_match(service_name)
             
             if service_details:
                 # Enriquece o dicionário com dados oficiais do banco (ID's e duração)
@@ -72,4 +78,18 @@ class SlotProcessorService:
                 logger.warning(f"Serviço '{service_name}' não encontrado no catálogo (DB). Removendo slots de serviço.")
                 slot_data.pop('servico', None)
         
-        return slot_data
\ No newline at end of file
+        return slot_data
+
+    async def _best_fuzzy_match(self, service_name: str) -> Optional["ServicoDTO"]:
+        """Aceita o melhor candidato apenas se passar do score mínimo e se destacar do segundo colocado."""
+        matches = await self.persistence_service.match_services(service_name, limit=2)
+        if not matches or matches[0].score < SERVICE_MATCH_MIN_SCORE:
+            return None
+
+        if len(matches) > 1 and matches[0].score - matches[1].score < SERVICE_MATCH_AMBIGUITY_MARGIN:
+            logger.info(f"Serviço '{service_name}' ambíguo: '{matches[0].item['nome']}' ({matches[0].score}) "
+                        f"x '{matches[1].item['nome']}' ({matches[1].score}).")
+            return None
+
+        logger.debug(f"Serviço '{service_name}' aproximado para '{matches[0].item['nome']}' (score {matches[0].score}).")
+        return matches[0].item
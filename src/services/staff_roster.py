@@ -0,0 +1,88 @@
+# src/services/staff_roster.py
+import asyncio
+from datetime import date
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from telegram.ext import ContextTypes
+
+from src.database.read_models import ProfissionalDTO
+from src.database.repositories.profissional_repo import ProfissionalRepository
+from src.utils.constants import STAFF_ROSTER_POLL_SECONDS
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class StaffSnapshot:
+    """Foto imutável dos profissionais ativos (recursos da agenda)."""
+    __slots__ = ('version', 'profissionais', 'by_id')
+
+    def __init__(self, profissionais: Iterable[ProfissionalDTO], version: int = 0):
+        self.version = version
+        self.profissionais: tuple[ProfissionalDTO, ...] = tuple(profissionais)
+        self.by_id: Mapping[int, ProfissionalDTO] = MappingProxyType(
+            {p.profissional_id: p for p in self.profissionais})
+
+    def __bool__(self) -> bool:
+        # Sem profissionais cadastrados a agenda continua com um único recurso (o estabelecimento)
+        return bool(self.profissionais)
+
+    def eligible(self
+                 , data: date
+                 , window: tuple[int, int]
+                 , servico_id: Optional[int] = None) -> list[tuple[int, tuple[int, int]]]:
+        """
+        (profissional_id, expediente em minutos) de quem executa o serviço e trabalha na data.
+        O expediente é limitado pelo horário de funcionamento (`window`).
+        """
+        recursos = []
+        for p in self.profissionais:
+            if servico_id is not None and p.servicos and servico_id not in p.servicos:
+                continue
+            expediente = p.horarios.get(data.weekday()) if p.horarios else window
+            if expediente is None:
+                continue    # Folga nesse dia da semana
+            inicio, fim = max(expediente[0], window[0]), min(expediente[1], window[1])
+            if inicio < fim:
+                recursos.append((p.profissional_id, (inicio, fim)))
+        return recursos
+
+    def nome(self, profissional_id: Optional[int]) -> Optional[str]:
+        p = self.by_id.get(profissional_id)
+        return p.nome if p else None
+
+
+class StaffRoster:
+    """Mantém a escala de profissionais em memória, recarregada periodicamente pelo JobQueue."""
+
+    def __init__(self
+                 , session_maker: async_sessionmaker[AsyncSession]
+                 , poll_interval: int = STAFF_ROSTER_POLL_SECONDS):
+        self._session_maker = session_maker
+        self.poll_interval = poll_interval
+        self._snapshot = StaffSnapshot([])
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> StaffSnapshot:
+        return self._snapshot
+
+    async def refresh(self) -> StaffSnapshot:
+        async with self._refresh_lock:
+            async with self._session_maker() as session:
+                profissionais = await ProfissionalRepository(session).listar_escala()
+            if self._snapshot.version and tuple(profissionais) == self._snapshot.profissionais:
+                return self._snapshot
+            # Troca atômica da foto
+            self._snapshot = StaffSnapshot(profissionais, version=self._snapshot.version + 1)
+
+        logger.info(f"Escala carregada (versão {self._snapshot.version}, {len(profissionais)} profissionais).")
+        return self._snapshot
+
+    async def poll_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback do JobQueue: recarrega a escala (tabelas pequenas, leitura barata)."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Erro ao recarregar a escala de profissionais: {e}", exc_info=True)
@@ -0,0 +1,302 @@
+# src/services/state_backend.py
+import asyncio
+import time as _time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from src.utils.constants import STATE_BACKEND_POOL_SIZE, STATE_BACKEND_TIMEOUT_SECONDS, STATE_KEY_PREFIX
+from src.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Value = Union[bytes, str, int]
+
+class StateBackendError(Exception):
+    """Falha do armazenamento de estado (conexão, timeout ou erro devolvido pelo servidor)."""
+
+
+class StateBackend(ABC):
+    """
+    Estado compartilhado entre workers (histórico do LLM, cache de ocupação...).
+    Valores são bytes (a serialização fica com quem usa); `ttl` em segundos, None = sem expiração.
+    A interface é o subconjunto de um key-value com listas que dá para implementar em memória
+    ou num servidor compatível com Redis (RESP), sem operações que exijam scripts.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def get_many(self, *keys: str) -> list[Optional[bytes]]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Incremento atômico (chave ausente vale 0)."""
+
+    @abstractmethod
+    async def list_push_capped(self, key: str, value: Value, max_len: int, ttl: Optional[float] = None) -> None:
+        """Acrescenta ao fim da lista mantendo só os `max_len` últimos itens (e renova o TTL)."""
+
+    @abstractmethod
+    async def list_range(self, key: str) -> list[bytes]: ...
+
+    async def close(self) -> None:
+        pass
+
+
+def _as_bytes(value: Value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode() if isinstance(value, int) else value.encode()
+
+
+class MemoryStateBackend(StateBackend):
+    """
+    Backend do próprio processo (um único worker). As operações não cedem o event loop, então são atômicas.
+    Expiração preguiçosa na leitura e uma varredura a cada `sweep_every` escritas.
+    """
+
+    def __init__(self, clock: Callable[[], float] = _time.monotonic, sweep_every: int = 1024):
+        self._clock = clock
+        self._data: dict[str, Union[bytes, list[bytes]]] = {}
+        self._expires: dict[str, float] = {}
+        self._sweep_every = sweep_every
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= self._clock():
+            self._data.pop(key, None)
+            del self._expires[key]
+            return False
+        return key in self._data
+
+    def _touch(self, key: str, ttl: Optional[float]):
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = self._clock() + ttl
+        self._writes += 1
+        if self._writes % self._sweep_every == 0:
+            for k in [k for k, exp in self._expires.items() if exp <= self._clock()]:
+                self._alive(k)
+
+    def _scalar(self, key: str) -> Optional[bytes]:
+        if not self._alive(key):
+            return None
+        value = self._data[key]
+        if isinstance(value, list):
+            raise StateBackendError(f"Chave {key!r} guarda uma lista.")
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._scalar(key)
+
+    async def get_many(self, *keys: str) -> list[Optional[bytes]]:
+        return [self._scalar(k) for k in keys]
+
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None) -> None:
+        self._data[key] = _as_bytes(value)
+        self._touch(key, ttl)
+
+    async def delete(self, *keys: str) -> int:
+        removidas = 0
+        for key in keys:
+            removidas += self._alive(key)
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removidas
+
+    async def incr(self, key: str) -> int:
+        atual = self._scalar(key)
+        valor = int(atual) + 1 if atual is not None else 1
+        self._data[key] = str(valor).encode()     # Mantém o TTL existente (como no Redis)
+        return valor
+
+    async def list_push_capped(self, key: str, value: Value, max_len: int, ttl: Optional[float] = None) -> None:
+        lista = self._data.get(key) if self._alive(key) else None
+        if lista is None:
+            lista = self._data[key] = []
+        elif not isinstance(lista, list):
+            raise StateBackendError(f"Chave {key!r} não guarda uma lista.")
+        lista.append(_as_bytes(value))
+        del lista[:-max_len]
+        self._touch(key, ttl)
+
+    async def list_range(self, key: str) -> list[bytes]:
+        if not self._alive(key):
+            return []
+        lista = self._data[key]
+        if not isinstance(lista, list):
+            raise StateBackendError(f"Chave {key!r} não guarda uma lista.")
+        return list(lista)
+
+
+# -----------------------------
+# Servidor de rede (protocolo RESP, compatível com Redis/Valkey/KeyDB)
+# -----------------------------
+def encode_command(*args: Value) -> bytes:
+    partes = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        dados = _as_bytes(arg)
+        partes.append(b"$%d\r\n%s\r\n" % (len(dados), dados))
+    return b"".join(partes)
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Lê uma resposta RESP2. Erros do servidor voltam como StateBackendError (não levantados)."""
+    linha = await reader.readline()
+    if not linha.endswith(b"\r\n"):
+        raise ConnectionError("Conexão encerrada pelo servidor.")
+    tipo, corpo = linha[:1], linha[1:-2]
+    if tipo == b"+":
+        return corpo
+    if tipo == b"-":
+        return StateBackendError(corpo.decode(errors='replace'))
+    if tipo == b":":
+        return int(corpo)
+    if tipo == b"$":
+        n = int(corpo)
+        return None if n < 0 else (await reader.readexactly(n + 2))[:-2]
+    if tipo == b"*":
+        n = int(corpo)
+        return None if n < 0 else [await read_reply(reader) for _ in range(n)]
+    raise ConnectionError(f"Resposta RESP inválida: {linha[:40]!r}")     # Conexão dessincronizada: descartada
+
+
+class RespStateBackend(StateBackend):
+    """
+    Backend de rede num servidor RESP (ex.: redis://host:6379/0), compartilhado por todos os workers.
+    Pool de conexões; comandos de uma operação vão num único pipeline (uma ida e volta).
+    As chaves recebem `prefix` para dividir o servidor com outras aplicações.
+    """
+
+    def __init__(self
+                 , host: str = 'localhost'
+                 , port: int = 6379
+                 , db: int = 0
+                 , password: Optional[str] = None
+                 , username: Optional[str] = None
+                 , pool_size: int = STATE_BACKEND_POOL_SIZE
+                 , timeout: float = STATE_BACKEND_TIMEOUT_SECONDS
+                 , prefix: str = STATE_KEY_PREFIX):
+        self.host, self.port, self.db = host, port, db
+        self.username, self.password = username, password
+        self.timeout = timeout
+        self.prefix = prefix
+        self._pool: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(pool_size)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RespStateBackend":
+        """redis://[usuario:senha@]host[:porta][/db]"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('redis', 'resp'):
+            raise ValueError(f"Esquema não suportado em STATE_BACKEND_URL: {parsed.scheme!r}")
+        db = int(parsed.path.lstrip('/') or 0)
+        return cls(host=parsed.hostname or 'localhost', port=parsed.port or 6379, db=db
+                   , username=unquote(parsed.username) if parsed.username else None
+                   , password=unquote(parsed.password) if parsed.password else None, **kwargs)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        handshake = []
+        if self.password:
+            handshake.append(('AUTH', self.username, self.password) if self.username else ('AUTH', self.password))
+        if self.db:
+            handshake.append(('SELECT', self.db))
+        if handshake:
+            try:
+                await self._roundtrip(reader, writer, handshake)
+            except BaseException:
+                writer.close()
+                raise
+        return reader, writer
+
+    @staticmethod
+    async def _roundtrip(reader, writer, commands) -> list:
+        writer.write(b"".join(encode_command(*c) for c in commands))
+        await writer.drain()
+        respostas = [await read_reply(reader) for _ in commands]
+        erro = next((r for r in respostas if isinstance(r, StateBackendError)), None)
+        if erro:
+            raise erro
+        return respostas
+
+    async def execute(self, *commands: tuple) -> list:
+        """Executa os comandos num pipeline e devolve as respostas na mesma ordem."""
+        async with self._slots:
+            conn = self._pool.get_nowait() if not self._pool.empty() else None
+            sincronizada = False
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(self._connect(), self.timeout)
+                respostas = await asyncio.wait_for(self._roundtrip(*conn, commands), self.timeout)
+                sincronizada = True
+            except StateBackendError:
+                sincronizada = True     # Erro do comando: todas as respostas foram lidas
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+                raise StateBackendError(f"Servidor de estado indisponível ({self.host}:{self.port}): {e}") from e
+            finally:
+                # Falha de rede ou cancelamento no meio do pipeline deixam respostas pendentes: fecha
+                if conn is not None:
+                    if sincronizada:
+                        self._pool.put_nowait(conn)
+                    else:
+                        conn[1].close()
+            return respostas
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.execute(('GET', self._key(key))))[0]
+
+    async def get_many(self, *keys: str) -> list[Optional[bytes]]:
+        return (await self.execute(('MGET', *map(self._key, keys))))[0] if keys else []
+
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None) -> None:
+        comando = ('SET', self._key(key), value)
+        if ttl is not None:
+            comando += ('PX', max(1, int(ttl * 1000)))
+        await self.execute(comando)
+
+    async def delete(self, *keys: str) -> int:
+        return (await self.execute(('DEL', *map(self._key, keys))))[0] if keys else 0
+
+    async def incr(self, key: str) -> int:
+        return (await self.execute(('INCR', self._key(key))))[0]
+
+    async def list_push_capped(self, key: str, value: Value, max_len: int, ttl: Optional[float] = None) -> None:
+        chave = self._key(key)
+        comandos = [('RPUSH', chave, value), ('LTRIM', chave, -max_len, -1)]
+        if ttl is not None:
+            comandos.append(('PEXPIRE', chave, max(1, int(ttl * 1000))))
+        await self.execute(*comandos)
+
+    async def list_range(self, key: str) -> list[bytes]:
+        return (await self.execute(('LRANGE', self._key(key), 0, -1)))[0]
+
+    async def close(self) -> None:
+        while not self._pool.empty():
+            _, writer = self._pool.get_nowait()
+            writer.close()
+
+
+def create_state_backend(url: Optional[str]) -> StateBackend:
+    """STATE_BACKEND_URL vazio: estado no processo (um worker). Com URL: servidor RESP compartilhado."""
+    if not url:
+        return MemoryStateBackend()
+    backend = RespStateBackend.from_url(url)
+    logger.info(f"Estado compartilhado em {backend.host}:{backend.port}/{backend.db}.")
+    return backend
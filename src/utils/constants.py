@@ -25,6 +25,10 @@ BUSINESS_HOURS = {
     "domingo": None  # Fechado
 }
 
+# Calendário compilado (grade semanal + exceções do banco): dias pré-calculados e recarga de fallback
+CALENDAR_HORIZON_DAYS = 90
+CALENDAR_POLL_SECONDS = 300
+
 # Slots obrigatórios para o Agendamento
 REQUIRED_SLOTS = ["servico_id", "data", "turno", "hora_inicio"]
 
@@ -32,5 +36,101 @@ SHIFT_TIMES = {
     "Manhã": {"inicio": "08:00", "fim": "12:00"}, "Tarde": {"inicio": "12:00", "fim": "18:00"}, "Noite": {"inicio": "18:00", "fim": "22:00"},
 }
 
+# Granularidade dos horários oferecidos (a ocupação é calculada minuto a minuto)
+AVAILABILITY_STEP_MINUTES = 30
+
+# Sugestão de próximas datas quando o dia pedido está lotado
+NEXT_AVAILABLE_HORIZON_DAYS = 14
+NEXT_AVAILABLE_SUGGESTIONS = 3
+
+# Escolhas do agendamento por botões inline (callback_data = "<prefixo>:<slot>:<valor>")
+BOOKING_CALLBACK_PREFIX = "agd"
+BOOKING_DATE_OPTIONS = 6        # Próximas datas com horário livre oferecidas como botão
+BOOKING_TIME_OPTIONS = 8        # Horários do turno listados na pergunta e oferecidos como botão
+BOOKING_CONFIRM_SLOT = "confirmar"  # Botões da confirmação final (valor "sim"/"nao")
+BOOKING_CONFIRM_WORDS = {"sim", "s", "confirmo", "confirmar", "confirma", "ok", "pode", "pode ser"}
+
+# Cache de ocupação por data. Escritas do bot atualizam/invalidam a data na hora; o TTL cobre
+# alterações feitas por fora (ex.: direto no banco)
+AVAILABILITY_CACHE_TTL_SECONDS = 300
+
+# Reserva temporária do horário escolhido enquanto o usuário termina o agendamento
+SLOT_HOLD_TTL_SECONDS = 300
+
+# Retenção do histórico de mensagens (tabela `mensagem` particionada por mês)
+MENSAGEM_RETENTION_MONTHS = 3       # Meses mantidos online (além do mês corrente)
+MENSAGEM_PARTITIONS_AHEAD = 2       # Partições futuras pré-criadas
+MENSAGEM_ARCHIVE_DIR = "archive/mensagem"
+
+# Catálogo de serviços em memória: intervalo do polling de fallback (LISTEN/NOTIFY é o caminho principal)
+CATALOG_POLL_SECONDS = 60
+
+# Escala de profissionais (recursos da agenda) em memória: intervalo de recarga
+STAFF_ROSTER_POLL_SECONDS = 60
+
+# Busca aproximada de serviços (trigramas). 0.6 é o word_similarity_threshold padrão do pg_trgm
+SERVICE_MATCH_MIN_SCORE = 0.6
+SERVICE_MATCH_AMBIGUITY_MARGIN = 0.1    # Diferença mínima entre o 1º e o 2º colocado para aceitar o match
+SERVICE_DESCRIPTION_WEIGHT = 0.8        # Peso de um match apenas na descrição (o nome vale mais)
+
+# Expiração de sessões por inatividade (varredura periódica em lote, sem um job por usuário)
+SESSION_TIMEOUT_MINUTES = 10
+SESSION_SWEEP_INTERVAL_SECONDS = 30
+SESSION_SWEEP_BATCH_SIZE = 500          # Sessões removidas por DELETE (o ciclo repete até esvaziar)
+SESSION_EXPIRY_NOTICE_WINDOW_SECONDS = 300  # Só avisa quem expirou há menos que isso; sessões antigas saem em silêncio
+
+# Lembretes de agendamento: leitura periódica da janela + roda de temporização em memória
+REMINDER_LEAD_MINUTES = 60              # Antecedência do lembrete
+REMINDER_POLL_SECONDS = 60              # Intervalo entre leituras da janela (a janela cobre duas leituras)
+REMINDER_TICK_SECONDS = 1               # Resolução da roda (um único job dispara os vencidos)
+REMINDER_BATCH_SIZE = 5000              # Lembretes lidos por varredura
+REMINDER_CLAIM_LEASE_SECONDS = 600      # Reserva 'enviando' abandonada ou 'falhou' volta a valer depois disso
+REMINDER_MAX_ATTEMPTS = 3               # Reservas por lembrete; esgotadas, o lembrete que falhou é descartado
+
+# Envio de mensagens iniciadas pelo bot (limite global do Telegram é ~30 msg/s)
+TELEGRAM_NOTIFY_RATE_PER_SECOND = 25
+
+# Fila de saída (todas as chamadas da Bot API com chat_id): baldes global e por chat, com prioridade
+TELEGRAM_GLOBAL_RATE_PER_SECOND = 30
+TELEGRAM_GLOBAL_BURST = 30
+TELEGRAM_CHAT_RATE_PER_SECOND = 1       # Conversa privada: ~1 msg/s sustentado...
+TELEGRAM_CHAT_BURST = 3                 # ...com pequena rajada (resposta + menu)
+TELEGRAM_GROUP_RATE_PER_MINUTE = 20
+TELEGRAM_RETRY_AFTER_MAX_RETRIES = 2    # Repetições após RetryAfter (429) antes de desistir
+TELEGRAM_MAX_TRACKED_CHATS = 10_000     # Baldes por chat mantidos (LRU)
+
+# Recebimento de updates: TELEGRAM_MODE=polling (padrão) ou webhook (TELEGRAM_WEBHOOK_URL + TELEGRAM_WEBHOOK_SECRET)
+TELEGRAM_WEBHOOK_PATH = "/telegram/webhook"
+TELEGRAM_WEBHOOK_MAX_CONNECTIONS = 40   # Conexões simultâneas que o Telegram abre contra o webhook
+
+# Idempotência por update_id (reentregas do webhook/retries): memória + tabela opcional entre workers
+UPDATE_DEDUP_TTL_SECONDS = 15 * 60      # Janela em que um update_id repetido é descartado sem ir ao banco
+UPDATE_DEDUP_MAX_IDS = 100_000          # Teto de ids lembrados em memória (os mais antigos saem primeiro)
+UPDATE_DEDUP_RETENTION_HOURS = 48       # Registros da tabela updates_processadas removidos depois disso
+
+# Deploy sem perda: backlog processado ao subir e drenagem ao desligar
+CATCHUP_MAX_AGE_SECONDS = 15 * 60       # Mensagens pendentes mais velhas que isso são ignoradas
+CATCHUP_MAX_UPDATES = 1000              # Teto do backlog filtrado no startup (o resto segue pelo polling)
+DRAIN_TIMEOUT_SECONDS = 25              # Espera pelas updates em andamento (abaixo do SIGKILL do orquestrador)
+
+# Processamento concorrente de updates: usuários diferentes em paralelo, cada usuário em ordem
+TELEGRAM_MAX_CONCURRENT_UPDATES = 32    # Handlers executando ao mesmo tempo (chamadas ao LLM, DB...)
+TELEGRAM_MAX_ADMITTED_UPDATES = 256     # Updates admitidas (executando + aguardando a vez do próprio usuário)
+TELEGRAM_USER_LOCK_STRIPES = 1024       # Locks por usuário pré-alocados (memória fixa, independe do nº de usuários)
+
+# Estado compartilhado entre workers (STATE_BACKEND_URL=redis://host:6379/0; vazio = memória do processo)
+STATE_KEY_PREFIX = "chatbot:"
+STATE_BACKEND_POOL_SIZE = 8
+STATE_BACKEND_TIMEOUT_SECONDS = 2.0
+HISTORY_STATE_TTL_SECONDS = 24 * 3600  # Rede de segurança: a expiração de sessão já descarta o histórico
+
+# Instrumentação de queries por update (resumo por update + alerta de N+1)
+DB_REPEATED_STATEMENT_THRESHOLD = 3     # Mesmo statement N+ vezes na mesma update gera aviso
+DB_SLOW_UPDATE_MS = 500                 # Resumo em WARNING quando o tempo de DB da update passa disso
+
+# Importação/exportação em lote (COPY): registros por lote enviado ao banco e conflitos listados no relatório
+BULK_CHUNK_ROWS = 5000
+BULK_MAX_REPORTED_CONFLICTS = 50
+
 BUSINESS_DOMAIN = "Barbearia"
-BUSINESS_NAME = "Wesley Barbearia"
\ No newline at end of file
+BUSINESS_NAME = "Wesley Barbearia"
@@ -0,0 +1,25 @@
+# src/utils/striped_lock.py
+import asyncio
+from typing import Hashable
+
+class StripedLock:
+    """
+    Locks asyncio por chave com memória fixa: `stripes` locks pré-alocados, a chave escolhe um pelo hash.
+    Mesma chave -> mesmo lock (execução sequencial, em ordem de chegada: asyncio.Lock é FIFO).
+    Chaves diferentes só se serializam quando caem na mesma faixa (probabilidade 1/stripes).
+    """
+    __slots__ = ('_locks',)
+
+    def __init__(self, stripes: int = 1024):
+        if stripes < 1:
+            raise ValueError("stripes deve ser >= 1")
+        self._locks = tuple(asyncio.Lock() for _ in range(stripes))
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def lock_for(self, key: Hashable) -> asyncio.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def locked(self, key: Hashable) -> bool:
+        return self.lock_for(key).locked()
@@ -109,16 +109,24 @@ SLOT_FILLING_GENERAL_PROMPT = "{nome}, por favor, me diga o serviço, data e hor
 SLOT_FILLING_INCOMPLETE = "{nome}, parece que faltam detalhes para o agendamento. Por favor, forneça o serviço, data e hora."
 SLOT_FILLING_NO_AVAILABILITY = "{nome}, infelizmente não encontramos nenhum horário livre para {servico} no dia {data}. " \
     "Por favor, informe uma nova data."
+SLOT_FILLING_NO_AVAILABILITY_SUGGESTIONS = "{nome}, infelizmente não encontramos nenhum horário livre para {servico} " \
+    "no dia {data}. As próximas datas com horário são:\n{sugestoes}\n\nQual delas prefere? Você também pode informar outra data."
+SLOT_HELD_BY_OTHER = "Este horário está reservado para outro cliente que está finalizando o agendamento. " \
+    "Por favor, escolha outro horário."
 SLOT_FILLING_ASK_SHIFT = "{nome}, para o dia {data}, em qual turno você gostaria de agendar {lista_turnos}? "
 SLOT_FILLING_SHIFT_FULL = "{nome}, parece que todos os horários que tínhamos no turno da {turno} foram preenchidos " \
     "enquanto você estava escolhendo. Por favor, escolha outro turno ou informe uma nova data."
 SLOT_FILLING_ASK_SPECIFIC_TIME = "Ótimo, {nome}. No turno da {turno} do dia {data}, " \
     "os horários disponíveis para começar são: {horarios}. Qual horário você prefere?"
+SLOT_FILLING_CHOICE_EXPIRED = "Essa opção não está mais disponível. Responda à pergunta mais recente."
+SLOT_FILLING_CONFIRM = "{nome}, confirma o agendamento de {servico} no dia {data} às {hora_inicio}? " \
+    "O horário fica reservado para você por alguns minutos."
 
 # --- MENSAGENS DE VALIDAÇÃO (Usadas em BotServices) ---
 VALIDATION_SERVICE_NOT_FOUND = "{nome}, o serviço '{servico}' não foi encontrado. Por favor, tente um nome diferente ou use /servicos para ver as opções."
 VALIDATION_PAST_DATE = "{nome}, não é possível agendar datas no passado. Por favor, escolha uma data e hora futuras."
 VALIDATION_CLOSED_DAY = "{nome}, o salão está fechado na(o) {dia}. Por favor, escolha outro dia."
+VALIDATION_HOLIDAY = "{nome}, o salão estará fechado em {data} ({motivo}). Por favor, escolha outro dia."
 VALIDATION_OUTSIDE_HOURS = "{nome}, o horário de funcionamento na(o) {dia} é das {inicio} às {fim}. Por favor, escolha um horário dentro desse intervalo."
 VALIDATION_FORMAT_ERROR = "{nome}, o formato de data (DD/MM/AAAA) ou hora (HH:MM) que você digitou está inválido. Poderia corrigir?"
 VALIDATION_FORMAT_ERROR_DATE = "Desculpe, {nome}. Não consegui entender o formato da data. " \
@@ -133,6 +141,8 @@ GENERAL_ERROR = "❌ Ops, {nome}. Ocorreu um erro interno em nosso sistema. " \
 # --- COMMONS MESSAGES ---
 AGENDAMENTO_FALHA_GENERICA = "Desculpe, não foi possível concluir o agendamento no momento devido a um problema interno. Tente novamente mais tarde ou seja mais específico."
 AGENDAMENTO_SUCESSO = "Agendamento concluído com sucesso, {nome}! Agradecemos a preferência."
+APPOINTMENT_REMINDER = "⏰ Lembrete: seu horário de {servico} é {quando} às {hora}. Até logo!"
+SESSION_EXPIRED = "⚠️ Sua sessão expirou por inatividade ({minutos} minutos). Por favor, comece uma nova conversa."
 # =====================================================================================================
 #                               Dicionário para acessar mensagens por nome
 # =====================================================================================================
@@ -149,15 +159,20 @@ MESSAGES = {
     'SLOT_FILLING_GENERAL_PROMPT': SLOT_FILLING_GENERAL_PROMPT,
     'SLOT_FILLING_INCOMPLETE': SLOT_FILLING_INCOMPLETE,
     'SLOT_FILLING_NO_AVAILABILITY': SLOT_FILLING_NO_AVAILABILITY,
+    'SLOT_FILLING_NO_AVAILABILITY_SUGGESTIONS': SLOT_FILLING_NO_AVAILABILITY_SUGGESTIONS,
+    'SLOT_HELD_BY_OTHER': SLOT_HELD_BY_OTHER,
     'SLOT_FILLING_ASK_SHIFT': SLOT_FILLING_ASK_SHIFT,
     'SLOT_FILLING_SHIFT_FULL': SLOT_FILLING_SHIFT_FULL,
     'SLOT_FILLING_ASK_SPECIFIC_TIME': SLOT_FILLING_ASK_SPECIFIC_TIME,
+    'SLOT_FILLING_CHOICE_EXPIRED': SLOT_FILLING_CHOICE_EXPIRED,
+    'SLOT_FILLING_CONFIRM': SLOT_FILLING_CONFIRM,
 
 
     # --- MENSAGENS DE VALIDAÇÃO (Usadas em BotServices) ---
     'VALIDATION_SERVICE_NOT_FOUND': VALIDATION_SERVICE_NOT_FOUND,
     'VALIDATION_PAST_DATE': VALIDATION_PAST_DATE,
     'VALIDATION_CLOSED_DAY': VALIDATION_CLOSED_DAY,
+    'VALIDATION_HOLIDAY': VALIDATION_HOLIDAY,
     'VALIDATION_OUTSIDE_HOURS': VALIDATION_OUTSIDE_HOURS,
     'VALIDATION_FORMAT_ERROR': VALIDATION_FORMAT_ERROR,
     'VALIDATION_FORMAT_ERROR_DATE': VALIDATION_FORMAT_ERROR_DATE,
@@ -168,4 +183,6 @@ MESSAGES = {
     # --- COMMONS MESSAGES ---
     'AGENDAMENTO_FALHA_GENERICA': AGENDAMENTO_FALHA_GENERICA,
     'AGENDAMENTO_SUCESSO': "Agendamento concluído com sucesso, {nome}! Agradecemos a preferência.",
+    'SESSION_EXPIRED': SESSION_EXPIRED,
+    'APPOINTMENT_REMINDER': APPOINTMENT_REMINDER,
 }
@@ -0,0 +1,78 @@
+# src/utils/text_search.py
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Hashable, Iterable, NamedTuple, Optional
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Palavras que não ajudam a diferenciar serviços ("corte DE cabelo")
+STOPWORDS = frozenset({'a', 'as', 'o', 'os', 'e', 'de', 'da', 'das', 'do', 'dos', 'com', 'para', 'em'})
+
+def normalize_text(value: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados ("Coloração  " -> "coloracao")."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize('NFKD', value)
+    sem_acentos = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(sem_acentos.lower().split())
+
+def tokenize(value: str) -> list[str]:
+    """Quebra o texto normalizado em tokens alfanuméricos, sem stopwords."""
+    return [t for t in _TOKEN_RE.findall(normalize_text(value)) if t not in STOPWORDS]
+
+# ----------------------------------------------------------------------
+# Busca aproximada por trigramas (mesma ideia do pg_trgm, para rodar em memória)
+
+class ScoredMatch(NamedTuple):
+    """Resultado ranqueado de uma busca aproximada: o item encontrado e a similaridade (0..1)."""
+    item: Any
+    score: float
+
+def trigrams(value: str) -> frozenset[str]:
+    """Trigramas no estilo pg_trgm: cada palavra recebe dois espaços à esquerda e um à direita."""
+    grams = set()
+    for word in _TOKEN_RE.findall(normalize_text(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+class TrigramIndex:
+    """
+    Índice invertido trigrama -> chaves, equivalente em memória a um índice GIN gin_trgm_ops.
+    O score é a fração dos trigramas da consulta presentes no documento (aproximação do
+    word_similarity do pg_trgm); empates são desfeitos pela similaridade de Jaccard.
+    """
+
+    def __init__(self, documents: Iterable[tuple[Hashable, str]]):
+        self._sizes: dict[Hashable, int] = {}
+        self._postings: dict[str, list[Hashable]] = {}
+        for key, text in documents:
+            grams = trigrams(text)
+            self._sizes[key] = len(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key)
+
+    def query(self, text: str, min_score: float = 0.0, limit: Optional[int] = None) -> list[ScoredMatch]:
+        query_grams = trigrams(text)
+        if not query_grams:
+            return []
+
+        shared: Counter = Counter()
+        for gram in query_grams:
+            for key in self._postings.get(gram, ()):
+                shared[key] += 1
+
+        total = len(query_grams)
+        ranked = []
+        for key, n in shared.items():
+            word_similarity = n / total
+            if word_similarity < min_score:
+                continue
+            jaccard = n / (total + self._sizes[key] - n)
+            ranked.append((word_similarity, jaccard, key))
+
+        ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [ScoredMatch(key, round(score, 4)) for score, _, key in ranked]
@@ -0,0 +1,69 @@
+# src/utils/timer_wheel.py
+from typing import Generic, Hashable, TypeVar
+
+T = TypeVar('T')
+
+class TimerWheel(Generic[T]):
+    """
+    Roda de temporização (hashed timing wheel): `slots` baldes de `tick_seconds` cada.
+    Agendar é O(1) e cada avanço visita só os baldes dos ticks decorridos, sem um timer por item.
+    Itens além de uma volta ficam no balde e esperam as voltas seguintes (o prazo é conferido).
+    Chaves repetidas são ignoradas: recarregar a mesma janela não duplica itens.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self._buckets: list[dict[Hashable, tuple[float, T]]] = [{} for _ in range(slots)]
+        self._bucket_of: dict[Hashable, int] = {}
+        self._cursor: int | None = None     # Último tick encerrado (o tick corrente é revisitado)
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._bucket_of
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def schedule(self, key: Hashable, due: float, item: T) -> bool:
+        """Agenda `item` para `due` (epoch). Prazo já vencido sai no próximo avanço. False se a chave já existe."""
+        if key in self._bucket_of:
+            return False
+        tick = self._tick(due)
+        if self._cursor is not None and tick <= self._cursor:
+            tick = self._cursor + 1
+        bucket = tick % self.slots
+        self._buckets[bucket][key] = (due, item)
+        self._bucket_of[key] = bucket
+        return True
+
+    def cancel(self, key: Hashable) -> bool:
+        bucket = self._bucket_of.pop(key, None)
+        if bucket is None:
+            return False
+        del self._buckets[bucket][key]
+        return True
+
+    def advance(self, now: float) -> list[T]:
+        """Retira e devolve (em ordem de prazo) os itens vencidos até `now`."""
+        atual = self._tick(now)
+        primeira_volta = atual - self.slots + 1
+        if self._cursor is None:
+            inicio = primeira_volta     # Primeiro avanço: visita todos os baldes
+        elif atual <= self._cursor:
+            return []                   # Relógio voltou
+        else:
+            inicio = max(self._cursor + 1, primeira_volta)
+
+        vencidos: list[tuple[float, T]] = []
+        for tick in range(inicio, atual + 1):
+            balde = self._buckets[tick % self.slots]
+            for key in [k for k, (due, _) in balde.items() if due <= now]:
+                vencidos.append(balde.pop(key))
+                del self._bucket_of[key]
+        # O tick corrente ainda não terminou: itens com prazo no restante dele saem no próximo avanço
+        self._cursor = atual - 1
+        vencidos.sort(key=lambda v: v[0])
+        return [item for _, item in vencidos]
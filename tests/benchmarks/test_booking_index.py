@@ -0,0 +1,78 @@
+"""
+Benchmark do índice de conflitos com 10 mil agendamentos num dia (várias cadeiras).
+Confere o BookingIndex contra a varredura linear original nas mesmas consultas (suíte padrão);
+a comparação de tempo é opt-in: python -m pytest -m benchmark tests/benchmarks/test_booking_index.py
+"""
+import random
+import time as _time
+from datetime import date, time
+
+import numpy as np
+import pytest
+
+from src.services.availability_engine import DayAvailability
+from src.services.booking_index import BookingIndex
+
+N_BOOKINGS = 10_000
+N_QUERIES = 300
+DIA = date(2025, 10, 20)    # segunda: 09:00 às 22:00
+
+def _day_bookings(rng: random.Random, ate: int = 22 * 60) -> list[tuple[time, time]]:
+    bookings = []
+    for _ in range(N_BOOKINGS):
+        inicio = rng.randrange(9 * 60, ate - 15)
+        fim = inicio + rng.choice([5, 10, 15])
+        bookings.append((time(inicio // 60, inicio % 60), time(fim // 60, fim % 60)))
+    return bookings
+
+def _linear_overlaps(pares, inicio, fim) -> bool:
+    return any(inicio < b and fim > a for a, b in pares)
+
+def _scenario(seed: int = 7):
+    rng = random.Random(seed)
+    bookings = _day_bookings(rng)
+    pares = [(b[0].hour * 60 + b[0].minute, b[1].hour * 60 + b[1].minute) for b in bookings]
+    consultas = [(m, m + rng.choice([1, 2, 5])) for m in (rng.randrange(0, 24 * 60 - 5) for _ in range(N_QUERIES))]
+    return bookings, pares, consultas
+
+def test_index_matches_linear_scan_at_10k_bookings():
+    bookings, pares, consultas = _scenario()
+    index = BookingIndex.from_bookings(bookings)
+
+    inicios = np.array([a for a, _ in consultas])
+    assert [index.overlaps(a, b) for a, b in consultas] == [_linear_overlaps(pares, a, b) for a, b in consultas]
+    assert (~index.free_mask(inicios, 2)).tolist() == [_linear_overlaps(pares, a, a + 2) for a in inicios]
+
+@pytest.mark.benchmark
+def test_index_is_faster_than_linear_scan_at_10k_bookings(record_property):
+    bookings, pares, consultas = _scenario()
+
+    t0 = _time.perf_counter()
+    for a, b in consultas:
+        _linear_overlaps(pares, a, b)
+    linear_ms = (_time.perf_counter() - t0) * 1000
+
+    t0 = _time.perf_counter()
+    index = BookingIndex.from_bookings(bookings)
+    build_ms = (_time.perf_counter() - t0) * 1000
+
+    t0 = _time.perf_counter()
+    for a, b in consultas:
+        index.overlaps(a, b)
+    index_ms = (_time.perf_counter() - t0) * 1000
+
+    record_property("linear_ms", round(linear_ms, 1))
+    record_property("index_ms", round(index_ms, 2))
+    record_property("build_ms", round(build_ms, 1))
+    assert index_ms < linear_ms
+
+def test_full_day_availability_with_10k_bookings():
+    rng = random.Random(11)
+    bookings = _day_bookings(rng, ate=18 * 60)     # noite livre
+
+    day = DayAvailability.for_date(DIA, bookings)
+    livres = day.free_starts(5, step=5)
+
+    ocupado = BookingIndex.from_bookings(bookings).busy_minutes()
+    assert len(livres) and all(not ocupado[m:m + 5].any() for m in livres)
+    assert day.free_starts(5, "Noite", step=5).size == len(livres)
@@ -0,0 +1,47 @@
+"""
+Micro-benchmark de alocação por chamada: entidade ORM x dict x DTO com __slots__.
+Roda sem banco: mede só o custo de materializar o resultado de uma linha lida.
+Opt-in: python -m pytest -m benchmark tests/benchmarks/test_read_model_allocations.py
+"""
+import tracemalloc
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.models.servico_model import Servico
+from src.database.read_models import ServicoDTO
+
+N = 2000
+ROW = SimpleNamespace(servico_id=1, nome="Corte de Cabelo Masculino", descricao="Tesoura ou máquina.",
+                      preco=Decimal("35.00"), duracao_minutos=30)
+
+def _as_orm(row):
+    return Servico(servico_id=row.servico_id, nome=row.nome, descricao=row.descricao,
+                   preco=row.preco, duracao_minutos=row.duracao_minutos)
+
+def _as_dict(row):
+    return {"servico_id": row.servico_id, "nome": row.nome, "descricao": row.descricao,
+            "preco": float(row.preco), "duracao_minutos": row.duracao_minutos}
+
+def _bytes_per_call(factory) -> float:
+    factory(ROW)  # aquecimento (caches do mapper, etc.)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        keep = [factory(ROW) for _ in range(N)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(keep) == N
+    return (after - before) / N
+
+@pytest.mark.benchmark
+def test_dto_allocates_less_than_orm_entity_and_dict(record_property):
+    orm = _bytes_per_call(_as_orm)
+    as_dict = _bytes_per_call(_as_dict)
+    dto = _bytes_per_call(ServicoDTO.from_row)
+
+    for nome, valor in (("orm", orm), ("dict", as_dict), ("dto", dto)):
+        record_property(f"bytes_per_call_{nome}", round(valor))
+    assert dto < as_dict < orm
@@ -0,0 +1,250 @@
+"""
+Micro-benchmark do agendamento com dias sintéticos pesados, sem banco (repositório em memória).
+Mede latência (média, mediana, p95) e alocação transitória (pico do tracemalloc) por chamada de
+SchedulerService.calculate_available_blocks, SchedulerService.is_slot_available e
+AppointmentService.get_available_shifts, em cada cenário x duração x passo.
+
+A medição é opt-in (marcador `benchmark`); a suíte padrão só confere a consistência dos cenários.
+Resultados em JSON para comparar commits:
+
+    SCHEDULER_BENCH_OUTPUT=base.json python -m pytest -q -m benchmark tests/benchmarks/test_scheduler_bench.py
+    (aplica a otimização)
+    SCHEDULER_BENCH_OUTPUT=novo.json SCHEDULER_BENCH_BASELINE=base.json \\
+        SCHEDULER_BENCH_MAX_REGRESSION=1.25 python -m pytest -q -m benchmark tests/benchmarks/test_scheduler_bench.py
+
+SCHEDULER_BENCH_CALLS aumenta o número de chamadas medidas.
+"""
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time as _time
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from src.database.read_models import ProfissionalDTO
+from src.services.appointment_service import AppointmentService
+from src.services.availability_engine import format_minute
+from src.services.scheduler_service import SchedulerService
+from src.services.staff_roster import StaffSnapshot
+
+CALLS = int(os.getenv("SCHEDULER_BENCH_CALLS", "30"))
+ALLOC_CALLS = max(5, CALLS // 3)
+DURACOES = (15, 30, 60, 120)
+PASSOS = (5, 15, 30)
+ABERTURA, FECHAMENTO = 9 * 60, 22 * 60      # segunda a sábado (BUSINESS_HOURS)
+
+def _proxima_segunda() -> date:
+    # Data futura: is_slot_available recusa horários passados
+    hoje = date.today() + timedelta(days=7)
+    return hoje + timedelta(days=-hoje.weekday())
+
+DIA = _proxima_segunda()
+
+# -----------------------------
+# Dias sintéticos
+# -----------------------------
+def _t(minuto: int) -> time:
+    return time(minuto // 60, minuto % 60)
+
+def _sparse(rng: random.Random):
+    """Poucos atendimentos longos espalhados."""
+    return [(_t(m), _t(m + 60)) for m in sorted(rng.sample(range(ABERTURA, FECHAMENTO - 60, 30), 6))]
+
+def _dense(rng: random.Random):
+    """Atendimentos encostados com folgas raras de 15 min (poucos inícios livres)."""
+    bookings, m = [], ABERTURA
+    while m < FECHAMENTO - 30:
+        duracao = rng.choice([30, 45, 60])
+        bookings.append((_t(m), _t(min(m + duracao, FECHAMENTO))))
+        m += duracao + (15 if rng.random() < 0.1 else 0)
+    return bookings
+
+def _fragmented(rng: random.Random):
+    """Centenas de blocos curtos sobrepostos (encaixes de 5-10 min)."""
+    bookings = []
+    for _ in range(400):
+        m = rng.randrange(ABERTURA, FECHAMENTO - 10)
+        bookings.append((_t(m), _t(m + rng.choice([5, 10]))))
+    return bookings
+
+N_PROFISSIONAIS = 8
+
+def _multi_resource(rng: random.Random):
+    """Vários profissionais, cada um com o dia quase cheio, mais algumas pausas sem profissional."""
+    bookings = []
+    for pid in range(1, N_PROFISSIONAIS + 1):
+        m = ABERTURA + rng.randrange(0, 60, 15)
+        while m < FECHAMENTO - 30:
+            duracao = rng.choice([30, 45, 60])
+            bookings.append((_t(m), _t(min(m + duracao, FECHAMENTO)), pid))
+            m += duracao + rng.choice([0, 0, 15, 30])
+    bookings.append((_t(13 * 60), _t(13 * 60 + 30), None))
+    return bookings
+
+CENARIOS = {
+    "sparse": (_sparse, None),
+    "dense": (_dense, None),
+    "fragmented": (_fragmented, None),
+    "multi_resource": (_multi_resource, StaffSnapshot(
+        [ProfissionalDTO(pid, f"P{pid}") for pid in range(1, N_PROFISSIONAIS + 1)])),
+}
+
+class _InMemoryAgendaRepo:
+    """Stub do AgendaRepository: devolve a ocupação pré-gerada (mesmo formato do resumo materializado)."""
+
+    def __init__(self, por_dia: dict[date, list]):
+        self.por_dia = por_dia
+
+    async def verificar_disponibilidade(self, data: str):
+        return self.por_dia.get(date.fromisoformat(data), [])
+
+    async def listar_ocupacao_periodo(self, data_inicio: date, data_fim: date):
+        return [(d, *b) for d, bookings in sorted(self.por_dia.items())
+                if data_inicio <= d <= data_fim for b in bookings]
+
+class _SchedulerPersistence:
+    """Só o que o AppointmentService usa do PersistenceService, sem sessão."""
+
+    def __init__(self, scheduler: SchedulerService):
+        self.scheduler = scheduler
+
+    async def get_day_availability(self, data, servico_id=None, user_id=None):
+        return await self.scheduler.get_day_availability(data, servico_id, user_id)
+
+def _services(cenario: str):
+    gerar, staff = CENARIOS[cenario]
+    scheduler = SchedulerService(_InMemoryAgendaRepo({DIA: gerar(random.Random(cenario))}), staff=staff)
+    return scheduler, AppointmentService(_SchedulerPersistence(scheduler), validator=None)
+
+# -----------------------------
+# Medição
+# -----------------------------
+def _measure(loop: asyncio.AbstractEventLoop, call) -> dict:
+    """`call(i)` devolve uma corrotina; mede cada chamada isolada (latência e pico de alocação)."""
+    loop.run_until_complete(call(0))  # aquecimento
+
+    tempos = []
+    for i in range(CALLS):
+        t0 = _time.perf_counter()
+        loop.run_until_complete(call(i))
+        tempos.append((_time.perf_counter() - t0) * 1e6)
+
+    picos = []
+    tracemalloc.start()
+    try:
+        for i in range(ALLOC_CALLS):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            loop.run_until_complete(call(i))
+            _, pico = tracemalloc.get_traced_memory()
+            picos.append(pico - base)
+    finally:
+        tracemalloc.stop()
+
+    tempos.sort()
+    return {
+        "calls": CALLS,
+        "mean_us": round(statistics.fmean(tempos), 2),
+        "median_us": round(statistics.median(tempos), 2),
+        "p95_us": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 2),
+        "peak_alloc_bytes": int(statistics.median(picos)),
+    }
+
+def run_suite() -> list[dict]:
+    data = DIA.isoformat()
+    horas = [format_minute(m) for m in range(ABERTURA, FECHAMENTO - 120, 35)]
+    resultados = []
+    loop = asyncio.new_event_loop()
+    try:
+        for cenario in CENARIOS:
+            scheduler, appointments = _services(cenario)
+            for duracao in DURACOES:
+                for passo in PASSOS:
+                    resultados.append({"api": "calculate_available_blocks", "scenario": cenario
+                                       , "duration": duracao, "step": passo, **_measure(
+                        loop, lambda i: scheduler.calculate_available_blocks(DIA, duracao, step=passo))})
+                resultados.append({"api": "is_slot_available", "scenario": cenario
+                                   , "duration": duracao, "step": None, **_measure(
+                    loop, lambda i: scheduler.is_slot_available(data, horas[i % len(horas)], duracao))})
+                resultados.append({"api": "get_available_shifts", "scenario": cenario
+                                   , "duration": duracao, "step": None, **_measure(
+                    loop, lambda i: appointments.get_available_shifts(data, duracao))})
+    finally:
+        loop.close()
+    return resultados
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+                              , check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _key(r: dict) -> tuple:
+    return r["api"], r["scenario"], r["duration"], r["step"]
+
+def compare(baseline: dict, atual: dict) -> list[tuple[tuple, float, float]]:
+    """(caso, razão da mediana, razão do pico de alocação) atual/base; > 1 é regressão."""
+    base = {_key(r): r for r in baseline["results"]}
+    razoes = []
+    for r in atual["results"]:
+        b = base.get(_key(r))
+        if b:
+            razoes.append((_key(r), r["median_us"] / max(b["median_us"], 1e-9)
+                           , r["peak_alloc_bytes"] / max(b["peak_alloc_bytes"], 1)))
+    return razoes
+
+# -----------------------------
+# Suíte
+# -----------------------------
+def test_synthetic_days_are_consistent_across_apis():
+    loop = asyncio.new_event_loop()
+    try:
+        for cenario in CENARIOS:
+            scheduler, appointments = _services(cenario)
+            blocos = loop.run_until_complete(scheduler.calculate_available_blocks(DIA, 30, step=5))
+            turnos = loop.run_until_complete(appointments.get_available_shifts(DIA.isoformat(), 30))
+            assert bool(blocos) == bool(turnos), cenario
+            for hora in blocos[:5]:
+                ok, msg = loop.run_until_complete(scheduler.is_slot_available(DIA.isoformat(), hora, 30))
+                assert ok, (cenario, hora, msg)
+            # Passo maior só devolve um subconjunto dos inícios do passo menor
+            assert set(loop.run_until_complete(scheduler.calculate_available_blocks(DIA, 30, step=15))) <= set(blocos)
+    finally:
+        loop.close()
+
+@pytest.mark.benchmark
+def test_benchmark_writes_comparable_json(tmp_path, record_property):
+    saida = Path(os.getenv("SCHEDULER_BENCH_OUTPUT") or tmp_path / "scheduler_bench.json")
+    relatorio = {
+        "commit": _commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": run_suite(),
+    }
+    saida.write_text(json.dumps(relatorio, indent=2))
+
+    casos = {_key(r) for r in relatorio["results"]}
+    assert len(casos) == len(relatorio["results"]) == len(CENARIOS) * len(DURACOES) * (len(PASSOS) + 2)
+    assert all(r["median_us"] > 0 for r in relatorio["results"])
+    record_property("scheduler_bench_output", str(saida))
+
+    baseline = os.getenv("SCHEDULER_BENCH_BASELINE")
+    if baseline:
+        razoes = compare(json.loads(Path(baseline).read_text()), relatorio)
+        for caso, tempo, memoria in sorted(razoes, key=lambda r: -r[1])[:15]:
+            record_property('/'.join(map(str, caso)), f"tempo x{tempo:.2f} alocação x{memoria:.2f}")
+        limite = float(os.getenv("SCHEDULER_BENCH_MAX_REGRESSION", "0") or 0)
+        if limite:
+            piores = [caso for caso, tempo, _ in razoes if tempo > limite]
+            assert not piores, f"Regressão acima de x{limite}: {piores}"
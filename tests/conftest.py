@@ -0,0 +1,13 @@
+# tests/conftest.py
+import os
+
+# O engine (src/database/session.py) é criado na importação dos modelos.
+# Valores fictícios permitem importar os módulos nos testes unitários sem um PostgreSQL real.
+for key, value in {
+    'DB_HOST': 'localhost',
+    'DB_USER': 'postgres',
+    'DB_PASSWORD': 'postgres',
+    'DB_NAME': 'test_db',
+    'DB_PORT': '5432',
+}.items():
+    os.environ.setdefault(key, value)
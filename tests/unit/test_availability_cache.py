@@ -0,0 +1,98 @@
+import asyncio
+import random
+from datetime import date, time
+
+import pytest
+
+from src.services.availability_cache import AvailabilityCache
+from src.services.scheduler_service import SchedulerService
+
+DIA = date(2025, 10, 20)
+
+class _FakeAgenda:
+    """Banco simulado: cada leitura cede o event loop no meio, como uma query real."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.committed: list[tuple[time, time]] = []
+        self.reads = 0
+
+    async def load(self):
+        self.reads += 1
+        await asyncio.sleep(0)
+        snapshot = list(self.committed)
+        for _ in range(self.rng.randint(0, 3)):
+            await asyncio.sleep(0)
+        return snapshot
+
+    async def book(self, cache: AvailabilityCache, booking: tuple[time, time]):
+        await asyncio.sleep(0)
+        self.committed.append(booking + (None,))  # commit (sem profissional)
+        for _ in range(self.rng.randint(0, 2)):
+            await asyncio.sleep(0)      # janela entre o commit e a atualização do cache
+        await cache.booking_committed(DIA, *booking)
+
+@pytest.mark.asyncio
+async def test_cache_converges_to_database_under_racing_bookings():
+    for seed in range(50):
+        rng = random.Random(seed)
+        db = _FakeAgenda(rng)
+        cache = AvailabilityCache()
+
+        tarefas = [db.book(cache, (time(9 + i, 0), time(9 + i, 30))) for i in range(8)]
+        tarefas += [cache.get_bookings(DIA, db.load) for _ in range(12)]
+        rng.shuffle(tarefas)
+        await asyncio.gather(*tarefas)
+
+        # Sem escritas em andamento, o cache tem que refletir exatamente o banco
+        final = await cache.get_bookings(DIA, db.load)
+        assert sorted(final) == sorted(db.committed), f"seed {seed}"
+
+@pytest.mark.asyncio
+async def test_read_during_write_is_not_cached():
+    cache = AvailabilityCache()
+    nova = (time(10, 0), time(11, 0))
+
+    async def loader_com_escrita_no_meio():
+        resultado = []                              # a query não viu o agendamento...
+        await cache.booking_committed(DIA, *nova)   # ...que foi confirmado antes da gravação
+        return resultado
+
+    assert await cache.get_bookings(DIA, loader_com_escrita_no_meio) == ()
+    assert cache.stale_writes == 1
+
+    async def loader():
+        return [nova]
+    assert await cache.get_bookings(DIA, loader) == (nova,)
+    assert cache.snapshot()["misses"] == 2
+
+class _CountingRepo:
+    def __init__(self, bookings):
+        self.bookings = bookings
+        self.calls = 0
+
+    async def verificar_disponibilidade(self, data):
+        self.calls += 1
+        return list(self.bookings)
+
+@pytest.mark.asyncio
+async def test_scheduler_reuses_cached_day_until_status_change():
+    repo = _CountingRepo([(time(9, 0), time(12, 0))])
+    cache = AvailabilityCache()
+    scheduler = SchedulerService(repo, cache=cache)
+
+    await scheduler.get_day_availability(DIA)
+    await scheduler.get_day_availability(DIA)
+    assert repo.calls == 1
+
+    # Novo agendamento: atualização incremental, sem nova query
+    await cache.booking_committed(DIA, time(12, 0), time(13, 0))
+    day = await scheduler.get_day_availability(DIA)
+    assert repo.calls == 1 and not day.is_free(12 * 60, 30)
+
+    # Cancelamento: a data é invalidada e relida
+    repo.bookings = []
+    await cache.invalidate(DIA)
+    day = await scheduler.get_day_availability(DIA)
+    assert repo.calls == 2 and day.is_free(9 * 60, 30)
+    assert cache.snapshot()["hit_rate"] == 0.5
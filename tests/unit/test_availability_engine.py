@@ -0,0 +1,108 @@
+import random
+from datetime import date, datetime, time
+
+import pytest
+
+from src.services.availability_engine import DayAvailability, format_minute
+from src.services.scheduler_service import SchedulerService
+
+SEGUNDA = date(2025, 10, 20)    # 09:00 às 22:00
+SABADO = date(2025, 10, 25)     # 09:00 às 16:00
+DOMINGO = date(2025, 10, 26)    # fechado
+
+def _t(minuto: int) -> time:
+    return time(minuto // 60, minuto % 60)
+
+def _reference(bookings, inicio, fim, duracao, step=30):
+    """Loop O(slots x agendamentos) original, usado como oráculo."""
+    livres = []
+    atual = inicio
+    while atual + duracao <= fim:
+        if all(not (atual < to_ and atual + duracao > from_) for from_, to_ in bookings):
+            livres.append(format_minute(atual))
+        atual += step
+    return livres
+
+def test_free_starts_match_reference_loop_on_random_days():
+    rng = random.Random(42)
+    for _ in range(200):
+        bookings = []
+        for _ in range(rng.randint(0, 8)):
+            inicio = rng.randrange(9 * 60, 21 * 60, 15)
+            bookings.append((inicio, inicio + rng.choice([15, 30, 45, 60, 90])))
+        duracao = rng.choice([15, 30, 45, 60, 120])
+
+        day = DayAvailability.for_date(SEGUNDA, [(_t(a), _t(b)) for a, b in bookings])
+        assert day.available_times(duracao) == _reference(bookings, 9 * 60, 22 * 60, duracao)
+
+def test_shift_is_intersected_with_business_hours_and_case_insensitive():
+    sabado = DayAvailability.for_date(SABADO, [])
+    # Manhã (08-12) começa às 09:00 (abertura); Tarde (12-18) termina às 16:00 (fechamento)
+    assert sabado.available_times(60, "manhã")[0] == "09:00"
+    assert sabado.available_times(60, "Tarde")[-1] == "15:00"
+    assert sabado.available_shifts(60) == ["Manhã", "Tarde"]
+
+def test_busy_shift_and_closed_day():
+    cheio = DayAvailability.for_date(SEGUNDA, [(time(18, 0), time(22, 0))])
+    assert "Noite" not in cheio.available_shifts(30)
+    assert not cheio.is_free(17 * 60 + 30, 60)
+    assert cheio.is_free(17 * 60, 60)
+
+    domingo = DayAvailability.for_date(DOMINGO, [])
+    assert not domingo.is_open and domingo.available_shifts(30) == []
+
+class _CountingRepo:
+    def __init__(self, bookings):
+        self.bookings = bookings
+        self.calls = 0
+
+    async def verificar_disponibilidade(self, data):
+        self.calls += 1
+        return self.bookings
+
+@pytest.mark.asyncio
+async def test_scheduler_reads_the_day_once_and_skips_closed_days():
+    repo = _CountingRepo([(time(9, 0), time(12, 0))])
+    scheduler = SchedulerService(repo)
+
+    day = await scheduler.get_day_availability("2025-10-20")
+    assert day.available_shifts(30) == ["Tarde", "Noite"]
+    assert day.available_times(30, "Tarde")[:2] == ["12:00", "12:30"]
+    assert repo.calls == 1
+
+    await scheduler.get_day_availability(DOMINGO)
+    assert repo.calls == 1
+
+class _RangeRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def listar_ocupacao_periodo(self, data_inicio, data_fim):
+        self.calls.append((data_inicio, data_fim))
+        return [r for r in self.rows if data_inicio <= r[0] <= data_fim]
+
+@pytest.mark.asyncio
+async def test_find_next_available_scans_the_horizon_with_one_query():
+    # Segunda lotada, domingo fechado; terça só tem a tarde livre a partir das 14:00
+    rows = [(SEGUNDA, time(9, 0), time(22, 0)),
+            (date(2025, 10, 21), time(9, 0), time(14, 0)),
+            (date(2025, 10, 21), time(18, 0), time(22, 0))]
+    repo = _RangeRepo(rows)
+    scheduler = SchedulerService(repo)
+
+    opcoes = await scheduler.find_next_available(60, SEGUNDA, horizon_days=7, preferred_shift="noite",
+                                                 limit=3, now=datetime(2025, 10, 19, 12, 0))
+
+    assert repo.calls == [(SEGUNDA, date(2025, 10, 26))]
+    assert [(o.data, o.turno) for o in opcoes] == [
+        (date(2025, 10, 21), "Tarde"), (date(2025, 10, 22), "Noite"), (date(2025, 10, 23), "Noite")]
+    assert opcoes[0].horarios == ["14:00", "14:30", "15:00"]
+
+@pytest.mark.asyncio
+async def test_find_next_available_skips_past_times_today():
+    scheduler = SchedulerService(_RangeRepo([]))
+    opcoes = await scheduler.find_next_available(30, SABADO, horizon_days=3, limit=5,
+                                                 now=datetime(2025, 10, 25, 15, 10))
+    # Sábado fecha às 16:00: só sobra 15:30; domingo fechado; segunda abre às 09:00
+    assert [(o.data, o.horarios[0]) for o in opcoes] == [(SABADO, "15:30"), (date(2025, 10, 27), "09:00")]
@@ -0,0 +1,183 @@
+from contextlib import asynccontextmanager
+from datetime import date, time, timedelta, datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.database.models.agenda_model import AGENDA_OVERLAP_CONSTRAINT, AGENDA_USER_DAY_CONSTRAINT
+from src.database.repositories.agenda_repo import SLOT_TAKEN_MESSAGE, conflict_message
+from src.services.availability_cache import AvailabilityCache
+from src.services.persistence_service import PersistenceService
+
+class _PgError(Exception):
+    def __init__(self, constraint_name):
+        super().__init__(constraint_name)
+        self.constraint_name = constraint_name
+
+def _integrity_error(constraint_name: str) -> IntegrityError:
+    orig = Exception("violação")
+    orig.__cause__ = _PgError(constraint_name)
+    return IntegrityError("INSERT INTO agenda ...", {}, orig)
+
+def test_conflict_message_maps_agenda_constraints():
+    assert conflict_message(_integrity_error(AGENDA_OVERLAP_CONSTRAINT)) == SLOT_TAKEN_MESSAGE
+    assert "já tem um agendamento" in conflict_message(_integrity_error(AGENDA_USER_DAY_CONSTRAINT))
+    assert conflict_message(_integrity_error("agenda_user_id_fkey")) is None
+
+class _FakeSession:
+    def begin(self):
+        @asynccontextmanager
+        async def _tx():
+            yield
+        return _tx()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class _FakeAgendaRepo:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    async def inserir_agendamento(self, **kwargs):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+def _service(outcome):
+    cache = AvailabilityCache()
+    service = PersistenceService(session_maker=_FakeSession, availability_cache=cache)
+    repo = _FakeAgendaRepo(outcome)
+    service._get_repos = lambda session: {"agenda_repo": repo}
+    return service, repo, cache
+
+def _amanha_util() -> str:
+    dia = date.today() + timedelta(days=1)
+    while dia.weekday() == 6:   # domingo fechado
+        dia += timedelta(days=1)
+    return dia.isoformat()
+
+@pytest.mark.asyncio
+async def test_booking_outcomes_come_from_a_single_insert():
+    data = _amanha_util()
+
+    service, repo, cache = _service(42)
+    ok, msg = await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00")
+    assert ok and "Agendamento confirmado" in msg and repo.calls == 1
+    assert cache.snapshot()["incremental_updates"] == 1
+
+    service, repo, cache = _service(None)   # WHERE NOT EXISTS barrou
+    ok, msg = await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00")
+    assert (ok, msg) == (False, SLOT_TAKEN_MESSAGE) and cache.snapshot()["invalidations"] == 1
+
+    service, repo, cache = _service(_integrity_error(AGENDA_OVERLAP_CONSTRAINT))  # corrida
+    ok, msg = await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00")
+    assert (ok, msg) == (False, SLOT_TAKEN_MESSAGE) and cache.snapshot()["invalidations"] == 1
+
+    service, repo, _ = _service(_integrity_error("agenda_user_id_fkey"))
+    with pytest.raises(IntegrityError):
+        await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00")
+
+@pytest.mark.asyncio
+async def test_business_rules_are_checked_without_touching_the_database():
+    service, repo, _ = _service(42)
+    ontem = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    ok, msg = await service.inserir_agendamento(1, 2, "Corte", 30, ontem, "10:00")
+    assert not ok and "passados" in msg and repo.calls == 0
+
+class _SequenceAgendaRepo:
+    """Primeira tentativa perde a corrida (NOT EXISTS), a segunda entra."""
+    def __init__(self):
+        self.tentativas = []
+
+    async def inserir_agendamento(self, profissional_id=None, **kwargs):
+        self.tentativas.append(profissional_id)
+        return None if len(self.tentativas) == 1 else 7
+
+@pytest.mark.asyncio
+async def test_booking_falls_back_to_the_next_free_professional():
+    from types import SimpleNamespace
+    from src.database.read_models import ProfissionalDTO
+    from src.services.staff_roster import StaffSnapshot
+
+    data = _amanha_util()
+    cache = AvailabilityCache()
+    roster = SimpleNamespace(snapshot=StaffSnapshot([ProfissionalDTO(1, "Ana"), ProfissionalDTO(2, "Bruno")]))
+    service = PersistenceService(session_maker=_FakeSession, availability_cache=cache, staff_roster=roster)
+    repo = _SequenceAgendaRepo()
+
+    async def ocupacao(_data):
+        return [(time(13, 0), time(15, 0), 2)]  # Bruno tem o dia mais cheio: Ana é tentada primeiro
+    repo.verificar_disponibilidade = ocupacao
+    service._get_repos = lambda session: {"agenda_repo": repo}
+
+    ok, msg = await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00")
+    assert ok and "com Bruno" in msg
+    assert repo.tentativas == [1, 2]
+
+@pytest.mark.asyncio
+async def test_other_users_hold_blocks_booking_and_own_hold_is_consumed():
+    from src.services.slot_holds import SlotHoldService
+    from src.utils.system_message import MESSAGES
+
+    data = _amanha_util()
+    dia = date.fromisoformat(data)
+    holds = SlotHoldService()
+    service = PersistenceService(session_maker=_FakeSession, slot_holds=holds)
+    repo = _FakeAgendaRepo(42)
+    service._get_repos = lambda session: {"agenda_repo": repo}
+
+    await holds.hold(99, dia, time(10, 0), time(10, 30))
+    assert await service.inserir_agendamento(1, 2, "Corte", 30, data, "10:00") == (False, MESSAGES['SLOT_HELD_BY_OTHER'])
+    assert repo.calls == 0
+
+    ok, _ = await service.inserir_agendamento(99, 2, "Corte", 30, data, "10:00")
+    assert ok and await holds.get(99) is None
+
+@pytest.mark.asyncio
+async def test_own_hold_survives_unexpected_insert_error_and_is_released_on_refusal():
+    from src.services.slot_holds import SlotHoldService
+
+    data = _amanha_util()
+    dia = date.fromisoformat(data)
+    holds = SlotHoldService()
+    service = PersistenceService(session_maker=_FakeSession, slot_holds=holds)
+    repo = _FakeAgendaRepo(_integrity_error("agenda_user_id_fkey"))
+    service._get_repos = lambda session: {"agenda_repo": repo}
+    await holds.hold(7, dia, time(10, 0), time(10, 30))
+
+    # Erro inesperado: o horário continua segurado para a nova tentativa
+    with pytest.raises(IntegrityError):
+        await service.inserir_agendamento(7, 2, "Corte", 30, data, "10:00")
+    assert await holds.get(7) is not None
+
+    # Recusa definitiva (horário tomado): a reserva é liberada
+    repo.outcome = _integrity_error(AGENDA_OVERLAP_CONSTRAINT)
+    ok, _ = await service.inserir_agendamento(7, 2, "Corte", 30, data, "10:00")
+    assert not ok and await holds.get(7) is None
+
+@pytest.mark.asyncio
+async def test_hold_refusal_tells_booked_apart_from_held():
+    from src.services.slot_holds import SlotHoldService
+    from src.utils.system_message import MESSAGES
+
+    data = _amanha_util()
+    holds = SlotHoldService()
+    service = PersistenceService(session_maker=_FakeSession, slot_holds=holds)
+    repo = _FakeAgendaRepo(1)
+    ocupados = []
+
+    async def ocupacao(_data):
+        return ocupados
+    repo.verificar_disponibilidade = ocupacao
+    service._get_repos = lambda session: {"agenda_repo": repo}
+
+    await holds.hold(99, date.fromisoformat(data), time(10, 0), time(10, 30))
+    assert await service.hold_slot(7, 2, 30, data, "10:00") == (False, MESSAGES['SLOT_HELD_BY_OTHER'])
+
+    ocupados.append((time(10, 0), time(10, 30), None))   # Agendado: a reserva não é o único bloqueio
+    assert await service.hold_slot(7, 2, 30, data, "10:00") == (False, SLOT_TAKEN_MESSAGE)
@@ -0,0 +1,239 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot.slot_filling_manager import AWAITING_CONFIRMATION, SlotFillingManager
+from src.platform.telegram.ui.keyboards import (booking_callback_data, parse_booking_callback, get_dates_keyboard
+    , get_times_keyboard)
+
+class _FakePersistence:
+    def __init__(self, intent='AGENDAR', slot_data=None):
+        self.state = {'current_intent': intent, 'slot_data': slot_data or {}}
+        self.writes = []
+
+    async def get_session_state(self, user_id):
+        return self.state
+
+    async def update_session_state(self, user_id, current_intent=None, slot_data=None, remove_keys=None):
+        # Mesma semântica do SessionRepository: mescla (None ignorado) e só remove o que vier em remove_keys
+        self.writes.append(slot_data)
+        salvo = dict(self.state['slot_data'] or {})
+        salvo.update({k: v for k, v in (slot_data or {}).items() if v is not None})
+        for key in remove_keys or ():
+            salvo.pop(key, None)
+        self.state['slot_data'] = salvo
+
+    async def get_service_details_by_id(self, servico_id):
+        if servico_id == 3:
+            return {'servico_id': 3, 'nome': 'Corte', 'duracao_minutos': 30}
+        return None
+
+    async def get_nome_usuario(self, user_id):
+        return 'Ana'
+
+    async def clear_session_state(self, user_id):
+        self.state = {'current_intent': None, 'slot_data': {}}
+
+    async def release_slot_hold(self, user_id):
+        self.released = True
+
+class _FakeAppointments:
+    """Reserva e agendamento em memória: registra quem foi reservado e agendado."""
+    def __init__(self, livre: bool = True):
+        self.livre = livre
+        self.holds = []
+        self.booked = []
+
+    async def hold_slot(self, user_id, slot_data):
+        self.holds.append(slot_data['hora_inicio'])
+        return (True, "") if self.livre else (False, "reservado")
+
+    async def process_appointment(self, user_id, slot_data):
+        self.booked.append(slot_data['hora_inicio'])
+        return True, "Agendamento confirmado!"
+
+def _update():
+    respostas = []
+
+    async def reply_text(text, **kwargs):
+        respostas.append((text, kwargs.get('reply_markup')))
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=7, first_name='Ana')
+                             , effective_message=SimpleNamespace(reply_text=reply_text))
+    return update, respostas
+
+def _manager(persistence, appointments=None) -> SlotFillingManager:
+    return SlotFillingManager(persistence_service=persistence, appointment_service=appointments)
+
+def test_callback_data_round_trip_and_size_limit():
+    amanha = date.today() + timedelta(days=1)
+    teclado = get_dates_keyboard([amanha]).inline_keyboard
+    assert parse_booking_callback(teclado[0][0].callback_data) == ('data', amanha.isoformat())
+
+    # Horário tem ':' no valor
+    assert parse_booking_callback(booking_callback_data('hora_inicio', '10:30')) == ('hora_inicio', '10:30')
+    assert parse_booking_callback('outro:botao:1') is None
+    assert parse_booking_callback(None) is None
+
+    horarios = [f"{h:02d}:{m:02d}" for h in range(8, 14) for m in (0, 30)]
+    botoes = [b for linha in get_times_keyboard(horarios).inline_keyboard for b in linha]
+    assert len(botoes) == 12 and all(len(b.callback_data.encode()) <= 64 for b in botoes)
+
+@pytest.mark.asyncio
+async def test_choice_fills_slot_without_llm_and_resets_later_steps():
+    hoje = date.today().isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 1, 'servico': 'Escova', 'data': hoje
+                                              , 'turno': 'Tarde', 'hora_inicio': '14:00'})
+    slots = await _manager(persistence).apply_choice(7, 'servico_id', '3')
+
+    # Serviço trocado por um teclado antigo: data/turno/horário precisam ser escolhidos de novo
+    assert slots == {'servico_id': 3, 'servico': 'Corte', 'duracao_minutos': 30}
+    assert persistence.state['slot_data'] == slots     # O que a próxima pergunta usa é o que ficou salvo
+
+@pytest.mark.asyncio
+async def test_changing_shift_at_confirmation_drops_the_stale_time():
+    amanha = (date.today() + timedelta(days=1)).isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 3, 'servico': 'Corte', 'data': amanha, 'turno': 'Manhã'
+                                              , 'hora_inicio': '10:00', AWAITING_CONFIRMATION: True})
+    appointments = _FakeAppointments()
+    manager = _manager(persistence, appointments)
+
+    await manager.apply_choice(7, 'turno', 'Tarde')
+
+    assert persistence.state['slot_data'] == {'servico_id': 3, 'servico': 'Corte', 'data': amanha, 'turno': 'Tarde'}
+    # "sim" digitado depois: o horário antigo não é agendado no turno novo
+    assert not await manager.resolve_confirmation(_update()[0], None, True)
+    assert appointments.booked == []
+
+@pytest.mark.asyncio
+async def test_repeated_tap_and_invalid_values_are_rejected():
+    manager = _manager(_FakePersistence(slot_data={'servico_id': 3, 'turno': 'Manhã'}))
+
+    assert await manager.apply_choice(7, 'servico_id', '3') is None      # Toque repetido
+    assert await manager.apply_choice(7, 'servico_id', '99') is None     # Serviço inexistente
+    assert await manager.apply_choice(7, 'turno', 'Madrugada') is None
+    assert await manager.apply_choice(7, 'hora_inicio', '25:00') is None
+    ontem = (date.today() - timedelta(days=1)).isoformat()
+    assert await manager.apply_choice(7, 'data', ontem) is None
+    assert await manager.apply_choice(7, 'turno', 'Tarde') == {'servico_id': 3, 'turno': 'Tarde'}
+
+@pytest.mark.asyncio
+async def test_choice_outside_booking_flow_is_ignored():
+    persistence = _FakePersistence(intent=None)
+
+    assert await _manager(persistence).apply_choice(7, 'turno', 'Tarde') is None
+    assert persistence.writes == []
+
+@pytest.mark.asyncio
+async def test_full_slots_hold_the_time_and_wait_for_confirmation():
+    amanha = (date.today() + timedelta(days=1)).isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 3, 'servico': 'Corte', 'data': amanha
+                                              , 'turno': 'Manhã', 'hora_inicio': '10:00'})
+    appointments = _FakeAppointments()
+    manager = _manager(persistence, appointments)
+    update, respostas = _update()
+
+    await manager.handle_slot_filling(update, None)
+
+    # Reservado e perguntado: nada é gravado antes do "Confirmar"
+    assert appointments.holds == ['10:00'] and appointments.booked == []
+    assert persistence.state['slot_data'][AWAITING_CONFIRMATION] is True
+    botoes = [b.callback_data for b in respostas[-1][1].inline_keyboard[0]]
+    assert [parse_booking_callback(b) for b in botoes] == [('confirmar', 'sim'), ('confirmar', 'nao')]
+
+    assert manager.is_confirmation_text(" Sim! ") and not manager.is_confirmation_text("sim, mas às 11h")
+    assert await manager.resolve_confirmation(update, None, True)
+    assert appointments.booked == ['10:00'] and persistence.state['slot_data'] == {}
+
+    # Toque repetido no botão antigo: não há mais confirmação pendente
+    assert not await manager.resolve_confirmation(update, None, True)
+    assert appointments.booked == ['10:00']
+
+@pytest.mark.asyncio
+async def test_declined_confirmation_releases_hold_and_asks_another_time():
+    amanha = (date.today() + timedelta(days=1)).isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 3, 'servico': 'Corte', 'data': amanha, 'turno': 'Manhã'
+                                              , 'hora_inicio': '10:00', AWAITING_CONFIRMATION: True})
+    manager = _manager(persistence, _FakeAppointments())
+    perguntas = []
+
+    async def ask(update, nome, slots, missing):
+        perguntas.append(missing)
+    manager._ask_for_next_slot = ask
+
+    assert await manager.resolve_confirmation(_update()[0], None, False)
+    assert persistence.released
+    assert 'hora_inicio' not in persistence.state['slot_data']
+    assert AWAITING_CONFIRMATION not in persistence.state['slot_data']
+    assert perguntas == [['hora_inicio']]
+
+@pytest.mark.asyncio
+async def test_time_question_lists_the_same_options_as_the_buttons():
+    from src.utils.constants import BOOKING_TIME_OPTIONS
+
+    horarios = [f"{h:02d}:{m:02d}" for h in range(8, 14) for m in (0, 30)]
+
+    async def livres(**kwargs):
+        return horarios
+    appointments = SimpleNamespace(get_available_times_by_shift=livres)
+    slots = {'servico_id': 3, 'servico': 'Corte', 'data': date.today().isoformat(), 'turno': 'Manhã'}
+    update, respostas = _update()
+
+    await _manager(_FakePersistence(slot_data=slots), appointments)._ask_for_next_slot(
+        update, 'Ana', slots, ['hora_inicio'])
+
+    texto, teclado = respostas[-1]
+    botoes = [b.text for linha in teclado.inline_keyboard for b in linha]
+    assert botoes == horarios[:BOOKING_TIME_OPTIONS]
+    assert texto.endswith(f"{', '.join(botoes)}. Qual horário você prefere?")
+
+@pytest.mark.asyncio
+async def test_typed_yes_after_declining_does_not_book_the_declined_time():
+    amanha = (date.today() + timedelta(days=1)).isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 3, 'servico': 'Corte', 'data': amanha, 'turno': 'Manhã'
+                                              , 'hora_inicio': '10:00', AWAITING_CONFIRMATION: True})
+    appointments = _FakeAppointments()
+    manager = _manager(persistence, appointments)
+
+    async def ask(update, nome, slots, missing):
+        pass
+    manager._ask_for_next_slot = ask
+    update, _ = _update()
+
+    assert await manager.resolve_confirmation(update, None, False)
+    # "sim" digitado depois do "Outro horário": nada pendente no banco, nada agendado
+    assert not await manager.resolve_confirmation(update, None, True)
+    assert appointments.booked == []
+
+@pytest.mark.asyncio
+async def test_refused_hold_clears_the_time_in_the_stored_session():
+    amanha = (date.today() + timedelta(days=1)).isoformat()
+    persistence = _FakePersistence(slot_data={'servico_id': 3, 'servico': 'Corte', 'data': amanha, 'turno': 'Manhã'
+                                              , 'hora_inicio': '10:00', AWAITING_CONFIRMATION: True})
+    manager = _manager(persistence, _FakeAppointments(livre=False))
+
+    async def ask(update, nome, slots, missing):
+        pass
+    manager._ask_for_next_slot = ask
+
+    await manager.handle_slot_filling(_update()[0], None)
+    assert 'hora_inicio' not in persistence.state['slot_data']
+    assert AWAITING_CONFIRMATION not in persistence.state['slot_data']
+
+@pytest.mark.asyncio
+async def test_session_repo_merges_slots_and_deletes_only_remove_keys():
+    from src.database.repositories.session_repo import SessionRepository
+
+    salvo = SimpleNamespace(slot_data={'turno': 'Manhã', 'hora_inicio': '10:00', AWAITING_CONFIRMATION: True}
+                            , current_intent='AGENDAR')
+
+    async def get(model, user_id):
+        return salvo
+    repo = SessionRepository(SimpleNamespace(get=get))
+
+    # Tirar a chave do dict não apaga nada: o fake acima segue essa mesma regra
+    await repo.update_session_state(7, slot_data={'turno': 'Tarde'})
+    assert salvo.slot_data['hora_inicio'] == '10:00'
+
+    await repo.update_session_state(7, slot_data={'turno': 'Tarde'}, remove_keys=('hora_inicio', AWAITING_CONFIRMATION))
+    assert salvo.slot_data == {'turno': 'Tarde'}
@@ -0,0 +1,202 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import date, time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from src.services import bulk_transfer
+from src.services.bulk_transfer import BULK_TABLES, BulkImportError, BulkTransferService, iter_csv, iter_lines
+
+async def _blocos(dados: bytes, tamanho: int):
+    for i in range(0, len(dados), tamanho):
+        yield dados[i:i + tamanho]
+
+async def _lista(aiter):
+    return [item async for item in aiter]
+
+@pytest.mark.asyncio
+async def test_lines_survive_any_chunk_boundary():
+    dados = '﻿nome,descricao\r\n"Ção","linha 1\nlinha 2"\n'.encode('utf-8')
+    for tamanho in (1, 2, 3, 7, len(dados)):
+        registros = await _lista(iter_csv(iter_lines(_blocos(dados, tamanho))))
+        assert registros == [(3, {"nome": "Ção", "descricao": "linha 1\nlinha 2"})]
+
+class _FakeConn:
+    def __init__(self, conflitos=()):
+        self.conflitos = list(conflitos)
+        self.copies = []
+        self.executed = []
+        self.fetched = []
+
+    def transaction(self):
+        @asynccontextmanager
+        async def _tx():
+            yield
+        return _tx()
+
+    async def execute(self, sql, *args):
+        self.executed.append((sql, args))
+        return "INSERT 0 2" if sql.startswith("INSERT") else "OK"
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, list(records), columns))
+
+    async def fetch(self, sql):
+        self.fetched.append(sql)
+        if "fim_recurso" in sql:
+            return [{"linha": n} for n in self.conflitos]
+        return [{"data": date(2025, 10, 20)}]
+
+    async def close(self):
+        pass
+
+def _service(monkeypatch, conn, chunk_rows=2):
+    async def connect(dsn):
+        return conn
+    monkeypatch.setattr(bulk_transfer.asyncpg, "connect", connect)
+    engine = SimpleNamespace(url=make_url("postgresql+asyncpg://u:p@h:5432/d"))
+    return BulkTransferService(engine, chunk_rows=chunk_rows)
+
+AGENDA_JSONL = b"\n".join([
+    b'{"user_id": 1, "servico_id": 2, "data": "2025-10-20", "hora_inicio": "09:00", "hora_fim": "09:30"}',
+    b'{"user_id": 2, "servico_id": 2, "data": "2025-10-20", "hora_inicio": "09:15", "hora_fim": "09:45"}',
+    b'{"user_id": 3, "servico_id": 2, "data": "2025-10-20", "hora_inicio": "10:00", "hora_fim": "10:30", "status": "concluido"}',
+])
+
+@pytest.mark.asyncio
+async def test_agenda_import_is_chunked_typed_and_defaulted(monkeypatch):
+    conn = _FakeConn()
+    progresso = []
+    report = await _service(monkeypatch, conn).import_rows(
+        "agenda", "jsonl", _blocos(AGENDA_JSONL, 10), on_progress=progresso.append)
+
+    assert [len(lote) for _, lote, _ in conn.copies] == [2, 1] and progresso == [2, 3]
+    colunas = conn.copies[0][2]
+    primeiro = dict(zip(colunas, conn.copies[0][1][0]))
+    assert "agenda_id" not in colunas and primeiro["linha"] == 1
+    assert primeiro["hora_inicio"] == time(9, 0) and primeiro["data"] == date(2025, 10, 20)
+    assert primeiro["status"] == "agendado" and primeiro["created_at"] is not None
+    assert report.linhas_lidas == 3 and report.linhas_importadas == 2 and report.datas == [date(2025, 10, 20)]
+    # O resumo de disponibilidade é recalculado em lote, não pelo trigger linha a linha
+    assert any("SET LOCAL agenda.importacao_em_lote" in sql for sql, _ in conn.executed)
+
+@pytest.mark.asyncio
+async def test_overlaps_abort_everything_or_are_skipped(monkeypatch):
+    conn = _FakeConn(conflitos=[2])
+    with pytest.raises(BulkImportError) as erro:
+        await _service(monkeypatch, conn).import_rows("agenda", "jsonl", _blocos(AGENDA_JSONL, 64))
+    assert erro.value.report.linhas_em_conflito == [2]
+    assert not any(sql.startswith("INSERT") for sql, _ in conn.executed)
+
+    conn = _FakeConn(conflitos=[2])
+    report = await _service(monkeypatch, conn).import_rows(
+        "agenda", "jsonl", _blocos(AGENDA_JSONL, 64), on_conflict="skip")
+    assert report.conflitos == 1
+    assert ("DELETE FROM _importacao_agenda WHERE linha = ANY($1::bigint[])", ([2],)) in conn.executed
+
+class _AgendaConn(_FakeConn):
+    """
+    Guarda o que foi copiado para a staging e responde à validação com a regra de conflito
+    (mesma data, horários sobrepostos, mesmo profissional ou um dos dois sem profissional),
+    comparando com os anteriores do arquivo e com a agenda atual.
+    """
+    def __init__(self, agenda_atual=()):
+        super().__init__()
+        self.agenda_atual = list(agenda_atual)    # (data, início, fim, profissional_id)
+        self.staging = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.staging += [dict(zip(columns, r)) for r in records]
+
+    @staticmethod
+    def _conflita(a, b):
+        return (a['data'] == b['data'] and a['hora_inicio'] < b['hora_fim'] and b['hora_inicio'] < a['hora_fim']
+                and (a['profissional_id'] is None or b['profissional_id'] is None
+                     or a['profissional_id'] == b['profissional_id']))
+
+    async def fetch(self, sql):
+        if "fim_recurso" not in sql:
+            return [{"data": d} for d in sorted({r['data'] for r in self.staging})]
+        ativos = sorted((r for r in self.staging if r['status'] in ('agendado', 'concluido'))
+                        , key=lambda r: (r['data'], r['hora_inicio'], r['linha']))
+        atuais = [dict(zip(('data', 'hora_inicio', 'hora_fim', 'profissional_id'), a)) for a in self.agenda_atual]
+        return [{"linha": r['linha']} for i, r in enumerate(ativos)
+                if any(self._conflita(r, o) for o in ativos[:i] + atuais)]
+
+    async def execute(self, sql, *args):
+        self.executed.append((sql, args))
+        if sql.startswith("DELETE"):
+            self.staging = [r for r in self.staging if r['linha'] not in args[0]]
+        return f"INSERT 0 {len(self.staging)}" if sql.startswith("INSERT") else "OK"
+
+def _agenda_jsonl(*linhas) -> bytes:
+    return "\n".join(json.dumps({"user_id": u, "servico_id": 2, "data": "2025-10-20", "hora_inicio": i, "hora_fim": f
+                                 , "profissional_id": p}) for u, i, f, p in linhas).encode()
+
+@pytest.mark.asyncio
+async def test_import_without_professional_is_rejected_against_everyone(monkeypatch):
+    arquivo = _agenda_jsonl(
+        (1, "09:00", "09:30", 1)
+        , (2, "09:00", "09:30", 2)        # Outro profissional no mesmo horário: livre
+        , (3, "09:15", "09:45", None)     # Sem profissional: conflita com os dois acima
+        , (4, "11:00", "11:30", 1)        # Conflita com o agendamento legado (sem profissional) já salvo
+        , (5, "12:00", "12:30", 2))
+    legado = [(date(2025, 10, 20), time(11, 0), time(12, 0), None)]
+
+    conn = _AgendaConn(legado)
+    with pytest.raises(BulkImportError) as erro:
+        await _service(monkeypatch, conn).import_rows("agenda", "jsonl", _blocos(arquivo, 64))
+    assert erro.value.report.linhas_em_conflito == [3, 4]
+    assert not any(sql.startswith("INSERT") for sql, _ in conn.executed)
+
+    conn = _AgendaConn(legado)
+    report = await _service(monkeypatch, conn).import_rows("agenda", "jsonl", _blocos(arquivo, 64), on_conflict="skip")
+    assert report.conflitos == 2 and report.linhas_importadas == 3
+    assert [r['user_id'] for r in conn.staging] == [1, 2, 5]
+
+@pytest.mark.asyncio
+async def test_undecodable_or_malformed_files_report_the_line(monkeypatch):
+    latin1 = "nome,descricao\nBarba,Navalha\nEscova,Progressiva e hidratação\n".encode("latin-1")
+    with pytest.raises(BulkImportError, match="Linha 3: o arquivo deve estar em UTF-8"):
+        await _service(monkeypatch, _FakeConn()).import_rows("servicos", "csv", _blocos(latin1, 7))
+
+    with pytest.raises(BulkImportError, match="Linha 2: CSV inválido"):
+        await _service(monkeypatch, _FakeConn()).import_rows(
+            "servicos", "csv", _blocos(b'nome,descricao\n"Barba"x,y\n', 64))
+
+    with pytest.raises(BulkImportError, match="aspas abertas"):
+        await _service(monkeypatch, _FakeConn()).import_rows(
+            "servicos", "csv", _blocos(b'nome,descricao\nBarba,"sem fim\n', 64))
+
+@pytest.mark.asyncio
+async def test_overlap_check_uses_the_bot_resource_rule(monkeypatch):
+    from src.database.models.agenda_model import agenda_resource_conflict
+
+    conn = _FakeConn()
+    await _service(monkeypatch, conn).import_rows("agenda", "jsonl", _blocos(AGENDA_JSONL, 64))
+    validacao = next(sql for sql in conn.fetched if "fim_recurso" in sql)
+    # Sem profissional bloqueia todos: contra a agenda atual e dentro do arquivo
+    assert agenda_resource_conflict('n.profissional_id') in validacao
+    assert "WHEN n.profissional_id IS NULL THEN n.fim_dia" in validacao
+
+@pytest.mark.asyncio
+async def test_catalog_import_upserts_and_reports_bad_values(monkeypatch):
+    csv = b"servico_id,nome,preco,duracao_minutos,ativo\n7,Barba,25.50,30,sim\n"
+    conn = _FakeConn()
+    await _service(monkeypatch, conn).import_rows("servicos", "csv", _blocos(csv, 64))
+    registro = dict(zip(conn.copies[0][2], conn.copies[0][1][0]))
+    assert registro["preco"] == Decimal("25.50") and registro["ativo"] is True
+    insert = next(sql for sql, _ in conn.executed if sql.startswith("INSERT"))
+    assert "DISTINCT ON (servico_id)" in insert and "ON CONFLICT (servico_id) DO UPDATE" in insert
+
+    with pytest.raises(BulkImportError, match="Linha 2: valor inválido para 'preco'"):
+        await _service(monkeypatch, _FakeConn()).import_rows(
+            "servicos", "csv", _blocos(b"servico_id,nome,preco\n7,Barba,caro\n", 64))
+
+def test_only_known_tables_are_exposed():
+    assert set(BULK_TABLES) == {"usuarios", "servicos", "agenda"}
+    with pytest.raises(LookupError):
+        BulkTransferService.spec("mensagem")
@@ -0,0 +1,97 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time
+
+import pytest
+
+from src.services import business_calendar
+from src.services.availability_engine import DayAvailability, business_window
+from src.services.appointment_validator import AppointmentValidator
+from src.services.business_calendar import BusinessCalendar, CalendarSnapshot, active_calendar
+from src.services.scheduler_service import SchedulerService
+
+SEGUNDA = date(2030, 10, 21)
+TERCA = date(2030, 10, 22)
+DOMINGO = date(2030, 10, 27)
+
+@pytest.fixture(autouse=True)
+def _restaura_calendario():
+    original = active_calendar()
+    yield
+    business_calendar.set_active_calendar(original)
+
+def _publica(weekly, exceptions=None):
+    business_calendar.set_active_calendar(CalendarSnapshot(weekly, exceptions, start=SEGUNDA, horizon_days=30))
+
+def test_default_calendar_matches_business_hours():
+    assert business_window(SEGUNDA) == (9 * 60, 22 * 60)
+    assert business_window(DOMINGO) is None
+
+def test_exceptions_override_the_weekly_grid():
+    _publica({0: [(9 * 60, 12 * 60), (13 * 60, 18 * 60)], 1: [(9 * 60, 18 * 60)]}
+             , {TERCA: ([], "Feriado"), DOMINGO: ([(10 * 60, 14 * 60)], "Abertura especial")})
+
+    segunda = active_calendar().day(SEGUNDA)
+    assert segunda.window == (9 * 60, 18 * 60)
+    assert segunda.breaks == ((time(12, 0), time(13, 0), None),)
+    assert segunda.fits(11 * 60 + 30, 30) and not segunda.fits(11 * 60 + 30, 60)
+
+    terca = active_calendar().day(TERCA)
+    assert not terca.is_open and terca.descricao == "Feriado"
+    assert business_window(DOMINGO) == (10 * 60, 14 * 60)
+    # Fora do horizonte pré-calculado: compilado na hora com a mesma grade
+    assert business_window(date(2031, 6, 2)) == (9 * 60, 18 * 60)
+
+class _Repo:
+    async def verificar_disponibilidade(self, data):
+        return []
+
+@pytest.mark.asyncio
+async def test_breaks_are_never_offered_nor_accepted():
+    _publica({0: [(9 * 60, 12 * 60), (13 * 60, 18 * 60)]})
+
+    day = await SchedulerService(_Repo()).get_day_availability(SEGUNDA)
+    horarios = day.available_times(60)
+    assert "11:00" in horarios and "11:30" not in horarios and "12:00" not in horarios and "13:00" in horarios
+    assert DayAvailability.for_date(SEGUNDA, []).available_times(60) == horarios
+
+    ok, _ = SchedulerService(_Repo()).check_booking_rules(SEGUNDA.isoformat(), "11:30", 60)
+    assert not ok
+
+def test_validator_reports_holidays_and_breaks():
+    _publica({0: [(9 * 60, 12 * 60), (13 * 60, 18 * 60)]}, {TERCA: ([], "Feriado municipal")})
+    validator = AppointmentValidator()
+
+    assert "Feriado municipal" in validator.validate_business_hours(datetime.combine(TERCA, time(10, 0)))
+    assert validator.validate_business_hours(datetime.combine(SEGUNDA, time(12, 30)))
+    assert validator.validate_business_hours(datetime.combine(SEGUNDA, time(13, 0))) == ""
+
+class _FakeCalendarioRepo:
+    grade = {}
+    excecoes = {}
+
+    def __init__(self, session):
+        pass
+
+    async def listar_grade_semanal(self):
+        return dict(self.grade)
+
+    async def listar_excecoes(self, desde):
+        return dict(self.excecoes)
+
+@asynccontextmanager
+async def _session():
+    yield None
+
+@pytest.mark.asyncio
+async def test_refresh_hot_swaps_the_active_calendar_only_on_change(monkeypatch):
+    monkeypatch.setattr(business_calendar, "CalendarioRepository", _FakeCalendarioRepo)
+    calendar = BusinessCalendar(session_maker=_session)
+
+    await calendar.start()                              # grade vazia no banco: BUSINESS_HOURS
+    assert business_window(SEGUNDA) == (9 * 60, 22 * 60)
+    assert not await calendar.refresh()
+
+    _FakeCalendarioRepo.excecoes = {SEGUNDA: ([], "Reforma")}
+    assert await calendar.refresh()
+    assert business_window(SEGUNDA) is None and business_window(TERCA) == (9 * 60, 22 * 60)
+    _FakeCalendarioRepo.excecoes = {}
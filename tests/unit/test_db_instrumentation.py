@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.bot.update_processor import InstrumentedUpdateProcessor
+from src.database.instrumentation import DbInstrumentation
+
+@pytest.fixture
+def instrumented():
+    # Engine síncrono em memória: os eventos são os mesmos do sync_engine de um AsyncEngine
+    sync_engine = create_engine("sqlite://")
+    instrumentation = DbInstrumentation(SimpleNamespace(sync_engine=sync_engine), repeat_threshold=3)
+    instrumentation.install()
+    yield instrumentation, sync_engine
+    instrumentation.uninstall()
+
+def test_track_counts_queries_and_flags_repeated_statements(instrumented):
+    instrumentation, engine = instrumented
+
+    with engine.connect() as conn, instrumentation.track("update 1") as stats:
+        for i in range(3):
+            conn.execute(text("SELECT :x"), {"x": i})
+        conn.execute(text("SELECT 1"))
+
+    assert stats.queries == 4
+    assert stats.repeated() == [("SELECT ?", 3, 3)]
+
+    metrics = instrumentation.metrics.snapshot()
+    assert metrics["updates"] == 1 and metrics["queries"] == 4
+    assert metrics["updates_with_repeated_statements"] == 1
+    assert {t["statement"]: t["count"] for t in metrics["top_statements"]} == {"SELECT ?": 3, "SELECT 1": 1}
+
+def test_queries_outside_an_update_are_untracked(instrumented):
+    instrumentation, engine = instrumented
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert instrumentation.metrics.snapshot()["untracked_queries"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_are_attributed_separately(instrumented):
+    instrumentation, engine = instrumented
+    processor = InstrumentedUpdateProcessor(instrumentation, max_concurrent_updates=2)
+    vistos = {}
+
+    async def handler(n):
+        with engine.connect() as conn:
+            for _ in range(n):
+                conn.execute(text("SELECT 1"))
+                await asyncio.sleep(0)  # intercala com a outra update
+
+    async def run(nome, n):
+        with instrumentation.track(nome) as stats:
+            await handler(n)
+        vistos[nome] = stats.queries
+
+    await asyncio.gather(run("a", 2), run("b", 5))
+    assert vistos == {"a": 2, "b": 5}
+
+    await processor.process_update(SimpleNamespace(), handler(1))
+    assert instrumentation.metrics.snapshot()["updates"] == 3
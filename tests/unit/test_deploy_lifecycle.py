@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from telegram import Update
+
+from src.bot.lifecycle import BacklogCatchUp, drain
+from src.bot.update_processor import InstrumentedUpdateProcessor
+from src.platform.telegram.webhook import IngestionConfig
+
+AGORA = datetime(2025, 10, 20, 12, 0, tzinfo=timezone.utc)
+
+def _msg(update_id, user_id, text, minutos_atras=1):
+    return Update.de_json({"update_id": update_id, "message": {
+        "message_id": update_id, "date": int((AGORA - timedelta(minutes=minutos_atras)).timestamp()),
+        "chat": {"id": user_id, "type": "private"}, "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+        "text": text, "entities": [{"type": "bold", "offset": 0, "length": 1}]}}, None)
+
+def _callback(update_id, user_id):
+    return Update.de_json({"update_id": update_id, "callback_query": {
+        "id": str(update_id), "chat_instance": "x", "data": "confirmar",
+        "from": {"id": user_id, "is_bot": False, "first_name": "U"}}}, None)
+
+def test_plan_skips_stale_messages_and_collapses_bursts_per_user():
+    updates = [
+        _msg(1, 10, "mensagem de ontem", minutos_atras=60 * 24),
+        _msg(2, 10, "oi"), _msg(3, 20, "bom dia"), _msg(4, 10, "quero cortar"),
+        _callback(5, 10), _msg(6, 10, "amanhã"), _msg(7, 20, "/start"),
+    ]
+    report = BacklogCatchUp(max_age_seconds=15 * 60).plan(updates, now=AGORA)
+
+    assert (report.fetched, report.skipped_old, report.collapsed, report.processed) == (7, 1, 1, 5)
+    por_usuario = {}
+    for u in report.updates:
+        por_usuario.setdefault(u.effective_user.id, []).append(u.message.text if u.message else "botão")
+    assert por_usuario == {10: ["oi\nquero cortar", "botão", "amanhã"], 20: ["bom dia", "/start"]}
+    juntada = report.updates[0]
+    assert juntada.update_id == 4 and juntada.message.entities == ()
+
+class _BacklogBot:
+    def __init__(self, pendentes):
+        self.pendentes = pendentes
+        self.chamadas = []
+
+    async def delete_webhook(self, drop_pending_updates):
+        assert drop_pending_updates is False
+
+    async def get_updates(self, offset=None, timeout=0, limit=100, allowed_updates=None):
+        self.chamadas.append(offset)
+        if offset is not None:
+            self.pendentes = [u for u in self.pendentes if u.update_id >= offset]
+        return self.pendentes[:limit]
+
+@pytest.mark.asyncio
+async def test_fetch_confirms_backlog_up_to_the_limit():
+    bot = _BacklogBot([_msg(i, 10, f"m{i}") for i in range(1, 251)])
+    lidas = await BacklogCatchUp(max_updates=120).fetch(bot)
+
+    assert [u.update_id for u in lidas] == list(range(1, 121))
+    assert bot.chamadas == [None, 101, 121] and bot.pendentes[0].update_id == 121
+
+    todas = await BacklogCatchUp().fetch(_BacklogBot([_msg(1, 10, "a"), _msg(2, 10, "b")]))
+    assert len(todas) == 2
+
+def _application(processor):
+    return SimpleNamespace(update_queue=asyncio.Queue(), update_processor=processor, updater=None)
+
+async def _enfileirar(app, processor, update, coroutine):
+    await app.update_queue.put(update)
+    app.update_queue.get_nowait()
+
+    async def wrapper():
+        try:
+            await processor.process_update(update, coroutine)
+        finally:
+            app.update_queue.task_done()
+    return asyncio.create_task(wrapper())
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_updates_then_cancels_after_deadline():
+    processor = InstrumentedUpdateProcessor(SimpleNamespace(track=lambda label: nullcontext()), max_concurrent_updates=4)
+    app = _application(processor)
+    concluidas = []
+
+    async def handler(nome, pausa):
+        await asyncio.sleep(pausa)
+        concluidas.append(nome)
+
+    await _enfileirar(app, processor, _msg(1, 10, "a"), handler("rapida", 0.01))
+    assert await drain(app, IngestionConfig(), timeout=1) is True
+    assert concluidas == ["rapida"]
+
+    lenta = await _enfileirar(app, processor, _msg(2, 10, "b"), handler("lenta", 10))
+    await asyncio.sleep(0)
+    assert await drain(app, IngestionConfig(), timeout=0.05) is False
+    await asyncio.wait_for(app.update_queue.join(), 1)
+    assert lenta.done() and concluidas == ["rapida"]
@@ -0,0 +1,64 @@
+import random
+from datetime import date, time
+
+import pytest
+
+from src.database.repositories.agenda_repo import AgendaRepository, expand_summary
+from src.services.availability_engine import DayAvailability, ResourceDayAvailability, business_window
+
+SEGUNDA = date(2025, 10, 20)
+JANELA = business_window(SEGUNDA)
+
+def _t(minuto: int) -> time:
+    return time(minuto // 60, minuto % 60)
+
+def _resumo(bookings) -> dict[int, list[int]]:
+    """O que o trigger grava: por recurso, os blocos fundidos (range_agg) achatados em [início, fim, ...]."""
+    por_recurso: dict[int, list[list[int]]] = {}
+    for inicio, fim, dono in sorted(bookings, key=lambda b: (b[0], b[1])):
+        blocos = por_recurso.setdefault(dono or 0, [])
+        if blocos and inicio <= blocos[-1][1]:
+            blocos[-1][1] = max(blocos[-1][1], fim)
+        else:
+            blocos.append([inicio, fim])
+    return {rid: [m for bloco in blocos for m in bloco] for rid, blocos in por_recurso.items()}
+
+def test_expand_summary_restores_bookings_and_legacy_resource():
+    assert expand_summary(0, [540, 600, 660, 690]) == [(time(9, 0), time(10, 0), None), (time(11, 0), time(11, 30), None)]
+    assert expand_summary(7, [1380, 1439]) == [(time(23, 0), time(23, 59), 7)]
+
+def test_summary_blocks_give_the_same_availability_as_raw_bookings():
+    rng = random.Random(11)
+    recursos = [(1, JANELA), (2, (12 * 60, 20 * 60))]
+    for _ in range(100):
+        bookings = []
+        for _ in range(rng.randint(0, 30)):
+            inicio = rng.randrange(9 * 60, 21 * 60, 15)
+            bookings.append((inicio, inicio + rng.choice([15, 30, 45, 60]), rng.choice([1, 2, None])))
+        resumo = [b for rid, v in _resumo(bookings).items() for b in expand_summary(rid, v)]
+        crus = [(_t(a), _t(b), d) for a, b, d in bookings]
+
+        duracao = rng.choice([30, 60, 90])
+        assert (DayAvailability(SEGUNDA, resumo, JANELA).free_starts(duracao).tolist()
+                == DayAvailability(SEGUNDA, crus, JANELA).free_starts(duracao).tolist())
+        assert (ResourceDayAvailability(SEGUNDA, resumo, JANELA, recursos).free_starts(duracao).tolist()
+                == ResourceDayAvailability(SEGUNDA, crus, JANELA, recursos).free_starts(duracao).tolist())
+
+class _FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self.rows
+
+@pytest.mark.asyncio
+async def test_day_occupancy_is_a_single_summary_lookup():
+    session = _FakeSession([(2, [720, 780]), (0, [540, 600])])
+    repo = AgendaRepository(session)
+
+    assert await repo.verificar_disponibilidade("2025-10-20") == [
+        (time(9, 0), time(10, 0), None), (time(12, 0), time(13, 0), 2)]
+    assert len(session.statements) == 1
+    assert "FROM disponibilidade_resumo" in str(session.statements[0])
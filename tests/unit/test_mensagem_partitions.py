@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+
+from src.database.repositories.mensagem_partition_repo import (
+    add_months, month_start, partition_name, parse_partition_month)
+from src.services.message_retention_service import MessageRetentionService
+
+# -----------------------------
+# Helpers de calendário
+# -----------------------------
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2025, 11, 20), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+    assert month_start(date(2025, 10, 18)) == date(2025, 10, 1)
+
+def test_partition_name_roundtrip():
+    name = partition_name(date(2025, 3, 1))
+    assert name == "mensagem_p2025_03"
+    assert parse_partition_month(name) == date(2025, 3, 1)
+    assert parse_partition_month("mensagem_default") is None
+    assert parse_partition_month("mensagem_p2025_03; DROP TABLE usuarios") is None
+
+# -----------------------------
+# Janela de retenção
+# -----------------------------
+@pytest.mark.parametrize("name, expired", [
+    ("mensagem_p2025_06", True),
+    ("mensagem_p2025_07", False),   # limite: 3 meses antes de outubro
+    ("mensagem_p2025_10", False),
+    ("usuarios", False),
+])
+def test_retention_window(name, expired):
+    service = MessageRetentionService(session_maker=None, retention_months=3)
+    assert service._is_expired(name, date(2025, 10, 18)) is expired
+
+# -----------------------------
+# Banco antigo (mensagem sem particionamento)
+# -----------------------------
+class _FakeSession:
+    def __init__(self):
+        self.ddl = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def scalar(self, stmt):
+        return False    # pg_partitioned_table não tem `mensagem`
+
+    async def execute(self, stmt):
+        self.ddl.append(str(stmt))
+
+@pytest.mark.asyncio
+async def test_non_partitioned_table_skips_maintenance_without_ddl():
+    session = _FakeSession()
+    service = MessageRetentionService(session_maker=lambda: session)
+
+    assert await service.ensure_partitions(date(2025, 10, 18)) == []
+    assert await service.archive_expired_partitions(date(2025, 10, 18)) == []
+    assert session.ddl == []
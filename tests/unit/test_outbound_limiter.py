@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from telegram.error import RetryAfter
+
+from src.platform.telegram.outbound_limiter import OutboundPriority, OutboundRateLimiter, TokenBucket
+
+def test_token_bucket_allows_burst_then_spaces_reservations():
+    bucket = TokenBucket(rate=2, capacity=2, now=0.0)
+    assert [bucket.reserve(0.0) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    assert bucket.wait_time(1.0) == pytest.approx(0.5)
+
+def _send(limiter, ordem, chat_id, nome, priority=None):
+    async def callback():
+        ordem.append(nome)
+        return True
+    rate_limit_args = {'priority': priority} if priority is not None else None
+    return limiter.process_request(callback, (), {}, 'sendMessage', {'chat_id': chat_id, 'text': nome}, rate_limit_args)
+
+@pytest.mark.asyncio
+async def test_interactive_replies_jump_ahead_of_queued_bulk_sends():
+    loop = asyncio.get_running_loop()
+    liberado = asyncio.Event()
+    # Relógio parado em 0 até a resposta entrar na fila: só a primeira notificação (rajada de 1) sai antes
+    limiter = OutboundRateLimiter(global_rate=200, global_burst=1, chat_rate=1000, chat_burst=10
+                                  , clock=lambda: loop.time() if liberado.is_set() else 0.0)
+    ordem = []
+    bulk = [asyncio.create_task(_send(limiter, ordem, 100 + i, f"bulk{i}", OutboundPriority.BULK)) for i in range(6)]
+    while not ordem:
+        await asyncio.sleep(0)
+    interativa = asyncio.create_task(_send(limiter, ordem, 1, "resposta"))
+    while limiter.snapshot()["queued_global"] < 6:    # As 5 notificações restantes + a resposta
+        await asyncio.sleep(0)
+    liberado.set()
+    await asyncio.gather(interativa, *bulk)
+
+    assert ordem == ["bulk0", "resposta", "bulk1", "bulk2", "bulk3", "bulk4", "bulk5"]
+    metricas = limiter.snapshot()
+    assert metricas["interactive"]["sent"] == 1 and metricas["bulk"]["sent"] == 6
+    assert metricas["bulk"]["waiting"] == 0 and metricas["queued_global"] == 0
+
+@pytest.mark.asyncio
+async def test_per_chat_bucket_spaces_messages_to_the_same_chat_only():
+    limiter = OutboundRateLimiter(global_rate=1000, global_burst=100, chat_rate=20, chat_burst=1)
+    ordem = []
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    await asyncio.gather(_send(limiter, ordem, 1, "a1"), _send(limiter, ordem, 1, "a2"), _send(limiter, ordem, 2, "b1"))
+    assert ordem.index("b1") < ordem.index("a2") and ordem.index("a1") < ordem.index("a2")
+    assert loop.time() - inicio >= 0.045
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_everything_and_retries():
+    limiter = OutboundRateLimiter(global_rate=1000, global_burst=100, chat_rate=1000, chat_burst=10, max_retries=1)
+    chamadas = []
+
+    async def flood():
+        chamadas.append(asyncio.get_running_loop().time())
+        if len(chamadas) == 1:
+            raise RetryAfter(0.05)
+        return True
+
+    assert await limiter.process_request(flood, (), {}, 'sendMessage', {'chat_id': 5}, None) is True
+    assert chamadas[1] - chamadas[0] >= 0.045 and limiter.snapshot()["retry_after"] == 1
+
+    async def sempre_flood():
+        raise RetryAfter(0.01)
+    with pytest.raises(RetryAfter):
+        await limiter.process_request(sempre_flood, (), {}, 'sendMessage', {'chat_id': 5}, None)
+
+@pytest.mark.asyncio
+async def test_calls_without_chat_are_not_limited():
+    limiter = OutboundRateLimiter(global_rate=0.001, global_burst=1)
+
+    async def get_updates():
+        return []
+    for _ in range(3):
+        assert await asyncio.wait_for(limiter.process_request(get_updates, (), {}, 'getUpdates', {}, None), 0.1) == []
+
+@pytest.mark.asyncio
+async def test_bulk_sender_behind_the_limiter_does_not_retry_twice():
+    from src.platform.telegram.rate_limited_sender import RateLimitedSender
+
+    limiter = OutboundRateLimiter(global_rate=1000, global_burst=100, chat_rate=1000, chat_burst=10, max_retries=2)
+    chamadas = []
+
+    class _Bot:
+        async def send_message(self, chat_id, text, rate_limit_args=None):
+            async def flood():
+                chamadas.append(chat_id)
+                raise RetryAfter(0)
+            return await limiter.process_request(flood, (), {}, 'sendMessage', {'chat_id': chat_id}, rate_limit_args)
+
+    sender = RateLimitedSender(rate_per_second=1000, max_retries=0, rate_limit_args={'priority': OutboundPriority.BULK})
+    assert await sender.send(_Bot(), 9, "aviso") is False
+    assert len(chamadas) == 3       # Só as tentativas do limiter (1 + max_retries), não 3 x 3
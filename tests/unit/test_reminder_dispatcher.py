@@ -0,0 +1,163 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from telegram.error import Forbidden, TelegramError
+
+from src.database.read_models import LembreteDTO
+from src.platform.telegram.rate_limited_sender import RateLimitedSender
+from src.services.reminder_dispatcher import ReminderDispatcher
+from src.utils.constants import REMINDER_MAX_ATTEMPTS
+from src.utils.timer_wheel import TimerWheel
+
+# -----------------------------
+# Roda de temporização
+# -----------------------------
+def test_wheel_matches_sorted_oracle_across_laps():
+    rng = random.Random(7)
+    wheel, oracle = TimerWheel(tick_seconds=1.0, slots=8), {}
+    agora = 1000.0
+    for _ in range(300):
+        key = rng.randrange(60)
+        due = agora + rng.uniform(-3, 40)
+        if wheel.schedule(key, due, key):
+            oracle[key] = due
+        agora += rng.uniform(0, 2.5)
+        esperados = sorted((d, k) for k, d in oracle.items() if d <= agora)
+        assert wheel.advance(agora) == [k for _, k in esperados]
+        for _, k in esperados:
+            del oracle[k]
+    assert len(wheel) == len(oracle)
+
+def test_wheel_deduplicates_and_cancels():
+    wheel = TimerWheel(tick_seconds=1.0, slots=4)
+    assert wheel.schedule("a", 10.5, "a") and not wheel.schedule("a", 11, "outro")
+    assert wheel.schedule("b", 10.2, "b") and wheel.cancel("b") and "b" not in wheel
+    assert wheel.advance(10.4) == [] and wheel.advance(10.6) == ["a"]
+
+# -----------------------------
+# Dispatcher
+# -----------------------------
+HOJE = date(2025, 10, 20)
+
+class _FakePersistence:
+    def __init__(self, pendentes, ja_reservados=()):
+        self.pendentes = pendentes
+        self.ja_reservados = set(ja_reservados)
+        self.registrados = []
+        self.consultas = []
+
+    async def listar_lembretes_pendentes(self, inicio, fim, lease_cutoff, limite):
+        self.consultas.append((inicio, fim, limite))
+        return list(self.pendentes)
+
+    async def reservar_lembretes(self, ids, agora, lease_cutoff):
+        reservados = [i for i in ids if i not in self.ja_reservados]
+        self.ja_reservados.update(reservados)
+        return reservados
+
+    async def registrar_lembretes(self, ids, status, agora):
+        self.registrados.append((status, sorted(ids)))
+        return len(ids)
+
+class _FakeBot:
+    def __init__(self, bloqueados=()):
+        self.sent = []
+        self.bloqueados = set(bloqueados)
+
+    async def send_message(self, chat_id, text):
+        if chat_id in self.bloqueados:
+            raise Forbidden("blocked")
+        self.sent.append((chat_id, text))
+
+def _lembrete(agenda_id, user_id, hora):
+    return LembreteDTO(agenda_id=agenda_id, user_id=user_id, servico="Corte", data=HOJE, hora_inicio=hora)
+
+def _dispatcher(persistence, relogio):
+    return ReminderDispatcher(persistence, RateLimitedSender(rate_per_second=1000)
+                              , lead_minutes=60, poll_seconds=60, clock=lambda: relogio[0])
+
+@pytest.mark.asyncio
+async def test_window_reload_does_not_schedule_twice():
+    persistence = _FakePersistence([_lembrete(1, 10, time(10, 0)), _lembrete(2, 20, time(10, 30))])
+    relogio = [datetime(2025, 10, 20, 8, 59).timestamp()]
+    dispatcher = _dispatcher(persistence, relogio)
+
+    assert await dispatcher.load_window() == 2
+    assert await dispatcher.load_window() == 0
+    inicio, fim, _ = persistence.consultas[0]
+    assert fim - inicio == timedelta(minutes=62)
+
+    assert dispatcher.pop_due() == []
+    relogio[0] = datetime(2025, 10, 20, 9, 0).timestamp()
+    assert [l.agenda_id for l in dispatcher.pop_due()] == [1]
+
+@pytest.mark.asyncio
+async def test_only_claimed_reminders_are_sent_and_outcome_is_recorded():
+    lembretes = [_lembrete(1, 10, time(10, 0)), _lembrete(2, 20, time(10, 0)), _lembrete(3, 30, time(10, 0))]
+    persistence = _FakePersistence(lembretes, ja_reservados={2})
+    relogio = [datetime(2025, 10, 20, 9, 0).timestamp()]
+    bot = _FakeBot(bloqueados={30})
+
+    entregues = await _dispatcher(persistence, relogio).deliver(bot, lembretes)
+
+    assert entregues == 1
+    assert bot.sent == [(10, "⏰ Lembrete: seu horário de Corte é hoje às 10:00. Até logo!")]
+    assert persistence.registrados == [("bloqueado", [3]), ("enviado", [1])]
+    # Um segundo processo com o mesmo lote não reenvia nada
+    assert await _dispatcher(persistence, relogio).deliver(_FakeBot(), lembretes) == 0
+
+class _AgendaLembretes:
+    """Emula o predicado de _lembrete_pendente e a reserva do AgendaRepository sobre linhas em memória."""
+    def __init__(self, lembretes):
+        self.lembretes = {l.agenda_id: l for l in lembretes}
+        self.linhas = {l.agenda_id: {"status": None, "em": None, "tentativas": 0} for l in lembretes}
+
+    def _pendente(self, agenda_id, lease_cutoff):
+        linha = self.linhas[agenda_id]
+        return linha["status"] is None or (linha["status"] in ("enviando", "falhou")
+                                           and linha["em"] < lease_cutoff
+                                           and linha["tentativas"] < REMINDER_MAX_ATTEMPTS)
+
+    async def listar_lembretes_pendentes(self, inicio, fim, lease_cutoff, limite):
+        return [l for i, l in self.lembretes.items() if self._pendente(i, lease_cutoff)][:limite]
+
+    async def reservar_lembretes(self, ids, agora, lease_cutoff):
+        reservados = [i for i in ids if self._pendente(i, lease_cutoff)]
+        for i in reservados:
+            self.linhas[i].update(status="enviando", em=agora, tentativas=self.linhas[i]["tentativas"] + 1)
+        return reservados
+
+    async def registrar_lembretes(self, ids, status, agora):
+        for i in ids:
+            if self.linhas[i]["status"] == "enviando":
+                self.linhas[i].update(status=status, em=agora)
+        return len(ids)
+
+class _FlakyBot(_FakeBot):
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        if chat_id in self.bloqueados:
+            raise Forbidden("blocked")
+        raise TelegramError("timeout")
+
+@pytest.mark.asyncio
+async def test_failed_reminders_are_retried_until_attempts_run_out():
+    persistence = _AgendaLembretes([_lembrete(1, 10, time(10, 0)), _lembrete(2, 20, time(10, 0))])
+    relogio = [datetime(2025, 10, 20, 9, 0).timestamp()]
+    dispatcher = _dispatcher(persistence, relogio)
+    bot = _FlakyBot(bloqueados={20})
+
+    for tentativa in range(REMINDER_MAX_ATTEMPTS):
+        pendentes = [l.agenda_id for l in await persistence.listar_lembretes_pendentes(
+            dispatcher._now(), None, dispatcher._now() - dispatcher.lease, 10)]
+        # O bloqueado sai na primeira tentativa; o que falhou volta depois de cada lease
+        assert pendentes == ([1, 2] if tentativa == 0 else [1])
+        assert await dispatcher.deliver(bot, [persistence.lembretes[i] for i in pendentes]) == 0
+        relogio[0] += dispatcher.lease.total_seconds() + 1
+
+    assert await persistence.listar_lembretes_pendentes(dispatcher._now(), None, dispatcher._now() - dispatcher.lease, 10) == []
+    assert await dispatcher.deliver(bot, list(persistence.lembretes.values())) == 0
+    assert [chat_id for chat_id, _ in bot.sent].count(10) == REMINDER_MAX_ATTEMPTS
+    assert [chat_id for chat_id, _ in bot.sent].count(20) == 1
+    assert persistence.linhas[1]["status"] == "falhou" and persistence.linhas[2]["status"] == "bloqueado"
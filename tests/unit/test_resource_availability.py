@@ -0,0 +1,66 @@
+import random
+from datetime import date, time
+
+from src.database.read_models import ProfissionalDTO
+from src.services.availability_engine import ResourceDayAvailability, business_window
+from src.services.staff_roster import StaffSnapshot
+
+SEGUNDA = date(2025, 10, 20)    # 09:00 às 22:00
+JANELA = business_window(SEGUNDA)
+
+def _t(minuto: int) -> time:
+    return time(minuto // 60, minuto % 60)
+
+def _reference(recursos, bookings, duracao, step=30):
+    """Oráculo: um início serve se algum recurso está no expediente e sem conflito (próprio ou legado)."""
+    livres = []
+    for inicio in range(JANELA[0], JANELA[1] - duracao + 1, step):
+        fim = inicio + duracao
+        for rid, (ini_r, fim_r) in recursos:
+            if inicio < ini_r or fim > fim_r:
+                continue
+            if all(not (inicio < b and fim > a) for a, b, dono in bookings if dono in (rid, None)):
+                livres.append(inicio)
+                break
+    return livres
+
+def test_resource_matrix_matches_per_resource_reference():
+    rng = random.Random(3)
+    for _ in range(150):
+        recursos = []
+        for rid in range(1, rng.randint(1, 5) + 1):
+            inicio = rng.choice([9, 10, 12]) * 60
+            recursos.append((rid, (inicio, min(inicio + rng.choice([4, 6, 10]) * 60, JANELA[1]))))
+
+        bookings = []
+        for _ in range(rng.randint(0, 15)):
+            inicio = rng.randrange(9 * 60, 21 * 60, 15)
+            dono = rng.choice([rid for rid, _ in recursos] + [None, 99])   # 99: fora da escala do serviço
+            bookings.append((inicio, inicio + rng.choice([30, 45, 60]), dono))
+        duracao = rng.choice([30, 60, 90])
+
+        day = ResourceDayAvailability(SEGUNDA, [(_t(a), _t(b), d) for a, b, d in bookings], JANELA, recursos)
+        assert day.free_starts(duracao).tolist() == _reference(recursos, bookings, duracao)
+
+def test_candidates_prefer_the_least_loaded_free_resource():
+    recursos = [(1, JANELA), (2, JANELA), (3, (18 * 60, 22 * 60))]
+    bookings = [(time(9, 0), time(11, 0), 1), (time(14, 0), time(15, 0), 2)]
+    day = ResourceDayAvailability(SEGUNDA, bookings, JANELA, recursos)
+
+    assert day.candidates(10 * 60, 30) == [2]           # 1 ocupado, 3 fora do expediente
+    assert day.candidates(19 * 60, 30) == [3, 2, 1]     # menos minutos agendados primeiro
+    assert day.available_shifts(30) == ["Manhã", "Tarde", "Noite"]
+
+    legado = ResourceDayAvailability(SEGUNDA, [(time(9, 0), time(22, 0), None)], JANELA, recursos)
+    assert legado.available_shifts(30) == []            # sem profissional: ocupa todos
+
+def test_staff_snapshot_filters_by_skill_and_working_hours():
+    staff = StaffSnapshot([
+        ProfissionalDTO(1, "Ana", servicos=frozenset({10})),
+        ProfissionalDTO(2, "Bruno", horarios={0: (14 * 60, 23 * 60)}),   # segunda à tarde
+        ProfissionalDTO(3, "Caio", horarios={1: (9 * 60, 18 * 60)}),     # só terça
+    ])
+
+    assert staff.eligible(SEGUNDA, JANELA, servico_id=10) == [(1, JANELA), (2, (14 * 60, 22 * 60))]
+    assert staff.eligible(SEGUNDA, JANELA, servico_id=20) == [(2, (14 * 60, 22 * 60))]
+    assert staff.nome(2) == "Bruno" and not StaffSnapshot([])
@@ -0,0 +1,59 @@
+import re
+
+import src.database.models  # noqa: F401  (registra os modelos e a DDL de cada um)
+from src.database.base import _SCHEMA_UPGRADES
+
+# Comandos que podem rodar de novo sem erro num banco já atualizado
+_IDEMPOTENT = re.compile(r'IF NOT EXISTS|IF EXISTS|OR REPLACE|^\s*(SELECT|DO)\b', re.IGNORECASE)
+
+def test_every_startup_statement_is_idempotent():
+    assert _SCHEMA_UPGRADES
+    for ddl in _SCHEMA_UPGRADES:
+        assert _IDEMPOTENT.search(ddl.statement), ddl.statement
+
+def test_notify_trigger_is_installed_on_existing_databases():
+    statements = " ".join(ddl.statement for ddl in _SCHEMA_UPGRADES)
+    assert "CREATE OR REPLACE TRIGGER trg_servicos_changed" in statements
+
+def test_trigram_search_indexes_are_installed_on_existing_databases():
+    statements = [ddl.statement for ddl in _SCHEMA_UPGRADES]
+    unaccent = next(i for i, s in enumerate(statements) if "FUNCTION f_unaccent" in s)
+    indice = next(i for i, s in enumerate(statements) if "ix_servicos_nome_trgm" in s)
+    assert unaccent < indice     # O índice de expressão depende da função
+
+def test_agenda_upgrade_adds_resource_column_and_legacy_overlap_trigger():
+    from src.database.models.agenda_model import agenda_resource_conflict
+
+    statements = " ".join(ddl.statement for ddl in _SCHEMA_UPGRADES)
+    assert "ALTER TABLE agenda ADD COLUMN IF NOT EXISTS profissional_id" in statements
+    assert "CREATE OR REPLACE TRIGGER trg_agenda_sem_profissional" in statements
+    # O trigger usa o mesmo predicado de recurso da inserção do bot
+    assert agenda_resource_conflict('NEW.profissional_id') in statements
+
+def test_availability_summary_trigger_and_backfill_run_after_the_agenda_upgrade():
+    statements = [ddl.statement for ddl in _SCHEMA_UPGRADES]
+    coluna = next(i for i, s in enumerate(statements) if "ADD COLUMN IF NOT EXISTS profissional_id" in s)
+    trigger = next(i for i, s in enumerate(statements) if "CREATE OR REPLACE TRIGGER trg_agenda_resumo" in s)
+    carga = next(i for i, s in enumerate(statements) if "SELECT disponibilidade_resumo_recalcular" in s)
+    assert coluna < trigger < carga     # O trigger referencia profissional_id; a carga vem depois dele
+
+def test_reminder_columns_and_index_are_installed_on_existing_databases():
+    statements = " ".join(ddl.statement for ddl in _SCHEMA_UPGRADES)
+    for coluna in ("lembrete_status", "lembrete_em", "lembrete_tentativas"):
+        assert f"ADD COLUMN IF NOT EXISTS {coluna}" in statements
+    assert "CREATE INDEX IF NOT EXISTS ix_agenda_lembretes" in statements
+
+def test_session_sweep_index_is_installed_on_existing_databases():
+    from src.database.models.session_model import UserSession
+
+    statements = " ".join(ddl.statement for ddl in _SCHEMA_UPGRADES)
+    # Mesmo nome do índice do create_all: o IF NOT EXISTS não duplica em bancos novos
+    assert {i.name for i in UserSession.__table__.indexes} == {"ix_user_sessions_last_updated"}
+    assert "CREATE INDEX IF NOT EXISTS ix_user_sessions_last_updated ON user_sessions (last_updated)" in statements
+
+def test_agenda_date_index_is_installed_on_existing_databases():
+    from src.database.models.agenda_model import Agenda
+
+    statements = " ".join(ddl.statement for ddl in _SCHEMA_UPGRADES)
+    assert "ix_agenda_data" in {i.name for i in Agenda.__table__.indexes}
+    assert "CREATE INDEX IF NOT EXISTS ix_agenda_data ON agenda (data)" in statements
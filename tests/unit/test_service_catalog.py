@@ -0,0 +1,99 @@
+import pytest
+
+from src.services.service_catalog import CatalogSnapshot, ServiceCatalog
+
+SERVICOS = [
+    {"servico_id": 1, "nome": "Corte de Cabelo Feminino", "descricao": "Inclui lavagem e finalização.",
+     "preco": 50.0, "duracao_minutos": 45},
+    {"servico_id": 2, "nome": "Corte de Cabelo Masculino", "descricao": "Tesoura ou máquina.",
+     "preco": 35.0, "duracao_minutos": 30},
+    {"servico_id": 3, "nome": "Coloração", "descricao": "Tingimento completo do cabelo.",
+     "preco": 120.0, "duracao_minutos": 90},
+]
+
+# -----------------------------
+# Snapshot indexado
+# -----------------------------
+def test_snapshot_lookups_are_accent_and_case_insensitive():
+    snapshot = CatalogSnapshot(SERVICOS, version=1)
+
+    assert snapshot.get_by_id(3)['nome'] == "Coloração"
+    assert snapshot.get_by_name("  COLORACAO ")['servico_id'] == 3
+    assert snapshot.get_by_name("inexistente") is None
+    assert snapshot.names() == [s['nome'] for s in SERVICOS]
+
+def test_snapshot_search_uses_token_prefixes():
+    snapshot = CatalogSnapshot(SERVICOS, version=1)
+
+    assert [s['servico_id'] for s in snapshot.search("corte masc")] == [2]
+    assert [s['servico_id'] for s in snapshot.search("cabelo")] == [1, 2, 3]  # descrição também conta
+    assert snapshot.search("unha") == []
+    assert len(snapshot.search("")) == 3
+
+def test_snapshot_match_tolerates_typos_and_ranks_by_similarity():
+    snapshot = CatalogSnapshot(SERVICOS, version=1)
+
+    melhor = snapshot.match("colorasao")[0]
+    assert melhor.item['servico_id'] == 3 and melhor.score >= 0.6
+
+    ranking = snapshot.match("corte masculno", min_score=0.0)
+    assert ranking[0].item['servico_id'] == 2
+    assert ranking[0].score > ranking[1].score
+
+    # Empate entre dois serviços: quem decide é o chamador (margem de ambiguidade)
+    empate = snapshot.match("corte de cabelo", limit=2)
+    assert {m.item['servico_id'] for m in empate} == {1, 2}
+    assert empate[0].score == empate[1].score
+
+def test_snapshot_search_includes_fuzzy_matches():
+    snapshot = CatalogSnapshot(SERVICOS, version=1)
+    assert [s['servico_id'] for s in snapshot.search("coloracão")] == [3]
+    assert [s['servico_id'] for s in snapshot.search("masculno")] == [2]
+
+def test_snapshot_records_are_read_only():
+    snapshot = CatalogSnapshot(SERVICOS, version=1)
+    with pytest.raises(TypeError):
+        snapshot.get_by_id(1)['nome'] = "Outro"
+
+# -----------------------------
+# Refresh por fingerprint
+# -----------------------------
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class _FakeRepo:
+    fingerprint = "v1"
+    services = SERVICOS
+    loads = 0
+
+    def __init__(self, session):
+        pass
+
+    async def get_catalog_fingerprint(self):
+        return _FakeRepo.fingerprint
+
+    async def get_active_services(self):
+        _FakeRepo.loads += 1
+        return _FakeRepo.services
+
+@pytest.mark.asyncio
+async def test_refresh_only_publishes_when_fingerprint_changes(monkeypatch):
+    monkeypatch.setattr("src.services.service_catalog.ServicoRepository", _FakeRepo)
+    catalog = ServiceCatalog(session_maker=_FakeSession)
+    published = []
+    catalog.subscribe(lambda snap: published.append(snap.version))
+
+    await catalog.start()
+    assert await catalog.refresh() is False        # nada mudou
+
+    _FakeRepo.fingerprint = "v2"
+    _FakeRepo.services = SERVICOS[:1]
+    assert await catalog.refresh() is True
+
+    assert published == [1, 2]
+    assert catalog.snapshot.names() == ["Corte de Cabelo Feminino"]
+    assert _FakeRepo.loads == 2
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import Forbidden, RetryAfter
+
+from src.platform.telegram.rate_limited_sender import RateLimitedSender
+from src.services.session_expiry_service import SessionExpiryService
+
+class _FakePersistence:
+    """expirados: user_id (inativo logo antes do corte) ou (user_id, minutos de inatividade além do corte)."""
+    def __init__(self, expirados):
+        self.expirados = [e if isinstance(e, tuple) else (e, 0) for e in expirados]
+        self.calls = []
+
+    async def delete_expired_sessions(self, cutoff, batch_size):
+        self.calls.append((cutoff, batch_size))
+        return [(user_id, cutoff - timedelta(minutes=1 + atraso)) for user_id, atraso in self.expirados[:batch_size]]
+
+class _FakeHistory:
+    def __init__(self):
+        self.discarded = []
+
+    async def discard_history(self, user_id):
+        self.discarded.append(user_id)
+
+class _FakeBot:
+    def __init__(self, errors=None):
+        self.sent = []
+        self.errors = dict(errors or {})
+
+    async def send_message(self, chat_id, text):
+        error = self.errors.pop(chat_id, None)
+        if error:
+            raise error
+        self.sent.append((chat_id, text))
+
+# -----------------------------
+# Varredura
+# -----------------------------
+@pytest.mark.asyncio
+async def test_sweep_uses_timeout_cutoff_and_one_batch_per_tick():
+    persistence, history = _FakePersistence([1, 2, 3]), _FakeHistory()
+    service = SessionExpiryService(persistence, history, RateLimitedSender(), timeout_minutes=10, batch_size=2)
+    now = datetime(2025, 10, 20, 12, 0)
+
+    assert await service.sweep(now) == ([1, 2], [1, 2])
+    assert persistence.calls == [(now - timedelta(minutes=10), 2)]
+    assert history.discarded == [1, 2]
+
+@pytest.mark.asyncio
+async def test_sweep_job_clears_user_data_and_notifies_in_background():
+    bot = _FakeBot()
+    tasks = []
+    application = SimpleNamespace(
+        user_data={1: {"etapa": "x"}}
+        , create_task=lambda coro, name=None: tasks.append(asyncio.ensure_future(coro))
+    )
+    context = SimpleNamespace(application=application, bot=bot)
+    service = SessionExpiryService(_FakePersistence([1, 2]), _FakeHistory(), RateLimitedSender(rate_per_second=1000))
+
+    await service.sweep_job(context)
+    await asyncio.gather(*tasks)
+
+    assert application.user_data[1] == {}
+    assert [chat_id for chat_id, _ in bot.sent] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_sessions_expired_long_ago_are_removed_without_notice():
+    bot = _FakeBot()
+    tasks = []
+    application = SimpleNamespace(
+        user_data={}
+        , create_task=lambda coro, name=None: tasks.append(asyncio.ensure_future(coro))
+    )
+    # 2 ficou de antes da varredura (meses parada): sai sem aviso
+    persistence = _FakePersistence([1, (2, 60 * 24 * 90)])
+    history = _FakeHistory()
+    service = SessionExpiryService(persistence, history, RateLimitedSender(rate_per_second=1000))
+
+    await service.sweep_job(SimpleNamespace(application=application, bot=bot))
+    await asyncio.gather(*tasks)
+
+    assert history.discarded == [1, 2]
+    assert [chat_id for chat_id, _ in bot.sent] == [1]
+
+# -----------------------------
+# Envio com limite de taxa
+# -----------------------------
+@pytest.mark.asyncio
+async def test_rate_limited_sender_retries_after_flood_control_and_skips_blocked_users():
+    bot = _FakeBot(errors={1: RetryAfter(0), 2: Forbidden("blocked")})
+    sender = RateLimitedSender(rate_per_second=1000)
+
+    entregues = await sender.send_many(bot, [(1, "a"), (2, "b"), (3, "c")])
+
+    assert entregues == 2
+    assert bot.sent == [(1, "a"), (3, "c")]
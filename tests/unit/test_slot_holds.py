@@ -0,0 +1,63 @@
+import asyncio
+from datetime import date, time
+
+import pytest
+
+from src.services.scheduler_service import SchedulerService
+from src.services.slot_holds import SlotHoldService
+
+DIA = date(2025, 10, 20)
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.mark.asyncio
+async def test_hold_is_exclusive_per_resource_and_expires():
+    clock = _Clock()
+    holds = SlotHoldService(ttl_seconds=60, clock=clock)
+
+    assert await holds.hold(1, DIA, time(10, 0), time(10, 30))
+    assert not await holds.hold(2, DIA, time(10, 15), time(10, 45))
+    assert await holds.hold(2, DIA, time(10, 30), time(11, 0))          # encosta, não sobrepõe
+    assert await holds.conflicts(DIA, time(10, 0), time(10, 30), user_id=3)
+    assert not await holds.conflicts(DIA, time(10, 0), time(10, 30), user_id=1)
+
+    # Nova escolha do mesmo usuário substitui a anterior
+    assert await holds.hold(1, DIA, time(15, 0), time(15, 30))
+    assert await holds.hold(3, DIA, time(10, 0), time(10, 30))
+
+    clock.now += 61
+    assert await holds.get(1) is None
+    assert await holds.hold(4, DIA, time(15, 0), time(15, 30))
+
+@pytest.mark.asyncio
+async def test_holds_on_different_professionals_do_not_collide():
+    holds = SlotHoldService()
+    assert await holds.hold(1, DIA, time(10, 0), time(11, 0), profissional_id=7)
+    assert await holds.hold(2, DIA, time(10, 0), time(11, 0), profissional_id=8)
+    assert not await holds.hold(3, DIA, time(10, 0), time(11, 0))     # estabelecimento inteiro
+
+@pytest.mark.asyncio
+async def test_concurrent_acquires_grant_a_single_winner():
+    holds = SlotHoldService()
+    resultados = await asyncio.gather(*(holds.hold(u, DIA, time(9, 0), time(9, 30)) for u in range(20)))
+    assert resultados.count(True) == 1
+
+class _Repo:
+    async def verificar_disponibilidade(self, data):
+        return []
+
+@pytest.mark.asyncio
+async def test_availability_hides_other_users_holds_only():
+    holds = SlotHoldService()
+    await holds.hold(1, DIA, time(9, 0), time(12, 0))
+    scheduler = SchedulerService(_Repo(), holds=holds)
+
+    outro = await scheduler.get_day_availability(DIA, user_id=2)
+    dono = await scheduler.get_day_availability(DIA, user_id=1)
+    assert "Manhã" not in outro.available_shifts(30)
+    assert dono.available_shifts(30)[0] == "Manhã"
@@ -0,0 +1,37 @@
+import pytest
+
+from src.services.service_catalog import CatalogSnapshot
+from src.services.slot_processor_service import SlotProcessorService
+
+SERVICOS = [
+    {"servico_id": 1, "nome": "Corte de Cabelo Feminino", "descricao": None, "preco": 50.0, "duracao_minutos": 45},
+    {"servico_id": 2, "nome": "Corte de Cabelo Masculino", "descricao": None, "preco": 35.0, "duracao_minutos": 30},
+    {"servico_id": 3, "nome": "Coloração", "descricao": None, "preco": 120.0, "duracao_minutos": 90},
+]
+
+class _FakePersistence:
+    """Responde pelo snapshot em memória, como o PersistenceService faz com o catálogo carregado."""
+    def __init__(self):
+        self.snapshot = CatalogSnapshot(SERVICOS, version=1)
+
+    async def get_service_details_by_name(self, nome):
+        return self.snapshot.get_by_name(nome)
+
+    async def match_services(self, termo, limit=3):
+        return self.snapshot.match(termo, limit=limit)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("texto, esperado", [
+    ("Coloração", 3),                 # exato
+    ("colorasao", 3),                 # erro de digitação
+    ("corte masculno", 2),            # aproximado, destacado do segundo colocado
+    ("corte de cabelo", None),        # ambíguo: feminino x masculino
+    ("manicure", None),               # fora do catálogo
+])
+async def test_normalize_service_details_uses_fuzzy_fallback(texto, esperado):
+    processor = SlotProcessorService(_FakePersistence())
+    slots = await processor._normalize_service_details({"servico": texto})
+
+    assert slots.get('servico_id') == esperado
+    if esperado is None:
+        assert 'servico' not in slots
@@ -0,0 +1,90 @@
+import asyncio
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from telegram import Update
+
+from src.bot.update_dedup import RecentIds, UpdateDeduplicator
+from src.bot.update_processor import InstrumentedUpdateProcessor
+from src.utils.striped_lock import StripedLock
+
+def _update(update_id: int, user_id: int = 1) -> Update:
+    return Update.de_json({"update_id": update_id, "message": {
+        "message_id": 1, "date": 0, "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "U"}, "text": "oi"}}, None)
+
+class _FakeRegistry:
+    """Imita a tabela updates_processadas (INSERT ... ON CONFLICT DO NOTHING)."""
+    def __init__(self, falhar: bool = False):
+        self.ids = set()
+        self.falhar = falhar
+
+    async def registrar_update(self, update_id):
+        if self.falhar:
+            raise ConnectionError("banco fora")
+        if update_id in self.ids:
+            return False
+        self.ids.add(update_id)
+        return True
+
+def _processor(deduplicator: UpdateDeduplicator) -> InstrumentedUpdateProcessor:
+    instrumentation = SimpleNamespace(track=lambda label: nullcontext())
+    return InstrumentedUpdateProcessor(instrumentation, max_concurrent_updates=4, user_locks=StripedLock(16)
+                                       , max_admitted_updates=16, deduplicator=deduplicator)
+
+def test_recent_ids_expire_by_ttl_and_size():
+    agora = [0.0]
+    recent = RecentIds(ttl_seconds=10, max_size=3, clock=lambda: agora[0])
+    assert recent.add(1) and not recent.add(1)
+
+    agora[0] = 11
+    assert recent.add(1)        # Expirou: volta a ser novo
+
+    for i in (2, 3, 4):
+        recent.add(i)
+    assert len(recent) == 3
+    assert recent.add(1)        # O mais antigo saiu pelo limite de tamanho
+
+@pytest.mark.asyncio
+async def test_redelivered_update_runs_handlers_once():
+    dedup = UpdateDeduplicator()
+    processor = _processor(dedup)
+    executou = []
+
+    async def handler(nome):
+        executou.append(nome)
+
+    await asyncio.gather(*(processor.process_update(_update(100), handler(f"copia{i}")) for i in range(3)))
+    await processor.process_update(_update(101), handler("outra"))
+
+    assert executou == ["copia0", "outra"]
+    assert dedup.snapshot()["dropped_memory"] == 2
+
+@pytest.mark.asyncio
+async def test_persistent_registry_blocks_updates_claimed_by_other_worker():
+    registry = _FakeRegistry()
+    worker_a, worker_b = UpdateDeduplicator(registry), UpdateDeduplicator(registry)
+    executou = []
+
+    async def handler(worker):
+        executou.append(worker)
+
+    await _processor(worker_a).process_update(_update(7), handler("a"))
+    await _processor(worker_b).process_update(_update(7), handler("b"))
+
+    assert executou == ["a"]
+    assert worker_b.snapshot()["dropped_persistent"] == 1
+
+@pytest.mark.asyncio
+async def test_registry_failure_fails_open():
+    dedup = UpdateDeduplicator(_FakeRegistry(falhar=True))
+    executou = []
+
+    async def handler():
+        executou.append(True)
+
+    await _processor(dedup).process_update(_update(9), handler())
+
+    assert executou == [True]
+    assert dedup.snapshot()["persistent_errors"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from telegram import Update
+
+from src.bot.update_processor import InstrumentedUpdateProcessor
+from src.utils.striped_lock import StripedLock
+
+_seq = iter(range(1, 10_000))
+
+def _update(user_id: int) -> Update:
+    return Update.de_json({"update_id": next(_seq), "message": {
+        "message_id": 1, "date": 0, "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "U"}, "text": "oi"}}, None)
+
+def _processor(max_concurrent: int, admitted: int = 16) -> InstrumentedUpdateProcessor:
+    instrumentation = SimpleNamespace(track=lambda label: nullcontext())
+    return InstrumentedUpdateProcessor(instrumentation, max_concurrent_updates=max_concurrent
+                                       , user_locks=StripedLock(64), max_admitted_updates=admitted)
+
+def test_striped_lock_is_bounded_and_stable():
+    locks = StripedLock(8)
+    assert len(locks) == 8
+    assert locks.lock_for(123) is locks.lock_for(123)
+    assert len({id(locks.lock_for(i)) for i in range(1000)}) == 8
+
+@pytest.mark.asyncio
+async def test_same_user_is_sequential_and_ordered_while_users_run_in_parallel():
+    processor = _processor(max_concurrent=8)
+    eventos = []
+
+    async def handler(nome, pausa):
+        eventos.append(("inicio", nome))
+        await asyncio.sleep(pausa)
+        eventos.append(("fim", nome))
+
+    tarefas = [asyncio.create_task(processor.process_update(_update(uid), handler(nome, pausa)))
+               for uid, nome, pausa in [(1, "a1", 0.03), (1, "a2", 0), (2, "b1", 0), (1, "a3", 0)]]
+    await asyncio.gather(*tarefas)
+
+    do_a = [e for e in eventos if e[1].startswith("a")]
+    assert do_a == [("inicio", "a1"), ("fim", "a1"), ("inicio", "a2"), ("fim", "a2"), ("inicio", "a3"), ("fim", "a3")]
+    # O outro usuário não espera o handler lento
+    assert eventos.index(("fim", "b1")) < eventos.index(("fim", "a1"))
+
+@pytest.mark.asyncio
+async def test_queued_updates_of_one_user_do_not_take_execution_slots():
+    processor = _processor(max_concurrent=2)
+    liberar = asyncio.Event()
+    executou = []
+
+    async def lento():
+        await liberar.wait()
+
+    async def rapido(nome):
+        executou.append(nome)
+
+    a1 = asyncio.create_task(processor.process_update(_update(1), lento()))
+    a2 = asyncio.create_task(processor.process_update(_update(1), rapido("a2")))
+    b1 = asyncio.create_task(processor.process_update(_update(2), rapido("b1")))
+    await asyncio.wait_for(b1, timeout=1)
+    assert executou == ["b1"] and not a2.done()
+
+    liberar.set()
+    await asyncio.gather(a1, a2)
+    assert executou == ["b1", "a2"]
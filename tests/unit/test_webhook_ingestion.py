@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from src.platform.telegram.webhook import IngestionConfig
+from src.utils.constants import TELEGRAM_WEBHOOK_PATH
+
+UPDATE = {"update_id": 42, "message": {"message_id": 1, "date": 0, "chat": {"id": 7, "type": "private"}, "text": "oi"}}
+
+def test_config_defaults_to_polling_and_validates_webhook(monkeypatch):
+    monkeypatch.delenv("TELEGRAM_MODE", raising=False)
+    assert IngestionConfig.from_env() == IngestionConfig()
+
+    monkeypatch.setenv("TELEGRAM_MODE", "webhook")
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_SECRET", "com espaço")
+    with pytest.raises(ValueError):
+        IngestionConfig.from_env()
+
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_SECRET", "s3cr3t_token")
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_URL", "https://bot.exemplo.com/")
+    config = IngestionConfig.from_env()
+    assert config.is_webhook and config.endpoint == "https://bot.exemplo.com" + TELEGRAM_WEBHOOK_PATH
+    assert config.verify_secret("s3cr3t_token") and not config.verify_secret("outro") and not config.verify_secret(None)
+
+@pytest.fixture
+def client(monkeypatch):
+    fila = asyncio.Queue()
+    bot_app = SimpleNamespace(running=True, bot=None, update_queue=fila)
+    monkeypatch.setattr(app_module.app.state, "telegram_app", bot_app, raising=False)
+    monkeypatch.setattr(app_module.app.state, "ingestion"
+                        , IngestionConfig(mode="webhook", secret_token="s3cr3t"), raising=False)
+    # Sem o bloco `with`: o lifespan (bot real) não é executado
+    return TestClient(app_module.app), fila
+
+def test_webhook_enqueues_update_only_with_secret(client):
+    http, fila = client
+    assert http.post(TELEGRAM_WEBHOOK_PATH, json=UPDATE).status_code == 403
+    assert http.post(TELEGRAM_WEBHOOK_PATH, json=UPDATE
+                     , headers={"X-Telegram-Bot-Api-Secret-Token": "errado"}).status_code == 403
+    assert fila.empty()
+
+    resposta = http.post(TELEGRAM_WEBHOOK_PATH, json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": "s3cr3t"})
+    assert resposta.status_code == 200
+    update = fila.get_nowait()
+    assert update.update_id == 42 and update.message.text == "oi"
+
+    assert http.post(TELEGRAM_WEBHOOK_PATH, content=b"[]"
+                     , headers={"X-Telegram-Bot-Api-Secret-Token": "s3cr3t"}).status_code == 400
+
+def test_webhook_route_is_disabled_in_polling_mode(client, monkeypatch):
+    http, fila = client
+    monkeypatch.setattr(app_module.app.state, "ingestion", IngestionConfig())
+    assert http.post(TELEGRAM_WEBHOOK_PATH, json=UPDATE).status_code == 404